@@ -57,7 +57,7 @@ def _create_token_pair(user: User, request: Request, db: Session) -> Token:
 
 
 @router.post("/login", response_model=Token)
-async def login(
+def login(
     request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
@@ -110,7 +110,7 @@ async def login(
 
 
 @router.post("/login-form", response_model=Token)
-async def login_form(
+def login_form(
     request: Request,
     login_data: LoginRequest,
     db: Session = Depends(get_db)
@@ -179,7 +179,7 @@ async def get_current_user_info(
 
 
 @router.post("/link-telegram", response_model=UserResponse)
-async def link_telegram_account(
+def link_telegram_account(
     data: TelegramLinkRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -197,14 +197,16 @@ async def link_telegram_account(
     if existing:
         existing.telegram_chat_id = None
 
-    current_user.telegram_chat_id = chat_id_str
+    # current_user belongs to the AsyncSession when ASYNC_DATABASE is on
+    user = db.merge(current_user)
+    user.telegram_chat_id = chat_id_str
     db.commit()
-    db.refresh(current_user)
-    return current_user
+    db.refresh(user)
+    return user
 
 
 @router.post("/refresh", response_model=Token)
-async def refresh_access_token(
+def refresh_access_token(
     request: Request,
     data: RefreshTokenRequest,
     db: Session = Depends(get_db),
@@ -241,7 +243,7 @@ async def refresh_access_token(
 
 
 @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
-async def logout(
+def logout(
     data: RefreshTokenRequest,
     db: Session = Depends(get_db),
 ):
@@ -26,7 +26,7 @@ router = APIRouter()
 
 
 @router.post("", response_model=AutomationRuleResponse, status_code=status.HTTP_201_CREATED)
-async def create_new_automation_rule(
+def create_new_automation_rule(
     request: Request,
     rule_data: AutomationRuleCreate,
     db: Session = Depends(get_db),
@@ -56,7 +56,7 @@ async def create_new_automation_rule(
 
 
 @router.get("", response_model=list[AutomationRuleResponse])
-async def get_automation_rules(
+def get_automation_rules(
     request: Request,
     page: int = Query(1, ge=1, description="شماره صفحه"),
     page_size: int = Query(50, ge=1, le=100, description="تعداد آیتم در هر صفحه"),
@@ -72,7 +72,7 @@ async def get_automation_rules(
 
 
 @router.get("/{rule_id}", response_model=AutomationRuleResponse)
-async def get_automation_rule_by_id(
+def get_automation_rule_by_id(
     request: Request,
     rule_id: int,
     db: Session = Depends(get_db),
@@ -90,7 +90,7 @@ async def get_automation_rule_by_id(
 
 
 @router.put("/{rule_id}", response_model=AutomationRuleResponse)
-async def update_automation_rule_by_id(
+def update_automation_rule_by_id(
     request: Request,
     rule_id: int,
     rule_data: AutomationRuleUpdate,
@@ -130,7 +130,7 @@ async def update_automation_rule_by_id(
 
 
 @router.delete("/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_automation_rule_by_id(
+def delete_automation_rule_by_id(
     request: Request,
     rule_id: int,
     db: Session = Depends(get_db),
@@ -28,7 +28,7 @@ router = APIRouter()
 
 
 @router.post("", response_model=BranchInfrastructureResponse, status_code=status.HTTP_201_CREATED)
-async def create_branch_infrastructure(
+def create_branch_infrastructure(
     request: Request,
     infrastructure_data: BranchInfrastructureCreate,
     db: Session = Depends(get_db),
@@ -56,7 +56,7 @@ async def create_branch_infrastructure(
 
 
 @router.get("", response_model=List[BranchInfrastructureResponse])
-async def list_branch_infrastructure(
+def list_branch_infrastructure(
     request: Request,
     branch_id: Optional[int] = Query(None, description="فیلتر بر اساس شعبه"),
     infrastructure_type: Optional[str] = Query(None, description="فیلتر بر اساس نوع"),
@@ -91,7 +91,7 @@ async def list_branch_infrastructure(
 
 
 @router.get("/{infrastructure_id}", response_model=BranchInfrastructureResponse)
-async def get_branch_infrastructure_by_id(
+def get_branch_infrastructure_by_id(
     request: Request,
     infrastructure_id: int,
     db: Session = Depends(get_db),
@@ -114,7 +114,7 @@ async def get_branch_infrastructure_by_id(
 
 
 @router.put("/{infrastructure_id}", response_model=BranchInfrastructureResponse)
-async def update_branch_infrastructure_by_id(
+def update_branch_infrastructure_by_id(
     request: Request,
     infrastructure_id: int,
     infrastructure_data: BranchInfrastructureUpdate,
@@ -156,7 +156,7 @@ async def update_branch_infrastructure_by_id(
 
 
 @router.delete("/{infrastructure_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_branch_infrastructure_by_id(
+def delete_branch_infrastructure_by_id(
     request: Request,
     infrastructure_id: int,
     db: Session = Depends(get_db),
@@ -20,7 +20,7 @@ router = APIRouter()
 
 
 @router.get("", response_model=List[BranchResponse])
-async def get_branches(
+def get_branches(
   request: Request,
   is_active: Optional[bool] = Query(None),
   db: Session = Depends(get_db),
@@ -31,7 +31,7 @@ async def get_branches(
 
 
 @router.post("", response_model=BranchResponse, status_code=status.HTTP_201_CREATED)
-async def add_branch(
+def add_branch(
   request: Request,
   data: BranchCreate,
   db: Session = Depends(get_db),
@@ -47,7 +47,7 @@ async def add_branch(
 
 
 @router.get("/{branch_id}", response_model=BranchResponse)
-async def get_branch_by_id(
+def get_branch_by_id(
   request: Request,
   branch_id: int,
   db: Session = Depends(get_db),
@@ -60,7 +60,7 @@ async def get_branch_by_id(
 
 
 @router.put("/{branch_id}", response_model=BranchResponse)
-async def update_branch(
+def update_branch(
   request: Request,
   branch_id: int,
   data: BranchUpdate,
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 from typing import List
+from app.core.concurrency import run_blocking
 from app.database import get_db
 from app.models import Ticket, User
 from app.schemas.comment import CommentCreate, CommentResponse
@@ -21,7 +22,7 @@ async def add_comment(
   db: Session = Depends(get_db),
   current_user: User = Depends(get_current_active_user)
 ):
-  ticket = get_ticket(db, data.ticket_id)
+  ticket = await run_blocking(get_ticket, db, data.ticket_id)
   if not ticket:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=translate("tickets.not_found", resolve_lang(request, current_user)))
   if not can_user_access_ticket(current_user, ticket):
@@ -33,7 +34,7 @@ async def add_comment(
 
 
 @router.get("/ticket/{ticket_id}", response_model=List[CommentResponse])
-async def list_comments(
+def list_comments(
   request: Request,
   ticket_id: int,
   db: Session = Depends(get_db),
@@ -1,7 +1,7 @@
 """
 API endpoints for Custom Fields management
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.database import get_db
@@ -16,6 +16,7 @@ from app.schemas.custom_field import (
     CustomFieldWithValue,
     BulkCustomFieldValuesUpdate
 )
+from app.services.count_service import resolve_count_mode
 from app.services.custom_field_service import (
     get_custom_fields,
     get_custom_field,
@@ -34,17 +35,19 @@ router = APIRouter()
 
 
 @router.get("", response_model=List[CustomFieldResponse])
-async def list_custom_fields(
+def list_custom_fields(
+    response: Response,
     category: Optional[TicketCategory] = Query(None, description="Filter by ticket category"),
     department_id: Optional[int] = Query(None, description="Filter by department"),
     branch_id: Optional[int] = Query(None, description="Filter by branch"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    include_total: bool = Query(True, description="Return the total count in the X-Total-Count header"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
 ):
-    """Get list of custom fields"""
+    """Get list of custom fields (total count in the X-Total-Count header)"""
     custom_fields, total = get_custom_fields(
         db,
         category=category,
@@ -52,13 +55,16 @@ async def list_custom_fields(
         branch_id=branch_id,
         is_active=is_active,
         skip=skip,
-        limit=limit
+        limit=limit,
+        count_mode=resolve_count_mode(include_total)
     )
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
     return custom_fields
 
 
 @router.get("/{field_id}", response_model=CustomFieldResponse)
-async def get_custom_field_by_id(
+def get_custom_field_by_id(
     field_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
@@ -74,7 +80,7 @@ async def get_custom_field_by_id(
 
 
 @router.post("", response_model=CustomFieldResponse, status_code=status.HTTP_201_CREATED)
-async def create_custom_field_endpoint(
+def create_custom_field_endpoint(
     field_data: CustomFieldCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
@@ -91,7 +97,7 @@ async def create_custom_field_endpoint(
 
 
 @router.patch("/{field_id}", response_model=CustomFieldResponse)
-async def update_custom_field_endpoint(
+def update_custom_field_endpoint(
     field_id: int,
     field_data: CustomFieldUpdate,
     db: Session = Depends(get_db),
@@ -116,7 +122,7 @@ async def update_custom_field_endpoint(
 
 
 @router.delete("/{field_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_custom_field_endpoint(
+def delete_custom_field_endpoint(
     field_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
@@ -138,7 +144,7 @@ async def delete_custom_field_endpoint(
 
 
 @router.get("/ticket/{ticket_id}", response_model=List[CustomFieldWithValue])
-async def get_ticket_custom_fields(
+def get_ticket_custom_fields(
     ticket_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -206,7 +212,7 @@ async def get_ticket_custom_fields(
 
 
 @router.post("/ticket/{ticket_id}/values", response_model=List[TicketCustomFieldValueResponse])
-async def set_ticket_custom_field_values(
+def set_ticket_custom_field_values(
     ticket_id: int,
     values_data: BulkCustomFieldValuesUpdate,
     db: Session = Depends(get_db),
@@ -276,7 +282,7 @@ async def set_ticket_custom_field_values(
 
 
 @router.delete("/ticket/{ticket_id}/values/{field_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_ticket_custom_field_value_endpoint(
+def delete_ticket_custom_field_value_endpoint(
     ticket_id: int,
     field_id: int,
     db: Session = Depends(get_db),
@@ -27,7 +27,7 @@ router = APIRouter()
 
 
 @router.post("", response_model=DepartmentResponse, status_code=status.HTTP_201_CREATED)
-async def create_new_department(
+def create_new_department(
     request: Request,
     department_data: DepartmentCreate,
     db: Session = Depends(get_db),
@@ -57,7 +57,7 @@ async def create_new_department(
 
 
 @router.get("", response_model=list[DepartmentResponse])
-async def get_departments(
+def get_departments(
     request: Request,
     page: int = Query(1, ge=1, description="شماره صفحه"),
     page_size: int = Query(50, ge=1, le=100, description="تعداد آیتم در هر صفحه"),
@@ -72,7 +72,7 @@ async def get_departments(
 
 
 @router.get("/{department_id}", response_model=DepartmentResponse)
-async def get_department_by_id(
+def get_department_by_id(
     request: Request,
     department_id: int,
     db: Session = Depends(get_db),
@@ -90,7 +90,7 @@ async def get_department_by_id(
 
 
 @router.put("/{department_id}", response_model=DepartmentResponse)
-async def update_department_by_id(
+def update_department_by_id(
     request: Request,
     department_id: int,
     department_data: DepartmentUpdate,
@@ -130,7 +130,7 @@ async def update_department_by_id(
 
 
 @router.delete("/{department_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_department_by_id(
+def delete_department_by_id(
     request: Request,
     department_id: int,
     db: Session = Depends(get_db),
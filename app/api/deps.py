@@ -1,11 +1,13 @@
 """
 Dependencies for API endpoints
 """
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from jose import JWTError
-from app.database import get_db
+from app.core.concurrency import run_in_session
+from app.database import AnySession, get_session
 from app.models import User
 from app.core.security import decode_access_token
 from app.schemas.token import TokenData
@@ -15,13 +17,25 @@ from app.core.enums import UserRole
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
+def _load_user(db: Session, token_data: TokenData) -> Optional[User]:
+    # branch is serialized by UserResponse; with an AsyncSession it cannot be lazy-loaded later
+    user_query = db.query(User).options(joinedload(User.branch))
+    if token_data.user_id:
+        return user_query.filter(User.id == token_data.user_id).first()
+    return user_query.filter(User.username == token_data.username).first()
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_session)
 ) -> User:
     """
     Get current authenticated user from token
     
+    With ASYNC_DATABASE the user comes from the request's AsyncSession: its
+    columns and branch are loaded, but endpoints writing to it must merge it
+    into their own Session first.
+    
     Args:
         token: JWT token from request
         db: Database session
@@ -52,11 +66,7 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user_query = db.query(User)
-    if token_data.user_id:
-        user = user_query.filter(User.id == token_data.user_id).first()
-    else:
-        user = user_query.filter(User.username == token_data.username).first()
+    user = await run_in_session(db, _load_user, token_data)
     
     if user is None:
         raise credentials_exception
@@ -105,4 +115,8 @@ require_admin = require_roles(UserRole.ADMIN, UserRole.CENTRAL_ADMIN)
 require_central_admin = require_roles(UserRole.CENTRAL_ADMIN)
 require_branch_admin = require_roles(UserRole.BRANCH_ADMIN, UserRole.CENTRAL_ADMIN)
 require_report_access = require_roles(UserRole.REPORT_MANAGER, UserRole.ADMIN, UserRole.CENTRAL_ADMIN)
+# Branch admins see reports limited to their branch
+require_branch_report_access = require_roles(
+    UserRole.REPORT_MANAGER, UserRole.ADMIN, UserRole.CENTRAL_ADMIN, UserRole.BRANCH_ADMIN
+)
 
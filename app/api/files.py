@@ -30,7 +30,7 @@ router = APIRouter()
 
 
 @router.post("/upload", response_model=FileUploadResponse, status_code=status.HTTP_201_CREATED)
-async def upload_file(
+def upload_file(
     request: Request,
     ticket_id: int = Query(..., description="شناسه تیکت"),
     file: UploadFile = File(..., description="فایل برای آپلود"),
@@ -115,7 +115,7 @@ async def upload_file(
 
 
 @router.get("/{file_id}", response_class=FastAPIFileResponse)
-async def download_file(
+def download_file(
     request: Request,
     file_id: int,
     db: Session = Depends(get_db),
@@ -176,7 +176,7 @@ async def download_file(
 
 
 @router.get("/ticket/{ticket_id}/list", response_model=List[FileResponse])
-async def get_ticket_files(
+def get_ticket_files(
     request: Request,
     ticket_id: int,
     db: Session = Depends(get_db),
@@ -217,7 +217,7 @@ async def get_ticket_files(
 
 
 @router.delete("/{file_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_file(
+def delete_file(
     request: Request,
     file_id: int,
     db: Session = Depends(get_db),
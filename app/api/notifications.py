@@ -5,7 +5,8 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.database import get_db
+from app.core.concurrency import run_in_session
+from app.database import AnySession, get_db, get_session
 from app.api.deps import get_current_active_user
 from app.schemas.notification import (
     NotificationResponse,
@@ -23,15 +24,15 @@ router = APIRouter()
 
 
 @router.get("", response_model=List[NotificationResponse])
-def get_my_notifications(
+async def get_my_notifications(
     limit: int = Query(10, ge=1, le=50, description="حداکثر تعداد اعلان بازگشتی"),
-    db: Session = Depends(get_db),
+    db: AnySession = Depends(get_session),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     دریافت اعلان‌های کاربر جاری
     """
-    notifications = list_notifications_for_user(db, current_user.id, limit=limit)
+    notifications = await run_in_session(db, list_notifications_for_user, current_user.id, limit=limit)
     # Map to response with read flag
     return [
         NotificationResponse(
@@ -10,7 +10,7 @@ router = APIRouter()
 
 
 @router.get("", response_model=list[PriorityInfo])
-async def get_priorities(
+def get_priorities(
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -1,27 +1,27 @@
-from datetime import date
-from typing import Optional, List, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
-from fastapi.responses import PlainTextResponse, StreamingResponse, Response
+from datetime import date, datetime
+from typing import Optional, List, Dict, Any, NamedTuple
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Request
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse, Response
 from io import BytesIO
 try:
   import openpyxl
 except Exception:
   openpyxl = None
 try:
-  from reportlab.lib.pagesizes import A4
-  from reportlab.lib import colors
-  from reportlab.lib.units import cm
-  from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-  from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-  from reportlab.pdfbase import pdfmetrics
-  from reportlab.pdfbase.ttfonts import TTFont
+  import numpy
+except Exception:
+  numpy = None
+try:
+  import reportlab  # noqa: F401  rendering happens in report_render_service
   REPORTLAB_AVAILABLE = True
 except Exception:
   REPORTLAB_AVAILABLE = False
 from sqlalchemy.orm import Session
+from app.core.concurrency import run_blocking
 from app.database import get_db
-from app.api.deps import require_report_access
+from app.api.deps import require_branch_report_access, require_report_access
 from app.models import User
+from app.core.enums import TicketCategory, TicketPriority, TicketStatus, UserRole
 from app.services.report_service import (
     tickets_by_status, 
     tickets_by_date, 
@@ -31,144 +31,268 @@ from app.services.report_service import (
     tickets_by_priority,
     tickets_by_department,
     sla_compliance_report,
-    sla_by_priority
+    sla_by_priority,
+    sla_by_department,
+    sla_by_branch,
+    sla_by_rule,
+    dashboard_kpis,
+    ReportFilter
 )
+from app.services.report_job_service import (
+  JOB_DONE,
+  REPORT_MEDIA_TYPES,
+  get_report_job,
+  report_job_artifact,
+  report_job_params,
+  run_report_job,
+  submit_report_job,
+  wait_for_report_job
+)
+from app.services.latency_stats_service import latency_statistics
+from app.services.report_cache_service import cached_report, report_cache
+from app.schemas.report import ReportJobCreate, ReportJobResponse
+from app.services.ticket_export_service import EXPORT_FORMATS, EXPORT_MEDIA_TYPES, stream_ticket_export
 from app.i18n.translator import translate
 from app.i18n.fastapi_utils import resolve_lang
 
 router = APIRouter()
 
 
+async def _cached(kind: str, compute, **filters):
+  """Serve a report through the report cache, computing it off the event loop"""
+  return await run_blocking(cached_report, kind, compute, **filters)
+
+
+class ReportScope(NamedTuple):
+  """Report filters together with the user they were scoped for"""
+  filters: ReportFilter
+  user: User
+
+
+def report_scope(
+  date_from: Optional[date] = Query(None),
+  date_to: Optional[date] = Query(None),
+  branch_id: Optional[int] = Query(None),
+  department_id: Optional[int] = Query(None),
+  priority: Optional[TicketPriority] = Query(None),
+  category: Optional[TicketCategory] = Query(None),
+  current_user: User = Depends(require_branch_report_access)
+) -> ReportScope:
+  """Report filters from the query string; branch admins only get their own branch"""
+  filters = _scoped_filter(
+    current_user,
+    date_from=date_from,
+    date_to=date_to,
+    branch_id=branch_id,
+    department_id=department_id,
+    priority=priority,
+    category=category,
+  )
+  return ReportScope(filters, current_user)
+
+
+def report_filter(scope: ReportScope = Depends(report_scope)) -> ReportFilter:
+  """Report filters only, for endpoints that do not need the user"""
+  return scope.filters
+
+
+def _scoped_filter(current_user: User, branch_id: Optional[int] = None, **values) -> ReportFilter:
+  """ReportFilter for a user, pinning branch admins to their own branch"""
+  if current_user.role == UserRole.BRANCH_ADMIN:
+    if current_user.branch_id is None or branch_id not in (None, current_user.branch_id):
+      raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    branch_id = current_user.branch_id
+  return ReportFilter(branch_id=branch_id, **values)
+
+
 @router.get("/overview")
 async def overview(
   request: Request,
-  db: Session = Depends(get_db),
-  _current_user: User = Depends(require_report_access)
+  filters: ReportFilter = Depends(report_filter),
+  db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+  return await _cached("overview", lambda: tickets_overview(db, filters), **filters.as_dict())
+
+
+@router.get("/dashboard")
+async def report_dashboard(
+  request: Request,
+  filters: ReportFilter = Depends(report_filter),
+  db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
-  return tickets_overview(db)
+  """All dashboard KPIs in one payload (the single report endpoints in one round trip)"""
+  return await _cached("dashboard", lambda: dashboard_kpis(db, filters), **filters.as_dict())
 
 
 @router.get("/by-status")
 async def report_by_status(
   request: Request,
-  db: Session = Depends(get_db),
-  _current_user: User = Depends(require_report_access)
+  filters: ReportFilter = Depends(report_filter),
+  db: Session = Depends(get_db)
 ) -> Dict[str, int]:
-  return tickets_by_status(db)
+  return await _cached("by-status", lambda: tickets_by_status(db, filters), **filters.as_dict())
 
 
 @router.get("/by-date")
 async def report_by_date(
   request: Request,
-  date_from: Optional[date] = Query(None),
-  date_to: Optional[date] = Query(None),
-  db: Session = Depends(get_db),
-  _current_user: User = Depends(require_report_access)
+  filters: ReportFilter = Depends(report_filter),
+  db: Session = Depends(get_db)
 ) -> List[Dict[str, Any]]:
-  return tickets_by_date(db, date_from, date_to)
+  return await _cached("by-date", lambda: tickets_by_date(db, filters), **filters.as_dict())
 
 
 @router.get("/by-branch")
 async def report_by_branch(
   request: Request,
-  db: Session = Depends(get_db),
-  _current_user: User = Depends(require_report_access)
+  filters: ReportFilter = Depends(report_filter),
+  db: Session = Depends(get_db)
 ):
-  return tickets_by_branch(db)
+  return await _cached("by-branch", lambda: tickets_by_branch(db, filters), **filters.as_dict())
 
 
 @router.get("/response-time")
 async def report_response_time(
   request: Request,
-  db: Session = Depends(get_db),
-  _current_user: User = Depends(require_report_access)
+  filters: ReportFilter = Depends(report_filter),
+  db: Session = Depends(get_db)
 ):
-  avg_hours = average_response_time_hours(db)
+  avg_hours = await _cached(
+    "response-time", lambda: average_response_time_hours(db, filters), **filters.as_dict()
+  )
   return {"average_response_time_hours": avg_hours}
 
 
+@router.get("/latency")
+async def report_latency(
+  request: Request,
+  filters: ReportFilter = Depends(report_filter),
+  db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+  """Response/resolution time median, p90, p95 and histograms per branch, department and priority"""
+  if numpy is None:
+    raise HTTPException(status_code=500, detail="numpy is not installed")
+  return await _cached("latency", lambda: latency_statistics(db, filters), **filters.as_dict())
+
+
 @router.get("/by-priority")
 async def report_by_priority(
   request: Request,
-  db: Session = Depends(get_db),
-  _current_user: User = Depends(require_report_access)
+  filters: ReportFilter = Depends(report_filter),
+  db: Session = Depends(get_db)
 ) -> Dict[str, int]:
   """Report tickets by priority"""
-  return tickets_by_priority(db)
+  return await _cached("by-priority", lambda: tickets_by_priority(db, filters), **filters.as_dict())
 
 
 @router.get("/by-department")
 async def report_by_department(
   request: Request,
-  db: Session = Depends(get_db),
-  _current_user: User = Depends(require_report_access)
+  filters: ReportFilter = Depends(report_filter),
+  db: Session = Depends(get_db)
 ):
   """Report tickets by department"""
-  return tickets_by_department(db)
+  return await _cached("by-department", lambda: tickets_by_department(db, filters), **filters.as_dict())
 
 
 @router.get("/sla-compliance")
 async def report_sla_compliance(
   request: Request,
-  db: Session = Depends(get_db),
-  _current_user: User = Depends(require_report_access)
+  filters: ReportFilter = Depends(report_filter),
+  db: Session = Depends(get_db)
 ):
   """SLA compliance report"""
-  return sla_compliance_report(db)
+  return await _cached("sla-compliance", lambda: sla_compliance_report(db, filters), **filters.as_dict())
 
 
 @router.get("/sla-by-priority")
 async def report_sla_by_priority(
   request: Request,
-  db: Session = Depends(get_db),
-  _current_user: User = Depends(require_report_access)
+  filters: ReportFilter = Depends(report_filter),
+  db: Session = Depends(get_db)
 ):
   """SLA compliance report by priority"""
-  return sla_by_priority(db)
+  return await _cached("sla-by-priority", lambda: sla_by_priority(db, filters), **filters.as_dict())
+
+
+@router.get("/sla-by-department")
+async def report_sla_by_department(
+  request: Request,
+  filters: ReportFilter = Depends(report_filter),
+  db: Session = Depends(get_db)
+):
+  """SLA compliance report by department"""
+  return await _cached("sla-by-department", lambda: sla_by_department(db, filters), **filters.as_dict())
+
+
+@router.get("/sla-by-branch")
+async def report_sla_by_branch(
+  request: Request,
+  filters: ReportFilter = Depends(report_filter),
+  db: Session = Depends(get_db)
+):
+  """SLA compliance report by branch"""
+  return await _cached("sla-by-branch", lambda: sla_by_branch(db, filters), **filters.as_dict())
+
+
+@router.get("/sla-by-rule")
+async def report_sla_by_rule(
+  request: Request,
+  filters: ReportFilter = Depends(report_filter),
+  db: Session = Depends(get_db)
+):
+  """SLA compliance report by SLA rule"""
+  return await _cached("sla-by-rule", lambda: sla_by_rule(db, filters), **filters.as_dict())
+
+
+@router.get("/cache-stats")
+def report_cache_stats(
+  _current_user: User = Depends(require_report_access)
+) -> Dict[str, Any]:
+  """Hit/miss counters of this process's report cache"""
+  return report_cache.stats()
 
 
 @router.get("/export", response_class=PlainTextResponse)
-async def export_csv(
+def export_csv(
   request: Request,
   kind: str = Query(..., description="نوع گزارش: overview|by-status|by-date|by-branch|by-priority|by-department|sla-compliance"),
-  date_from: Optional[date] = Query(None),
-  date_to: Optional[date] = Query(None),
-  db: Session = Depends(get_db),
-  _current_user: User = Depends(require_report_access)
+  filters: ReportFilter = Depends(report_filter),
+  db: Session = Depends(get_db)
 ):
   # very basic CSV export (UTF-8)
   if kind == "overview":
-    data = tickets_overview(db)
+    data = tickets_overview(db, filters)
     header = "metric,value"
     rows = [f"{k},{v}" for k, v in data.items()]
     return "\n".join([header, *rows])
   if kind == "by-status":
-    data = tickets_by_status(db)
+    data = tickets_by_status(db, filters)
     header = "status,count"
     rows = [f"{k},{v}" for k, v in data.items()]
     return "\n".join([header, *rows])
   if kind == "by-date":
-    data = tickets_by_date(db, date_from, date_to)
+    data = tickets_by_date(db, filters)
     header = "date,count"
     rows = [f"{row['date']},{row['count']}" for row in data]
     return "\n".join([header, *rows])
   if kind == "by-branch":
-    data = tickets_by_branch(db)
+    data = tickets_by_branch(db, filters)
     header = "branch_id,branch_name,branch_code,count"
     rows = [f"{row['branch_id']},{row['branch_name']},{row['branch_code']},{row['count']}" for row in data]
     return "\n".join([header, *rows])
   if kind == "by-priority":
-    data = tickets_by_priority(db)
+    data = tickets_by_priority(db, filters)
     header = "priority,count"
     rows = [f"{k},{v}" for k, v in data.items()]
     return "\n".join([header, *rows])
   if kind == "by-department":
-    data = tickets_by_department(db)
+    data = tickets_by_department(db, filters)
     header = "department_id,department_name,department_code,count"
     rows = [f"{row['department_id']},{row['department_name']},{row['department_code']},{row['count']}" for row in data]
     return "\n".join([header, *rows])
   if kind == "sla-compliance":
-    data = sla_compliance_report(db)
+    data = sla_compliance_report(db, filters)
     header = "metric,value"
     rows = [f"{k},{v}" for k, v in data.items()]
     return "\n".join([header, *rows])
@@ -176,53 +300,50 @@ async def export_csv(
 
 
 @router.get("/export.xlsx")
-async def export_xlsx(
+def export_xlsx(
   request: Request,
   kind: str = Query(..., description="overview|by-status|by-date|by-branch|by-priority|by-department|sla-compliance"),
-  date_from: Optional[date] = Query(None),
-  date_to: Optional[date] = Query(None),
-  db: Session = Depends(get_db),
-  _current_user: User = Depends(require_report_access)
+  filters: ReportFilter = Depends(report_filter),
+  db: Session = Depends(get_db)
 ):
   if openpyxl is None:
     raise HTTPException(status_code=500, detail="openpyxl is not installed")
 
-  wb = openpyxl.Workbook()
-  ws = wb.active
-  ws.title = kind
+  wb = openpyxl.Workbook(write_only=True)
+  ws = wb.create_sheet(kind)
 
   if kind == "overview":
-    data = tickets_overview(db)
+    data = tickets_overview(db, filters)
     ws.append(["metric", "value"])
     for k, v in data.items():
       ws.append([k, v])
   elif kind == "by-status":
-    data = tickets_by_status(db)
+    data = tickets_by_status(db, filters)
     ws.append(["status", "count"])
     for k, v in data.items():
       ws.append([k, v])
   elif kind == "by-date":
-    data = tickets_by_date(db, date_from, date_to)
+    data = tickets_by_date(db, filters)
     ws.append(["date", "count"])
     for row in data:
       ws.append([row["date"], row["count"]])
   elif kind == "by-branch":
-    data = tickets_by_branch(db)
+    data = tickets_by_branch(db, filters)
     ws.append(["branch_id", "branch_name", "branch_code", "count"])
     for row in data:
       ws.append([row["branch_id"], row["branch_name"], row["branch_code"], row["count"]])
   elif kind == "by-priority":
-    data = tickets_by_priority(db)
+    data = tickets_by_priority(db, filters)
     ws.append(["priority", "count"])
     for k, v in data.items():
       ws.append([k, v])
   elif kind == "by-department":
-    data = tickets_by_department(db)
+    data = tickets_by_department(db, filters)
     ws.append(["department_id", "department_name", "department_code", "count"])
     for row in data:
       ws.append([row["department_id"], row["department_name"], row["department_code"], row["count"]])
   elif kind == "sla-compliance":
-    data = sla_compliance_report(db)
+    data = sla_compliance_report(db, filters)
     ws.append(["metric", "value"])
     for k, v in data.items():
       ws.append([k, v])
@@ -239,177 +360,160 @@ async def export_xlsx(
   )
 
 
-@router.get("/export-pdf")
-async def export_pdf(
+@router.get("/export/tickets")
+def export_tickets(
   request: Request,
-  date_from: Optional[date] = Query(None),
-  date_to: Optional[date] = Query(None),
+  export_format: str = Query("csv", alias="format", description="csv|ndjson|xlsx"),
+  status_filter: Optional[TicketStatus] = Query(None, alias="status"),
+  priority: Optional[TicketPriority] = Query(None),
+  category: Optional[TicketCategory] = Query(None),
   branch_id: Optional[int] = Query(None),
   department_id: Optional[int] = Query(None),
-  priority: Optional[str] = Query(None),
-  db: Session = Depends(get_db),
-  _current_user: User = Depends(require_report_access)
+  date_from: Optional[date] = Query(None),
+  date_to: Optional[date] = Query(None),
+  current_user: User = Depends(require_report_access)
 ):
-  """Export comprehensive dashboard report as PDF"""
-  if not REPORTLAB_AVAILABLE:
-    raise HTTPException(status_code=500, detail="ReportLab is not installed")
-  
-  # Collect all report data
-  overview_data = tickets_overview(db)
-  status_data = tickets_by_status(db)
-  date_data = tickets_by_date(db, date_from, date_to)
-  branch_data = tickets_by_branch(db)
-  priority_data = tickets_by_priority(db)
-  department_data = tickets_by_department(db)
-  sla_data = sla_compliance_report(db)
-  response_time = average_response_time_hours(db)
-  
-  # Create PDF
-  bio = BytesIO()
-  doc = SimpleDocTemplate(bio, pagesize=A4)
-  story = []
-  styles = getSampleStyleSheet()
-  
-  # Title
-  title_style = ParagraphStyle(
-    'CustomTitle',
-    parent=styles['Heading1'],
-    fontSize=24,
-    textColor=colors.HexColor('#1a1a1a'),
-    spaceAfter=30,
-    alignment=1  # Center
-  )
-  story.append(Paragraph("گزارش جامع داشبورد سیستم تیکتینگ", title_style))
-  story.append(Spacer(1, 0.5*cm))
-  
-  # Overview Section
-  story.append(Paragraph("خلاصه کلی", styles['Heading2']))
-  overview_table_data = [
-    ['معیار', 'مقدار'],
-    ['مجموع تیکت‌ها', str(overview_data.get('total', 0))],
-    ['در انتظار', str(overview_data.get('pending', 0))],
-    ['در حال انجام', str(overview_data.get('in_progress', 0))],
-    ['حل شده', str(overview_data.get('resolved', 0))],
-    ['بسته شده', str(overview_data.get('closed', 0))],
-  ]
-  if response_time:
-    overview_table_data.append(['میانگین زمان پاسخ (ساعت)', f"{response_time:.2f}"])
-  
-  overview_table = Table(overview_table_data, colWidths=[8*cm, 8*cm])
-  overview_table.setStyle(TableStyle([
-    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-    ('FONTSIZE', (0, 0), (-1, 0), 12),
-    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-  ]))
-  story.append(overview_table)
-  story.append(Spacer(1, 0.5*cm))
-  
-  # Status Section
-  story.append(Paragraph("تیکت‌ها بر اساس وضعیت", styles['Heading2']))
-  status_table_data = [['وضعیت', 'تعداد']]
-  status_map = {
-    'pending': 'در انتظار',
-    'in_progress': 'در حال انجام',
-    'resolved': 'حل شده',
-    'closed': 'بسته شده'
-  }
-  for status, count in status_data.items():
-    status_table_data.append([status_map.get(status, status), str(count)])
-  
-  status_table = Table(status_table_data, colWidths=[8*cm, 8*cm])
-  status_table.setStyle(TableStyle([
-    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-    ('FONTSIZE', (0, 0), (-1, 0), 12),
-    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-  ]))
-  story.append(status_table)
-  story.append(Spacer(1, 0.5*cm))
-  
-  # Priority Section
-  story.append(Paragraph("تیکت‌ها بر اساس اولویت", styles['Heading2']))
-  priority_table_data = [['اولویت', 'تعداد']]
-  priority_map = {
-    'critical': 'بحرانی',
-    'high': 'بالا',
-    'medium': 'متوسط',
-    'low': 'پایین'
-  }
-  for pri, count in priority_data.items():
-    priority_table_data.append([priority_map.get(pri, pri), str(count)])
-  
-  priority_table = Table(priority_table_data, colWidths=[8*cm, 8*cm])
-  priority_table.setStyle(TableStyle([
-    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-    ('FONTSIZE', (0, 0), (-1, 0), 12),
-    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-  ]))
-  story.append(priority_table)
-  story.append(Spacer(1, 0.5*cm))
-  
-  # SLA Section
-  if sla_data and sla_data.get('total_tickets_with_sla', 0) > 0:
-    story.append(Paragraph("گزارش رعایت SLA", styles['Heading2']))
-    sla_table_data = [
-      ['معیار', 'مقدار'],
-      ['مجموع تیکت‌های دارای SLA', str(sla_data.get('total_tickets_with_sla', 0))],
-      ['پاسخ در مهلت', str(sla_data.get('response_on_time', 0))],
-      ['پاسخ هشدار', str(sla_data.get('response_warning', 0))],
-      ['پاسخ نقض شده', str(sla_data.get('response_breached', 0))],
-      ['نرخ رعایت پاسخ (%)', f"{sla_data.get('response_compliance_rate', 0):.1f}"],
-      ['حل در مهلت', str(sla_data.get('resolution_on_time', 0))],
-      ['حل هشدار', str(sla_data.get('resolution_warning', 0))],
-      ['حل نقض شده', str(sla_data.get('resolution_breached', 0))],
-      ['نرخ رعایت حل (%)', f"{sla_data.get('resolution_compliance_rate', 0):.1f}"],
-    ]
-    
-    sla_table = Table(sla_table_data, colWidths=[8*cm, 8*cm])
-    sla_table.setStyle(TableStyle([
-      ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-      ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-      ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-      ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-      ('FONTSIZE', (0, 0), (-1, 0), 12),
-      ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-      ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-      ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    story.append(sla_table)
-    story.append(Spacer(1, 0.5*cm))
-  
-  # Footer
-  from datetime import datetime
-  story.append(Spacer(1, 1*cm))
-  footer_style = ParagraphStyle(
-    'Footer',
-    parent=styles['Normal'],
-    fontSize=8,
-    textColor=colors.grey,
-    alignment=1
+  """
+  Row-level ticket export, streamed while it is read from the database
+
+  CSV and NDJSON start arriving at once and never hold more than one chunk
+  of rows in memory; XLSX is written in write-only mode and sent when done.
+  """
+  if export_format not in EXPORT_FORMATS:
+    raise HTTPException(status_code=400, detail="Invalid format")
+  if export_format == "xlsx" and openpyxl is None:
+    raise HTTPException(status_code=500, detail="openpyxl is not installed")
+
+  body = stream_ticket_export(
+    export_format,
+    current_user,
+    status=status_filter,
+    priority=priority,
+    category=category,
+    branch_id=branch_id,
+    department_id=department_id,
+    date_from=datetime.combine(date_from, datetime.min.time()) if date_from else None,
+    date_to=datetime.combine(date_to, datetime.min.time()) if date_to else None,
   )
-  story.append(Paragraph(f"تاریخ تولید: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", footer_style))
-  
-  # Build PDF
-  doc.build(story)
-  bio.seek(0)
-  
+  filename = f"tickets_{date.today().isoformat()}.{export_format}"
   return StreamingResponse(
-    bio,
-    media_type="application/pdf",
-    headers={"Content-Disposition": f'attachment; filename="dashboard-report-{datetime.now().strftime("%Y%m%d")}.pdf"'}
+    body,
+    media_type=EXPORT_MEDIA_TYPES[export_format],
+    headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"}
+  )
+
+
+def _job_response(job) -> ReportJobResponse:
+  response = ReportJobResponse.model_validate(job)
+  if job.status == JOB_DONE:
+    response.download_url = f"/api/reports/jobs/{job.id}/download"
+  return response
+
+
+def _can_access_job(current_user: User, job) -> bool:
+  """
+  Whether the user may see a job's report
+
+  Jobs are shared by everyone requesting the same parameters, so access
+  follows the report's scope rather than requested_by_id: branch admins
+  only see jobs of their own branch.
+  """
+  if current_user.role != UserRole.BRANCH_ADMIN:
+    return True
+  return current_user.branch_id is not None and report_job_params(job).get("branch_id") == current_user.branch_id
+
+
+def _get_job_or_404(db: Session, job_id: str, current_user: User):
+  job = get_report_job(db, job_id)
+  if job is None or not _can_access_job(current_user, job):
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report job not found")
+  return job
+
+
+def _artifact_response(job) -> FileResponse:
+  path = report_job_artifact(job)
+  if path is None:
+    raise HTTPException(status_code=status.HTTP_410_GONE, detail="Report artifact expired")
+  return FileResponse(
+    path,
+    media_type=REPORT_MEDIA_TYPES[job.kind],
+    filename=f"dashboard-report-{job.finished_at.strftime('%Y%m%d')}.{job.kind}"
   )
 
+
+@router.post("/jobs", response_model=ReportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_report_job(
+  payload: ReportJobCreate,
+  background_tasks: BackgroundTasks,
+  db: Session = Depends(get_db),
+  current_user: User = Depends(require_branch_report_access)
+):
+  """
+  Queue a dashboard report build (PDF or XLSX)
+
+  Returns the job at once; poll GET /jobs/{id} and download when done. An
+  identical request within REPORT_JOB_TTL_SECONDS gets the existing job.
+  Branch admins only get their own branch.
+  """
+  if payload.kind == "pdf" and not REPORTLAB_AVAILABLE:
+    raise HTTPException(status_code=500, detail="ReportLab is not installed")
+  if payload.kind == "xlsx" and openpyxl is None:
+    raise HTTPException(status_code=500, detail="openpyxl is not installed")
+
+  filters = _scoped_filter(current_user, **payload.model_dump(exclude={"kind"}))
+  job, created = submit_report_job(db, payload.kind, filters.as_dict(), requested_by_id=current_user.id)
+  if created:
+    background_tasks.add_task(run_report_job, job.id)
+  return _job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=ReportJobResponse)
+def get_report_job_status(
+  job_id: str,
+  db: Session = Depends(get_db),
+  current_user: User = Depends(require_branch_report_access)
+):
+  job = _get_job_or_404(db, job_id, current_user)
+  return _job_response(job)
+
+
+@router.get("/jobs/{job_id}/download")
+def download_report_job(
+  job_id: str,
+  db: Session = Depends(get_db),
+  current_user: User = Depends(require_branch_report_access)
+):
+  job = _get_job_or_404(db, job_id, current_user)
+  if job.status != JOB_DONE:
+    raise HTTPException(
+      status_code=status.HTTP_409_CONFLICT,
+      detail=job.error if job.error else "Report job not finished"
+    )
+  return _artifact_response(job)
+
+
+@router.get("/export-pdf")
+async def export_pdf(
+  request: Request,
+  scope: ReportScope = Depends(report_scope),
+  db: Session = Depends(get_db)
+):
+  """
+  Export comprehensive dashboard report as PDF
+
+  Runs through the report job queue and waits for it, so rendering happens
+  off the event loop and concurrent identical requests share one build.
+  """
+  if not REPORTLAB_AVAILABLE:
+    raise HTTPException(status_code=500, detail="ReportLab is not installed")
+
+  job, created = await run_blocking(
+    submit_report_job, db, "pdf", scope.filters.as_dict(), requested_by_id=scope.user.id
+  )
+  if created:
+    await run_report_job(job.id)
+  job = await wait_for_report_job(job.id)
+  if job is None or job.status != JOB_DONE:
+    detail = job.error if job is not None and job.error else "Report generation did not finish"
+    raise HTTPException(status_code=500, detail=detail)
+  return _artifact_response(job)
@@ -0,0 +1,27 @@
+"""
+Background scheduler API endpoints
+"""
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.models import User
+from app.schemas.scheduler import SchedulerLeaseResponse, SchedulerStatusResponse
+from app.api.deps import require_admin
+from app.services.scheduler_lease_service import PROCESS_ID, lease_is_active, list_leases
+
+router = APIRouter()
+
+
+@router.get("", response_model=SchedulerStatusResponse)
+def get_scheduler_status(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """Which process runs each background job, and its last run (Admin only)"""
+    leases = []
+    for lease in list_leases(db):
+        response = SchedulerLeaseResponse.model_validate(lease)
+        response.active = lease_is_active(lease)
+        response.held_by_this_process = response.active and lease.holder == PROCESS_ID
+        leases.append(response)
+    return SchedulerStatusResponse(process_id=PROCESS_ID, leases=leases)
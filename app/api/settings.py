@@ -10,7 +10,9 @@ from app.schemas.settings import (
     FileSettingsUpdate, 
     SettingsResponse,
     GeneralSettingsResponse,
-    GeneralSettingsUpdate
+    GeneralSettingsUpdate,
+    PriorityKeywordsResponse,
+    PriorityKeywordsUpdate
 )
 from app.api.deps import get_current_active_user, require_central_admin
 from app.services.settings_service import (
@@ -19,6 +21,10 @@ from app.services.settings_service import (
     get_all_settings,
     initialize_default_settings
 )
+from app.services.priority_classifier_service import (
+    get_priority_keyword_config,
+    set_priority_keyword_config
+)
 from app.i18n.translator import translate
 from app.i18n.fastapi_utils import resolve_lang
 
@@ -26,7 +32,7 @@ router = APIRouter()
 
 
 @router.get("/file", response_model=FileSettingsResponse)
-async def get_file_settings_endpoint(
+def get_file_settings_endpoint(
     request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -42,7 +48,7 @@ async def get_file_settings_endpoint(
 
 
 @router.put("/file", response_model=FileSettingsResponse)
-async def update_file_settings(
+def update_file_settings(
     request: Request,
     settings_data: FileSettingsUpdate,
     db: Session = Depends(get_db),
@@ -110,8 +116,37 @@ async def update_file_settings(
     return FileSettingsResponse(**updated_settings)
 
 
+@router.get("/priority-keywords", response_model=PriorityKeywordsResponse)
+def get_priority_keywords(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_central_admin)
+):
+    """Get keyword sets used to auto-determine ticket priority (Central Admin only)"""
+    return PriorityKeywordsResponse(**get_priority_keyword_config(db))
+
+
+@router.put("/priority-keywords", response_model=PriorityKeywordsResponse)
+def update_priority_keywords(
+    request: Request,
+    keywords_data: PriorityKeywordsUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_central_admin)
+):
+    """Update priority keyword sets and weights (Central Admin only)"""
+    config = get_priority_keyword_config(db)
+    config.update(keywords_data.model_dump(exclude_none=True))
+    try:
+        set_priority_keyword_config(db, config, updated_by_id=current_user.id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=translate("common.bad_request", resolve_lang(request, current_user))
+        )
+    return PriorityKeywordsResponse(**get_priority_keyword_config(db))
+
+
 @router.get("", response_model=GeneralSettingsResponse)
-async def get_settings(
+def get_settings(
     request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -148,7 +183,7 @@ async def get_settings(
 
 
 @router.put("", response_model=GeneralSettingsResponse)
-async def update_settings(
+def update_settings(
     request: Request,
     settings_data: GeneralSettingsUpdate,
     db: Session = Depends(get_db),
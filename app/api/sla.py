@@ -1,7 +1,7 @@
 """
 SLA API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import Optional
 from app.database import get_db
@@ -10,7 +10,10 @@ from app.schemas.sla import (
     SLARuleCreate,
     SLARuleUpdate,
     SLARuleResponse,
-    SLALogResponse
+    SLALogResponse,
+    SLABackfillCreate,
+    SLABackfillUpdate,
+    SLABackfillJobResponse,
 )
 from app.api.deps import get_current_active_user, require_admin
 from app.services.sla_service import (
@@ -22,6 +25,15 @@ from app.services.sla_service import (
     get_ticket_sla_log,
     list_sla_logs,
 )
+from app.services.sla_backfill_service import (
+    create_backfill_job,
+    get_backfill_job,
+    pause_backfill_job,
+    resume_backfill_job,
+    run_backfill_job,
+    update_backfill_throttle,
+)
+from app.services.count_service import resolve_count_mode
 from app.i18n.translator import translate
 from app.i18n.fastapi_utils import resolve_lang
 
@@ -29,7 +41,7 @@ router = APIRouter()
 
 
 @router.post("", response_model=SLARuleResponse, status_code=status.HTTP_201_CREATED)
-async def create_new_sla_rule(
+def create_new_sla_rule(
     request: Request,
     sla_data: SLARuleCreate,
     db: Session = Depends(get_db),
@@ -51,22 +63,28 @@ async def create_new_sla_rule(
 
 
 @router.get("", response_model=list[SLARuleResponse])
-async def get_sla_rules(
+def get_sla_rules(
     request: Request,
+    response: Response,
     page: int = Query(1, ge=1, description="شماره صفحه"),
     page_size: int = Query(50, ge=1, le=100, description="تعداد آیتم در هر صفحه"),
     is_active: Optional[bool] = Query(None, description="فیلتر بر اساس وضعیت"),
+    include_total: bool = Query(True, description="ارسال تعداد کل در هدر X-Total-Count"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get list of SLA rules"""
+    """Get list of SLA rules (total count in the X-Total-Count header)"""
     skip = (page - 1) * page_size
-    rules, total = list_sla_rules(db, skip=skip, limit=page_size, is_active=is_active)
+    rules, total = list_sla_rules(
+        db, skip=skip, limit=page_size, is_active=is_active, count_mode=resolve_count_mode(include_total)
+    )
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
     return rules
 
 
 @router.get("/{sla_id}", response_model=SLARuleResponse)
-async def get_sla_rule_by_id(
+def get_sla_rule_by_id(
     request: Request,
     sla_id: int,
     db: Session = Depends(get_db),
@@ -84,7 +102,7 @@ async def get_sla_rule_by_id(
 
 
 @router.put("/{sla_id}", response_model=SLARuleResponse)
-async def update_sla_rule_by_id(
+def update_sla_rule_by_id(
     request: Request,
     sla_id: int,
     sla_data: SLARuleUpdate,
@@ -115,7 +133,7 @@ async def update_sla_rule_by_id(
 
 
 @router.delete("/{sla_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_sla_rule_by_id(
+def delete_sla_rule_by_id(
     request: Request,
     sla_id: int,
     db: Session = Depends(get_db),
@@ -140,7 +158,7 @@ async def delete_sla_rule_by_id(
 
 
 @router.get("/ticket/{ticket_id}", response_model=SLALogResponse)
-async def get_ticket_sla(
+def get_ticket_sla(
     request: Request,
     ticket_id: int,
     db: Session = Depends(get_db),
@@ -159,8 +177,9 @@ async def get_ticket_sla(
 
 
 @router.get("/logs", response_model=list[SLALogResponse])
-async def get_sla_logs(
+def get_sla_logs(
     request: Request,
+    response: Response,
     page: int = Query(1, ge=1, description="شماره صفحه"),
     page_size: int = Query(50, ge=1, le=100, description="تعداد آیتم در هر صفحه"),
     ticket_id: Optional[int] = Query(None, description="فیلتر بر اساس تیکت"),
@@ -168,12 +187,16 @@ async def get_sla_logs(
     response_status: Optional[str] = Query(None, description="فیلتر بر اساس وضعیت پاسخ"),
     resolution_status: Optional[str] = Query(None, description="فیلتر بر اساس وضعیت حل"),
     escalated: Optional[bool] = Query(None, description="فیلتر بر اساس Escalation"),
+    include_total: bool = Query(True, description="ارسال تعداد کل در هدر X-Total-Count"),
+    estimate_total: bool = Query(False, description="تعداد کل تخمینی (برای داشبوردها)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
 ):
     """
     دریافت لیست لاگ‌های SLA با فیلتر و pagination
     Get list of SLA logs with filters and pagination (Admin only)
+    
+    The total count is returned in the X-Total-Count header.
     """
     skip = (page - 1) * page_size
     logs, total = list_sla_logs(
@@ -184,8 +207,11 @@ async def get_sla_logs(
         sla_rule_id=sla_rule_id,
         response_status=response_status,
         resolution_status=resolution_status,
-        escalated=escalated
+        escalated=escalated,
+        count_mode=resolve_count_mode(include_total, estimate_total)
     )
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
     
     # اضافه کردن اطلاعات مرتبط برای نمایش بهتر
     result = []
@@ -212,3 +238,94 @@ async def get_sla_logs(
     return result
 
 
+def _backfill_response(job) -> SLABackfillJobResponse:
+    response = SLABackfillJobResponse.model_validate(job)
+    response.progress = round(job.processed_tickets / job.total_tickets, 4) if job.total_tickets else (
+        1.0 if job.status == "done" else 0.0
+    )
+    return response
+
+
+def _get_backfill_or_404(db: Session, job_id: int):
+    job = get_backfill_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="SLA backfill job not found")
+    return job
+
+
+@router.post("/backfill", response_model=SLABackfillJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def start_sla_backfill(
+    payload: SLABackfillCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Recompute the SLA logs of existing tickets against the current rules (Admin only)
+
+    Returns the job at once; poll GET /backfill/{id}. The job runs in chunks
+    and can be paused, throttled and resumed.
+    """
+    job = create_backfill_job(
+        db,
+        only_open=payload.only_open,
+        dry_run=payload.dry_run,
+        chunk_size=payload.chunk_size,
+        pause_ms=payload.pause_ms,
+        requested_by_id=current_user.id,
+    )
+    background_tasks.add_task(run_backfill_job, job.id)
+    return _backfill_response(job)
+
+
+@router.get("/backfill/{job_id}", response_model=SLABackfillJobResponse)
+def get_sla_backfill(
+    job_id: int,
+    db: Session = Depends(get_db),
+    _current_user: User = Depends(require_admin)
+):
+    """Progress of an SLA backfill (Admin only)"""
+    return _backfill_response(_get_backfill_or_404(db, job_id))
+
+
+@router.patch("/backfill/{job_id}", response_model=SLABackfillJobResponse)
+def throttle_sla_backfill(
+    job_id: int,
+    payload: SLABackfillUpdate,
+    db: Session = Depends(get_db),
+    _current_user: User = Depends(require_admin)
+):
+    """Change the chunk size or pause of an SLA backfill (Admin only)"""
+    job = _get_backfill_or_404(db, job_id)
+    return _backfill_response(update_backfill_throttle(db, job, payload.chunk_size, payload.pause_ms))
+
+
+@router.post("/backfill/{job_id}/pause", response_model=SLABackfillJobResponse)
+def pause_sla_backfill(
+    job_id: int,
+    db: Session = Depends(get_db),
+    _current_user: User = Depends(require_admin)
+):
+    """Pause an SLA backfill after its current chunk (Admin only)"""
+    job = _get_backfill_or_404(db, job_id)
+    try:
+        return _backfill_response(pause_backfill_job(db, job))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@router.post("/backfill/{job_id}/resume", response_model=SLABackfillJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def resume_sla_backfill(
+    job_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    _current_user: User = Depends(require_admin)
+):
+    """Resume a paused, failed or abandoned SLA backfill after its last chunk (Admin only)"""
+    job = _get_backfill_or_404(db, job_id)
+    try:
+        job = resume_backfill_job(db, job)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    background_tasks.add_task(run_backfill_job, job.id)
+    return _backfill_response(job)
@@ -4,6 +4,7 @@ Telegram Bot API endpoints
 from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+from app.core.concurrency import run_blocking
 from app.database import get_db
 from app.models import User, TelegramSession
 from app.api.deps import get_current_active_user
@@ -17,6 +18,41 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _session_activity(db: Session) -> dict:
+    """Telegram session counts and activity times (blocking queries)"""
+    # Count total messages (approximate - using session activity)
+    now = datetime.utcnow()
+    last_24h = now - timedelta(hours=24)
+    last_7d = now - timedelta(days=7)
+    
+    # Count active sessions as proxy for message activity
+    total_sessions = db.query(TelegramSession).count()
+    sessions_last_24h = db.query(TelegramSession).filter(
+        TelegramSession.last_activity >= last_24h
+    ).count()
+    sessions_last_7d = db.query(TelegramSession).filter(
+        TelegramSession.last_activity >= last_7d
+    ).count()
+    
+    # Get last activity time
+    last_activity_obj = db.query(TelegramSession).order_by(
+        TelegramSession.last_activity.desc()
+    ).first()
+    
+    # Calculate uptime (when bot started - approximate)
+    # We'll use the earliest session creation time as proxy
+    earliest_session = db.query(TelegramSession).order_by(
+        TelegramSession.created_at.asc()
+    ).first()
+    return {
+        "total_sessions": total_sessions,
+        "sessions_last_24h": sessions_last_24h,
+        "sessions_last_7d": sessions_last_7d,
+        "last_activity": last_activity_obj.last_activity.isoformat() if last_activity_obj else None,
+        "uptime_seconds": int((now - earliest_session.created_at).total_seconds()) if earliest_session else None,
+    }
+
+
 @router.get("/status")
 async def get_telegram_bot_status(
     request: Request,
@@ -49,34 +85,12 @@ async def get_telegram_bot_status(
                 logger.warning(f"Could not get bot info: {e}")
         
         # Get message statistics from TelegramSession
-        # Count total messages (approximate - using session activity)
-        now = datetime.utcnow()
-        last_24h = now - timedelta(hours=24)
-        last_7d = now - timedelta(days=7)
-        
-        # Count active sessions as proxy for message activity
-        total_sessions = db.query(TelegramSession).count()
-        sessions_last_24h = db.query(TelegramSession).filter(
-            TelegramSession.last_activity >= last_24h
-        ).count()
-        sessions_last_7d = db.query(TelegramSession).filter(
-            TelegramSession.last_activity >= last_7d
-        ).count()
-        
-        # Get last activity time
-        last_activity_obj = db.query(TelegramSession).order_by(
-            TelegramSession.last_activity.desc()
-        ).first()
-        last_activity = last_activity_obj.last_activity.isoformat() if last_activity_obj else None
-        
-        # Calculate uptime (when bot started - approximate)
-        # We'll use the earliest session creation time as proxy
-        earliest_session = db.query(TelegramSession).order_by(
-            TelegramSession.created_at.asc()
-        ).first()
-        uptime_seconds = None
-        if earliest_session:
-            uptime_seconds = int((now - earliest_session.created_at).total_seconds())
+        activity = await run_blocking(_session_activity, db)
+        total_sessions = activity["total_sessions"]
+        sessions_last_24h = activity["sessions_last_24h"]
+        sessions_last_7d = activity["sessions_last_7d"]
+        last_activity = activity["last_activity"]
+        uptime_seconds = activity["uptime_seconds"]
         
         # Use session counts as approximate message counts
         # In a real implementation, you'd track actual messages
@@ -1,12 +1,13 @@
 """
 Ticket API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from datetime import date
-from app.database import get_db
-from app.models import Ticket, User
+from app.core.concurrency import run_blocking, run_in_session
+from app.database import AnySession, get_db, get_session
+from app.models import User
 from app.schemas.comment import CommentCreate
 from app.schemas.ticket import (
     TicketCreate,
@@ -15,6 +16,7 @@ from app.schemas.ticket import (
     TicketAssignUpdate,
     TicketResponse,
     TicketListResponse,
+    TicketSyncResponse,
     BulkActionRequest,
     BulkActionResponse
 )
@@ -27,10 +29,17 @@ from app.services.ticket_service import (
     update_ticket,
     update_ticket_status,
     get_user_tickets,
+    get_user_tickets_after_cursor,
     get_all_tickets,
+    get_all_tickets_after_cursor,
     can_user_access_ticket,
+    InvalidTicketCursor,
 )
 from app.services.comment_service import create_comment
+from app.services.ticket_bulk_service import run_bulk_action, fan_out_status_notifications
+from app.services.count_service import resolve_count_mode
+from app.services.ticket_cache_service import CachedTicket, ticket_read_cache
+from app.services.ticket_sync_service import SYNC_MAX_PAGE_SIZE, SYNC_PAGE_SIZE, sync_tickets
 from app.services.ticket_history_service import (
     create_ticket_history,
     get_ticket_history,
@@ -82,43 +91,13 @@ async def create_new_ticket(
                 )
             ticket_data.branch_id = current_user.branch_id
 
-        # Create ticket
-        ticket = create_ticket(db, ticket_data, current_user.id)
+        # Create ticket (ticket, SLA log, assignment, history and feed rows in one commit)
+        ticket = await run_blocking(create_ticket, db, ticket_data, current_user.id)
+        ticket = await run_blocking(get_ticket, db, ticket.id, load_relations=True)
         logger.debug(f"Ticket created: id={ticket.id}, ticket_number={ticket.ticket_number}")
-        
-        # Reload ticket with user relationship using joinedload to ensure proper serialization
-        from sqlalchemy.orm import joinedload
-        ticket_id = ticket.id  # Store ID before reload
-        db.refresh(ticket)  # Refresh to ensure we have latest data
-        
-        # Reload with user relationship
-        ticket_with_user = db.query(Ticket).options(joinedload(Ticket.user)).filter(Ticket.id == ticket_id).first()
-        
-        if ticket_with_user:
-            ticket = ticket_with_user
-            # Ensure user is set
-            if not ticket.user:
-                logger.warning(f"User relationship not loaded for ticket {ticket.id}, setting manually")
-                ticket.user = current_user
-        else:
-            logger.error(f"Ticket {ticket_id} not found after creation!")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=translate("ticket.creation_failed", resolve_lang(request, current_user))
-            )
-
-        # Log history for ticket creation
-        create_ticket_history(
-            db,
-            TicketHistoryCreate(
-                ticket_id=ticket.id,
-                status=ticket.status,
-                changed_by_id=current_user.id,
-                comment="Ticket created",
-            ),
-        )
 
-        await notify_ticket_created(ticket, db)
+        # Side effects only after the commit
+        await notify_ticket_created(ticket, db, persist_feed=False)
 
         logger.info(f"Ticket created successfully: id={ticket.id}, ticket_number={ticket.ticket_number}, user={ticket.user.username if ticket.user else 'None'}")
         return ticket
@@ -147,15 +126,31 @@ async def get_tickets(
     date_from: Optional[date] = Query(None, description="فیلتر از تاریخ"),
     date_to: Optional[date] = Query(None, description="فیلتر تا تاریخ"),
     ticket_number: Optional[str] = Query(None, description="فیلتر بر اساس شماره تیکت"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="صفحه‌بندی cursor (خالی برای صفحه اول، سپس next_cursor)"),
+    q: Optional[str] = Query(None, max_length=200, description="جستجوی متنی در عنوان، توضیحات و نظرات"),
+    include_total: bool = Query(True, description="محاسبه تعداد کل (false برای پاسخ سریع‌تر)"),
+    estimate_total: bool = Query(False, description="تعداد کل تخمینی (برای داشبوردها)"),
+    db: AnySession = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Get list of tickets with pagination and filters
     
+    Passing ``cursor`` (empty for the first page, then the returned
+    ``next_cursor``) switches to keyset pagination: ``page`` is ignored and
+    no total is computed, so deep pages cost the same as the first one.
+    
+    Passing ``q`` runs a full-text search within the same role scope and
+    filters; results are ordered by relevance and paginated by ``page``
+    (``cursor`` is ignored).
+    
     Args:
         page: Page number
         page_size: Items per page
+        cursor: Keyset cursor (optional)
+        q: Full-text search query (optional)
+        include_total: Compute ``total``/``total_pages`` (false skips the count)
+        estimate_total: Accept an estimated total (planner estimate or a few minutes old)
         status: Filter by status
         category: Filter by category
         db: Database session
@@ -186,66 +181,100 @@ async def get_tickets(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=translate("common.forbidden", lang)
             )
-        from datetime import datetime as dt
-        date_from_dt = dt.combine(date_from, dt.min.time()) if date_from else None
-        date_to_dt = dt.combine(date_to, dt.max.time()) if date_to else None
-        
-        tickets, total = get_all_tickets(
-            db,
-            skip=skip,
-            limit=page_size,
-            status=status,
-            category=category,
-            priority=priority,
-            branch_id=current_user.branch_id,
-            department_id=department_id,
-            assigned_to_id=assigned_to_id,
-            user_id=user_id,
-            date_from=date_from_dt,
-            date_to=date_to_dt,
-            ticket_number=ticket_number,
-        )
-    elif current_user.role in admin_roles:
-        from datetime import datetime as dt
-        date_from_dt = dt.combine(date_from, dt.min.time()) if date_from else None
-        date_to_dt = dt.combine(date_to, dt.max.time()) if date_to else None
-        
-        tickets, total = get_all_tickets(
-            db,
-            skip=skip,
-            limit=page_size,
-            status=status,
-            category=category,
-            priority=priority,
-            branch_id=branch_id,
-            department_id=department_id,
-            assigned_to_id=assigned_to_id,
-            user_id=user_id,
-            date_from=date_from_dt,
-            date_to=date_to_dt,
-            ticket_number=ticket_number,
-        )
-    else:
-        tickets, total = get_user_tickets(
-            db, current_user.id, skip=skip, limit=page_size, status=status, category=category, priority=priority
+        branch_id = current_user.branch_id
+
+    total = None
+    next_cursor = None
+    count_mode = resolve_count_mode(include_total, estimate_total)
+    try:
+        if current_user.role == UserRole.BRANCH_ADMIN or current_user.role in admin_roles:
+            from datetime import datetime as dt
+            filters = dict(
+                status=status,
+                category=category,
+                priority=priority,
+                branch_id=branch_id,
+                department_id=department_id,
+                assigned_to_id=assigned_to_id,
+                user_id=user_id,
+                date_from=dt.combine(date_from, dt.min.time()) if date_from else None,
+                date_to=dt.combine(date_to, dt.max.time()) if date_to else None,
+                ticket_number=ticket_number,
+            )
+            if cursor is None or q:
+                tickets, total = await run_in_session(
+                    db, get_all_tickets, skip=skip, limit=page_size, search=q, count_mode=count_mode, **filters
+                )
+            else:
+                tickets, next_cursor = await run_in_session(
+                    db, get_all_tickets_after_cursor, cursor=cursor, limit=page_size, **filters
+                )
+        else:
+            filters = dict(status=status, category=category, priority=priority)
+            if cursor is None or q:
+                tickets, total = await run_in_session(
+                    db, get_user_tickets, current_user.id, skip=skip, limit=page_size, search=q, count_mode=count_mode, **filters
+                )
+            else:
+                tickets, next_cursor = await run_in_session(
+                    db, get_user_tickets_after_cursor, current_user.id, cursor=cursor, limit=page_size, **filters
+                )
+    except InvalidTicketCursor:
+        # ``status`` is shadowed by the query parameter in this handler
+        raise HTTPException(
+            status_code=400,
+            detail=translate("tickets.invalid_cursor", lang)
         )
     
-    # Load relationships for each ticket
-    from sqlalchemy.orm import joinedload
-    for ticket in tickets:
-        if not ticket.user:
-            ticket.user = db.query(User).filter(User.id == ticket.user_id).first()
-        if ticket.assigned_to_id and not ticket.assigned_to:
-            ticket.assigned_to = db.query(User).filter(User.id == ticket.assigned_to_id).first()
-    
-    total_pages = (total + page_size - 1) // page_size
+    total_pages = (total + page_size - 1) // page_size if total is not None else None
     
     return TicketListResponse(
         items=tickets,
         total=total,
         page=page,
         page_size=page_size,
-        total_pages=total_pages
+        total_pages=total_pages,
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/sync", response_model=TicketSyncResponse)
+def sync_ticket_changes(
+    request: Request,
+    since: Optional[str] = Query(None, description="watermark پاسخ قبلی (خالی برای همگام‌سازی اولیه)"),
+    limit: int = Query(SYNC_PAGE_SIZE, ge=1, le=SYNC_MAX_PAGE_SIZE, description="حداکثر تعداد تغییرات"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get tickets created/updated and tickets deleted since a watermark
+    
+    Meant for polling clients: call without ``since`` for the initial sync,
+    then pass the returned ``watermark`` each time. While ``has_more`` is
+    true, call again immediately. Visibility follows the ticket list rules.
+    
+    Args:
+        since: Watermark of the previous response (optional)
+        limit: Maximum tickets (and tombstones) per response
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        TicketSyncResponse: Changed tickets, tombstones and the next watermark
+    """
+    try:
+        page = sync_tickets(db, current_user, watermark=since, limit=limit)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=translate("tickets.invalid_watermark", resolve_lang(request, current_user))
+        )
+    
+    return TicketSyncResponse(
+        items=page.tickets,
+        deleted=page.deletions,
+        watermark=page.watermark,
+        has_more=page.has_more,
     )
 
 
@@ -253,7 +282,7 @@ async def get_tickets(
 async def get_ticket_by_id(
     request: Request,
     ticket_id: int,
-    db: Session = Depends(get_db),
+    db: AnySession = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -269,28 +298,35 @@ async def get_ticket_by_id(
         
     Raises:
         HTTPException: If ticket not found or user doesn't have access
+        
+    The response carries ETag/Last-Modified; a matching If-None-Match gets 304.
     """
-    ticket = get_ticket(db, ticket_id)
-    
-    if not ticket:
-        lang = resolve_lang(request, current_user)
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=translate("tickets.not_found", lang)
-        )
+    entry = ticket_read_cache.get(ticket_id)
+    if entry is not None:
+        entry = await run_in_session(db, ticket_read_cache.revalidate, entry)
+    if entry is None:
+        stamp = ticket_read_cache.version()
+        ticket = await run_in_session(db, get_ticket, ticket_id, load_relations=True)
+        if not ticket:
+            lang = resolve_lang(request, current_user)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=translate("tickets.not_found", lang)
+            )
+        entry = ticket_read_cache.store(ticket, stamp)
     
     # Check access
-    if not can_user_access_ticket(current_user, ticket):
+    if not can_user_access_ticket(current_user, entry):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=translate("common.forbidden", resolve_lang(request, current_user))
         )
     
-    return ticket
+    return _cached_ticket_response(request, entry)
 
 
 @router.get("/number/{ticket_number}", response_model=TicketResponse)
-async def get_ticket_by_ticket_number(
+def get_ticket_by_ticket_number(
     request: Request,
     ticket_number: str,
     db: Session = Depends(get_db),
@@ -309,28 +345,50 @@ async def get_ticket_by_ticket_number(
         
     Raises:
         HTTPException: If ticket not found or user doesn't have access
+        
+    The response carries ETag/Last-Modified; a matching If-None-Match gets 304.
     """
-    ticket = get_ticket_by_number(db, ticket_number)
-    
-    if not ticket:
-        lang = resolve_lang(request, current_user)
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=translate("tickets.not_found", lang)
-        )
+    entry = ticket_read_cache.get_by_number(ticket_number)
+    if entry is not None:
+        entry = ticket_read_cache.revalidate(db, entry)
+    if entry is None:
+        stamp = ticket_read_cache.version()
+        ticket = get_ticket_by_number(db, ticket_number, load_relations=True)
+        if not ticket:
+            lang = resolve_lang(request, current_user)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=translate("tickets.not_found", lang)
+            )
+        entry = ticket_read_cache.store(ticket, stamp)
     
     # Check access
-    if not can_user_access_ticket(current_user, ticket):
+    if not can_user_access_ticket(current_user, entry):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=translate("common.forbidden", resolve_lang(request, current_user))
         )
     
-    return ticket
+    return _cached_ticket_response(request, entry)
+
+
+def _cached_ticket_response(request: Request, entry: CachedTicket) -> Response:
+    """Serve a cached ticket payload, or 304 when the client's ETag still matches"""
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if entry.last_modified:
+        headers["Last-Modified"] = entry.last_modified
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in candidates or entry.etag in candidates:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return Response(content=entry.payload, media_type="application/json", headers=headers)
 
 
 @router.put("/{ticket_id}", response_model=TicketResponse)
-async def update_ticket_by_id(
+def update_ticket_by_id(
     request: Request,
     ticket_id: int,
     ticket_data: TicketUpdate,
@@ -402,7 +460,7 @@ async def update_ticket_status_by_id(
     Raises:
         HTTPException: If ticket not found
     """
-    ticket = get_ticket(db, ticket_id)
+    ticket = await run_blocking(get_ticket, db, ticket_id)
     
     if not ticket:
         lang = resolve_lang(request, current_user)
@@ -419,7 +477,9 @@ async def update_ticket_status_by_id(
             )
     
     previous_status = ticket.status
-    updated_ticket = update_ticket_status(db, ticket, status_data.status)
+    # The commit expires current_user; reading it afterwards would query on the loop
+    user_id = current_user.id
+    updated_ticket = await run_blocking(update_ticket_status, db, ticket, status_data.status)
 
     comment_text = (
         status_data.comment.strip()
@@ -429,9 +489,9 @@ async def update_ticket_status_by_id(
     if comment_text:
         await create_comment(
             db,
-            current_user.id,
+            user_id,
             CommentCreate(
-                ticket_id=updated_ticket.id,
+                ticket_id=ticket_id,
                 comment=comment_text,
                 is_internal=status_data.is_internal,
             ),
@@ -440,17 +500,19 @@ async def update_ticket_status_by_id(
     # Create history entry
     from app.schemas.ticket_history import TicketHistoryCreate
     history_comment = comment_text or None
-    create_ticket_history(
+    await run_blocking(
+        create_ticket_history,
         db,
         TicketHistoryCreate(
-            ticket_id=updated_ticket.id,
-            status=updated_ticket.status,
-            changed_by_id=current_user.id,
+            ticket_id=ticket_id,
+            status=status_data.status,
+            changed_by_id=user_id,
             comment=history_comment,
         ),
     )
     await notify_ticket_status_changed(updated_ticket, previous_status, db)
-    return updated_ticket
+    # Serialized on the loop: load what TicketResponse reads on a worker thread first
+    return await run_blocking(get_ticket, db, ticket_id, load_relations=True)
 
 
 @router.patch("/{ticket_id}/assign", response_model=TicketResponse)
@@ -478,7 +540,7 @@ async def assign_ticket(
     """
     lang = resolve_lang(request, current_user)
     
-    ticket = get_ticket(db, ticket_id)
+    ticket = await run_blocking(get_ticket, db, ticket_id)
     if not ticket:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -493,7 +555,7 @@ async def assign_ticket(
         )
     
     # Validate assigned user exists
-    assigned_user = db.query(User).filter(User.id == assign_data.assigned_to_id).first()
+    assigned_user = await run_blocking(db.query(User).filter(User.id == assign_data.assigned_to_id).first)
     if not assigned_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -509,50 +571,52 @@ async def assign_ticket(
     
     # Update ticket assignment
     previous_assigned_to_id = ticket.assigned_to_id
-    previous_assigned_to_id = ticket.assigned_to_id
-    ticket.assigned_to_id = assign_data.assigned_to_id
-    db.commit()
-    db.refresh(ticket)
-    
-    # ارسال اعلان تخصیص (اگر تخصیص تغییر کرده باشد)
-    if previous_assigned_to_id != assign_data.assigned_to_id:
-        from app.services.notification_service import notify_ticket_assigned
-        await notify_ticket_assigned(ticket, current_user, db)
-    
-    # Load assigned_to relationship
-    if ticket.assigned_to_id:
-        ticket.assigned_to = db.query(User).filter(User.id == ticket.assigned_to_id).first()
-    
-    # Create history entry
-    from app.schemas.ticket_history import TicketHistoryCreate
-    from app.services.ticket_history_service import create_ticket_history
-    
-    assignment_comment = f"تیکت به {assigned_user.full_name} تخصیص داده شد."
-    if previous_assigned_to_id:
-        previous_user = db.query(User).filter(User.id == previous_assigned_to_id).first()
-        if previous_user:
-            assignment_comment = f"تیکت از {previous_user.full_name} به {assigned_user.full_name} منتقل شد."
-    
-    create_ticket_history(
-        db,
-        TicketHistoryCreate(
-            ticket_id=ticket.id,
-            status=ticket.status,
-            changed_by_id=current_user.id,
-            comment=assignment_comment,
-        ),
-    )
+
+    def apply_assignment() -> None:
+        from app.schemas.ticket_history import TicketHistoryCreate
+        from app.services.ticket_history_service import create_ticket_history
+
+        ticket.assigned_to_id = assign_data.assigned_to_id
+        db.commit()
+        db.refresh(ticket)
+
+        # Load assigned_to relationship
+        if ticket.assigned_to_id:
+            ticket.assigned_to = db.query(User).filter(User.id == ticket.assigned_to_id).first()
+
+        # Create history entry
+        assignment_comment = f"تیکت به {assigned_user.full_name} تخصیص داده شد."
+        if previous_assigned_to_id:
+            previous_user = db.query(User).filter(User.id == previous_assigned_to_id).first()
+            if previous_user:
+                assignment_comment = f"تیکت از {previous_user.full_name} به {assigned_user.full_name} منتقل شد."
+
+        create_ticket_history(
+            db,
+            TicketHistoryCreate(
+                ticket_id=ticket.id,
+                status=ticket.status,
+                changed_by_id=current_user.id,
+                comment=assignment_comment,
+            ),
+        )
+        # Reloaded here: the notification reads both on the loop
+        db.refresh(ticket)
+        if current_user in db:
+            db.refresh(current_user)
+
+    await run_blocking(apply_assignment)
     
     # ارسال اعلان تخصیص (اگر تخصیص تغییر کرده باشد)
     if previous_assigned_to_id != assign_data.assigned_to_id:
         from app.services.notification_service import notify_ticket_assigned
         await notify_ticket_assigned(ticket, current_user, db)
     
-    return ticket
+    return await run_blocking(get_ticket, db, ticket_id, load_relations=True)
 
 
 @router.patch("/{ticket_id}/unassign", response_model=TicketResponse)
-async def unassign_ticket(
+def unassign_ticket(
     request: Request,
     ticket_id: int,
     db: Session = Depends(get_db),
@@ -613,7 +677,7 @@ async def unassign_ticket(
 
 
 @router.delete("/{ticket_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_ticket_by_id(
+def delete_ticket_by_id(
     request: Request,
     ticket_id: int,
     db: Session = Depends(get_db),
@@ -650,7 +714,7 @@ async def delete_ticket_by_id(
 
 
 @router.get("/{ticket_id}/history", response_model=List[TicketHistoryResponse])
-async def list_ticket_history(
+def list_ticket_history(
     request: Request,
     ticket_id: int,
     db: Session = Depends(get_db),
@@ -676,9 +740,10 @@ async def list_ticket_history(
 
 
 @router.post("/bulk-action", response_model=BulkActionResponse)
-async def bulk_action_tickets(
+def bulk_action_tickets(
     request: Request,
     bulk_data: BulkActionRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
 ):
@@ -690,110 +755,24 @@ async def bulk_action_tickets(
     - assign: Assign multiple tickets to a specialist
     - unassign: Unassign multiple tickets
     - delete: Delete multiple tickets
+    
+    Tickets are changed in chunks with set-based statements; status-change
+    notifications are sent after the response.
     """
-    lang = resolve_lang(request, current_user)
-    success_count = 0
-    failed_count = 0
-    failed_ids = []
-    
-    for ticket_id in bulk_data.ticket_ids:
-        try:
-            ticket = get_ticket(db, ticket_id)
-            if not ticket:
-                failed_count += 1
-                failed_ids.append(ticket_id)
-                continue
-            
-            # Check access
-            if not can_user_access_ticket(current_user, ticket):
-                failed_count += 1
-                failed_ids.append(ticket_id)
-                continue
-            
-            if bulk_data.action == "status":
-                if not bulk_data.status:
-                    failed_count += 1
-                    failed_ids.append(ticket_id)
-                    continue
-                previous_status = ticket.status
-                update_ticket_status(db, ticket, bulk_data.status)
-                # Create history
-                create_ticket_history(
-                    db,
-                    TicketHistoryCreate(
-                        ticket_id=ticket.id,
-                        status=bulk_data.status,
-                        changed_by_id=current_user.id,
-                        comment=f"تغییر وضعیت از {previous_status.value} به {bulk_data.status.value} (Bulk Action)",
-                    ),
-                )
-                # Notify
-                await notify_ticket_status_changed(ticket, previous_status, db)
-                
-            elif bulk_data.action == "assign":
-                if not bulk_data.assigned_to_id:
-                    failed_count += 1
-                    failed_ids.append(ticket_id)
-                    continue
-                from app.services.user_service import get_user
-                assignee = get_user(db, bulk_data.assigned_to_id)
-                if not assignee:
-                    failed_count += 1
-                    failed_ids.append(ticket_id)
-                    continue
-                ticket.assigned_to_id = bulk_data.assigned_to_id
-                db.commit()
-                db.refresh(ticket)
-                # Create history
-                create_ticket_history(
-                    db,
-                    TicketHistoryCreate(
-                        ticket_id=ticket.id,
-                        status=ticket.status,
-                        changed_by_id=current_user.id,
-                        comment=f"تخصیص به {assignee.full_name} (Bulk Action)",
-                    ),
-                )
-                
-            elif bulk_data.action == "unassign":
-                ticket.assigned_to_id = None
-                db.commit()
-                db.refresh(ticket)
-                # Create history
-                create_ticket_history(
-                    db,
-                    TicketHistoryCreate(
-                        ticket_id=ticket.id,
-                        status=ticket.status,
-                        changed_by_id=current_user.id,
-                        comment="حذف تخصیص (Bulk Action)",
-                    ),
-                )
-                
-            elif bulk_data.action == "delete":
-                from app.services.ticket_service import delete_ticket
-                if not delete_ticket(db, ticket):
-                    failed_count += 1
-                    failed_ids.append(ticket_id)
-                    continue
-            else:
-                failed_count += 1
-                failed_ids.append(ticket_id)
-                continue
-            
-            success_count += 1
-            
-        except Exception as e:
-            db.rollback()
-            failed_count += 1
-            failed_ids.append(ticket_id)
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Bulk action error for ticket {ticket_id}: {e}")
+    result = run_bulk_action(
+        db,
+        current_user,
+        bulk_data.ticket_ids,
+        bulk_data.action,
+        status=bulk_data.status,
+        assigned_to_id=bulk_data.assigned_to_id,
+    )
+    if result.status_changes:
+        background_tasks.add_task(fan_out_status_notifications, result.status_changes)
     
     return BulkActionResponse(
-        success_count=success_count,
-        failed_count=failed_count,
-        failed_ids=failed_ids
+        success_count=len(result.success_ids),
+        failed_count=len(result.failed_ids),
+        failed_ids=result.failed_ids
     )
 
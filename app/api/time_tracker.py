@@ -17,7 +17,7 @@ router = APIRouter()
 
 
 @router.post("/start", response_model=TimeLogResponse, status_code=status.HTTP_201_CREATED)
-async def start_timer(
+def start_timer(
     request: Request,
     data: TimeLogCreate,
     db: Session = Depends(get_db),
@@ -57,7 +57,7 @@ async def start_timer(
 
 
 @router.post("/stop/{time_log_id}", response_model=TimeLogResponse)
-async def stop_timer(
+def stop_timer(
     request: Request,
     time_log_id: int,
     data: Optional[TimeLogUpdate] = None,
@@ -91,7 +91,7 @@ async def stop_timer(
 
 
 @router.post("/stop-active", response_model=Optional[TimeLogResponse])
-async def stop_active_timer(
+def stop_active_timer(
     request: Request,
     data: Optional[TimeLogUpdate] = None,
     db: Session = Depends(get_db),
@@ -125,7 +125,7 @@ async def stop_active_timer(
 
 
 @router.get("/active", response_model=Optional[TimeLogResponse])
-async def get_active_timer(
+def get_active_timer(
     request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -149,7 +149,7 @@ async def get_active_timer(
 
 
 @router.get("/ticket/{ticket_id}", response_model=List[TimeLogResponse])
-async def get_ticket_time_logs(
+def get_ticket_time_logs(
     request: Request,
     ticket_id: int,
     user_id: Optional[int] = None,
@@ -206,7 +206,7 @@ async def get_ticket_time_logs(
 
 
 @router.get("/ticket/{ticket_id}/summary", response_model=TimeLogSummary)
-async def get_ticket_time_summary(
+def get_ticket_time_summary(
     request: Request,
     ticket_id: int,
     user_id: Optional[int] = None,
@@ -233,7 +233,7 @@ async def get_ticket_time_summary(
 
 
 @router.put("/{time_log_id}", response_model=TimeLogResponse)
-async def update_time_log(
+def update_time_log(
     request: Request,
     time_log_id: int,
     data: TimeLogUpdate,
@@ -264,7 +264,7 @@ async def update_time_log(
 
 
 @router.delete("/{time_log_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_time_log(
+def delete_time_log(
     request: Request,
     time_log_id: int,
     db: Session = Depends(get_db),
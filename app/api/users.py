@@ -26,7 +26,7 @@ router = APIRouter()
 
 
 @router.get("", response_model=List[UserResponse])
-async def list_users_endpoint(
+def list_users_endpoint(
     request: Request,
     role: Optional[UserRole] = Query(None),
     branch_id: Optional[int] = Query(None),
@@ -65,7 +65,7 @@ async def list_users_endpoint(
 
 
 @router.post("", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def create_user_endpoint(
+def create_user_endpoint(
     request: Request,
     data: UserCreate,
     db: Session = Depends(get_db),
@@ -83,7 +83,7 @@ async def create_user_endpoint(
 
 
 @router.put("/{user_id}", response_model=UserResponse)
-async def update_user_endpoint(
+def update_user_endpoint(
     request: Request,
     user_id: int,
     data: UserUpdate,
@@ -108,7 +108,7 @@ async def update_user_endpoint(
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_user_endpoint(
+def delete_user_endpoint(
     request: Request,
     user_id: int,
     db: Session = Depends(get_db),
@@ -2,7 +2,7 @@
 Configuration settings for the application
 """
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 from pathlib import Path
 
@@ -22,6 +22,10 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = "sqlite:///./ticketing.db"
+    # Hot read endpoints (ticket list/detail, notification feed, auth/me, current user) on an AsyncEngine
+    ASYNC_DATABASE: bool = False
+    # Defaults to DATABASE_URL with the asyncio driver (aiosqlite, asyncpg)
+    ASYNC_DATABASE_URL: Optional[str] = None
 
     # Security
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
@@ -144,6 +148,61 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "DEBUG"  # Changed to DEBUG for better error tracking
     LOG_FILE: str = "logs/app.log"
 
+    # Ticket numbers
+    # Numbers reserved per database round trip; >1 trades strict ordering across workers for fewer writes
+    TICKET_NUMBER_BLOCK_SIZE: int = 1
+
+    # List totals
+    # Exact counts are reused for this long unless a write touches the counted tables
+    COUNT_CACHE_TTL_SECONDS: int = 30
+    # Estimated totals (dashboards) may be this old even after writes
+    COUNT_ESTIMATE_TTL_SECONDS: int = 300
+
+    # Hot-ticket read cache (serialized GET /api/tickets/{id} payloads)
+    # Per process: hits are revalidated against tickets.version, so ticket changes made by
+    # other workers show at once; a renamed user/branch may show in other workers for this long
+    TICKET_CACHE_TTL_SECONDS: int = 60
+
+    # Delta sync (GET /api/tickets/sync)
+    # Changes younger than this are held back so transactions still committing are not skipped
+    SYNC_SETTLE_SECONDS: int = 2
+
+    # Report results (GET /api/reports/*) are reused this long unless tickets change
+    REPORT_CACHE_TTL_SECONDS: int = 30
+
+    # Report jobs (POST /api/reports/jobs)
+    REPORT_STORAGE_DIR: Path = Path("storage/reports")
+    # Rendering processes; 0 renders in a thread of the API process instead
+    REPORT_JOB_WORKERS: int = 2
+    # Identical requests reuse a finished artifact this long; it is deleted afterwards
+    REPORT_JOB_TTL_SECONDS: int = 600
+
+    # SLA alerts fire at each log's next deadline (warning, breach, escalation)
+    # Writes made by other processes (workers without the "sla" lease, bot, scripts) are
+    # polled for this often and reach the deadline schedule within it
+    SLA_CHANGE_POLL_SECONDS: int = 5
+    # Full rebuild of the deadline schedule (catches anything the poll misses)
+    SLA_RESYNC_SECONDS: int = 900
+    # Rule matching uses a compiled index of the active SLA rules, rebuilt when they change;
+    # bounds how late rule writes made by other processes are seen
+    SLA_RULE_CACHE_TTL_SECONDS: int = 60
+    # Alerts of a sweep are grouped per recipient and sent by this many concurrent workers
+    SLA_NOTIFICATION_WORKERS: int = 10
+    # SLA backfill (recomputing existing SLA logs): tickets per chunk and pause between chunks
+    SLA_BACKFILL_CHUNK_SIZE: int = 500
+    SLA_BACKFILL_PAUSE_MS: int = 200
+
+    # Background schedulers run in one process at a time (scheduler_leases); a dead holder's
+    # lease is taken over after SCHEDULER_LEASE_SECONDS, the holder renews it every heartbeat
+    SCHEDULER_LEASE_SECONDS: int = 60
+    SCHEDULER_HEARTBEAT_SECONDS: int = 15
+
+    # Blocking work (sync endpoints and dependencies, database calls from async code)
+    # Worker threads shared by all of it; keep within the database connection pool
+    WORKER_THREADS: int = 20
+    # The event loop monitor logs a warning when a callback holds the loop longer than this
+    EVENT_LOOP_LAG_WARNING_MS: int = 100
+
     # File Storage
     UPLOAD_DIR: Path = Path("storage/uploads")
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10 MB
@@ -158,5 +217,6 @@ settings = Settings()
 
 # Create necessary directories
 settings.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+settings.REPORT_STORAGE_DIR.mkdir(parents=True, exist_ok=True)
 Path(settings.LOG_FILE).parent.mkdir(parents=True, exist_ok=True)
 
@@ -0,0 +1,123 @@
+"""
+Keeping blocking work off the event loop
+
+The API, the schedulers (SLA, automation, reports) and the Telegram bot
+share one event loop, so a synchronous SQLAlchemy call made from async code
+stalls all of them until it returns. Routes without anything to await are
+plain ``def`` functions, which FastAPI runs on its worker threads; async
+code that needs the database goes through run_blocking. Both use anyio's
+default thread limiter, sized by WORKER_THREADS in configure_worker_threads.
+Endpoints that may get an AsyncSession (ASYNC_DATABASE) use run_in_session,
+which needs no worker thread in that case.
+
+EventLoopMonitor measures how late the loop wakes up from short sleeps,
+which is how long something held it, and logs the stalls.
+"""
+import asyncio
+import functools
+import logging
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import anyio.to_thread
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def configure_worker_threads(size: Optional[int] = None) -> None:
+    """
+    Size the thread pool of sync routes, sync dependencies and run_blocking
+
+    Must run inside the event loop (application startup).
+    """
+    size = size or settings.WORKER_THREADS
+    anyio.to_thread.current_default_thread_limiter().total_tokens = size
+    logger.info("Worker threads for blocking work: %d", size)
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking callable (database work) on a worker thread and await it
+
+    The callable must not be used concurrently with other code sharing its
+    session; awaiting it right away, as async callers do, guarantees that.
+    """
+    if kwargs:
+        func = functools.partial(func, *args, **kwargs)
+        args = ()
+    return await anyio.to_thread.run_sync(func, *args)
+
+
+async def run_in_session(db: Any, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run ``func(session, *args, **kwargs)``, sync ORM code, on a Session or an AsyncSession
+
+    With an AsyncSession the function runs on the loop through run_sync, its
+    queries awaited on the async driver; with a Session it goes to a worker
+    thread. Either way what it returns must not lazy-load afterwards.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(func, *args, **kwargs)
+    return await run_blocking(func, db, *args, **kwargs)
+
+
+class EventLoopMonitor:
+    """Periodic probe of event loop lag (how long callbacks held the loop)"""
+
+    def __init__(self, interval: float = 0.05, warning_seconds: Optional[float] = None):
+        self.interval = interval
+        self.warning_seconds = (
+            warning_seconds if warning_seconds is not None else settings.EVENT_LOOP_LAG_WARNING_MS / 1000.0
+        )
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+        self.samples = 0
+        self.stalls = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def reset(self) -> None:
+        self.max_lag = self.last_lag = 0.0
+        self.samples = self.stalls = 0
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - started - self.interval)
+            self.last_lag = lag
+            self.samples += 1
+            if lag > self.max_lag:
+                self.max_lag = lag
+            if lag >= self.warning_seconds:
+                self.stalls += 1
+                logger.warning("Event loop blocked for %.0f ms", lag * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "last_lag_ms": round(self.last_lag * 1000, 1),
+            "stalls": self.stalls,
+            "samples": self.samples,
+            "warning_ms": round(self.warning_seconds * 1000),
+        }
+
+
+event_loop_monitor = EventLoopMonitor(interval=0.5)
@@ -0,0 +1,47 @@
+"""
+Text normalization helpers for Persian/Arabic input
+"""
+import re
+
+# Arabic letters that Persian keyboards and older systems still produce
+_CHAR_MAP = {
+    "\u064a": "\u06cc",  # ي -> ی
+    "\u0649": "\u06cc",  # ى -> ی
+    "\u0643": "\u06a9",  # ك -> ک
+    "\u0629": "\u0647",  # ة -> ه
+    # Persian and Arabic-Indic digits -> ASCII
+    **{chr(0x06F0 + i): str(i) for i in range(10)},
+    **{chr(0x0660 + i): str(i) for i in range(10)},
+    # Zero-width non-joiner/joiner split compound words inconsistently ("می\u200cخواهم" vs "میخواهم")
+    **dict.fromkeys("\u200c\u200d\ufeff", ""),
+    # Harakat, superscript alef and tatweel carry no meaning for matching
+    **dict.fromkeys([chr(c) for c in range(0x064B, 0x0660)] + ["\u0670", "\u0640"], ""),
+}
+
+# One C-level scan finds the few characters to rewrite; str.translate with a
+# dict does a Python lookup for every character of non-ASCII text
+_CHAR_RE = re.compile("[" + "".join(re.escape(c) for c in _CHAR_MAP) + "]")
+
+
+def _replace_char(match: re.Match) -> str:
+    return _CHAR_MAP[match.group()]
+
+
+def normalize_persian(text: str) -> str:
+    """
+    Normalize Persian text for matching (search, keyword rules)
+
+    Unifies Arabic/Persian letter variants, drops zero-width joiners and
+    diacritics, maps digits to ASCII, lowercases Latin text and collapses
+    whitespace. Both stored text and queries must go through this function.
+
+    Args:
+        text: Raw text (None is treated as empty)
+
+    Returns:
+        str: Normalized text
+    """
+    if not text:
+        return ""
+    text = _CHAR_RE.sub(_replace_char, text)
+    return " ".join(text.split()).lower()
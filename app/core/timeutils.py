@@ -0,0 +1,16 @@
+"""
+Timestamp helpers
+
+The code compares timestamps as naive UTC (datetime.utcnow()). SQLite
+returns the DateTime(timezone=True) columns naive, PostgreSQL returns them
+aware; naive_utc brings both to the same form.
+"""
+from datetime import datetime, timezone
+from typing import Any
+
+
+def naive_utc(value: Any) -> Any:
+    """``value`` as a naive UTC datetime if it is an aware one, otherwise unchanged (None, naive, non-datetime)"""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
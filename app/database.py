@@ -1,9 +1,20 @@
 """
 Database configuration and session management
+
+The sync engine/SessionLocal serve everything. With ASYNC_DATABASE on, an
+AsyncEngine (aiosqlite / asyncpg) is created as well and get_session hands
+the hot read endpoints an AsyncSession instead of a Session; the code they
+run is the same (app.core.concurrency.run_in_session), only how its I/O is
+waited for changes.
 """
+from contextlib import contextmanager
+from typing import AsyncIterator, Iterator, Optional, Union
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.config import settings
 
 # Create database engine
@@ -24,6 +35,47 @@ else:
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Asyncio drivers by backend
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+    "mysql": "aiomysql",
+}
+
+
+def async_database_url(url: str) -> str:
+    """
+    URL for the async engine: ASYNC_DATABASE_URL, else ``url`` with the asyncio driver of its backend
+
+    Raises:
+        ValueError: If the backend has no known asyncio driver
+    """
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver known for {backend}; set ASYNC_DATABASE_URL")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.ASYNC_DATABASE:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    if settings.DATABASE_URL.startswith("sqlite"):
+        async_engine = create_async_engine(async_database_url(settings.DATABASE_URL), echo=settings.DEBUG)
+    else:
+        async_engine = create_async_engine(
+            async_database_url(settings.DATABASE_URL),
+            echo=settings.DEBUG,
+            pool_pre_ping=True
+        )
+    # Results are serialized after the request's queries, outside run_sync, where
+    # refreshing expired attributes is impossible
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Base class for models
 Base = declarative_base()
 
@@ -38,3 +90,33 @@ def get_db():
     finally:
         db.close()
 
+
+@contextmanager
+def session_scope(db: Optional[Session] = None, **options) -> Iterator[Session]:
+    """
+    Session for background work: ``db`` if given (tests pass theirs), otherwise
+    a new SessionLocal(**options) that is closed on exit
+    """
+    if db is not None:
+        yield db
+        return
+    session = SessionLocal(**options)
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    Dependency for getting an async database session (ASYNC_DATABASE on)
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Session of the endpoints ported to async: an AsyncSession when ASYNC_DATABASE
+# is on, otherwise the same get_db as every other endpoint (one session per request)
+get_session = get_async_db if settings.ASYNC_DATABASE else get_db
+
+AnySession = Union[Session, AsyncSession]
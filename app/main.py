@@ -211,6 +211,11 @@ async def startup_event():
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Debug mode: {settings.DEBUG}")
+
+    # Blocking work runs on a bounded thread pool; watch the loop for anything that still blocks it
+    from app.core.concurrency import configure_worker_threads, event_loop_monitor
+    configure_worker_threads()
+    event_loop_monitor.start()
     
     # Start automation scheduler
     try:
@@ -266,6 +271,21 @@ async def shutdown_event():
     """Actions to perform on application shutdown"""
     logger.info("Shutting down application")
     
+    # Stop the background schedulers and hand their leases over to the other processes
+    from app.tasks.scheduler_lease_tasks import stop_leader_tasks
+    await stop_leader_tasks()
+
+    # Stop report rendering processes
+    from app.services.report_job_service import shutdown_report_executor
+    shutdown_report_executor()
+
+    from app.core.concurrency import event_loop_monitor
+    await event_loop_monitor.stop()
+
+    from app.database import async_engine
+    if async_engine is not None:
+        await async_engine.dispose()
+    
     # Stop Telegram Bot if it was started
     if settings.TELEGRAM_BOT_TOKEN and getattr(app.state, "telegram_bot_started", False):
         try:
@@ -289,23 +309,28 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint for monitoring"""
+    from app.core.concurrency import event_loop_monitor, run_blocking
     from app.database import SessionLocal
     from sqlalchemy import text
     
     health_status = {
         "status": "healthy",
         "version": settings.APP_VERSION,
-        "environment": settings.ENVIRONMENT
+        "environment": settings.ENVIRONMENT,
+        "event_loop": event_loop_monitor.stats(),
     }
-    
-    # Check database connection
-    try:
+
+    def ping_database():
         db = SessionLocal()
         try:
             db.execute(text("SELECT 1"))
-            health_status["database"] = "connected"
         finally:
             db.close()
+    
+    # Check database connection
+    try:
+        await run_blocking(ping_database)
+        health_status["database"] = "connected"
     except Exception as e:
         health_status["status"] = "unhealthy"
         health_status["database"] = "disconnected"
@@ -351,6 +376,7 @@ from app.api import profile
 from app.api import knowledge_base
 from app.api import assets
 from app.api import telegram_bot
+from app.api import schedulers
 
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(tickets.router, prefix="/api/tickets", tags=["Tickets"])
@@ -372,6 +398,7 @@ app.include_router(profile.router, prefix="/api/profile", tags=["Profile"])
 app.include_router(knowledge_base.router, prefix="/api/knowledge-base", tags=["Knowledge Base"])
 app.include_router(assets.router, prefix="/api/assets", tags=["Assets"])
 app.include_router(telegram_bot.router, prefix="/api/telegram-bot", tags=["Telegram Bot"])
+app.include_router(schedulers.router, prefix="/api/schedulers", tags=["Schedulers"])
 
 if __name__ == "__main__":
     import uvicorn
@@ -19,6 +19,13 @@ from app.models.notification import Notification
 from app.models.user_profile import UserProfile
 from app.models.knowledge_article import KnowledgeArticle
 from app.models.telegram_session import TelegramSession
+from app.models.ticket_number_sequence import TicketNumberSequence
+from app.models.ticket_deletion import TicketDeletion
+from app.models.ticket_rollup import TicketDailyRollup
+from app.models.report_job import ReportJob
+from app.models.scheduler_lease import SchedulerLease
+from app.models.sla_backfill_job import SLABackfillJob
+from app.models import ticket_search  # noqa: F401  registers the FTS table DDL
 
 __all__ = [
     "User",
@@ -42,4 +49,15 @@ __all__ = [
     "UserProfile",
     "KnowledgeArticle",
     "TelegramSession",
+    "TicketNumberSequence",
+    "TicketDeletion",
+    "TicketDailyRollup",
+    "ReportJob",
+    "SchedulerLease",
+    "SLABackfillJob",
 ]
+
+# Session hooks keeping derived ticket tables (report rollups, search index) in step with
+# ticket writes. Registered with the models so every writer (API, bot, scripts) has them;
+# a missed write would leave those tables wrong until they are rebuilt.
+from app.services import ticket_rollup_service, ticket_search_service  # noqa: E402,F401
@@ -0,0 +1,34 @@
+"""
+Report job model (queued PDF/XLSX report builds)
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class ReportJob(Base):
+    """One requested report build and its artifact under REPORT_STORAGE_DIR"""
+    __tablename__ = "report_jobs"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex, handed to clients
+    kind = Column(String(10), nullable=False)  # pdf | xlsx
+    params = Column(Text, nullable=False)  # JSON of the report parameters
+    cache_key = Column(String(64), nullable=False)  # sha256 of kind + params
+    status = Column(String(20), nullable=False, default="pending")  # pending | running | done | failed
+    file_path = Column(String(512), nullable=True)
+    file_size = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+    requested_by_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True)  # Artifact is deleted after this
+
+    __table_args__ = (
+        # Reuse lookup: latest job with the same parameters
+        Index('idx_report_job_key_created', 'cache_key', 'created_at'),
+        Index('idx_report_job_expires', 'expires_at'),
+    )
+
+    def __repr__(self):
+        return f"<ReportJob(id='{self.id}', kind='{self.kind}', status='{self.status}')>"
@@ -0,0 +1,26 @@
+"""
+Scheduler lease model (which process runs each background job)
+"""
+from sqlalchemy import Column, String, Text, DateTime
+from app.database import Base
+
+
+class SchedulerLease(Base):
+    """Lease on a background job; the holder renews it by heartbeat and other processes take over once it expires"""
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(64), primary_key=True)  # automation | sla | daily_report | telegram_session_cleanup
+    holder = Column(String(255), nullable=True)  # host:pid:token of the running process, None once released
+    acquired_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+    # Last run of the job, whichever process did it
+    last_run_holder = Column(String(255), nullable=True)
+    last_run_started_at = Column(DateTime(timezone=True), nullable=True)
+    last_run_finished_at = Column(DateTime(timezone=True), nullable=True)
+    last_run_status = Column(String(20), nullable=True)  # ok | error
+    last_run_error = Column(Text, nullable=True)
+
+    def __repr__(self):
+        return f"<SchedulerLease(name='{self.name}', holder='{self.holder}')>"
@@ -89,6 +89,11 @@ class SLALog(Base):
         Index('idx_sla_log_ticket', 'ticket_id'),
         Index('idx_sla_log_status', 'response_status', 'resolution_status'),
         Index('idx_sla_log_escalated', 'escalated'),
+        # Covers the SLA report aggregation (no table lookups per log)
+        Index(
+            'idx_sla_log_report',
+            'ticket_id', 'sla_rule_id', 'response_status', 'resolution_status', 'escalated',
+        ),
     )
     
     def __repr__(self):
@@ -0,0 +1,38 @@
+"""
+SLA backfill job model (recomputing SLA logs of existing tickets)
+"""
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class SLABackfillJob(Base):
+    """Progress of an SLA recompute; last_ticket_id is the resume point, committed with each chunk"""
+    __tablename__ = "sla_backfill_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String(20), nullable=False, default="pending")  # pending | running | paused | done | failed
+    only_open = Column(Boolean, default=False, nullable=False)  # Only pending/in-progress tickets
+    dry_run = Column(Boolean, default=False, nullable=False)  # Count the changes without writing them
+
+    # Throttling, read again before every chunk
+    chunk_size = Column(Integer, nullable=False)
+    pause_ms = Column(Integer, nullable=False)
+
+    last_ticket_id = Column(Integer, default=0, nullable=False)
+    max_ticket_id = Column(Integer, default=0, nullable=False)  # Tickets created after the start already get current rules
+    total_tickets = Column(Integer, default=0, nullable=False)
+    processed_tickets = Column(Integer, default=0, nullable=False)
+    updated_logs = Column(Integer, default=0, nullable=False)
+    created_logs = Column(Integer, default=0, nullable=False)
+    unmatched_tickets = Column(Integer, default=0, nullable=False)  # No active rule matches
+
+    error = Column(Text, nullable=True)
+    requested_by_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<SLABackfillJob(id={self.id}, status='{self.status}', last_ticket_id={self.last_ticket_id})>"
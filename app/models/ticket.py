@@ -1,7 +1,7 @@
 """
 Ticket model
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Index, Numeric
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Index, Numeric, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -33,6 +33,8 @@ class Ticket(Base):
     resolved_at = Column(DateTime(timezone=True), nullable=True)
     closed_at = Column(DateTime(timezone=True), nullable=True)
     first_response_at = Column(DateTime(timezone=True), nullable=True)  # زمان اولین پاسخ
+    # Bumped by every UPDATE (ORM flushes and update(Ticket) statements); read cache validator
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=text("version + 1"))
     
     # Relationships
     user = relationship("User", foreign_keys=[user_id], back_populates="tickets")
@@ -55,6 +57,13 @@ class Ticket(Base):
         Index('idx_ticket_department', 'department_id'),
         Index('idx_ticket_assigned', 'assigned_to_id'),
         Index('idx_ticket_status_priority', 'status', 'priority'),
+        # Keyset pagination of ticket lists: (priority ASC, created_at DESC, id DESC)
+        Index('idx_ticket_priority_created_id', priority, created_at.desc(), id.desc()),
+        # Delta sync: tickets changed after a (updated_at, id) watermark
+        Index('idx_ticket_updated_id', updated_at, id),
+        # Filtered reports (SLA and latency): branch/department equality plus creation range
+        Index('idx_ticket_branch_created', 'branch_id', 'created_at'),
+        Index('idx_ticket_department_created', 'department_id', 'created_at'),
     )
     
     def __repr__(self):
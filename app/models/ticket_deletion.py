@@ -0,0 +1,41 @@
+"""
+Ticket deletion log model (tombstones for delta sync)
+"""
+from sqlalchemy import Column, Integer, String, DateTime, Index, event, insert
+from sqlalchemy.sql import func
+from app.database import Base
+from app.models.ticket import Ticket
+
+
+class TicketDeletion(Base):
+    """One row per deleted ticket, so sync clients can drop it locally"""
+    __tablename__ = "ticket_deletions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    ticket_id = Column(Integer, nullable=False)  # No FK: the ticket row is gone
+    ticket_number = Column(String, nullable=False)
+    # Scope of the deleted ticket, for the same access rules as tickets
+    user_id = Column(Integer, nullable=True)
+    branch_id = Column(Integer, nullable=True)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # Delta sync seeks on (deleted_at, id)
+        Index('idx_ticket_deletion_deleted_id', 'deleted_at', 'id'),
+    )
+
+    def __repr__(self):
+        return f"<TicketDeletion(ticket_id={self.ticket_id}, ticket_number='{self.ticket_number}')>"
+
+
+@event.listens_for(Ticket, "after_delete")
+def _log_ticket_deletion(mapper, connection, target) -> None:
+    """Write the tombstone in the deleting transaction (single and bulk deletes)"""
+    connection.execute(
+        insert(TicketDeletion.__table__).values(
+            ticket_id=target.id,
+            ticket_number=target.ticket_number,
+            user_id=target.user_id,
+            branch_id=target.branch_id,
+        )
+    )
@@ -0,0 +1,18 @@
+"""
+Ticket number sequence model
+"""
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class TicketNumberSequence(Base):
+    """Per-day counter behind T-YYYYMMDD-#### ticket numbers"""
+    __tablename__ = "ticket_number_sequences"
+
+    day = Column(String(8), primary_key=True)  # YYYYMMDD
+    last_value = Column(Integer, nullable=False, default=0)  # Last number handed out for the day
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<TicketNumberSequence(day='{self.day}', last_value={self.last_value})>"
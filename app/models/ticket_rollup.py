@@ -0,0 +1,42 @@
+"""
+Daily ticket rollup model (fact table behind the report endpoints)
+"""
+from sqlalchemy import Column, Integer, String, Date, Float, Numeric, Index
+from app.database import Base
+
+
+class TicketDailyRollup(Base):
+    """
+    Ticket counts and sums per creation day and dimension combination
+    
+    Every ticket is counted in exactly one row: the one matching its
+    current branch, department, priority, status and category. Missing
+    branch/department are stored as 0 so the key can be unique.
+    """
+    __tablename__ = "ticket_daily_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)  # Ticket creation day (UTC)
+    branch_id = Column(Integer, nullable=False, default=0)
+    department_id = Column(Integer, nullable=False, default=0)
+    priority = Column(String(20), nullable=False)  # TicketPriority value
+    status = Column(String(20), nullable=False)  # TicketStatus value
+    category = Column(String(20), nullable=False)  # TicketCategory value
+    ticket_count = Column(Integer, nullable=False, default=0)
+    resolved_count = Column(Integer, nullable=False, default=0)  # Tickets with resolved_at
+    resolution_seconds_sum = Column(Float, nullable=False, default=0.0)  # resolved_at - created_at
+    cost_sum = Column(Numeric(14, 2), nullable=False, default=0)
+
+    __table_args__ = (
+        Index(
+            'uq_ticket_rollup_key',
+            'day', 'branch_id', 'department_id', 'priority', 'status', 'category',
+            unique=True,
+        ),
+        # Reports filtered by branch/department (branch admins) without a day range scan
+        Index('idx_ticket_rollup_branch_day', 'branch_id', 'day'),
+        Index('idx_ticket_rollup_department_day', 'department_id', 'day'),
+    )
+
+    def __repr__(self):
+        return f"<TicketDailyRollup(day={self.day}, status='{self.status}', ticket_count={self.ticket_count})>"
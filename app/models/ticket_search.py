@@ -0,0 +1,26 @@
+"""
+Ticket full-text search index (SQLite FTS5)
+"""
+from sqlalchemy import DDL, event
+from app.models.ticket import Ticket
+
+TICKET_SEARCH_TABLE = "ticket_search"
+
+# rowid is the ticket id; columns hold normalized text (see app.core.text.normalize_persian)
+CREATE_TICKET_SEARCH_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TICKET_SEARCH_TABLE} "
+    "USING fts5(title, description, comments, tokenize = 'unicode61 remove_diacritics 2')"
+)
+DROP_TICKET_SEARCH_SQL = f"DROP TABLE IF EXISTS {TICKET_SEARCH_TABLE}"
+
+# create_all/drop_all manage the virtual table together with tickets (SQLite only)
+event.listen(
+    Ticket.__table__,
+    "after_create",
+    DDL(CREATE_TICKET_SEARCH_SQL).execute_if(dialect="sqlite"),
+)
+event.listen(
+    Ticket.__table__,
+    "before_drop",
+    DDL(DROP_TICKET_SEARCH_SQL).execute_if(dialect="sqlite"),
+)
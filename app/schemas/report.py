@@ -0,0 +1,35 @@
+"""
+Report job schemas
+"""
+from pydantic import BaseModel, Field
+from datetime import date, datetime
+from typing import Optional, Literal
+from app.core.enums import TicketCategory, TicketPriority
+
+
+class ReportJobCreate(BaseModel):
+    """Schema for requesting a report build"""
+    kind: Literal["pdf", "xlsx"] = Field(..., description="نوع فایل گزارش")
+    date_from: Optional[date] = Field(None, description="از تاریخ")
+    date_to: Optional[date] = Field(None, description="تا تاریخ")
+    branch_id: Optional[int] = Field(None, description="شناسه شعبه")
+    department_id: Optional[int] = Field(None, description="شناسه دپارتمان")
+    priority: Optional[TicketPriority] = Field(None, description="اولویت")
+    category: Optional[TicketCategory] = Field(None, description="دسته‌بندی")
+
+
+class ReportJobResponse(BaseModel):
+    """Schema for report job status"""
+    id: str
+    kind: str
+    status: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    file_size: Optional[int] = None
+    error: Optional[str] = None
+    download_url: Optional[str] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,31 @@
+"""
+Scheduler lease schemas
+"""
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+
+class SchedulerLeaseResponse(BaseModel):
+    """Schema for the lease and last run of a background job"""
+    name: str
+    holder: Optional[str] = None
+    active: bool = False
+    held_by_this_process: bool = False
+    acquired_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    last_run_holder: Optional[str] = None
+    last_run_started_at: Optional[datetime] = None
+    last_run_finished_at: Optional[datetime] = None
+    last_run_status: Optional[str] = None
+    last_run_error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class SchedulerStatusResponse(BaseModel):
+    """Schema for GET /api/schedulers"""
+    process_id: str
+    leases: List[SchedulerLeaseResponse]
@@ -68,3 +68,21 @@ class GeneralSettingsUpdate(BaseModel):
     welcome_message_text: Optional[str] = None
     help_command_enabled: Optional[bool] = None
     help_command_text: Optional[str] = None
+
+
+class PriorityKeywordsResponse(BaseModel):
+    """Keyword sets of the automatic priority classifier"""
+    critical: Dict[str, float] = Field(default_factory=dict, description="کلمات کلیدی بحرانی و وزن آن‌ها")
+    high: Dict[str, float] = Field(default_factory=dict, description="کلمات کلیدی اولویت بالا")
+    medium: Dict[str, float] = Field(default_factory=dict, description="کلمات کلیدی اولویت متوسط")
+    low: Dict[str, float] = Field(default_factory=dict, description="کلمات کلیدی اولویت پایین")
+    threshold: float = Field(1.0, description="حداقل مجموع وزن برای انتخاب اولویت")
+
+
+class PriorityKeywordsUpdate(BaseModel):
+    """Priority keywords update request (omitted sets are kept)"""
+    critical: Optional[Dict[str, float]] = None
+    high: Optional[Dict[str, float]] = None
+    medium: Optional[Dict[str, float]] = None
+    low: Optional[Dict[str, float]] = None
+    threshold: Optional[float] = Field(None, gt=0)
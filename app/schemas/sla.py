@@ -78,3 +78,44 @@ class SLALogResponse(BaseModel):
         from_attributes = True
 
 
+
+
+class SLABackfillCreate(BaseModel):
+    """Schema for starting an SLA backfill (recomputing SLA logs of existing tickets)"""
+    only_open: bool = Field(False, description="فقط تیکت‌های باز")
+    dry_run: bool = Field(False, description="فقط شمارش تغییرات، بدون نوشتن")
+    chunk_size: Optional[int] = Field(None, ge=1, le=10000, description="تعداد تیکت در هر مرحله")
+    pause_ms: Optional[int] = Field(None, ge=0, le=60000, description="مکث بین مراحل (میلی‌ثانیه)")
+
+
+class SLABackfillUpdate(BaseModel):
+    """Schema for throttling a backfill (applies from its next chunk)"""
+    chunk_size: Optional[int] = Field(None, ge=1, le=10000, description="تعداد تیکت در هر مرحله")
+    pause_ms: Optional[int] = Field(None, ge=0, le=60000, description="مکث بین مراحل (میلی‌ثانیه)")
+
+
+class SLABackfillJobResponse(BaseModel):
+    """Schema for SLA backfill progress"""
+    id: int
+    status: str
+    only_open: bool
+    dry_run: bool
+    chunk_size: int
+    pause_ms: int
+    last_ticket_id: int
+    max_ticket_id: int
+    total_tickets: int
+    processed_tickets: int
+    updated_logs: int
+    created_logs: int
+    unmatched_tickets: int
+    progress: float = 0.0  # processed_tickets / total_tickets
+    error: Optional[str] = None
+    requested_by_id: Optional[int] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
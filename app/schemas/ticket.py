@@ -98,10 +98,29 @@ class TicketResponse(TicketBase):
         from_attributes = True
 
 
+class TicketTombstone(BaseModel):
+    """Schema for a deleted ticket in a sync response"""
+    ticket_id: int
+    ticket_number: str
+    deleted_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class TicketSyncResponse(BaseModel):
+    """Schema for delta sync response"""
+    items: List[TicketResponse] = Field(default_factory=list, description="تیکت‌های ایجاد/ویرایش‌شده")
+    deleted: List[TicketTombstone] = Field(default_factory=list, description="تیکت‌های حذف‌شده")
+    watermark: str = Field(..., description="مقدار since برای درخواست بعدی")
+    has_more: bool = Field(False, description="تغییرات بیشتری باقی است؛ بلافاصله دوباره درخواست دهید")
+
+
 class TicketListResponse(BaseModel):
     """Schema for ticket list response with pagination"""
     items: List[TicketResponse]
-    total: int
+    total: Optional[int] = Field(None, description="تعداد کل (در حالت cursor محاسبه نمی‌شود)")
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = Field(None, description="cursor صفحه بعد (فقط در حالت cursor)")
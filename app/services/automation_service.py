@@ -53,13 +53,14 @@ def check_conditions(ticket: Ticket, conditions: dict) -> bool:
     return True
 
 
-def auto_assign_ticket(db: Session, ticket: Ticket) -> Optional[User]:
+def auto_assign_ticket(db: Session, ticket: Ticket, commit: bool = True) -> Optional[User]:
     """
     Auto-assign ticket based on automation rules
     
     Args:
         db: Database session
         ticket: Ticket to assign
+        commit: Commit the assignment; False only flushes (caller owns the transaction)
         
     Returns:
         User or None if no assignment made
@@ -91,7 +92,7 @@ def auto_assign_ticket(db: Session, ticket: Ticket) -> Optional[User]:
             ).first()
             if user:
                 ticket.assigned_to_id = user.id
-                db.commit()
+                _save_assignment(db, commit)
                 logger.info(f"Auto-assigned ticket {ticket.id} to user {user.username} via rule {rule.name}")
                 return user
         
@@ -141,7 +142,7 @@ def auto_assign_ticket(db: Session, ticket: Ticket) -> Optional[User]:
                 selected_user = users[0]
             
             ticket.assigned_to_id = selected_user.id
-            db.commit()
+            _save_assignment(db, commit)
             logger.info(f"Auto-assigned ticket {ticket.id} to user {selected_user.username} via rule {rule.name}")
             return selected_user
         
@@ -176,13 +177,20 @@ def auto_assign_ticket(db: Session, ticket: Ticket) -> Optional[User]:
                     selected_user = users[0]
                 
                 ticket.assigned_to_id = selected_user.id
-                db.commit()
+                _save_assignment(db, commit)
                 logger.info(f"Auto-assigned ticket {ticket.id} to user {selected_user.username} via rule {rule.name}")
                 return selected_user
     
     return None
 
 
+def _save_assignment(db: Session, commit: bool) -> None:
+    if commit:
+        db.commit()
+    else:
+        db.flush()
+
+
 def create_automation_rule(db: Session, rule_data: AutomationRuleCreate) -> AutomationRule:
     """Create new automation rule"""
     rule = AutomationRule(**rule_data.model_dump())
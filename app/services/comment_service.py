@@ -2,19 +2,52 @@
 سرویس مدیریت کامنت‌های تیکت
 Comment service for ticket comments
 """
-from typing import List
+from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
 from app.models import Comment, Ticket, User
 from app.schemas.comment import CommentCreate
+from app.core.concurrency import run_blocking
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _save_comment(db: Session, user_id: int, data: CommentCreate) -> Comment:
+  comment = Comment(
+    ticket_id=data.ticket_id,
+    user_id=user_id,
+    comment=data.comment,
+    is_internal=data.is_internal,
+  )
+  db.add(comment)
+  db.commit()
+  db.refresh(comment)
+  return comment
+
+
+def _comment_email_recipients(db: Session, user_id: int, ticket_id: int) -> Tuple[Optional[Ticket], Optional[User], List[User]]:
+  """
+  تیکت، نویسنده کامنت و گیرندگان ایمیل
+  Ticket, comment author and users to email (owner and assignee, not the author)
+  """
+  ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+  comment_author = db.query(User).filter(User.id == user_id).first()
+  if not ticket or not comment_author:
+    return ticket, comment_author, []
+  recipients = []
+  # صاحب تیکت و کارشناس مسئول (اگر خودشان کامنت نگذاشته باشند)
+  for recipient in (ticket.user, ticket.assigned_to):
+    if recipient and recipient.id != user_id and recipient.email and recipient not in recipients:
+      recipients.append(recipient)
+  return ticket, comment_author, recipients
+
+
 async def create_comment(db: Session, user_id: int, data: CommentCreate) -> Comment:
   """
   ایجاد کامنت جدید برای تیکت
   Create a new comment for a ticket
+
+  Database work runs on a worker thread; only the emails are awaited on the loop.
   
   Args:
       db: Session دیتابیس
@@ -27,53 +60,26 @@ async def create_comment(db: Session, user_id: int, data: CommentCreate) -> Comm
   from app.services.email_service import email_service
   from app.core.enums import Language
   
-  comment = Comment(
-    ticket_id=data.ticket_id,
-    user_id=user_id,
-    comment=data.comment,
-    is_internal=data.is_internal,
-  )
-  db.add(comment)
-  db.commit()
-  db.refresh(comment)
+  comment = await run_blocking(_save_comment, db, user_id, data)
   
   # ارسال اعلان ایمیل (فقط برای کامنت‌های عمومی)
   if not data.is_internal:
     try:
       # دریافت تیکت و کاربران مرتبط
-      ticket = db.query(Ticket).filter(Ticket.id == data.ticket_id).first()
-      comment_author = db.query(User).filter(User.id == user_id).first()
-      
-      if ticket and comment_author:
-        # ارسال به صاحب تیکت (اگر خودش کامنت نگذاشته باشد)
-        if ticket.user and ticket.user.id != user_id and ticket.user.email:
-          try:
-            lang = ticket.user.language if hasattr(ticket.user, 'language') else Language.FA
-            await email_service.send_comment_added_email(
-              to_email=ticket.user.email,
-              ticket_number=ticket.ticket_number,
-              ticket_title=ticket.title,
-              comment_author=comment_author.full_name,
-              comment_text=data.comment[:500],  # محدود کردن طول متن
-              language=lang
-            )
-          except Exception as e:
-            logger.error(f"Failed to send email to ticket owner: {e}")
-        
-        # ارسال به کارشناس مسئول (اگر خودش کامنت نگذاشته باشد)
-        if ticket.assigned_to and ticket.assigned_to.id != user_id and ticket.assigned_to.email:
-          try:
-            lang = ticket.assigned_to.language if hasattr(ticket.assigned_to, 'language') else Language.FA
-            await email_service.send_comment_added_email(
-              to_email=ticket.assigned_to.email,
-              ticket_number=ticket.ticket_number,
-              ticket_title=ticket.title,
-              comment_author=comment_author.full_name,
-              comment_text=data.comment[:500],
-              language=lang
-            )
-          except Exception as e:
-            logger.error(f"Failed to send email to assigned user: {e}")
+      ticket, comment_author, recipients = await run_blocking(_comment_email_recipients, db, user_id, data.ticket_id)
+      for recipient in recipients:
+        try:
+          lang = recipient.language if hasattr(recipient, 'language') else Language.FA
+          await email_service.send_comment_added_email(
+            to_email=recipient.email,
+            ticket_number=ticket.ticket_number,
+            ticket_title=ticket.title,
+            comment_author=comment_author.full_name,
+            comment_text=data.comment[:500],  # محدود کردن طول متن
+            language=lang
+          )
+        except Exception as e:
+          logger.error(f"Failed to send comment email to user {recipient.id}: {e}")
     except Exception as e:
       logger.error(f"Error sending comment notification emails: {e}", exc_info=True)
   
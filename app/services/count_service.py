@@ -0,0 +1,203 @@
+"""
+Total-count strategies for paginated lists
+
+List services call count_query() instead of query.count(). Modes:
+
+- exact: exact count, cached per query signature (SQL text + parameters)
+  for COUNT_CACHE_TTL_SECONDS and dropped as soon as a write touches one
+  of the counted tables
+- estimated: for dashboards; the planner estimate on PostgreSQL, elsewhere
+  an exact count that may be reused up to COUNT_ESTIMATE_TTL_SECONDS even
+  after writes
+- none: no count at all (include_total=false)
+
+The cache is per process; other workers see a write after at most the TTL.
+"""
+import json
+import logging
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql.util import find_tables
+
+from app.config import settings
+from app.database import Base
+
+logger = logging.getLogger(__name__)
+
+COUNT_EXACT = "exact"
+COUNT_ESTIMATED = "estimated"
+COUNT_NONE = "none"
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATED, COUNT_NONE)
+
+_MAX_ENTRIES = 2048
+
+
+class CountCache:
+    """Per-process count cache invalidated by per-table write generations"""
+
+    def __init__(self, max_entries: int = _MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._generations: Dict[str, int] = {}
+        # signature -> (count, stored at, table generations at count time)
+        self._entries: Dict[tuple, Tuple[int, float, Tuple[int, ...]]] = {}
+
+    def get(self, signature: tuple, tables: Tuple[str, ...], max_age: float, ignore_writes: bool = False) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(signature)
+            if entry is None:
+                return None
+            count, stored_at, generations = entry
+            if time.monotonic() - stored_at > max_age:
+                return None
+            if not ignore_writes and generations != self._current(tables):
+                return None
+            return count
+
+    def put(self, signature: tuple, tables: Tuple[str, ...], count: int, generations: Tuple[int, ...]) -> None:
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Entries are short-lived; dropping everything is cheaper than LRU bookkeeping
+                self._entries.clear()
+            self._entries[signature] = (count, time.monotonic(), generations)
+
+    def generations(self, tables: Tuple[str, ...]) -> Tuple[int, ...]:
+        with self._lock:
+            return self._current(tables)
+
+    def bump(self, tables: Iterable[str]) -> None:
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _current(self, tables: Tuple[str, ...]) -> Tuple[int, ...]:
+        return tuple(self._generations.get(table, 0) for table in tables)
+
+
+count_cache = CountCache()
+
+
+def count_query(
+    query: Query,
+    mode: str = COUNT_EXACT,
+    depends_on: Iterable[str] = (),
+) -> Optional[int]:
+    """
+    Count the rows of a filtered list query according to ``mode``
+
+    Args:
+        query: Filtered query (ordering, eager loads and pagination are ignored)
+        mode: COUNT_EXACT, COUNT_ESTIMATED or COUNT_NONE
+        depends_on: Extra table names whose writes change the result
+            (for tables reached through raw SQL, e.g. the search index)
+
+    Returns:
+        Total count, or None for COUNT_NONE
+    """
+    if mode == COUNT_NONE:
+        return None
+    if mode not in COUNT_MODES:
+        raise ValueError(f"Unknown count mode: {mode}")
+
+    query = query.order_by(None)
+    bind = query.session.get_bind()
+    statement = query.statement
+    compiled = statement.compile(dialect=bind.dialect)
+    tables = tuple(sorted(
+        {t.name for t in find_tables(statement, include_joins=True) if hasattr(t, "name")}
+        | set(depends_on)
+    ))
+    signature = (str(bind.engine.url), str(compiled), _freeze(compiled.params))
+
+    if mode == COUNT_ESTIMATED:
+        if bind.dialect.name == "postgresql":
+            estimate = _planner_estimate(query.session, compiled)
+            if estimate is not None:
+                return estimate
+        cached = count_cache.get(signature, tables, settings.COUNT_ESTIMATE_TTL_SECONDS, ignore_writes=True)
+    else:
+        cached = count_cache.get(signature, tables, settings.COUNT_CACHE_TTL_SECONDS)
+    if cached is not None:
+        return cached
+
+    # Generations are read before counting so a concurrent write invalidates the new entry
+    generations = count_cache.generations(tables)
+    total = query.count()
+    count_cache.put(signature, tables, total, generations)
+    return total
+
+
+def resolve_count_mode(include_total: bool = True, estimate_total: bool = False) -> str:
+    """Map the include_total/estimate_total query flags of list endpoints to a count mode"""
+    if not include_total:
+        return COUNT_NONE
+    return COUNT_ESTIMATED if estimate_total else COUNT_EXACT
+
+
+def _freeze(params: dict) -> tuple:
+    return tuple(sorted((key, repr(value)) for key, value in params.items()))
+
+
+def _planner_estimate(db: Session, compiled) -> Optional[int]:
+    try:
+        plan = db.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled.string}", compiled.params
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as exc:
+        logger.debug("Planner count estimate failed: %s", exc)
+        return None
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_after_flush(session: Session, flush_context) -> None:
+    tables = {
+        obj.__table__.name
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if hasattr(obj, "__table__")
+    }
+    if tables:
+        count_cache.bump(tables)
+        session.info.setdefault("count_tables", set()).update(tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_on_bulk_write(orm_execute_state) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None:
+        table = mapper.local_table.name
+        count_cache.bump((table,))
+        orm_execute_state.session.info.setdefault("count_tables", set()).add(table)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    # Counts cached by other sessions between our flush and commit saw the old rows
+    tables = session.info.pop("count_tables", None)
+    if tables:
+        count_cache.bump(tables)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_after_rollback(session: Session, previous_transaction) -> None:
+    # A savepoint rollback leaves the outer transaction's writes to be committed
+    if not previous_transaction.nested:
+        session.info.pop("count_tables", None)
+
+
+@event.listens_for(Base.metadata, "after_create")
+@event.listens_for(Base.metadata, "after_drop")
+def _clear_after_schema_change(target, connection, **kw) -> None:
+    count_cache.clear()
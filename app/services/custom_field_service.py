@@ -7,6 +7,7 @@ from sqlalchemy import and_, or_
 from app.models import CustomField, TicketCustomFieldValue, Ticket, Department, Branch
 from app.models.custom_field import CustomFieldType
 from app.schemas.custom_field import CustomFieldCreate, CustomFieldUpdate
+from app.services.count_service import COUNT_EXACT, count_query
 from app.core.enums import TicketCategory
 import logging
 
@@ -20,8 +21,9 @@ def get_custom_fields(
     branch_id: Optional[int] = None,
     is_active: Optional[bool] = None,
     skip: int = 0,
-    limit: int = 100
-) -> Tuple[List[CustomField], int]:
+    limit: int = 100,
+    count_mode: str = COUNT_EXACT
+) -> Tuple[List[CustomField], Optional[int]]:
     """
     Get all custom fields with filters
     
@@ -33,14 +35,12 @@ def get_custom_fields(
         is_active: Filter by active status
         skip: Number of records to skip
         limit: Maximum number of records to return
+        count_mode: How to compute the total (see count_service)
         
     Returns:
-        Tuple of (custom fields list, total count)
+        Tuple of (custom fields list, total count or None for COUNT_NONE)
     """
-    query = db.query(CustomField).options(
-        joinedload(CustomField.department),
-        joinedload(CustomField.branch)
-    )
+    query = db.query(CustomField)
     
     if category is not None:
         query = query.filter(
@@ -69,8 +69,11 @@ def get_custom_fields(
     if is_active is not None:
         query = query.filter(CustomField.is_active == is_active)
     
-    total = query.count()
-    custom_fields = query.order_by(
+    total = count_query(query, count_mode)
+    custom_fields = query.options(
+        joinedload(CustomField.department),
+        joinedload(CustomField.branch)
+    ).order_by(
         CustomField.display_order.asc(),
         CustomField.name.asc()
     ).offset(skip).limit(limit).all()
@@ -450,6 +450,41 @@ class EmailService:
             html_body=html_body
         )
     
+    async def send_sla_digest_email(
+        self,
+        to_email: str,
+        alerts: List[Dict[str, Any]],
+        language: Language = Language.FA
+    ) -> bool:
+        """
+        ارسال یک ایمیل برای چند هشدار/نقض SLA
+        Send one email listing several SLA warnings and breaches
+        
+        Args:
+            to_email: آدرس ایمیل گیرنده
+            alerts: هر مورد شامل ticket_number, ticket_title, kind
+                (response_warning, response_breach, resolution_warning,
+                resolution_breach) و time
+            language: زبان ایمیل
+        """
+        subject = translate("emails.sla_digest.subject", language, count=len(alerts))
+        
+        context = {
+            'alerts': [
+                {**alert, 'ticket_url': f"{settings.API_BASE_URL}/tickets/{alert['ticket_number']}"}
+                for alert in alerts
+            ],
+            'app_name': settings.APP_NAME,
+        }
+        
+        html_body = self._render_template('sla_digest', language, context)
+        
+        return await self._send_email(
+            to_addresses=[to_email],
+            subject=subject,
+            html_body=html_body
+        )
+    
     async def send_custom_email(
         self,
         to_addresses: List[str],
@@ -10,6 +10,7 @@ from app.models.notification import Notification
 def create_notifications(
     db: Session,
     notifications: Iterable[dict],
+    commit: bool = True,
 ) -> List[Notification]:
     """
     Persist multiple notifications at once.
@@ -17,6 +18,7 @@ def create_notifications(
     Args:
         db: Database session
         notifications: Iterable of dicts with keys (user_id, title, body, severity, metadata/extra)
+        commit: Commit here; False only flushes so the caller's transaction decides
     """
     entries: List[Notification] = []
     for payload in notifications:
@@ -40,6 +42,11 @@ def create_notifications(
     if not entries:
         return []
 
+    if not commit:
+        db.add_all(entries)
+        db.flush()
+        return entries
+
     try:
         db.add_all(entries)
         db.commit()
@@ -9,6 +9,7 @@ import httpx
 from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.core.concurrency import run_blocking
 from app.core.enums import Language, TicketStatus, UserRole
 from app.i18n.translator import translate
 from app.models import Ticket, User
@@ -89,16 +90,50 @@ def _persist_feed_notifications(db: Session, entries: List[dict]) -> None:
         logger.warning("Failed to persist feed notifications: %s", exc)
 
 
-async def notify_ticket_created(ticket: Ticket, db: Session) -> None:
+def ticket_created_feed_entries(ticket: Ticket, db: Session) -> List[dict]:
+    """
+    اعلان‌های داخلی (feed) ایجاد تیکت
+    Feed rows for a new ticket, built without sending anything
+
+    Lets create_ticket write them in the same transaction as the ticket.
+    """
+    creator = ticket.user
+    feed_entries: List[dict] = []
+    if creator and creator.telegram_chat_id:
+        creator_language = _normalize_language(creator.language)
+        feed_entries.append(
+            {
+                "user_id": creator.id,
+                "title": translate("notifications.feed.ticket_created_user", creator_language) or "ثبت تیکت جدید",
+                "body": _ticket_reference(ticket),
+                "severity": "info",
+            }
+        )
+    for admin in _collect_admin_recipients(db, exclude_user_id=creator.id if creator else None):
+        lang = _normalize_language(admin.language)
+        feed_entries.append(
+            {
+                "user_id": admin.id,
+                "title": translate("notifications.feed.ticket_created_admin", lang) or "تیکت جدید ثبت شد",
+                "body": _ticket_reference(ticket),
+                "severity": "info",
+            }
+        )
+    return feed_entries
+
+
+async def notify_ticket_created(ticket: Ticket, db: Session, persist_feed: bool = True) -> None:
     """
     اطلاع‌رسانی ایجاد تیکت به صاحب تیکت و ادمین‌ها
     Notify ticket owner and admins about new ticket
+
+    persist_feed=False skips the feed rows when the caller already wrote
+    them (see ticket_created_feed_entries).
     """
     try:
         messages: List[Tuple[str, str]] = []
 
-        creator = ticket.user
-        feed_entries: List[dict] = []
+        creator = await run_blocking(getattr, ticket, "user")
         creator_language = _normalize_language(creator.language if creator else None)
         
         # ارسال اعلان تلگرام به کاربر
@@ -113,14 +148,6 @@ async def notify_ticket_created(ticket: Ticket, db: Session) -> None:
                 f"\n{_ticket_category_label(ticket.category.value if hasattr(ticket.category, 'value') else ticket.category, creator_language)}"
             )
             messages.append((creator.telegram_chat_id, text))
-            feed_entries.append(
-                {
-                    "user_id": creator.id,
-                    "title": translate("notifications.feed.ticket_created_user", creator_language) or "ثبت تیکت جدید",
-                    "body": _ticket_reference(ticket),
-                    "severity": "info",
-                }
-            )
         
         # ارسال ایمیل به کاربر (اگر ایمیل داشته باشد)
         if creator and creator.email:
@@ -140,7 +167,7 @@ async def notify_ticket_created(ticket: Ticket, db: Session) -> None:
                 logger.error(f"Failed to send email notification to user {creator.id}: {e}")
 
         # ارسال اعلان به ادمین‌ها
-        admins = _collect_admin_recipients(db, exclude_user_id=creator.id if creator else None)
+        admins = await run_blocking(_collect_admin_recipients, db, exclude_user_id=creator.id if creator else None)
         for admin in admins:
             lang = _normalize_language(admin.language)
             text = translate(
@@ -154,14 +181,6 @@ async def notify_ticket_created(ticket: Ticket, db: Session) -> None:
                 f"\n👤 {creator.full_name if creator else '-'}"
             )
             messages.append((admin.telegram_chat_id, text))
-            feed_entries.append(
-                {
-                    "user_id": admin.id,
-                    "title": translate("notifications.feed.ticket_created_admin", lang) or "تیکت جدید ثبت شد",
-                    "body": _ticket_reference(ticket),
-                    "severity": "info",
-                }
-            )
             
             # ارسال ایمیل به ادمین (اگر ایمیل داشته باشد)
             if admin.email:
@@ -182,7 +201,9 @@ async def notify_ticket_created(ticket: Ticket, db: Session) -> None:
 
         if messages:
             await _send_telegram_messages(messages)
-        _persist_feed_notifications(db, feed_entries)
+        if persist_feed:
+            entries = await run_blocking(ticket_created_feed_entries, ticket, db)
+            await run_blocking(_persist_feed_notifications, db, entries)
     except Exception as exc:
         logger.exception("Error in notify_ticket_created: %s", exc)
 
@@ -199,7 +220,7 @@ async def notify_ticket_status_changed(
     try:
         messages: List[Tuple[str, str]] = []
 
-        creator = ticket.user
+        creator = await run_blocking(getattr, ticket, "user")
         feed_entries: List[dict] = []
         if creator and creator.telegram_chat_id:
             lang = _normalize_language(creator.language)
@@ -239,7 +260,7 @@ async def notify_ticket_status_changed(
             except Exception as e:
                 logger.error(f"Failed to send email notification to user {creator.id}: {e}")
 
-        admins = _collect_admin_recipients(db)
+        admins = await run_blocking(_collect_admin_recipients, db)
         for admin in admins:
             lang = _normalize_language(admin.language)
             text = translate(
@@ -280,7 +301,7 @@ async def notify_ticket_status_changed(
 
         if messages:
             await _send_telegram_messages(messages)
-        _persist_feed_notifications(db, feed_entries)
+        await run_blocking(_persist_feed_notifications, db, feed_entries)
     except Exception as exc:
         logger.exception("Error in notify_ticket_status_changed: %s", exc)
 
@@ -335,11 +356,11 @@ async def notify_ticket_assigned(
     اطلاع‌رسانی تخصیص تیکت به کاربر تخصیص داده شده
     Notify user about ticket assignment
     """
-    if not ticket.assigned_to:
+    assigned_user = await run_blocking(getattr, ticket, "assigned_to")
+    if not assigned_user:
         return
     
     try:
-        assigned_user = ticket.assigned_to
         lang = _normalize_language(assigned_user.language)
         
         # ارسال اعلان تلگرام
@@ -376,7 +397,7 @@ async def notify_ticket_assigned(
                 )
             except Exception as e:
                 logger.error(f"Failed to send email notification to assigned user {assigned_user.id}: {e}")
-        _persist_feed_notifications(db, feed_entries)
+        await run_blocking(_persist_feed_notifications, db, feed_entries)
     except Exception as exc:
         logger.exception("Error in notify_ticket_assigned: %s", exc)
 
@@ -406,14 +427,14 @@ async def send_telegram_notification_to_role(
             should_close = False
         
         try:
-            users = (
+            users = await run_blocking(
                 db.query(User)
                 .filter(
                     User.role == role,
                     User.is_active.is_(True),
                     User.telegram_chat_id.isnot(None)
                 )
-                .all()
+                .all
             )
             
             messages = [(user.telegram_chat_id, message) for user in users if user.telegram_chat_id]
@@ -0,0 +1,294 @@
+"""
+Keyword-based ticket priority classifier
+
+Keyword sets per priority (Persian and English, optionally weighted) are
+normalized with normalize_persian and compiled into one regular expression,
+so a ticket is classified with a single scan of its normalized text instead
+of one substring search per keyword.
+
+Matching is by substring, like the original hard-coded lists ("error" also
+matches "errors"). Priorities are tried from the most severe down; the first
+whose matched keyword weights add up to the threshold wins, otherwise the
+ticket is MEDIUM. With the default weights of 1 this is "any keyword".
+
+The keyword sets live in SystemSettings under ``priority_keywords`` (JSON,
+see DEFAULT_PRIORITY_KEYWORDS); compiled classifiers are cached per process.
+"""
+import json
+import logging
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from sqlalchemy.orm import Session
+
+from app.core.enums import TicketPriority
+from app.core.text import normalize_persian
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_KEYWORDS_SETTING = "priority_keywords"
+
+DEFAULT_PRIORITY_KEYWORDS = {
+    "critical": ["قطع کامل", "کار نمی‌کند", "متوقف شده", "down", "not working", "stopped", "critical"],
+    "high": ["مشکل دارد", "کند است", "has problem", "slow", "error", "خطا"],
+    "low": ["درخواست", "سوال", "راهنمایی", "request", "question", "help", "پیشنهاد", "suggestion"],
+    "threshold": 1.0,
+}
+
+# Most severe first; MEDIUM is the fallback but may also carry keywords
+_SEVERITY_ORDER = (TicketPriority.CRITICAL, TicketPriority.HIGH, TicketPriority.MEDIUM, TicketPriority.LOW)
+
+# How long a process trusts its compiled classifier before re-reading the setting
+_CLASSIFIER_TTL_SECONDS = 60
+
+KeywordSet = Union[Iterable[str], Mapping[str, float]]
+
+
+class PriorityClassifier:
+    """Keyword sets compiled into a single regular expression"""
+
+    def __init__(self, keywords: Mapping[TicketPriority, KeywordSet], threshold: float = 1.0):
+        """
+        Args:
+            keywords: Keywords per priority, as a list (weight 1) or keyword -> weight
+            threshold: Summed weight a priority needs to be chosen
+        """
+        self.threshold = float(threshold)
+        # normalized keyword -> [(priority, weight)]; a keyword may be listed under several priorities
+        self._weights: Dict[str, List[Tuple[TicketPriority, float]]] = {}
+        for priority, keyword_set in keywords.items():
+            items = keyword_set.items() if isinstance(keyword_set, Mapping) else ((k, 1.0) for k in keyword_set)
+            for keyword, weight in items:
+                normalized = normalize_persian(keyword)
+                if normalized:
+                    self._weights.setdefault(normalized, []).append((TicketPriority(priority), float(weight)))
+
+        # A match only reports the longest keyword starting at a position; keywords
+        # contained in it matched too, so each keyword credits everything it contains
+        self._implied: Dict[str, Tuple[str, ...]] = {
+            keyword: tuple(other for other in self._weights if other in keyword)
+            for keyword in self._weights
+        }
+        self._pattern: Optional[re.Pattern] = (
+            re.compile(_trie_pattern(_build_trie(self._weights))) if self._weights else None
+        )
+
+    @property
+    def keyword_count(self) -> int:
+        return len(self._weights)
+
+    def scores(self, text: str, normalized: bool = False) -> Dict[TicketPriority, float]:
+        """
+        Summed keyword weights per priority (each keyword counts once)
+
+        Args:
+            text: Ticket text
+            normalized: The text already went through normalize_persian
+        """
+        if self._pattern is None:
+            return {}
+        if not normalized:
+            text = normalize_persian(text)
+        found = set()
+        search = self._pattern.search
+        match = search(text)
+        while match is not None:
+            found.update(self._implied[match.group()])
+            # Restart right after the match start so overlapping keywords are found too
+            match = search(text, match.start() + 1)
+        scores: Dict[TicketPriority, float] = {}
+        for keyword in found:
+            for priority, weight in self._weights[keyword]:
+                scores[priority] = scores.get(priority, 0.0) + weight
+        return scores
+
+    def classify(self, title: str, description: str = "") -> TicketPriority:
+        """
+        Determine the priority of one ticket
+
+        Args:
+            title: Ticket title
+            description: Ticket description
+
+        Returns:
+            TicketPriority: Most severe priority reaching the threshold, else MEDIUM
+        """
+        scores = self.scores(f"{title or ''} {description or ''}")
+        for priority in _SEVERITY_ORDER:
+            if scores.get(priority, 0.0) >= self.threshold:
+                return priority
+        return TicketPriority.MEDIUM
+
+    def classify_many(self, tickets: Iterable[Tuple[str, str]]) -> List[TicketPriority]:
+        """
+        Classify many tickets (bulk imports, re-prioritisation jobs)
+
+        Args:
+            tickets: (title, description) pairs
+
+        Returns:
+            List of priorities in input order
+        """
+        classify = self.classify
+        return [classify(title, description) for title, description in tickets]
+
+
+def _build_trie(keywords: Iterable[str]) -> dict:
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return trie
+
+
+def _trie_pattern(node: dict) -> str:
+    """
+    Regular expression of a keyword trie, longest match first
+
+    Sharing prefixes means the regex engine follows one branch per position
+    instead of trying every keyword, and the set of first characters lets
+    it skip non-matching positions in C.
+    """
+    end = "" in node
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    if len(branches) == 1 and not end:
+        return branches[0]
+    group = "(?:" + "|".join(branches) + ")"
+    return group + "?" if end else group
+
+
+def parse_priority_keywords(value: Union[str, Mapping, None]) -> PriorityClassifier:
+    """
+    Build a classifier from the ``priority_keywords`` setting
+
+    Args:
+        value: JSON text or dict like DEFAULT_PRIORITY_KEYWORDS; None for the defaults
+
+    Returns:
+        PriorityClassifier: Compiled classifier
+
+    Raises:
+        ValueError: If the value is not valid keyword configuration
+    """
+    if value is None:
+        value = DEFAULT_PRIORITY_KEYWORDS
+    try:
+        config = json.loads(value) if isinstance(value, str) else dict(value)
+        threshold = float(config.pop("threshold", 1.0))
+        keywords = {TicketPriority(name): keyword_set for name, keyword_set in config.items()}
+        for keyword_set in keywords.values():
+            if isinstance(keyword_set, str) or not isinstance(keyword_set, (list, Mapping)):
+                raise TypeError("keyword sets must be lists or keyword -> weight objects")
+        return PriorityClassifier(keywords, threshold)
+    except Exception as exc:
+        raise ValueError(f"Invalid {PRIORITY_KEYWORDS_SETTING} setting: {exc}") from exc
+
+
+@lru_cache(maxsize=1)
+def default_priority_classifier() -> PriorityClassifier:
+    """Classifier for DEFAULT_PRIORITY_KEYWORDS (no database needed)"""
+    return parse_priority_keywords(None)
+
+
+def get_priority_keyword_config(db: Session) -> Dict[str, object]:
+    """
+    Current keyword configuration with every set as keyword -> weight
+
+    Args:
+        db: Database session
+
+    Returns:
+        Dict with one entry per priority name plus ``threshold``
+    """
+    from app.services.settings_service import get_setting
+
+    raw = get_setting(db, PRIORITY_KEYWORDS_SETTING)
+    try:
+        config = json.loads(raw) if raw else dict(DEFAULT_PRIORITY_KEYWORDS)
+        parse_priority_keywords(config)
+    except ValueError:
+        config = dict(DEFAULT_PRIORITY_KEYWORDS)
+    result: Dict[str, object] = {"threshold": float(config.get("threshold", 1.0))}
+    for priority in _SEVERITY_ORDER:
+        keyword_set = config.get(priority.value, {})
+        if not isinstance(keyword_set, Mapping):
+            keyword_set = {keyword: 1.0 for keyword in keyword_set}
+        result[priority.value] = {keyword: float(weight) for keyword, weight in keyword_set.items()}
+    return result
+
+
+def set_priority_keyword_config(db: Session, config: Mapping, updated_by_id: Optional[int] = None) -> None:
+    """
+    Validate and store the keyword configuration
+
+    Args:
+        db: Database session
+        config: Dict shaped like get_priority_keyword_config's result
+        updated_by_id: User making the change
+
+    Raises:
+        ValueError: If the configuration does not compile
+    """
+    from app.services.settings_service import set_setting
+
+    parse_priority_keywords(config)
+    set_setting(
+        db,
+        PRIORITY_KEYWORDS_SETTING,
+        json.dumps(config, ensure_ascii=False),
+        value_type="json",
+        description="کلمات کلیدی تعیین خودکار اولویت تیکت",
+        updated_by_id=updated_by_id,
+    )
+    reset_priority_classifier()
+
+
+_cache_lock = threading.Lock()
+# (raw setting value, compiled classifier, loaded at)
+_cached: Optional[Tuple[Optional[str], PriorityClassifier, float]] = None
+
+
+def get_priority_classifier(db: Session) -> PriorityClassifier:
+    """
+    Classifier for the configured keyword sets
+
+    The setting is re-read at most every _CLASSIFIER_TTL_SECONDS and only
+    recompiled when its value changed. An invalid setting falls back to the
+    defaults.
+
+    Args:
+        db: Database session
+    """
+    global _cached
+    from app.services.settings_service import get_setting
+
+    cached = _cached
+    if cached is not None and time.monotonic() - cached[2] < _CLASSIFIER_TTL_SECONDS:
+        return cached[1]
+
+    raw = get_setting(db, PRIORITY_KEYWORDS_SETTING)
+    with _cache_lock:
+        if _cached is not None and _cached[0] == raw:
+            classifier = _cached[1]
+        else:
+            try:
+                classifier = parse_priority_keywords(raw)
+            except ValueError as exc:
+                logger.warning("%s; using default keywords", exc)
+                classifier = default_priority_classifier()
+        _cached = (raw, classifier, time.monotonic())
+    return classifier
+
+
+def reset_priority_classifier() -> None:
+    """Drop the cached classifier (after the setting changed)"""
+    global _cached
+    with _cache_lock:
+        _cached = None
@@ -0,0 +1,222 @@
+"""
+Report result cache for the dashboard report endpoints
+
+Results are keyed by report kind plus normalized filters (None dropped,
+dates as ISO strings, enums as values) and reused for
+REPORT_CACHE_TTL_SECONDS, unless the global ticket-write generation moved
+on: any flush, bulk statement or commit touching tickets, SLA logs/rules,
+branches or departments advances it, which invalidates every entry at once.
+
+Identical concurrent requests are coalesced: the first computes, the others
+wait for its result instead of running the same queries. A computation
+only joins one that started in the same generation, so nobody is handed a
+result older than a write they could already see. Cached values are shared
+between callers and must not be mutated.
+
+The cache and its hit/miss counters are per process.
+"""
+import json
+import logging
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import Base
+from app.models import Branch, Department, SLALog, SLARule, Ticket, TicketDailyRollup
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_MAX_ENTRIES = 1024
+
+# Writes to these change some report
+_REPORT_MODELS = (Ticket, TicketDailyRollup, SLALog, SLARule, Branch, Department)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if hasattr(value, "value"):
+        return value.value
+    return value
+
+
+def report_cache_key(kind: str, filters: Optional[Mapping[str, Any]] = None) -> str:
+    """Cache key of a report: kind plus its non-empty filters in a fixed order"""
+    normalized = {name: _normalize(value) for name, value in (filters or {}).items() if value is not None}
+    return kind + ":" + json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+
+
+class _Inflight:
+    """A running computation other callers can wait for"""
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ReportCache:
+    """Per-process report cache invalidated by a global write generation"""
+
+    def __init__(self, max_entries: int = _MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._generation = 0
+        # key -> (value, stored at, generation at computation start)
+        self._entries: Dict[str, Tuple[Any, float, int]] = {}
+        # (key, generation) -> running computation
+        self._inflight: Dict[Tuple[str, int], _Inflight] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    def get_or_compute(self, kind: str, filters: Optional[Mapping[str, Any]], compute: Callable[[], T]) -> T:
+        """
+        Cached result of a report, computing it at most once per key and generation
+
+        Args:
+            kind: Report kind (e.g. "by-status")
+            filters: Filters the result depends on
+            compute: Function producing the result
+
+        Returns:
+            The report result (shared; do not mutate)
+        """
+        key = report_cache_key(kind, filters)
+        with self._lock:
+            generation = self._generation
+            entry = self._entries.get(key)
+            if (
+                entry is not None
+                and entry[2] == generation
+                and time.monotonic() - entry[1] <= settings.REPORT_CACHE_TTL_SECONDS
+            ):
+                self.hits += 1
+                return entry[0]
+            inflight = self._inflight.get((key, generation))
+            owner = inflight is None
+            if owner:
+                inflight = _Inflight()
+                self._inflight[(key, generation)] = inflight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            inflight.done.wait()
+            if inflight.error is not None:
+                raise inflight.error
+            return inflight.value
+
+        try:
+            inflight.value = compute()
+        except BaseException as exc:
+            inflight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop((key, generation), None)
+                # A write during the computation makes the result stale for later readers
+                if inflight.error is None and generation == self._generation:
+                    if len(self._entries) >= self.max_entries:
+                        self._entries.clear()
+                    self._entries[key] = (inflight.value, time.monotonic(), generation)
+            inflight.done.set()
+        return inflight.value
+
+    def bump(self) -> None:
+        """Advance the write generation (invalidates all entries)"""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size"""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "invalidations": self.invalidations,
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else None,
+                "entries": len(self._entries),
+                "inflight": len(self._inflight),
+                "generation": self._generation,
+                "ttl_seconds": settings.REPORT_CACHE_TTL_SECONDS,
+            }
+
+
+report_cache = ReportCache()
+
+
+def cached_report(kind: str, compute: Callable[[], T], **filters) -> T:
+    """
+    Shortcut for report_cache.get_or_compute
+
+    Args:
+        kind: Report kind
+        compute: Function producing the result
+        **filters: Filters the result depends on (date_from, date_to, branch_id, ...)
+    """
+    return report_cache.get_or_compute(kind, filters, compute)
+
+
+def _is_report_model(mapper) -> bool:
+    return mapper is not None and issubclass(mapper.class_, _REPORT_MODELS)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_after_flush(session: Session, flush_context) -> None:
+    if any(isinstance(obj, _REPORT_MODELS) for obj in (*session.new, *session.dirty, *session.deleted)):
+        report_cache.bump()
+        session.info["report_cache_dirty"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_on_bulk_write(orm_execute_state) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    if _is_report_model(orm_execute_state.bind_mapper):
+        report_cache.bump()
+        orm_execute_state.session.info["report_cache_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    # Reports computed by other sessions between our flush and commit saw the old rows
+    if session.info.pop("report_cache_dirty", False):
+        report_cache.bump()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_after_rollback(session: Session, previous_transaction) -> None:
+    if previous_transaction.nested:
+        # The outer transaction still commits its writes; keep the flag for after_commit
+        if session.info.get("report_cache_dirty"):
+            report_cache.bump()
+        return
+    if session.info.pop("report_cache_dirty", False):
+        # Reports computed through this session may have seen the rolled-back rows
+        report_cache.bump()
+
+
+@event.listens_for(Base.metadata, "after_create")
+@event.listens_for(Base.metadata, "after_drop")
+def _clear_after_schema_change(target, connection, **kw) -> None:
+    report_cache.clear()
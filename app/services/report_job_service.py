@@ -0,0 +1,356 @@
+"""
+Report job queue (POST /api/reports/jobs)
+
+A job records the kind (pdf/xlsx) and parameters of a dashboard report.
+Running it collects the data on a worker thread (rollup queries) and
+renders the file in a process pool, so neither step blocks the event loop
+and ReportLab's CPU work does not compete with request handling for the
+GIL. Artifacts are written to REPORT_STORAGE_DIR as <job id>.<kind>.
+
+Identical requests (same kind and parameters) share the latest job that has
+not failed or expired: while it is pending/running callers wait for it, and
+once done its artifact is reused until expires_at (REPORT_JOB_TTL_SECONDS
+after it finished). Expired jobs and their files are purged whenever a job
+is submitted.
+
+Jobs run in the process that accepted them. A pending/running job whose
+expiry passes (the process restarted, or rendering hung) is reported failed.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.concurrency import run_blocking
+from app.core.timeutils import naive_utc
+from app.database import session_scope
+from app.models import ReportJob
+
+logger = logging.getLogger(__name__)
+
+REPORT_JOB_KINDS = ("pdf", "xlsx")
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+REPORT_MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# How often callers waiting for a job re-read its status
+_POLL_SECONDS = 0.5
+
+_submit_lock = threading.Lock()
+_executor_lock = threading.Lock()
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _normalize_params(params: Mapping[str, Any]) -> Dict[str, Any]:
+    normalized = {}
+    for name, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        elif hasattr(value, "value"):
+            value = value.value
+        normalized[name] = value
+    return normalized
+
+
+def report_job_key(kind: str, params: Mapping[str, Any]) -> str:
+    """Cache key shared by requests for the same report"""
+    payload = json.dumps([kind, _normalize_params(params)], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def submit_report_job(
+    db: Session,
+    kind: str,
+    params: Mapping[str, Any],
+    requested_by_id: Optional[int] = None,
+) -> Tuple[ReportJob, bool]:
+    """
+    Find a reusable job for the report or create a pending one
+
+    Args:
+        db: Database session
+        kind: One of REPORT_JOB_KINDS
+        params: Report parameters (date_from, date_to, filters); None values are ignored
+        requested_by_id: User requesting the report
+
+    Returns:
+        Tuple of (job, created); a created job still has to be run with run_report_job
+
+    Raises:
+        ValueError: If the kind is unknown
+    """
+    if kind not in REPORT_JOB_KINDS:
+        raise ValueError(f"Unknown report kind: {kind}")
+    normalized = _normalize_params(params)
+    key = report_job_key(kind, normalized)
+    now = datetime.utcnow()
+    purge_expired_report_jobs(db, now)
+
+    with _submit_lock:
+        candidates = (
+            db.query(ReportJob)
+            .filter(
+                ReportJob.cache_key == key,
+                ReportJob.status != JOB_FAILED,
+                ReportJob.expires_at > now,
+            )
+            .order_by(ReportJob.created_at.desc())
+            .all()
+        )
+        for job in candidates:
+            if job.status != JOB_DONE or (job.file_path and os.path.exists(job.file_path)):
+                return job, False
+
+        job = ReportJob(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            params=json.dumps(normalized, sort_keys=True, ensure_ascii=False),
+            cache_key=key,
+            status=JOB_PENDING,
+            requested_by_id=requested_by_id,
+            created_at=now,
+            # A job still unfinished by then is considered lost
+            expires_at=now + timedelta(seconds=settings.REPORT_JOB_TTL_SECONDS),
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+    return job, True
+
+
+def get_report_job(db: Session, job_id: str) -> Optional[ReportJob]:
+    """
+    Load a job, marking it failed if it was left unfinished past its expiry
+
+    Args:
+        db: Database session
+        job_id: Job ID
+
+    Returns:
+        ReportJob or None
+    """
+    job = db.query(ReportJob).filter(ReportJob.id == job_id).first()
+    if job is not None and job.status in (JOB_PENDING, JOB_RUNNING) and _expired(job, datetime.utcnow()):
+        job.status = JOB_FAILED
+        job.error = "interrupted"
+        job.finished_at = datetime.utcnow()
+        db.commit()
+    return job
+
+
+def report_job_params(job: ReportJob) -> Dict[str, Any]:
+    """Stored report parameters of a job (ReportFilter fields)"""
+    return json.loads(job.params)
+
+
+def report_job_artifact(job: ReportJob) -> Optional[Path]:
+    """Path of a finished, unexpired job's file, or None"""
+    if job.status != JOB_DONE or not job.file_path or _expired(job, datetime.utcnow()):
+        return None
+    path = Path(job.file_path)
+    return path if path.exists() else None
+
+
+def purge_expired_report_jobs(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Delete expired jobs and their artifacts
+
+    Args:
+        db: Database session
+        now: Current UTC time
+
+    Returns:
+        int: Number of jobs deleted
+    """
+    now = now or datetime.utcnow()
+    jobs = db.query(ReportJob).filter(ReportJob.expires_at <= now).all()
+    for job in jobs:
+        if job.file_path:
+            Path(job.file_path).unlink(missing_ok=True)
+        db.delete(job)
+    if jobs:
+        db.commit()
+        logger.info("Purged %d expired report jobs", len(jobs))
+    return len(jobs)
+
+
+def _expired(job: ReportJob, now: datetime) -> bool:
+    return job.expires_at is not None and naive_utc(job.expires_at) <= now
+
+
+def render_report_file(kind: str, data: Dict[str, Any], path: str) -> int:
+    """
+    Render a report and write it to ``path`` (runs in a worker process)
+
+    The file is written under a temporary name and renamed, so a reader
+    never sees a partial artifact.
+
+    Returns:
+        int: File size in bytes
+    """
+    from app.services.report_render_service import render_dashboard_pdf, render_dashboard_xlsx
+
+    content = render_dashboard_pdf(data) if kind == "pdf" else render_dashboard_xlsx(data)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(content)
+    os.replace(tmp_path, path)
+    return len(content)
+
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    global _executor
+    if settings.REPORT_JOB_WORKERS <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            # spawn: forking a process that runs the event loop and the bot threads is unsafe
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.REPORT_JOB_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False)
+
+
+def shutdown_report_executor() -> None:
+    """Stop the rendering processes (application shutdown)"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _start_job(job_id: str, db: Optional[Session]) -> Optional[Tuple[str, Dict[str, Any], Path]]:
+    from app.services.report_cache_service import cached_report
+    from app.services.report_service import ReportFilter, dashboard_kpis
+
+    with session_scope(db) as session:
+        job = session.query(ReportJob).filter(ReportJob.id == job_id).first()
+        if job is None or job.status != JOB_PENDING:
+            return None
+        job.status = JOB_RUNNING
+        job.started_at = datetime.utcnow()
+        session.commit()
+
+        try:
+            filters = ReportFilter(**report_job_params(job))
+            # Shares the cached GET /api/reports/dashboard payload when it is fresh
+            data = cached_report("dashboard", lambda: dashboard_kpis(session, filters), **filters.as_dict())
+        except Exception as exc:
+            session.rollback()
+            logger.error("Report job %s failed collecting data: %s", job_id, exc, exc_info=True)
+            _record_result(session, job_id, None, None, str(exc))
+            return None
+        path = (settings.REPORT_STORAGE_DIR / f"{job.id}.{job.kind}").resolve()
+        return job.kind, data, path
+
+
+def _finish_job(job_id: str, db: Optional[Session], path: Optional[Path], size: Optional[int], error: Optional[str]) -> None:
+    with session_scope(db) as session:
+        _record_result(session, job_id, path, size, error)
+
+
+def _record_result(session: Session, job_id: str, path: Optional[Path], size: Optional[int], error: Optional[str]) -> None:
+    job = session.query(ReportJob).filter(ReportJob.id == job_id).first()
+    if job is None:
+        # Purged while rendering
+        if path is not None:
+            path.unlink(missing_ok=True)
+        return
+    now = datetime.utcnow()
+    job.status = JOB_FAILED if error else JOB_DONE
+    job.error = error
+    job.file_path = str(path) if path is not None else None
+    job.file_size = size
+    job.finished_at = now
+    job.expires_at = now + timedelta(seconds=settings.REPORT_JOB_TTL_SECONDS)
+    session.commit()
+
+
+async def run_report_job(job_id: str, db: Optional[Session] = None) -> None:
+    """
+    Build the artifact of a pending job; failures are recorded on the job
+
+    Args:
+        job_id: Job ID returned by submit_report_job
+        db: Session to use (tests); by default each step opens its own
+    """
+    prepared = await run_blocking(_start_job, job_id, db)
+    if prepared is None:
+        return
+    kind, data, path = prepared
+
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    started = loop.time()
+    try:
+        size = await loop.run_in_executor(executor, render_report_file, kind, data, str(path))
+    except Exception as exc:
+        if isinstance(exc, BrokenProcessPool) and executor is not None:
+            # A worker died; the next job gets a fresh pool
+            _discard_executor(executor)
+        logger.error("Report job %s failed rendering: %s", job_id, exc, exc_info=True)
+        await run_blocking(_finish_job, job_id, db, None, None, str(exc) or exc.__class__.__name__)
+        return
+    await run_blocking(_finish_job, job_id, db, path, size, None)
+    logger.info("Report job %s (%s) rendered in %.2fs, %d bytes", job_id, kind, loop.time() - started, size)
+
+
+async def wait_for_report_job(job_id: str, timeout: float = 120.0, db: Optional[Session] = None) -> Optional[ReportJob]:
+    """
+    Wait until a job is no longer pending/running
+
+    Args:
+        job_id: Job ID
+        timeout: Seconds to wait at most
+        db: Session to use (tests); by default each poll opens its own
+
+    Returns:
+        The job as last read (possibly still running on timeout), or None if it is gone
+    """
+    def load() -> Optional[ReportJob]:
+        with session_scope(db) as session:
+            job = get_report_job(session, job_id)
+            if job is not None:
+                # Loaded before the session closes; get_report_job may have committed (expiring it)
+                session.refresh(job)
+            return job
+
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        job = await run_blocking(load)
+        if job is None or job.status not in (JOB_PENDING, JOB_RUNNING):
+            return job
+        if asyncio.get_running_loop().time() >= deadline:
+            return job
+        await asyncio.sleep(_POLL_SECONDS)
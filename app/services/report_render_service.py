@@ -0,0 +1,214 @@
+"""
+Dashboard report rendering (PDF with ReportLab, XLSX with openpyxl)
+
+Renderers take the plain data of report_service.dashboard_kpis and
+return the file bytes. They need no database or application state, so the
+report job queue can run them in worker processes.
+"""
+from io import BytesIO
+from typing import Any, Dict
+
+_STATUS_LABELS = {
+  'pending': 'در انتظار',
+  'in_progress': 'در حال انجام',
+  'resolved': 'حل شده',
+  'closed': 'بسته شده'
+}
+
+_PRIORITY_LABELS = {
+  'critical': 'بحرانی',
+  'high': 'بالا',
+  'medium': 'متوسط',
+  'low': 'پایین'
+}
+
+
+def _table_style():
+  from reportlab.lib import colors
+  from reportlab.platypus import TableStyle
+
+  return TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+  ])
+
+
+def render_dashboard_pdf(data: Dict[str, Any]) -> bytes:
+  """
+  Comprehensive dashboard report as PDF
+
+  Args:
+    data: Result of dashboard_kpis
+
+  Returns:
+    bytes: PDF document
+
+  Raises:
+    ImportError: If ReportLab is not installed
+  """
+  from reportlab.lib import colors
+  from reportlab.lib.pagesizes import A4
+  from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+  from reportlab.lib.units import cm
+  from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table
+
+  overview_data = data["overview"]
+  sla_data = data["sla"]
+  response_time = data["response_time_hours"]
+
+  bio = BytesIO()
+  doc = SimpleDocTemplate(bio, pagesize=A4)
+  story = []
+  styles = getSampleStyleSheet()
+
+  # Title
+  title_style = ParagraphStyle(
+    'CustomTitle',
+    parent=styles['Heading1'],
+    fontSize=24,
+    textColor=colors.HexColor('#1a1a1a'),
+    spaceAfter=30,
+    alignment=1  # Center
+  )
+  story.append(Paragraph("گزارش جامع داشبورد سیستم تیکتینگ", title_style))
+  story.append(Spacer(1, 0.5*cm))
+
+  # Overview Section
+  story.append(Paragraph("خلاصه کلی", styles['Heading2']))
+  overview_table_data = [
+    ['معیار', 'مقدار'],
+    ['مجموع تیکت‌ها', str(overview_data.get('total', 0))],
+    ['در انتظار', str(overview_data.get('pending', 0))],
+    ['در حال انجام', str(overview_data.get('in_progress', 0))],
+    ['حل شده', str(overview_data.get('resolved', 0))],
+    ['بسته شده', str(overview_data.get('closed', 0))],
+  ]
+  if response_time:
+    overview_table_data.append(['میانگین زمان پاسخ (ساعت)', f"{response_time:.2f}"])
+
+  overview_table = Table(overview_table_data, colWidths=[8*cm, 8*cm])
+  overview_table.setStyle(_table_style())
+  story.append(overview_table)
+  story.append(Spacer(1, 0.5*cm))
+
+  # Status Section
+  story.append(Paragraph("تیکت‌ها بر اساس وضعیت", styles['Heading2']))
+  status_table_data = [['وضعیت', 'تعداد']]
+  for status, count in data["by_status"].items():
+    status_table_data.append([_STATUS_LABELS.get(status, status), str(count)])
+
+  status_table = Table(status_table_data, colWidths=[8*cm, 8*cm])
+  status_table.setStyle(_table_style())
+  story.append(status_table)
+  story.append(Spacer(1, 0.5*cm))
+
+  # Priority Section
+  story.append(Paragraph("تیکت‌ها بر اساس اولویت", styles['Heading2']))
+  priority_table_data = [['اولویت', 'تعداد']]
+  for pri, count in data["by_priority"].items():
+    priority_table_data.append([_PRIORITY_LABELS.get(pri, pri), str(count)])
+
+  priority_table = Table(priority_table_data, colWidths=[8*cm, 8*cm])
+  priority_table.setStyle(_table_style())
+  story.append(priority_table)
+  story.append(Spacer(1, 0.5*cm))
+
+  # SLA Section
+  if sla_data and sla_data.get('total_tickets_with_sla', 0) > 0:
+    story.append(Paragraph("گزارش رعایت SLA", styles['Heading2']))
+    sla_table_data = [
+      ['معیار', 'مقدار'],
+      ['مجموع تیکت‌های دارای SLA', str(sla_data.get('total_tickets_with_sla', 0))],
+      ['پاسخ در مهلت', str(sla_data.get('response_on_time', 0))],
+      ['پاسخ هشدار', str(sla_data.get('response_warning', 0))],
+      ['پاسخ نقض شده', str(sla_data.get('response_breached', 0))],
+      ['نرخ رعایت پاسخ (%)', f"{sla_data.get('response_compliance_rate', 0):.1f}"],
+      ['حل در مهلت', str(sla_data.get('resolution_on_time', 0))],
+      ['حل هشدار', str(sla_data.get('resolution_warning', 0))],
+      ['حل نقض شده', str(sla_data.get('resolution_breached', 0))],
+      ['نرخ رعایت حل (%)', f"{sla_data.get('resolution_compliance_rate', 0):.1f}"],
+    ]
+
+    sla_table = Table(sla_table_data, colWidths=[8*cm, 8*cm])
+    sla_table.setStyle(_table_style())
+    story.append(sla_table)
+    story.append(Spacer(1, 0.5*cm))
+
+  # Footer
+  story.append(Spacer(1, 1*cm))
+  footer_style = ParagraphStyle(
+    'Footer',
+    parent=styles['Normal'],
+    fontSize=8,
+    textColor=colors.grey,
+    alignment=1
+  )
+  story.append(Paragraph(f"تاریخ تولید: {data['generated_at']}", footer_style))
+
+  doc.build(story)
+  return bio.getvalue()
+
+
+def render_dashboard_xlsx(data: Dict[str, Any]) -> bytes:
+  """
+  Dashboard report as a workbook with one sheet per breakdown
+
+  Args:
+    data: Result of dashboard_kpis
+
+  Returns:
+    bytes: XLSX document
+
+  Raises:
+    ImportError: If openpyxl is not installed
+  """
+  import openpyxl
+
+  wb = openpyxl.Workbook(write_only=True)
+
+  ws = wb.create_sheet("overview")
+  ws.append(["metric", "value"])
+  for k, v in data["overview"].items():
+    ws.append([k, v])
+  if data["response_time_hours"] is not None:
+    ws.append(["avg_response_time_hours", data["response_time_hours"]])
+
+  ws = wb.create_sheet("by-status")
+  ws.append(["status", "count"])
+  for k, v in data["by_status"].items():
+    ws.append([k, v])
+
+  ws = wb.create_sheet("by-date")
+  ws.append(["date", "count"])
+  for row in data["by_date"]:
+    ws.append([row["date"], row["count"]])
+
+  ws = wb.create_sheet("by-branch")
+  ws.append(["branch_id", "branch_name", "branch_code", "count"])
+  for row in data["by_branch"]:
+    ws.append([row["branch_id"], row["branch_name"], row["branch_code"], row["count"]])
+
+  ws = wb.create_sheet("by-priority")
+  ws.append(["priority", "count"])
+  for k, v in data["by_priority"].items():
+    ws.append([k, v])
+
+  ws = wb.create_sheet("by-department")
+  ws.append(["department_id", "department_name", "department_code", "count"])
+  for row in data["by_department"]:
+    ws.append([row["department_id"], row["department_name"], row["department_code"], row["count"]])
+
+  ws = wb.create_sheet("sla-compliance")
+  ws.append(["metric", "value"])
+  for k, v in data["sla"].items():
+    ws.append([k, v])
+
+  bio = BytesIO()
+  wb.save(bio)
+  return bio.getvalue()
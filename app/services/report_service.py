@@ -1,213 +1,419 @@
-from datetime import datetime, date
-from typing import Dict, List, Tuple, Optional
+"""
+Report queries
+
+Ticket breakdowns are read from the ticket_daily_rollups fact table (see
+ticket_rollup_service), so their cost depends on the number of days and
+dimension combinations, not on the number of tickets.
+
+Every report takes an optional ReportFilter (creation date range, branch,
+department, priority, category). It is compiled into the WHERE clause of
+the rollup query, or of the tickets joined by the SLA reports, so a
+filtered report only reads the matching rows.
+"""
+from dataclasses import dataclass, fields
+from datetime import datetime, date, timedelta
+from typing import Any, Dict, List, Tuple, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func, cast, Date, text
-from app.models import Ticket, Branch, Department, SLALog, SLARule
+from sqlalchemy import func, case, cast, Date
+from app.models import Ticket, Branch, Department, SLALog, SLARule, TicketDailyRollup
 from app.core.enums import TicketStatus, TicketCategory, TicketPriority
 
 
-def tickets_by_status(db: Session) -> Dict[str, int]:
-  rows = (
-    db.query(Ticket.status, func.count(Ticket.id))
-    .group_by(Ticket.status)
+def _coerce_enum(enum_class, value):
+  if value is None or isinstance(value, enum_class):
+    return value
+  try:
+    return enum_class(value)
+  except ValueError:
+    pass
+  try:
+    # Enum name, as stored by SQLAlchemy's Enum type
+    return enum_class[str(value).upper()]
+  except KeyError:
+    raise ValueError(f"Invalid {enum_class.__name__}: {value}") from None
+
+
+@dataclass(frozen=True)
+class ReportFilter:
+  """
+  Filters shared by the report functions
+
+  Dates are ticket creation days (UTC), both ends inclusive. ISO date
+  strings and priority/category values or names are accepted, so the
+  filter can be rebuilt from stored job parameters.
+  """
+  date_from: Optional[date] = None
+  date_to: Optional[date] = None
+  branch_id: Optional[int] = None
+  department_id: Optional[int] = None
+  priority: Optional[TicketPriority] = None
+  category: Optional[TicketCategory] = None
+
+  def __post_init__(self):
+    for name in ("date_from", "date_to"):
+      value = getattr(self, name)
+      if isinstance(value, datetime):
+        object.__setattr__(self, name, value.date())
+      elif isinstance(value, str):
+        object.__setattr__(self, name, date.fromisoformat(value))
+    object.__setattr__(self, "priority", _coerce_enum(TicketPriority, self.priority))
+    object.__setattr__(self, "category", _coerce_enum(TicketCategory, self.category))
+
+  def as_dict(self) -> Dict[str, Any]:
+    """Non-empty filters by name (report cache key, job parameters)"""
+    values = {f.name: getattr(self, f.name) for f in fields(self)}
+    return {name: value for name, value in values.items() if value is not None}
+
+  def rollup_clauses(self) -> List:
+    """WHERE clauses on ticket_daily_rollups"""
+    clauses = []
+    if self.date_from:
+      clauses.append(TicketDailyRollup.day >= self.date_from)
+    if self.date_to:
+      clauses.append(TicketDailyRollup.day <= self.date_to)
+    if self.branch_id is not None:
+      clauses.append(TicketDailyRollup.branch_id == self.branch_id)
+    if self.department_id is not None:
+      clauses.append(TicketDailyRollup.department_id == self.department_id)
+    if self.priority is not None:
+      clauses.append(TicketDailyRollup.priority == self.priority.value)
+    if self.category is not None:
+      clauses.append(TicketDailyRollup.category == self.category.value)
+    return clauses
+
+  def ticket_clauses(self) -> List:
+    """WHERE clauses on tickets (same rows as rollup_clauses)"""
+    clauses = []
+    if self.date_from:
+      clauses.append(Ticket.created_at >= datetime.combine(self.date_from, datetime.min.time()))
+    if self.date_to:
+      clauses.append(Ticket.created_at < datetime.combine(self.date_to + timedelta(days=1), datetime.min.time()))
+    if self.branch_id is not None:
+      clauses.append(Ticket.branch_id == self.branch_id)
+    if self.department_id is not None:
+      clauses.append(Ticket.department_id == self.department_id)
+    if self.priority is not None:
+      clauses.append(Ticket.priority == self.priority)
+    if self.category is not None:
+      clauses.append(Ticket.category == self.category)
+    return clauses
+
+
+_NO_FILTER = ReportFilter()
+
+
+_ticket_count = func.sum(TicketDailyRollup.ticket_count)
+
+
+def _rollup_counts(db: Session, filters: Optional[ReportFilter], *group_by) -> List[Tuple]:
+  """Ticket counts per group, skipping groups whose tickets all moved away"""
+  return (
+    db.query(*group_by, _ticket_count)
+    .filter(*(filters or _NO_FILTER).rollup_clauses())
+    .group_by(*group_by)
+    .having(_ticket_count > 0)
     .all()
   )
-  return {status.value: count for status, count in rows}
-
-
-def tickets_by_date(
-  db: Session,
-  date_from: Optional[date] = None,
-  date_to: Optional[date] = None,
-) -> List[Dict[str, int]]:
-  # Use func.date() for SQLite compatibility instead of cast()
-  q = db.query(func.date(Ticket.created_at).label("d"), func.count(Ticket.id))
-  if date_from:
-    q = q.filter(Ticket.created_at >= datetime.combine(date_from, datetime.min.time()))
-  if date_to:
-    q = q.filter(Ticket.created_at <= datetime.combine(date_to, datetime.max.time()))
-  rows = q.group_by("d").order_by("d").all()
-  # Handle both string and date objects from SQLite
-  result = []
-  for row in rows:
-    d, c = row
-    # Convert date to string if needed
-    if isinstance(d, str):
-      date_str = d
-    elif isinstance(d, date):
-      date_str = d.isoformat()
-    else:
-      date_str = str(d)
-    result.append({"date": date_str, "count": c})
-  return result
 
 
-def tickets_overview(db: Session) -> Dict[str, int]:
-  total = db.query(func.count(Ticket.id)).scalar() or 0
-  by_status = tickets_by_status(db)
-  return {"total": total, **by_status}
+def tickets_by_status(db: Session, filters: Optional[ReportFilter] = None) -> Dict[str, int]:
+  rows = _rollup_counts(db, filters, TicketDailyRollup.status)
+  return {status: int(count) for status, count in rows}
 
 
-def tickets_by_branch(db: Session) -> List[Dict[str, any]]:
+def tickets_by_date(db: Session, filters: Optional[ReportFilter] = None) -> List[Dict[str, int]]:
   rows = (
-    db.query(Ticket.branch_id, Branch.name, Branch.code, func.count(Ticket.id))
-    .join(Branch, Branch.id == Ticket.branch_id)
-    .group_by(Ticket.branch_id, Branch.name, Branch.code)
+    db.query(TicketDailyRollup.day, _ticket_count)
+    .filter(*(filters or _NO_FILTER).rollup_clauses())
+    .group_by(TicketDailyRollup.day)
+    .having(_ticket_count > 0)
+    .order_by(TicketDailyRollup.day)
     .all()
   )
-  result = [{"branch_id": bid, "branch_name": name, "branch_code": code, "count": cnt} for bid, name, code, cnt in rows]
-  # Also count tickets without branch
-  no_branch_count = db.query(func.count(Ticket.id)).filter(Ticket.branch_id.is_(None)).scalar() or 0
+  return [
+    {"date": d.isoformat() if isinstance(d, date) else str(d), "count": int(c)}
+    for d, c in rows
+  ]
+
+
+def tickets_overview(db: Session, filters: Optional[ReportFilter] = None) -> Dict[str, int]:
+  by_status = tickets_by_status(db, filters)
+  return {"total": sum(by_status.values()), **by_status}
+
+
+def tickets_by_branch(db: Session, filters: Optional[ReportFilter] = None) -> List[Dict[str, any]]:
+  return _branch_breakdown(db, _rollup_counts(db, filters, TicketDailyRollup.branch_id))
+
+
+def _branch_breakdown(db: Session, rows: List[Tuple[int, int]]) -> List[Dict[str, any]]:
+  """Label (branch_id, count) pairs; branch_id 0 is tickets without branch"""
+  names = {
+    b.id: (b.name, b.code)
+    for b in db.query(Branch.id, Branch.name, Branch.code).filter(Branch.id.in_([bid for bid, _ in rows]))
+  }
+  result = [
+    {"branch_id": bid, "branch_name": names[bid][0], "branch_code": names[bid][1], "count": int(cnt)}
+    for bid, cnt in rows
+    if bid in names
+  ]
+  # Also count tickets without branch (stored as branch_id 0)
+  no_branch_count = sum(int(cnt) for bid, cnt in rows if bid == 0)
   if no_branch_count > 0:
     result.append({"branch_id": None, "branch_name": "بدون شعبه", "branch_code": "NONE", "count": no_branch_count})
   return result
 
 
-def average_response_time_hours(db: Session) -> Optional[float]:
+def average_response_time_hours(db: Session, filters: Optional[ReportFilter] = None) -> Optional[float]:
   # response time: created_at -> resolved_at
-  rows = (
-    db.query(func.avg(func.strftime("%s", Ticket.resolved_at) - func.strftime("%s", Ticket.created_at)))
-    .filter(Ticket.resolved_at.isnot(None))
-    .all()
-  )
-  seconds = rows[0][0] if rows and rows[0][0] is not None else None
-  if seconds is None:
+  seconds, resolved = db.query(
+    func.sum(TicketDailyRollup.resolution_seconds_sum),
+    func.sum(TicketDailyRollup.resolved_count),
+  ).filter(*(filters or _NO_FILTER).rollup_clauses()).one()
+  if not resolved:
     return None
-  return float(seconds) / 3600.0
+  return float(seconds) / resolved / 3600.0
 
 
-def tickets_by_priority(db: Session) -> Dict[str, int]:
+def tickets_by_priority(db: Session, filters: Optional[ReportFilter] = None) -> Dict[str, int]:
   """Report tickets by priority"""
-  # بعضی دیتابیس‌ها مقدار enum را به صورت نام (MEDIUM) نگه می‌دارند، برخی به صورت مقدار (medium)
   result: Dict[str, int] = {p.value: 0 for p in TicketPriority}
-  query = text("SELECT priority, COUNT(id) AS cnt FROM tickets GROUP BY priority")
-  rows = db.execute(query).fetchall()
-  for priority_value, count in rows:
-    normalized = str(priority_value or "").lower()
-    if normalized in result:
-      result[normalized] = count
-    else:
-      # fallback برای حالت‌های غیرمنتظره
-      result[priority_value] = count
+  for priority_value, count in _rollup_counts(db, filters, TicketDailyRollup.priority):
+    result[priority_value] = int(count)
   return result
 
 
-def tickets_by_department(db: Session) -> List[Dict[str, any]]:
+def tickets_by_department(db: Session, filters: Optional[ReportFilter] = None) -> List[Dict[str, any]]:
   """Report tickets by department"""
-  rows = (
-    db.query(Ticket.department_id, Department.name, Department.code, func.count(Ticket.id))
-    .join(Department, Department.id == Ticket.department_id)
-    .group_by(Ticket.department_id, Department.name, Department.code)
-    .all()
-  )
-  result = [{"department_id": did, "department_name": name, "department_code": code, "count": cnt} 
-            for did, name, code, cnt in rows]
-  # Also count tickets without department
-  no_dept_count = db.query(func.count(Ticket.id)).filter(Ticket.department_id.is_(None)).scalar() or 0
+  return _department_breakdown(db, _rollup_counts(db, filters, TicketDailyRollup.department_id))
+
+
+def _department_breakdown(db: Session, rows: List[Tuple[int, int]]) -> List[Dict[str, any]]:
+  """Label (department_id, count) pairs; department_id 0 is tickets without department"""
+  names = {
+    d.id: (d.name, d.code)
+    for d in db.query(Department.id, Department.name, Department.code).filter(Department.id.in_([did for did, _ in rows]))
+  }
+  result = [
+    {"department_id": did, "department_name": names[did][0], "department_code": names[did][1], "count": int(cnt)}
+    for did, cnt in rows
+    if did in names
+  ]
+  # Also count tickets without department (stored as department_id 0)
+  no_dept_count = sum(int(cnt) for did, cnt in rows if did == 0)
   if no_dept_count > 0:
     result.append({"department_id": None, "department_name": "بدون دپارتمان", "department_code": "NONE", "count": no_dept_count})
   return result
 
 
-def sla_compliance_report(db: Session) -> Dict[str, any]:
+def _sla_status_columns() -> List:
+  """Conditional-aggregation columns shared by the SLA reports (one pass over sla_logs)"""
+  def count_where(condition, label):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0).label(label)
+
+  return [
+    func.count(SLALog.id).label("total"),
+    count_where(SLALog.response_status == "on_time", "response_on_time"),
+    count_where(SLALog.response_status == "warning", "response_warning"),
+    count_where(SLALog.response_status == "breached", "response_breached"),
+    count_where(SLALog.resolution_status == "on_time", "resolution_on_time"),
+    count_where(SLALog.resolution_status == "warning", "resolution_warning"),
+    count_where(SLALog.resolution_status == "breached", "resolution_breached"),
+    count_where(SLALog.escalated == True, "escalated_count"),
+  ]
+
+
+def _compliance_rate(on_time: int, breached: int) -> float:
+  completed = on_time + breached
+  return round((on_time / completed * 100) if completed > 0 else 0.0, 2)
+
+
+def _sla_group_metrics(row) -> Dict[str, any]:
+  """Metrics of one grouped SLA row, in the shape of sla_by_priority items"""
+  return {
+    "total_tickets": int(row.total),
+    "response_on_time": int(row.response_on_time),
+    "response_warning": int(row.response_warning),
+    "response_breached": int(row.response_breached),
+    "resolution_on_time": int(row.resolution_on_time),
+    "resolution_warning": int(row.resolution_warning),
+    "resolution_breached": int(row.resolution_breached),
+    "escalated_count": int(row.escalated_count),
+    "response_compliance_rate": _compliance_rate(int(row.response_on_time), int(row.response_breached)),
+    "resolution_compliance_rate": _compliance_rate(int(row.resolution_on_time), int(row.resolution_breached)),
+  }
+
+
+def _sla_query(db: Session, filters: Optional[ReportFilter], *columns):
+  """SLA log aggregation, joined to tickets only when a ticket filter applies"""
+  q = db.query(*columns, *_sla_status_columns()).select_from(SLALog)
+  clauses = (filters or _NO_FILTER).ticket_clauses()
+  if clauses:
+    q = q.join(Ticket, Ticket.id == SLALog.ticket_id).filter(*clauses)
+  return q
+
+
+def sla_compliance_report(db: Session, filters: Optional[ReportFilter] = None) -> Dict[str, any]:
   """SLA compliance report"""
-  total_logs = db.query(func.count(SLALog.id)).scalar() or 0
-  
-  if total_logs == 0:
-    return {
-      "total_tickets_with_sla": 0,
-      "response_on_time": 0,
-      "response_warning": 0,
-      "response_breached": 0,
-      "resolution_on_time": 0,
-      "resolution_warning": 0,
-      "resolution_breached": 0,
-      "escalated_count": 0,
-      "response_compliance_rate": 0.0,
-      "resolution_compliance_rate": 0.0
-    }
-  
-  # Response status counts
-  response_on_time = db.query(func.count(SLALog.id)).filter(SLALog.response_status == "on_time").scalar() or 0
-  response_warning = db.query(func.count(SLALog.id)).filter(SLALog.response_status == "warning").scalar() or 0
-  response_breached = db.query(func.count(SLALog.id)).filter(SLALog.response_status == "breached").scalar() or 0
-  
-  # Resolution status counts
-  resolution_on_time = db.query(func.count(SLALog.id)).filter(SLALog.resolution_status == "on_time").scalar() or 0
-  resolution_warning = db.query(func.count(SLALog.id)).filter(SLALog.resolution_status == "warning").scalar() or 0
-  resolution_breached = db.query(func.count(SLALog.id)).filter(SLALog.resolution_status == "breached").scalar() or 0
-  
-  # Escalated count
-  escalated_count = db.query(func.count(SLALog.id)).filter(SLALog.escalated == True).scalar() or 0
-  
-  # Calculate compliance rates
-  response_completed = response_on_time + response_breached
-  resolution_completed = resolution_on_time + resolution_breached
-  
-  response_compliance_rate = (response_on_time / response_completed * 100) if response_completed > 0 else 0.0
-  resolution_compliance_rate = (resolution_on_time / resolution_completed * 100) if resolution_completed > 0 else 0.0
-  
+  row = _sla_query(db, filters).one()
+  metrics = _sla_group_metrics(row)
   return {
-    "total_tickets_with_sla": total_logs,
-    "response_on_time": response_on_time,
-    "response_warning": response_warning,
-    "response_breached": response_breached,
-    "resolution_on_time": resolution_on_time,
-    "resolution_warning": resolution_warning,
-    "resolution_breached": resolution_breached,
-    "escalated_count": escalated_count,
-    "response_compliance_rate": round(response_compliance_rate, 2),
-    "resolution_compliance_rate": round(resolution_compliance_rate, 2)
+    "total_tickets_with_sla": metrics["total_tickets"],
+    "response_on_time": metrics["response_on_time"],
+    "response_warning": metrics["response_warning"],
+    "response_breached": metrics["response_breached"],
+    "resolution_on_time": metrics["resolution_on_time"],
+    "resolution_warning": metrics["resolution_warning"],
+    "resolution_breached": metrics["resolution_breached"],
+    "escalated_count": metrics["escalated_count"],
+    "response_compliance_rate": metrics["response_compliance_rate"],
+    "resolution_compliance_rate": metrics["resolution_compliance_rate"]
   }
 
 
-def sla_by_priority(db: Session) -> List[Dict[str, any]]:
-  """SLA compliance report by priority"""
-  result = []
-  
-  for priority in TicketPriority:
-    # Get SLA rule for this priority
-    sla_rule = db.query(SLARule).filter(
-      SLARule.priority == priority,
-      SLARule.is_active == True
-    ).first()
-    
-    if not sla_rule:
-      continue
-    
-    # Get tickets with this priority and their SLA logs
-    tickets_with_sla = (
-      db.query(Ticket, SLALog)
-      .join(SLALog, SLALog.ticket_id == Ticket.id)
-      .filter(
-        Ticket.priority == priority,
-        SLALog.sla_rule_id == sla_rule.id
-      )
-      .all()
+def sla_by_priority(db: Session, filters: Optional[ReportFilter] = None) -> List[Dict[str, any]]:
+  """SLA compliance report by priority (tickets under an active SLA rule)"""
+  rows = (
+    db.query(Ticket.priority, *_sla_status_columns())
+    .select_from(SLALog)
+    .join(Ticket, Ticket.id == SLALog.ticket_id)
+    .filter(*(filters or _NO_FILTER).ticket_clauses())
+    .join(SLARule, SLARule.id == SLALog.sla_rule_id)
+    .filter(SLARule.is_active == True)
+    .group_by(Ticket.priority)
+    .all()
+  )
+  by_priority = {row.priority: row for row in rows}
+  return [
+    {"priority": priority.value, **_sla_group_metrics(by_priority[priority])}
+    for priority in TicketPriority
+    if priority in by_priority
+  ]
+
+
+def sla_by_department(db: Session, filters: Optional[ReportFilter] = None) -> List[Dict[str, any]]:
+  """SLA compliance report by ticket department"""
+  rows = (
+    db.query(Ticket.department_id, Department.name, Department.code, *_sla_status_columns())
+    .select_from(SLALog)
+    .join(Ticket, Ticket.id == SLALog.ticket_id)
+    .filter(*(filters or _NO_FILTER).ticket_clauses())
+    .outerjoin(Department, Department.id == Ticket.department_id)
+    .group_by(Ticket.department_id, Department.name, Department.code)
+    .order_by(Ticket.department_id)
+    .all()
+  )
+  return [
+    {
+      "department_id": row.department_id,
+      "department_name": row.name if row.department_id is not None else "بدون دپارتمان",
+      "department_code": row.code if row.department_id is not None else "NONE",
+      **_sla_group_metrics(row),
+    }
+    for row in rows
+  ]
+
+
+def sla_by_branch(db: Session, filters: Optional[ReportFilter] = None) -> List[Dict[str, any]]:
+  """SLA compliance report by ticket branch"""
+  rows = (
+    db.query(Ticket.branch_id, Branch.name, Branch.code, *_sla_status_columns())
+    .select_from(SLALog)
+    .join(Ticket, Ticket.id == SLALog.ticket_id)
+    .filter(*(filters or _NO_FILTER).ticket_clauses())
+    .outerjoin(Branch, Branch.id == Ticket.branch_id)
+    .group_by(Ticket.branch_id, Branch.name, Branch.code)
+    .order_by(Ticket.branch_id)
+    .all()
+  )
+  return [
+    {
+      "branch_id": row.branch_id,
+      "branch_name": row.name if row.branch_id is not None else "بدون شعبه",
+      "branch_code": row.code if row.branch_id is not None else "NONE",
+      **_sla_group_metrics(row),
+    }
+    for row in rows
+  ]
+
+
+def sla_by_rule(db: Session, filters: Optional[ReportFilter] = None) -> List[Dict[str, any]]:
+  """SLA compliance report by SLA rule"""
+  rows = (
+    _sla_query(db, filters, SLARule.id, SLARule.name, SLARule.is_active)
+    .join(SLARule, SLARule.id == SLALog.sla_rule_id)
+    .group_by(SLARule.id, SLARule.name, SLARule.is_active)
+    .order_by(SLARule.id)
+    .all()
+  )
+  return [
+    {"sla_rule_id": row.id, "sla_rule_name": row.name, "is_active": row.is_active, **_sla_group_metrics(row)}
+    for row in rows
+  ]
+
+
+def dashboard_kpis(db: Session, filters: Optional[ReportFilter] = None) -> Dict[str, any]:
+  """
+  All dashboard KPIs in one payload, as plain (picklable) data
+
+  Serves GET /api/reports/dashboard, the PDF/XLSX report jobs and the
+  Telegram daily report. The status, priority, branch and department
+  breakdowns and the average resolution time come from one grouped rollup
+  query; the daily series, SLA summary and branch/department labels take
+  one statement each. Values match the individual report functions.
+
+  Args:
+    db: Database session
+    filters: Report filters, applied to every breakdown
+
+  Returns:
+    Dict with overview, by_status, by_date, by_branch, by_priority,
+    by_department, sla, response_time_hours and generated_at
+  """
+  rows = (
+    db.query(
+      TicketDailyRollup.status,
+      TicketDailyRollup.priority,
+      TicketDailyRollup.branch_id,
+      TicketDailyRollup.department_id,
+      _ticket_count,
+      func.sum(TicketDailyRollup.resolved_count),
+      func.sum(TicketDailyRollup.resolution_seconds_sum),
     )
-    
-    total = len(tickets_with_sla)
-    if total == 0:
-      continue
-    
-    response_on_time = sum(1 for t, log in tickets_with_sla if log.response_status == "on_time")
-    response_breached = sum(1 for t, log in tickets_with_sla if log.response_status == "breached")
-    resolution_on_time = sum(1 for t, log in tickets_with_sla if log.resolution_status == "on_time")
-    resolution_breached = sum(1 for t, log in tickets_with_sla if log.resolution_status == "breached")
-    
-    response_completed = response_on_time + response_breached
-    resolution_completed = resolution_on_time + resolution_breached
-    
-    result.append({
-      "priority": priority.value,
-      "total_tickets": total,
-      "response_on_time": response_on_time,
-      "response_breached": response_breached,
-      "resolution_on_time": resolution_on_time,
-      "resolution_breached": resolution_breached,
-      "response_compliance_rate": round((response_on_time / response_completed * 100) if response_completed > 0 else 0.0, 2),
-      "resolution_compliance_rate": round((resolution_on_time / resolution_completed * 100) if resolution_completed > 0 else 0.0, 2)
-    })
-  
-  return result
+    .filter(*(filters or _NO_FILTER).rollup_clauses())
+    .group_by(
+      TicketDailyRollup.status,
+      TicketDailyRollup.priority,
+      TicketDailyRollup.branch_id,
+      TicketDailyRollup.department_id,
+    )
+    .all()
+  )
+
+  by_status: Dict[str, int] = {}
+  by_priority: Dict[str, int] = {p.value: 0 for p in TicketPriority}
+  branch_counts: Dict[int, int] = {}
+  department_counts: Dict[int, int] = {}
+  resolved = 0
+  seconds = 0.0
+  for status_value, priority_value, branch_id, department_id, count, resolved_count, resolution_seconds in rows:
+    count = int(count or 0)
+    by_status[status_value] = by_status.get(status_value, 0) + count
+    by_priority[priority_value] = by_priority.get(priority_value, 0) + count
+    branch_counts[branch_id] = branch_counts.get(branch_id, 0) + count
+    department_counts[department_id] = department_counts.get(department_id, 0) + count
+    resolved += int(resolved_count or 0)
+    seconds += float(resolution_seconds or 0)
 
+  # Same shape as the HAVING sum > 0 of the single reports
+  by_status = {key: by_status[key] for key in sorted(by_status) if by_status[key] > 0}
+  return {
+    "overview": {"total": sum(by_status.values()), **by_status},
+    "by_status": by_status,
+    "by_date": tickets_by_date(db, filters),
+    "by_branch": _branch_breakdown(db, sorted((k, v) for k, v in branch_counts.items() if v > 0)),
+    "by_priority": by_priority,
+    "by_department": _department_breakdown(db, sorted((k, v) for k, v in department_counts.items() if v > 0)),
+    "sla": sla_compliance_report(db, filters),
+    "response_time_hours": seconds / resolved / 3600.0 if resolved else None,
+    "generated_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+  }
@@ -0,0 +1,146 @@
+"""
+Scheduler leases (one process runs each background job)
+
+Every worker process starts the background schedulers, but a job only runs
+in the process holding its row in scheduler_leases. A lease is taken with a
+conditional UPDATE (the row is free, expired or already ours), or an INSERT
+the first time a job runs, so exactly one process wins on SQLite and
+PostgreSQL alike. The holder renews the lease every
+SCHEDULER_HEARTBEAT_SECONDS; when a process dies its leases expire after
+SCHEDULER_LEASE_SECONDS and another process takes them over.
+"""
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import case, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.timeutils import naive_utc
+from app.models import SchedulerLease
+
+logger = logging.getLogger(__name__)
+
+# Identity of this process in scheduler_leases.holder
+PROCESS_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# Jobs started by app.main, in the order the admin endpoint lists them
+SCHEDULER_JOBS = ("automation", "sla", "daily_report", "telegram_session_cleanup")
+
+RUN_OK = "ok"
+RUN_ERROR = "error"
+
+
+def acquire_lease(db: Session, name: str, holder: str = PROCESS_ID, now: Optional[datetime] = None) -> bool:
+    """
+    Take or renew the lease on a job
+
+    Args:
+        db: Database session (committed)
+        name: Job name
+        holder: Process taking the lease
+        now: Current UTC time
+
+    Returns:
+        True if ``holder`` holds the lease until now + SCHEDULER_LEASE_SECONDS
+    """
+    now = now or datetime.utcnow()
+    expires_at = now + timedelta(seconds=settings.SCHEDULER_LEASE_SECONDS)
+    result = db.execute(
+        update(SchedulerLease)
+        .where(
+            SchedulerLease.name == name,
+            or_(
+                SchedulerLease.holder == holder,
+                SchedulerLease.holder.is_(None),
+                SchedulerLease.expires_at <= now,
+            ),
+        )
+        .values(
+            holder=holder,
+            acquired_at=case((SchedulerLease.holder == holder, SchedulerLease.acquired_at), else_=now),
+            heartbeat_at=now,
+            expires_at=expires_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        db.commit()
+        return True
+
+    if db.get(SchedulerLease, name) is not None:
+        # Held by another live process
+        db.rollback()
+        return False
+    db.add(SchedulerLease(name=name, holder=holder, acquired_at=now, heartbeat_at=now, expires_at=expires_at))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another process inserted it first
+        db.rollback()
+        return False
+    return True
+
+
+def release_lease(db: Session, name: str, holder: str = PROCESS_ID) -> bool:
+    """
+    Give up a lease so another process can take it over right away
+
+    Returns:
+        True if ``holder`` held it
+    """
+    result = db.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == name, SchedulerLease.holder == holder)
+        .values(holder=None, expires_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return bool(result.rowcount)
+
+
+def record_lease_run(
+    db: Session,
+    name: str,
+    started_at: datetime,
+    error: Optional[str] = None,
+    holder: str = PROCESS_ID,
+) -> None:
+    """Record the last run of a job (finished now, failed if ``error`` is set)"""
+    db.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == name)
+        .values(
+            last_run_holder=holder,
+            last_run_started_at=started_at,
+            last_run_finished_at=datetime.utcnow(),
+            last_run_status=RUN_ERROR if error else RUN_OK,
+            last_run_error=error,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def last_run_started_at(db: Session, name: str) -> Optional[datetime]:
+    """Start (naive UTC) of the last recorded run of a job, whichever process did it"""
+    return naive_utc(db.query(SchedulerLease.last_run_started_at).filter(SchedulerLease.name == name).scalar())
+
+
+def list_leases(db: Session) -> List[SchedulerLease]:
+    """Leases of the known jobs (unsaved placeholders for jobs that never ran) followed by any others"""
+    leases = {lease.name: lease for lease in db.query(SchedulerLease).order_by(SchedulerLease.name)}
+    known = [leases.pop(name, None) or SchedulerLease(name=name) for name in SCHEDULER_JOBS]
+    return known + list(leases.values())
+
+
+def lease_is_active(lease: SchedulerLease, now: Optional[datetime] = None) -> bool:
+    """Whether a process currently holds the lease"""
+    if lease.holder is None or lease.expires_at is None:
+        return False
+    return naive_utc(lease.expires_at) > (now or datetime.utcnow())
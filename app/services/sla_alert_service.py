@@ -1,23 +1,108 @@
 """
 SLA Alert Service - بررسی و ارسال هشدارهای SLA
+
+A sweep (full scan or the due logs) runs in three phases:
+
+1. evaluate: logs are loaded in chunks and the transitions of each one
+   (response/resolution warning or breach, escalation) are computed in memory;
+2. persist: a chunk's transitions are written with one bulk UPDATE by
+   primary key and committed before anything is sent, so an alert is sent
+   at most once (a chunk that fails to commit sends nothing and stays due);
+3. notify: the alerts of the sweep are grouped per recipient (Telegram chat
+   or email address), one message listing all of its tickets, and delivered
+   concurrently by SLA_NOTIFICATION_WORKERS workers.
+
+The stats of a sweep include the time spent in each phase.
 """
+import asyncio
+import functools
 import logging
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import update
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.models import SLALog, Ticket, User, SLARule
-from app.core.enums import TicketStatus, UserRole
+from app.config import settings
+from app.models import SLALog, Ticket, User
+from app.core.concurrency import run_blocking
+from app.core.enums import Language, TicketPriority, TicketStatus, UserRole
+from app.services.email_service import email_service
 from app.services.notification_service import (
+    send_telegram_notification_to_group,
     send_telegram_notification_to_user,
-    send_telegram_notification_to_role,
-    notify_admin_group,
 )
-import asyncio
 
 logger = logging.getLogger(__name__)
 
+# SLA logs loaded, evaluated and persisted per chunk
+_DUE_BATCH_SIZE = 500
+
+# Alerts listed per Telegram message (messages are limited to 4096 characters)
+_DIGEST_SIZE = 20
+
+RESPONSE_WARNING = "response_warning"
+RESPONSE_BREACH = "response_breach"
+RESOLUTION_WARNING = "resolution_warning"
+RESOLUTION_BREACH = "resolution_breach"
+ESCALATION = "escalation"
+
+_STAT_BY_KIND = {
+    RESPONSE_WARNING: "warnings_sent",
+    RESOLUTION_WARNING: "warnings_sent",
+    RESPONSE_BREACH: "breaches_sent",
+    RESOLUTION_BREACH: "breaches_sent",
+    ESCALATION: "escalations_sent",
+}
+
+_ALERT_LABELS = {
+    RESPONSE_WARNING: ("⚠️", "هشدار زمان پاسخ"),
+    RESPONSE_BREACH: ("🔴", "نقض زمان پاسخ"),
+    RESOLUTION_WARNING: ("⚠️", "هشدار زمان حل"),
+    RESOLUTION_BREACH: ("🔴", "نقض زمان حل"),
+    ESCALATION: ("📈", "Escalation"),
+}
+
+
+@dataclass(frozen=True)
+class AlertRecipient:
+    """Contact details of a user receiving SLA alerts"""
+    user_id: int
+    telegram_chat_id: Optional[str]
+    email: Optional[str]
+    language: Language
+
+    @classmethod
+    def from_user(cls, user: User) -> "AlertRecipient":
+        return cls(
+            user_id=user.id,
+            telegram_chat_id=user.telegram_chat_id,
+            email=user.email,
+            language=user.language or Language.FA,
+        )
+
+
+@dataclass(frozen=True)
+class SLAAlert:
+    """
+    An SLA transition to notify, with everything the messages need
+
+    ``deadline`` is the missed or upcoming target (the escalation time for
+    escalations) and ``minutes`` how far it was from the check time.
+    """
+    kind: str
+    sla_log_id: int
+    ticket_id: int
+    ticket_number: str
+    ticket_title: str
+    priority: Optional[TicketPriority]
+    deadline: datetime
+    minutes: int
+    assignee: Optional[AlertRecipient]
+
 
 def _get_priority_label(priority) -> str:
     """Get priority label in Persian"""
@@ -27,7 +112,7 @@ def _get_priority_label(priority) -> str:
         priority_value = priority.value
     else:
         priority_value = str(priority)
-    
+
     priority_map = {
         "critical": "🔴 بحرانی",
         "high": "🟠 بالا",
@@ -37,613 +122,387 @@ def _get_priority_label(priority) -> str:
     return priority_map.get(priority_value.lower(), priority_value)
 
 
-async def check_sla_warnings_and_breaches(db: Session) -> Dict[str, Any]:
-    """
-    بررسی تیکت‌ها برای هشدارها و نقض‌های SLA
-    و ارسال اعلان‌های لازم
-    
-    Returns:
-        Dict با آمار بررسی شده
-    """
-    now = datetime.utcnow()
-    stats = {
+def _format_minutes(minutes: int) -> str:
+    if minutes >= 60:
+        return f"{minutes // 60} ساعت و {minutes % 60} دقیقه"
+    return f"{minutes} دقیقه"
+
+
+def _active_sla_logs(db: Session, log_ids: Optional[List[int]] = None) -> List[SLALog]:
+    """SLA logs of open tickets (all, or the given ids), with everything the notifications read loaded up front"""
+    query = (
+        db.query(SLALog)
+        .join(Ticket)
+        .options(
+            joinedload(SLALog.ticket).joinedload(Ticket.assigned_to),
+            joinedload(SLALog.sla_rule),
+        )
+        .filter(
+            Ticket.status.in_([TicketStatus.PENDING, TicketStatus.IN_PROGRESS])
+        )
+    )
+    if log_ids is not None:
+        query = query.filter(SLALog.id.in_(log_ids))
+    return query.all()
+
+
+def _admin_recipients(db: Session) -> List[AlertRecipient]:
+    users = db.query(User).filter(
+        User.role.in_([UserRole.ADMIN, UserRole.CENTRAL_ADMIN]),
+        User.is_active == True,
+    ).order_by(User.id).all()
+    return [AlertRecipient.from_user(user) for user in users if user.telegram_chat_id or user.email]
+
+
+def _new_stats() -> Dict[str, Any]:
+    return {
         "checked": 0,
         "warnings_sent": 0,
         "breaches_sent": 0,
         "escalations_sent": 0,
-        "errors": 0
+        "errors": 0,
+        "messages_sent": 0,
+        "message_errors": 0,
+        "timings_ms": {"load": 0.0, "evaluate": 0.0, "persist": 0.0, "notify": 0.0},
     }
-    
-    try:
-        # دریافت تمام SLA Logs فعال که هنوز حل نشده‌اند
-        active_tickets_query = db.query(Ticket).filter(
-            Ticket.status.in_([TicketStatus.PENDING, TicketStatus.IN_PROGRESS])
-        )
-        
-        sla_logs = (
-            db.query(SLALog)
-            .join(Ticket)
-            .options(joinedload(SLALog.ticket), joinedload(SLALog.sla_rule))
-            .filter(
-                Ticket.status.in_([TicketStatus.PENDING, TicketStatus.IN_PROGRESS])
-            )
-            .all()
+
+
+def _add_timing(stats: Dict[str, Any], phase: str, started: float) -> None:
+    stats["timings_ms"][phase] = round(stats["timings_ms"][phase] + (time.perf_counter() - started) * 1000, 1)
+
+
+def evaluate_sla_log(sla_log: SLALog, now: datetime) -> Tuple[Dict[str, Any], List[SLAAlert]]:
+    """
+    Transitions of one log at ``now``
+
+    Args:
+        sla_log: SLA log with its ticket (and assignee) and rule loaded
+        now: Check time (UTC)
+
+    Returns:
+        Tuple of (changed SLALog columns, alerts to send)
+    """
+    ticket = sla_log.ticket
+    sla_rule = sla_log.sla_rule
+    changes: Dict[str, Any] = {}
+    kinds: List[Tuple[str, datetime]] = []
+    if not ticket or not sla_rule:
+        return changes, []
+
+    # بررسی وضعیت پاسخ (تا زمانی که پاسخی داده نشده)
+    if not ticket.first_response_at:
+        target = sla_log.target_response_time
+        warning_time = target - timedelta(minutes=sla_rule.response_warning_minutes)
+        if warning_time <= now < target and sla_log.response_status != "warning":
+            changes["response_status"] = "warning"
+            kinds.append((RESPONSE_WARNING, target))
+        elif now >= target and sla_log.response_status != "breached":
+            changes["response_status"] = "breached"
+            kinds.append((RESPONSE_BREACH, target))
+
+    # بررسی وضعیت حل
+    if not (ticket.resolved_at or ticket.closed_at):
+        target = sla_log.target_resolution_time
+        warning_time = target - timedelta(minutes=sla_rule.resolution_warning_minutes)
+        if warning_time <= now < target and sla_log.resolution_status != "warning":
+            changes["resolution_status"] = "warning"
+            kinds.append((RESOLUTION_WARNING, target))
+        elif now >= target and sla_log.resolution_status != "breached":
+            changes["resolution_status"] = "breached"
+            kinds.append((RESOLUTION_BREACH, target))
+
+    # بررسی Escalation
+    if sla_rule.escalation_enabled and sla_rule.escalation_after_minutes and not sla_log.escalated:
+        escalation_time = ticket.created_at + timedelta(minutes=sla_rule.escalation_after_minutes)
+        if now >= escalation_time:
+            changes["escalated"] = True
+            changes["escalated_at"] = now
+            kinds.append((ESCALATION, now))
+
+    assignee = AlertRecipient.from_user(ticket.assigned_to) if ticket.assigned_to else None
+    alerts = [
+        SLAAlert(
+            kind=kind,
+            sla_log_id=sla_log.id,
+            ticket_id=ticket.id,
+            ticket_number=ticket.ticket_number,
+            ticket_title=ticket.title,
+            priority=sla_rule.priority,
+            deadline=deadline,
+            minutes=int(abs((deadline - now).total_seconds()) / 60),
+            assignee=assignee,
         )
-        
-        stats["checked"] = len(sla_logs)
-        
-        for sla_log in sla_logs:
-            try:
-                ticket = sla_log.ticket
-                sla_rule = sla_log.sla_rule
-                
-                if not ticket or not sla_rule:
+        for kind, deadline in kinds
+    ]
+    return changes, alerts
+
+
+def _persist_transitions(db: Session, transitions: List[Tuple[SLALog, Dict[str, Any]]]) -> None:
+    """Write the transitions of a chunk (UPDATE by primary key, batched per set of columns) and commit"""
+    db.execute(update(SLALog), [{"id": sla_log.id, **changes} for sla_log, changes in transitions])
+    db.commit()
+    for sla_log, changes in transitions:
+        # Sessions kept across sweeps (expire_on_commit=False) must not see the old statuses
+        for key, value in changes.items():
+            set_committed_value(sla_log, key, value)
+
+
+async def _sweep(db: Session, log_ids: Optional[List[int]], now: datetime) -> Dict[str, Any]:
+    stats = _new_stats()
+    alerts: List[SLAAlert] = []
+
+    if log_ids is None:
+        chunks: List[Optional[List[int]]] = [None]
+    else:
+        chunks = [log_ids[start:start + _DUE_BATCH_SIZE] for start in range(0, len(log_ids), _DUE_BATCH_SIZE)]
+    for chunk in chunks:
+        started = time.perf_counter()
+        sla_logs = await run_blocking(_active_sla_logs, db, chunk)
+        _add_timing(stats, "load", started)
+        stats["checked"] += len(sla_logs)
+
+        for start in range(0, len(sla_logs), _DUE_BATCH_SIZE):
+            started = time.perf_counter()
+            transitions = []
+            chunk_alerts: List[SLAAlert] = []
+            for sla_log in sla_logs[start:start + _DUE_BATCH_SIZE]:
+                try:
+                    changes, log_alerts = evaluate_sla_log(sla_log, now)
+                except Exception as e:
+                    logger.error(f"Error checking SLA for ticket {sla_log.ticket_id}: {e}", exc_info=True)
+                    stats["errors"] += 1
                     continue
-                
-                # بررسی وضعیت پاسخ
-                response_warning_sent = await _check_response_warning(db, sla_log, ticket, sla_rule, now)
-                if response_warning_sent:
-                    stats["warnings_sent"] += 1
-                
-                response_breach_sent = await _check_response_breach(db, sla_log, ticket, sla_rule, now)
-                if response_breach_sent:
-                    stats["breaches_sent"] += 1
-                
-                # بررسی وضعیت حل
-                resolution_warning_sent = await _check_resolution_warning(db, sla_log, ticket, sla_rule, now)
-                if resolution_warning_sent:
-                    stats["warnings_sent"] += 1
-                
-                resolution_breach_sent = await _check_resolution_breach(db, sla_log, ticket, sla_rule, now)
-                if resolution_breach_sent:
-                    stats["breaches_sent"] += 1
-                
-                # بررسی Escalation
-                escalation_sent = await _check_escalation(db, sla_log, ticket, sla_rule, now)
-                if escalation_sent:
-                    stats["escalations_sent"] += 1
-                
+                if changes:
+                    transitions.append((sla_log, changes))
+                    chunk_alerts.extend(log_alerts)
+            _add_timing(stats, "evaluate", started)
+            if not transitions:
+                continue
+
+            started = time.perf_counter()
+            try:
+                await run_blocking(_persist_transitions, db, transitions)
             except Exception as e:
-                logger.error(f"Error checking SLA for ticket {sla_log.ticket_id}: {e}", exc_info=True)
-                stats["errors"] += 1
-        
+                logger.error(f"Error saving {len(transitions)} SLA transitions: {e}", exc_info=True)
+                await run_blocking(db.rollback)
+                stats["errors"] += len(transitions)
+            else:
+                alerts.extend(chunk_alerts)
+            _add_timing(stats, "persist", started)
+
+    for alert in alerts:
+        stats[_STAT_BY_KIND[alert.kind]] += 1
+    if alerts:
+        started = time.perf_counter()
+        delivered = await dispatch_sla_alerts(db, alerts)
+        stats["messages_sent"] = delivered["sent"]
+        stats["message_errors"] = delivered["failed"]
+        _add_timing(stats, "notify", started)
+    return stats
+
+
+async def check_sla_warnings_and_breaches(db: Session) -> Dict[str, Any]:
+    """
+    بررسی تیکت‌ها برای هشدارها و نقض‌های SLA
+    و ارسال اعلان‌های لازم
+
+    Full scan of every open ticket; the SLA task only checks the logs whose
+    deadline is due (check_due_sla_logs).
+
+    Returns:
+        Dict با آمار بررسی شده
+    """
+    try:
+        stats = await _sweep(db, None, datetime.utcnow())
         logger.info(f"SLA check completed: {stats}")
         return stats
-        
+
     except Exception as e:
         logger.error(f"Error in check_sla_warnings_and_breaches: {e}", exc_info=True)
+        stats = _new_stats()
         stats["errors"] += 1
         return stats
 
 
-async def _check_response_warning(
-    db: Session,
-    sla_log: SLALog,
-    ticket: Ticket,
-    sla_rule: SLARule,
-    now: datetime
-) -> bool:
-    """
-    بررسی هشدار برای زمان پاسخ
-    Returns True if warning was sent
-    """
-    # اگر قبلاً پاسخ داده شده، نیازی به بررسی نیست
-    if ticket.first_response_at:
-        return False
-    
-    # محاسبه زمان هشدار
-    warning_time = sla_log.target_response_time - timedelta(minutes=sla_rule.response_warning_minutes)
-    
-    # بررسی اینکه آیا در منطقه هشدار هستیم
-    if warning_time <= now < sla_log.target_response_time:
-        # بررسی اینکه آیا قبلاً هشدار ارسال شده (برای جلوگیری از ارسال مکرر)
-        # می‌توانیم از response_status استفاده کنیم
-        if sla_log.response_status != "warning":
-            # به‌روزرسانی وضعیت
-            sla_log.response_status = "warning"
-            db.commit()
-            
-            # ارسال اعلان
-            await _send_response_warning_notification(ticket, sla_log, sla_rule)
-            return True
-    
-    return False
-
-
-async def _check_response_breach(
-    db: Session,
-    sla_log: SLALog,
-    ticket: Ticket,
-    sla_rule: SLARule,
-    now: datetime
-) -> bool:
-    """
-    بررسی نقض برای زمان پاسخ
-    Returns True if breach notification was sent
+async def check_due_sla_logs(db: Session, log_ids: List[int], now: Optional[datetime] = None) -> Dict[str, Any]:
     """
-    # اگر قبلاً پاسخ داده شده، نیازی به بررسی نیست
-    if ticket.first_response_at:
-        return False
-    
-    # بررسی اینکه آیا مهلت گذشته است
-    if now >= sla_log.target_response_time:
-        # بررسی اینکه آیا قبلاً نقض ثبت شده
-        if sla_log.response_status != "breached":
-            # به‌روزرسانی وضعیت
-            sla_log.response_status = "breached"
-            db.commit()
-            
-            # ارسال اعلان
-            await _send_response_breach_notification(ticket, sla_log, sla_rule)
-            return True
-    
-    return False
-
-
-async def _check_resolution_warning(
-    db: Session,
-    sla_log: SLALog,
-    ticket: Ticket,
-    sla_rule: SLARule,
-    now: datetime
-) -> bool:
-    """
-    بررسی هشدار برای زمان حل
-    Returns True if warning was sent
-    """
-    # اگر قبلاً حل شده، نیازی به بررسی نیست
-    if ticket.resolved_at or ticket.closed_at:
-        return False
-    
-    # محاسبه زمان هشدار
-    warning_time = sla_log.target_resolution_time - timedelta(minutes=sla_rule.resolution_warning_minutes)
-    
-    # بررسی اینکه آیا در منطقه هشدار هستیم
-    if warning_time <= now < sla_log.target_resolution_time:
-        # بررسی اینکه آیا قبلاً هشدار ارسال شده
-        if sla_log.resolution_status != "warning":
-            # به‌روزرسانی وضعیت
-            sla_log.resolution_status = "warning"
-            db.commit()
-            
-            # ارسال اعلان
-            await _send_resolution_warning_notification(ticket, sla_log, sla_rule)
-            return True
-    
-    return False
-
-
-async def _check_resolution_breach(
-    db: Session,
-    sla_log: SLALog,
-    ticket: Ticket,
-    sla_rule: SLARule,
-    now: datetime
-) -> bool:
-    """
-    بررسی نقض برای زمان حل
-    Returns True if breach notification was sent
-    """
-    # اگر قبلاً حل شده، نیازی به بررسی نیست
-    if ticket.resolved_at or ticket.closed_at:
-        return False
-    
-    # بررسی اینکه آیا مهلت گذشته است
-    if now >= sla_log.target_resolution_time:
-        # بررسی اینکه آیا قبلاً نقض ثبت شده
-        if sla_log.resolution_status != "breached":
-            # به‌روزرسانی وضعیت
-            sla_log.resolution_status = "breached"
-            db.commit()
-            
-            # ارسال اعلان
-            await _send_resolution_breach_notification(ticket, sla_log, sla_rule)
-            return True
-    
-    return False
-
-
-async def _check_escalation(
-    db: Session,
-    sla_log: SLALog,
-    ticket: Ticket,
-    sla_rule: SLARule,
-    now: datetime
-) -> bool:
-    """
-    بررسی نیاز به Escalation
-    Returns True if escalation was sent
-    """
-    # بررسی اینکه آیا Escalation فعال است
-    if not sla_rule.escalation_enabled or not sla_rule.escalation_after_minutes:
-        return False
-    
-    # بررسی اینکه آیا قبلاً Escalation انجام شده
-    if sla_log.escalated:
-        return False
-    
-    # محاسبه زمان Escalation
-    escalation_time = ticket.created_at + timedelta(minutes=sla_rule.escalation_after_minutes)
-    
-    # بررسی اینکه آیا زمان Escalation رسیده است
-    if now >= escalation_time:
-        # به‌روزرسانی وضعیت
-        sla_log.escalated = True
-        sla_log.escalated_at = now
-        db.commit()
-        
-        # ارسال اعلان Escalation
-        await _send_escalation_notification(ticket, sla_log, sla_rule)
-        return True
-    
-    return False
-
-
-async def _send_response_warning_notification(ticket: Ticket, sla_log: SLALog, sla_rule: SLARule):
-    """
-    ارسال اعلان هشدار برای زمان پاسخ
-    Send response time warning notification
+    Run the SLA checks of the given logs only (those whose deadline passed)
+
+    Logs that are gone or whose ticket was closed meanwhile are skipped.
+
+    Args:
+        db: Database session
+        log_ids: SLA log IDs
+        now: Current UTC time
+
+    Returns:
+        Dict with the same counters as check_sla_warnings_and_breaches
     """
     try:
-        from app.services.email_service import email_service
-        from app.core.enums import Language
-        from app.i18n.translator import translate
-        
-        # محاسبه زمان باقی‌مانده
-        remaining_minutes = int((sla_log.target_response_time - datetime.utcnow()).total_seconds() / 60)
-        remaining_time = f"{remaining_minutes} دقیقه"
-        if remaining_minutes >= 60:
-            hours = remaining_minutes // 60
-            mins = remaining_minutes % 60
-            remaining_time = f"{hours} ساعت و {mins} دقیقه"
-        
-        message = (
-            f"⚠️ <b>هشدار SLA - زمان پاسخ</b>\n\n"
-            f"🔹 تیکت: <b>{ticket.ticket_number}</b>\n"
-            f"📌 عنوان: {ticket.title}\n"
-            f"🚨 اولویت: {_get_priority_label(sla_rule.priority)}\n"
-            f"⏰ زمان باقی‌مانده: {remaining_time}\n"
-            f"📅 مهلت پاسخ: {sla_log.target_response_time.strftime('%Y-%m-%d %H:%M')}\n\n"
-            f"لطفاً در اسرع وقت به این تیکت پاسخ دهید."
-        )
-        
-        # ارسال به کارشناس مسئول
-        if ticket.assigned_to:
-            if ticket.assigned_to.telegram_chat_id:
-                await send_telegram_notification_to_user(ticket.assigned_to.telegram_chat_id, message)
-            
-            # ارسال ایمیل
-            if ticket.assigned_to.email:
-                try:
-                    lang = ticket.assigned_to.language if hasattr(ticket.assigned_to, 'language') else Language.FA
-                    await email_service.send_sla_warning_email(
-                        to_email=ticket.assigned_to.email,
-                        ticket_number=ticket.ticket_number,
-                        ticket_title=ticket.title,
-                        warning_type='response',
-                        remaining_time=remaining_time,
-                        language=lang
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to send email SLA warning to assigned user {ticket.assigned_to.id}: {e}")
-        
-        # ارسال به مدیران
-        from app.database import SessionLocal
-        db = SessionLocal()
-        try:
-            await send_telegram_notification_to_role(db, UserRole.ADMIN, message)
-            await send_telegram_notification_to_role(db, UserRole.CENTRAL_ADMIN, message)
-            
-            # ارسال ایمیل به مدیران
-            from app.models import User
-            admins = db.query(User).filter(
-                User.role.in_([UserRole.ADMIN, UserRole.CENTRAL_ADMIN]),
-                User.is_active == True,
-                User.email.isnot(None)
-            ).all()
-            
-            for admin in admins:
-                try:
-                    lang = admin.language if hasattr(admin, 'language') else Language.FA
-                    await email_service.send_sla_warning_email(
-                        to_email=admin.email,
-                        ticket_number=ticket.ticket_number,
-                        ticket_title=ticket.title,
-                        warning_type='response',
-                        remaining_time=remaining_time,
-                        language=lang
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to send email SLA warning to admin {admin.id}: {e}")
-        finally:
-            db.close()
-        
-        await notify_admin_group(message)
-        logger.info(f"Response warning sent for ticket {ticket.ticket_number}")
-        
+        return await _sweep(db, list(log_ids), now or datetime.utcnow())
+
     except Exception as e:
-        logger.error(f"Error sending response warning notification: {e}", exc_info=True)
+        logger.error(f"Error in check_due_sla_logs: {e}", exc_info=True)
+        stats = _new_stats()
+        stats["errors"] += 1
+        return stats
 
 
-async def _send_response_breach_notification(ticket: Ticket, sla_log: SLALog, sla_rule: SLARule):
-    """
-    ارسال اعلان نقض برای زمان پاسخ
-    Send response time breach notification
-    """
-    try:
-        from app.services.email_service import email_service
-        from app.core.enums import Language
-        
-        # محاسبه زمان تاخیر
-        delay_minutes = int((datetime.utcnow() - sla_log.target_response_time).total_seconds() / 60)
-        delay_time = f"{delay_minutes} دقیقه"
-        if delay_minutes >= 60:
-            hours = delay_minutes // 60
-            mins = delay_minutes % 60
-            delay_time = f"{hours} ساعت و {mins} دقیقه"
-        
-        message = (
-            f"🔴 <b>نقض SLA - زمان پاسخ</b>\n\n"
-            f"🔹 تیکت: <b>{ticket.ticket_number}</b>\n"
-            f"📌 عنوان: {ticket.title}\n"
-            f"🚨 اولویت: {_get_priority_label(sla_rule.priority)}\n"
-            f"⏰ تاخیر: {delay_time}\n"
-            f"📅 مهلت پاسخ: {sla_log.target_response_time.strftime('%Y-%m-%d %H:%M')}\n\n"
-            f"⚠️ این تیکت از مهلت پاسخ خود گذشته است. لطفاً فوراً رسیدگی کنید."
+def _alert_message(alert: SLAAlert) -> str:
+    """Telegram message of a single alert"""
+    priority = _get_priority_label(alert.priority)
+    deadline = alert.deadline.strftime('%Y-%m-%d %H:%M')
+    if alert.kind == ESCALATION:
+        return (
+            f"📈 <b>Escalation SLA</b>\n\n"
+            f"🔹 تیکت: <b>{alert.ticket_number}</b>\n"
+            f"📌 عنوان: {alert.ticket_title}\n"
+            f"🚨 اولویت: {priority}\n"
+            f"⏰ زمان Escalation: {deadline}\n\n"
+            f"این تیکت به سطح بالاتر ارجاع داده شده است. لطفاً فوراً رسیدگی کنید."
         )
-        
-        # ارسال به کارشناس مسئول
-        if ticket.assigned_to:
-            if ticket.assigned_to.telegram_chat_id:
-                await send_telegram_notification_to_user(ticket.assigned_to.telegram_chat_id, message)
-            
-            # ارسال ایمیل
-            if ticket.assigned_to.email:
-                try:
-                    lang = ticket.assigned_to.language if hasattr(ticket.assigned_to, 'language') else Language.FA
-                    await email_service.send_sla_breach_email(
-                        to_email=ticket.assigned_to.email,
-                        ticket_number=ticket.ticket_number,
-                        ticket_title=ticket.title,
-                        breach_type='response',
-                        delay_time=delay_time,
-                        language=lang
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to send email SLA breach to assigned user {ticket.assigned_to.id}: {e}")
-        
-        # ارسال به مدیران
-        from app.database import SessionLocal
-        db = SessionLocal()
-        try:
-            await send_telegram_notification_to_role(db, UserRole.ADMIN, message)
-            await send_telegram_notification_to_role(db, UserRole.CENTRAL_ADMIN, message)
-            
-            # ارسال ایمیل به مدیران
-            from app.models import User
-            admins = db.query(User).filter(
-                User.role.in_([UserRole.ADMIN, UserRole.CENTRAL_ADMIN]),
-                User.is_active == True,
-                User.email.isnot(None)
-            ).all()
-            
-            for admin in admins:
-                try:
-                    lang = admin.language if hasattr(admin, 'language') else Language.FA
-                    await email_service.send_sla_breach_email(
-                        to_email=admin.email,
-                        ticket_number=ticket.ticket_number,
-                        ticket_title=ticket.title,
-                        breach_type='response',
-                        delay_time=delay_time,
-                        language=lang
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to send email SLA breach to admin {admin.id}: {e}")
-        finally:
-            db.close()
-        
-        await notify_admin_group(message)
-        logger.info(f"Response breach notification sent for ticket {ticket.ticket_number}")
-        
-    except Exception as e:
-        logger.error(f"Error sending response breach notification: {e}", exc_info=True)
+    target = "پاسخ" if alert.kind in (RESPONSE_WARNING, RESPONSE_BREACH) else "حل"
+    if alert.kind in (RESPONSE_WARNING, RESOLUTION_WARNING):
+        return (
+            f"⚠️ <b>هشدار SLA - زمان {target}</b>\n\n"
+            f"🔹 تیکت: <b>{alert.ticket_number}</b>\n"
+            f"📌 عنوان: {alert.ticket_title}\n"
+            f"🚨 اولویت: {priority}\n"
+            f"⏰ زمان باقی‌مانده: {_format_minutes(alert.minutes)}\n"
+            f"📅 مهلت {target}: {deadline}\n\n"
+            + ("لطفاً در اسرع وقت به این تیکت پاسخ دهید." if target == "پاسخ" else "لطفاً در اسرع وقت این تیکت را حل کنید.")
+        )
+    return (
+        f"🔴 <b>نقض SLA - زمان {target}</b>\n\n"
+        f"🔹 تیکت: <b>{alert.ticket_number}</b>\n"
+        f"📌 عنوان: {alert.ticket_title}\n"
+        f"🚨 اولویت: {priority}\n"
+        f"⏰ تاخیر: {_format_minutes(alert.minutes)}\n"
+        f"📅 مهلت {target}: {deadline}\n\n"
+        f"⚠️ این تیکت از مهلت {target} خود گذشته است. لطفاً فوراً رسیدگی کنید."
+    )
 
 
-async def _send_resolution_warning_notification(ticket: Ticket, sla_log: SLALog, sla_rule: SLARule):
-    """
-    ارسال اعلان هشدار برای زمان حل
-    Send resolution time warning notification
-    """
-    try:
-        from app.services.email_service import email_service
-        from app.core.enums import Language
-        
-        # محاسبه زمان باقی‌مانده
-        remaining_minutes = int((sla_log.target_resolution_time - datetime.utcnow()).total_seconds() / 60)
-        remaining_time = f"{remaining_minutes} دقیقه"
-        if remaining_minutes >= 60:
-            hours = remaining_minutes // 60
-            mins = remaining_minutes % 60
-            remaining_time = f"{hours} ساعت و {mins} دقیقه"
-        
-        message = (
-            f"⚠️ <b>هشدار SLA - زمان حل</b>\n\n"
-            f"🔹 تیکت: <b>{ticket.ticket_number}</b>\n"
-            f"📌 عنوان: {ticket.title}\n"
-            f"🚨 اولویت: {_get_priority_label(sla_rule.priority)}\n"
-            f"⏰ زمان باقی‌مانده: {remaining_time}\n"
-            f"📅 مهلت حل: {sla_log.target_resolution_time.strftime('%Y-%m-%d %H:%M')}\n\n"
-            f"لطفاً در اسرع وقت این تیکت را حل کنید."
+def _digest_messages(alerts: List[SLAAlert]) -> List[str]:
+    """Telegram messages for the alerts of one recipient: the usual message for one alert, else digests"""
+    if len(alerts) == 1:
+        return [_alert_message(alerts[0])]
+    messages = []
+    for start in range(0, len(alerts), _DIGEST_SIZE):
+        part = alerts[start:start + _DIGEST_SIZE]
+        lines = [f"🔔 <b>هشدارهای SLA</b> ({len(part)} مورد)\n"]
+        for alert in part:
+            icon, label = _ALERT_LABELS[alert.kind]
+            if alert.kind == ESCALATION:
+                detail = "ارجاع به سطح بالاتر"
+            elif alert.kind in (RESPONSE_WARNING, RESOLUTION_WARNING):
+                detail = f"باقی‌مانده: {_format_minutes(alert.minutes)}"
+            else:
+                detail = f"تاخیر: {_format_minutes(alert.minutes)}"
+            lines.append(
+                f"{icon} <b>{alert.ticket_number}</b> - {alert.ticket_title}\n"
+                f"{label} · {_get_priority_label(alert.priority)} · {detail}"
+            )
+        lines.append("\nلطفاً فوراً رسیدگی کنید.")
+        messages.append("\n".join(lines))
+    return messages
+
+
+async def _send_alert_emails(email: str, language: Language, alerts: List[SLAAlert]) -> bool:
+    if len(alerts) > 1:
+        return await email_service.send_sla_digest_email(
+            to_email=email,
+            alerts=[
+                {
+                    "ticket_number": alert.ticket_number,
+                    "ticket_title": alert.ticket_title,
+                    "kind": alert.kind,
+                    "time": _format_minutes(alert.minutes),
+                }
+                for alert in alerts
+            ],
+            language=language,
         )
-        
-        # ارسال به کارشناس مسئول
-        if ticket.assigned_to:
-            if ticket.assigned_to.telegram_chat_id:
-                await send_telegram_notification_to_user(ticket.assigned_to.telegram_chat_id, message)
-            
-            # ارسال ایمیل
-            if ticket.assigned_to.email:
-                try:
-                    lang = ticket.assigned_to.language if hasattr(ticket.assigned_to, 'language') else Language.FA
-                    await email_service.send_sla_warning_email(
-                        to_email=ticket.assigned_to.email,
-                        ticket_number=ticket.ticket_number,
-                        ticket_title=ticket.title,
-                        warning_type='resolution',
-                        remaining_time=remaining_time,
-                        language=lang
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to send email SLA warning to assigned user {ticket.assigned_to.id}: {e}")
-        
-        # ارسال به مدیران
-        from app.database import SessionLocal
-        db = SessionLocal()
-        try:
-            await send_telegram_notification_to_role(db, UserRole.ADMIN, message)
-            await send_telegram_notification_to_role(db, UserRole.CENTRAL_ADMIN, message)
-            
-            # ارسال ایمیل به مدیران
-            from app.models import User
-            admins = db.query(User).filter(
-                User.role.in_([UserRole.ADMIN, UserRole.CENTRAL_ADMIN]),
-                User.is_active == True,
-                User.email.isnot(None)
-            ).all()
-            
-            for admin in admins:
-                try:
-                    lang = admin.language if hasattr(admin, 'language') else Language.FA
-                    await email_service.send_sla_warning_email(
-                        to_email=admin.email,
-                        ticket_number=ticket.ticket_number,
-                        ticket_title=ticket.title,
-                        warning_type='resolution',
-                        remaining_time=remaining_time,
-                        language=lang
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to send email SLA warning to admin {admin.id}: {e}")
-        finally:
-            db.close()
-        
-        await notify_admin_group(message)
-        logger.info(f"Resolution warning sent for ticket {ticket.ticket_number}")
-        
-    except Exception as e:
-        logger.error(f"Error sending resolution warning notification: {e}", exc_info=True)
+    alert = alerts[0]
+    target = "response" if alert.kind in (RESPONSE_WARNING, RESPONSE_BREACH) else "resolution"
+    if alert.kind in (RESPONSE_WARNING, RESOLUTION_WARNING):
+        return await email_service.send_sla_warning_email(
+            to_email=email,
+            ticket_number=alert.ticket_number,
+            ticket_title=alert.ticket_title,
+            warning_type=target,
+            remaining_time=_format_minutes(alert.minutes),
+            language=language,
+        )
+    return await email_service.send_sla_breach_email(
+        to_email=email,
+        ticket_number=alert.ticket_number,
+        ticket_title=alert.ticket_title,
+        breach_type=target,
+        delay_time=_format_minutes(alert.minutes),
+        language=language,
+    )
 
 
-async def _send_resolution_breach_notification(ticket: Ticket, sla_log: SLALog, sla_rule: SLARule):
+async def dispatch_sla_alerts(db: Session, alerts: List[SLAAlert]) -> Dict[str, int]:
     """
-    ارسال اعلان نقض برای زمان حل
-    Send resolution time breach notification
+    Send the alerts of a sweep, one message per recipient and channel
+
+    The assignee of the ticket and the admins (ADMIN and CENTRAL_ADMIN) get
+    each alert on Telegram and by email; escalations go to the admins on
+    Telegram only. The admin group (TELEGRAM_ADMIN_GROUP_ID) gets every alert.
+
+    Args:
+        db: Database session (admin lookup)
+        alerts: Alerts whose transitions were committed
+
+    Returns:
+        Dict with the number of messages sent and failed
     """
-    try:
-        from app.services.email_service import email_service
-        from app.core.enums import Language
-        
-        # محاسبه زمان تاخیر
-        delay_minutes = int((datetime.utcnow() - sla_log.target_resolution_time).total_seconds() / 60)
-        delay_time = f"{delay_minutes} دقیقه"
-        if delay_minutes >= 60:
-            hours = delay_minutes // 60
-            mins = delay_minutes % 60
-            delay_time = f"{hours} ساعت و {mins} دقیقه"
-        
-        message = (
-            f"🔴 <b>نقض SLA - زمان حل</b>\n\n"
-            f"🔹 تیکت: <b>{ticket.ticket_number}</b>\n"
-            f"📌 عنوان: {ticket.title}\n"
-            f"🚨 اولویت: {_get_priority_label(sla_rule.priority)}\n"
-            f"⏰ تاخیر: {delay_time}\n"
-            f"📅 مهلت حل: {sla_log.target_resolution_time.strftime('%Y-%m-%d %H:%M')}\n\n"
-            f"⚠️ این تیکت از مهلت حل خود گذشته است. لطفاً فوراً رسیدگی کنید."
-        )
-        
-        # ارسال به کارشناس مسئول
-        if ticket.assigned_to:
-            if ticket.assigned_to.telegram_chat_id:
-                await send_telegram_notification_to_user(ticket.assigned_to.telegram_chat_id, message)
-            
-            # ارسال ایمیل
-            if ticket.assigned_to.email:
-                try:
-                    lang = ticket.assigned_to.language if hasattr(ticket.assigned_to, 'language') else Language.FA
-                    await email_service.send_sla_breach_email(
-                        to_email=ticket.assigned_to.email,
-                        ticket_number=ticket.ticket_number,
-                        ticket_title=ticket.title,
-                        breach_type='resolution',
-                        delay_time=delay_time,
-                        language=lang
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to send email SLA breach to assigned user {ticket.assigned_to.id}: {e}")
-        
-        # ارسال به مدیران
-        from app.database import SessionLocal
-        db = SessionLocal()
-        try:
-            await send_telegram_notification_to_role(db, UserRole.ADMIN, message)
-            await send_telegram_notification_to_role(db, UserRole.CENTRAL_ADMIN, message)
-            
-            # ارسال ایمیل به مدیران
-            from app.models import User
-            admins = db.query(User).filter(
-                User.role.in_([UserRole.ADMIN, UserRole.CENTRAL_ADMIN]),
-                User.is_active == True,
-                User.email.isnot(None)
-            ).all()
-            
-            for admin in admins:
-                try:
-                    lang = admin.language if hasattr(admin, 'language') else Language.FA
-                    await email_service.send_sla_breach_email(
-                        to_email=admin.email,
-                        ticket_number=ticket.ticket_number,
-                        ticket_title=ticket.title,
-                        breach_type='resolution',
-                        delay_time=delay_time,
-                        language=lang
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to send email SLA breach to admin {admin.id}: {e}")
-        finally:
-            db.close()
-        
-        await notify_admin_group(message)
-        logger.info(f"Resolution breach notification sent for ticket {ticket.ticket_number}")
-        
-    except Exception as e:
-        logger.error(f"Error sending resolution breach notification: {e}", exc_info=True)
+    admins = await run_blocking(_admin_recipients, db)
 
+    # recipient -> alerts, each alert once per recipient (assignees may be admins too)
+    chats: Dict[str, Dict[Tuple[str, int], SLAAlert]] = {}
+    emails: Dict[str, Tuple[Language, Dict[Tuple[str, int], SLAAlert]]] = {}
+    for alert in alerts:
+        key = (alert.kind, alert.sla_log_id)
+        recipients = list(admins)
+        if alert.assignee and alert.kind != ESCALATION:
+            recipients.insert(0, alert.assignee)
+        for recipient in recipients:
+            if recipient.telegram_chat_id:
+                chats.setdefault(recipient.telegram_chat_id, {})[key] = alert
+            if recipient.email and alert.kind != ESCALATION:
+                emails.setdefault(recipient.email, (recipient.language, {}))[1][key] = alert
 
-async def _send_escalation_notification(ticket: Ticket, sla_log: SLALog, sla_rule: SLARule):
-    """ارسال اعلان Escalation"""
-    try:
-        message = (
-            f"📈 <b>Escalation SLA</b>\n\n"
-            f"🔹 تیکت: <b>{ticket.ticket_number}</b>\n"
-            f"📌 عنوان: {ticket.title}\n"
-            f"🚨 اولویت: {_get_priority_label(sla_rule.priority)}\n"
-            f"⏰ زمان Escalation: {sla_log.escalated_at.strftime('%Y-%m-%d %H:%M') if sla_log.escalated_at else 'نامشخص'}\n\n"
-            f"این تیکت به سطح بالاتر ارجاع داده شده است. لطفاً فوراً رسیدگی کنید."
-        )
-        
-        # ارسال به مدیران ارشد
-        from app.database import SessionLocal
-        db = SessionLocal()
-        try:
-            await send_telegram_notification_to_role(db, UserRole.CENTRAL_ADMIN, message)
-            await send_telegram_notification_to_role(db, UserRole.ADMIN, message)
-        finally:
-            db.close()
-        
-        await notify_admin_group(message)
-        logger.info(f"Escalation notification sent for ticket {ticket.ticket_number}")
-        
-    except Exception as e:
-        logger.error(f"Error sending escalation notification: {e}", exc_info=True)
+    deliveries: List[Callable[[], Awaitable[Any]]] = []
+    for chat_id, chat_alerts in chats.items():
+        for message in _digest_messages(list(chat_alerts.values())):
+            deliveries.append(functools.partial(send_telegram_notification_to_user, chat_id, message))
+    if settings.TELEGRAM_ADMIN_GROUP_ID:
+        for message in _digest_messages(alerts):
+            deliveries.append(
+                functools.partial(send_telegram_notification_to_group, str(settings.TELEGRAM_ADMIN_GROUP_ID), message)
+            )
+    if email_service.enabled:
+        for email, (language, email_alerts) in emails.items():
+            deliveries.append(functools.partial(_send_alert_emails, email, language, list(email_alerts.values())))
+
+    semaphore = asyncio.Semaphore(max(1, settings.SLA_NOTIFICATION_WORKERS))
+
+    async def deliver(send: Callable[[], Awaitable[Any]]) -> bool:
+        async with semaphore:
+            try:
+                # Emails report failures as False; Telegram helpers log their own
+                return await send() is not False
+            except Exception as e:
+                logger.error(f"Error sending SLA notification: {e}", exc_info=True)
+                return False
 
+    results = await asyncio.gather(*(deliver(send) for send in deliveries))
+    sent = sum(results)
+    logger.info(
+        "SLA notifications for %d alerts: %d messages sent, %d failed",
+        len(alerts), sent, len(results) - sent,
+    )
+    return {"sent": sent, "failed": len(results) - sent}
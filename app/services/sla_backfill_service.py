@@ -0,0 +1,351 @@
+"""
+SLA backfill (recomputing the SLA logs of existing tickets)
+
+Changing an SLA rule or importing historical tickets leaves SLA logs with
+stale targets, or without a log at all. A backfill job walks the tickets in
+id order, one chunk at a time: it matches each chunk against the compiled
+rule index (sla_rule_matcher_service), recomputes targets and statuses from
+the ticket's own timestamps, and writes the chunk with one bulk UPDATE by
+primary key (plus one bulk INSERT for tickets without a log). The job's
+cursor and counters are committed in the same transaction, so a job that
+stops (paused, failed, process restarted) resumes after the last chunk
+written.
+
+The job pauses pause_ms between chunks; chunk_size and pause_ms are read
+again before every chunk, so a running job can be slowed down or sped up.
+A backfill only settles deadlines that are already met (responded,
+resolved); the status and escalation of an open deadline are left as they
+are, so the SLA checks still send its warning, breach and escalation
+alerts under the new targets.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.concurrency import run_blocking
+from app.core.enums import TicketStatus
+from app.core.timeutils import naive_utc
+from app.database import session_scope
+from app.models import SLABackfillJob, SLALog, Ticket
+from app.services.sla_rule_matcher_service import CompiledSLARule, sla_rule_matcher
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_PENDING = "pending"
+BACKFILL_RUNNING = "running"
+BACKFILL_PAUSED = "paused"
+BACKFILL_DONE = "done"
+BACKFILL_FAILED = "failed"
+
+# A running job without a chunk written for this long lost its runner and may be resumed
+BACKFILL_STALE_SECONDS = 300
+
+_TICKET_COLUMNS = (
+    Ticket.id,
+    Ticket.priority,
+    Ticket.category,
+    Ticket.department_id,
+    Ticket.created_at,
+    Ticket.first_response_at,
+    Ticket.resolved_at,
+    Ticket.closed_at,
+)
+
+_LOG_COLUMNS = (
+    SLALog.id,
+    SLALog.ticket_id,
+    SLALog.sla_rule_id,
+    SLALog.target_response_time,
+    SLALog.target_resolution_time,
+    SLALog.actual_response_time,
+    SLALog.actual_resolution_time,
+    SLALog.response_status,
+    SLALog.resolution_status,
+    SLALog.escalated,
+    SLALog.escalated_at,
+)
+
+
+def _status(actual: Optional[datetime], target: datetime, current: Optional[str]) -> Optional[str]:
+    if actual is not None:
+        return "on_time" if actual <= target else "breached"
+    # Open: warning/breached are set by the SLA checks together with their alerts
+    return current
+
+
+def recompute_sla_fields(ticket: Any, rule: CompiledSLARule, current: Any = None) -> Dict[str, Any]:
+    """
+    SLA log columns of a ticket under ``rule``, as if the log had been created with it
+
+    Targets count from the ticket's creation. Met deadlines get on_time or
+    breached as in apply_sla_log_status; an open deadline keeps its current
+    status (None for a new log), since presetting warning or breached would
+    suppress the alerts of the SLA checks. An escalation already recorded is
+    kept; a missing one is only dated for resolved tickets, when it became due.
+
+    Args:
+        ticket: Ticket or row with created_at, first_response_at, resolved_at and closed_at
+        rule: Matching SLA rule
+        current: Existing SLA log (or row), if any
+
+    Returns:
+        Dict of SLALog column -> value
+    """
+    created_at = naive_utc(ticket.created_at)
+    responded_at = naive_utc(ticket.first_response_at)
+    resolved_at = naive_utc(ticket.resolved_at or ticket.closed_at)
+    target_response = created_at + timedelta(minutes=rule.response_time_minutes)
+    target_resolution = created_at + timedelta(minutes=rule.resolution_time_minutes)
+
+    escalated_at = None
+    if current is not None and current.escalated:
+        escalated_at = current.escalated_at
+    elif resolved_at is not None and rule.escalation_enabled and rule.escalation_after_minutes:
+        escalation_time = created_at + timedelta(minutes=rule.escalation_after_minutes)
+        if escalation_time <= resolved_at:
+            escalated_at = escalation_time
+
+    return {
+        "sla_rule_id": rule.id,
+        "target_response_time": target_response,
+        "target_resolution_time": target_resolution,
+        "actual_response_time": responded_at,
+        "actual_resolution_time": resolved_at,
+        "response_status": _status(responded_at, target_response, current.response_status if current else None),
+        "resolution_status": _status(resolved_at, target_resolution, current.resolution_status if current else None),
+        "escalated": escalated_at is not None or bool(current is not None and current.escalated),
+        "escalated_at": escalated_at,
+    }
+
+
+def _ticket_scope(db: Session, job: SLABackfillJob):
+    query = db.query(*_TICKET_COLUMNS).filter(Ticket.id <= job.max_ticket_id)
+    if job.only_open:
+        query = query.filter(Ticket.status.in_([TicketStatus.PENDING, TicketStatus.IN_PROGRESS]))
+    return query
+
+
+def create_backfill_job(
+    db: Session,
+    only_open: bool = False,
+    dry_run: bool = False,
+    chunk_size: Optional[int] = None,
+    pause_ms: Optional[int] = None,
+    requested_by_id: Optional[int] = None,
+) -> SLABackfillJob:
+    """
+    Create a pending backfill job covering the tickets that exist now
+
+    Args:
+        db: Database session
+        only_open: Only pending and in-progress tickets
+        dry_run: Count the changes without writing them
+        chunk_size: Tickets per chunk (SLA_BACKFILL_CHUNK_SIZE by default)
+        pause_ms: Pause between chunks (SLA_BACKFILL_PAUSE_MS by default)
+        requested_by_id: User requesting the backfill
+
+    Returns:
+        SLABackfillJob; run it with run_backfill_job
+    """
+    job = SLABackfillJob(
+        status=BACKFILL_PENDING,
+        only_open=only_open,
+        dry_run=dry_run,
+        chunk_size=chunk_size or settings.SLA_BACKFILL_CHUNK_SIZE,
+        pause_ms=settings.SLA_BACKFILL_PAUSE_MS if pause_ms is None else pause_ms,
+        last_ticket_id=0,
+        max_ticket_id=db.query(func.max(Ticket.id)).scalar() or 0,
+        requested_by_id=requested_by_id,
+    )
+    job.total_tickets = _ticket_scope(db, job).count()
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_backfill_job(db: Session, job_id: int) -> Optional[SLABackfillJob]:
+    """Load a job as currently committed"""
+    return db.query(SLABackfillJob).populate_existing().filter(SLABackfillJob.id == job_id).first()
+
+
+def update_backfill_throttle(
+    db: Session,
+    job: SLABackfillJob,
+    chunk_size: Optional[int] = None,
+    pause_ms: Optional[int] = None,
+) -> SLABackfillJob:
+    """Change the chunk size or pause of a job; a running job uses them from its next chunk"""
+    if chunk_size is not None:
+        job.chunk_size = chunk_size
+    if pause_ms is not None:
+        job.pause_ms = pause_ms
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def pause_backfill_job(db: Session, job: SLABackfillJob) -> SLABackfillJob:
+    """
+    Stop a job after the chunk being written
+
+    Raises:
+        ValueError: If the job is not pending or running
+    """
+    if job.status not in (BACKFILL_PENDING, BACKFILL_RUNNING):
+        raise ValueError(f"SLA backfill job {job.id} is {job.status}")
+    job.status = BACKFILL_PAUSED
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def resume_backfill_job(db: Session, job: SLABackfillJob, now: Optional[datetime] = None) -> SLABackfillJob:
+    """
+    Make a paused, failed or abandoned job pending again (it continues after its cursor)
+
+    Raises:
+        ValueError: If the job is done or still has a live runner
+    """
+    now = now or datetime.utcnow()
+    if job.status in (BACKFILL_PENDING, BACKFILL_RUNNING):
+        last_seen = naive_utc(job.heartbeat_at or job.started_at or job.created_at)
+        if last_seen is not None and now - last_seen < timedelta(seconds=BACKFILL_STALE_SECONDS):
+            raise ValueError(f"SLA backfill job {job.id} is already {job.status}")
+    elif job.status not in (BACKFILL_PAUSED, BACKFILL_FAILED):
+        raise ValueError(f"SLA backfill job {job.id} is {job.status}")
+    job.status = BACKFILL_PENDING
+    job.error = None
+    job.heartbeat_at = now
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def process_backfill_chunk(db: Session, job_id: int, now: Optional[datetime] = None) -> Optional[float]:
+    """
+    Recompute the next chunk of a job and commit it together with the cursor
+
+    Args:
+        db: Database session
+        job_id: Backfill job ID
+        now: Current UTC time
+
+    Returns:
+        Seconds to pause before the next chunk, or None when the job is
+        finished or no longer pending/running (paused)
+    """
+    now = now or datetime.utcnow()
+    job = get_backfill_job(db, job_id)
+    if job is None or job.status not in (BACKFILL_PENDING, BACKFILL_RUNNING):
+        return None
+    if job.status == BACKFILL_PENDING:
+        job.status = BACKFILL_RUNNING
+        job.started_at = job.started_at or now
+
+    tickets = (
+        _ticket_scope(db, job)
+        .filter(Ticket.id > job.last_ticket_id)
+        .order_by(Ticket.id)
+        .limit(max(1, job.chunk_size))
+        .all()
+    )
+    if not tickets:
+        job.status = BACKFILL_DONE
+        job.finished_at = now
+        job.heartbeat_at = now
+        db.commit()
+        logger.info(
+            "SLA backfill %d done: %d tickets, %d logs updated, %d created, %d unmatched",
+            job.id, job.processed_tickets, job.updated_logs, job.created_logs, job.unmatched_tickets,
+        )
+        return None
+
+    rules = sla_rule_matcher.match_tickets(db, tickets)
+    logs: Dict[int, Any] = {}
+    for log in (
+        db.query(*_LOG_COLUMNS)
+        .filter(SLALog.ticket_id.in_([ticket.id for ticket in tickets]))
+        .order_by(SLALog.id)
+    ):
+        logs.setdefault(log.ticket_id, log)
+
+    updates: List[Dict[str, Any]] = []
+    inserts: List[Dict[str, Any]] = []
+    unmatched = 0
+    for ticket in tickets:
+        rule = rules[ticket.id]
+        if rule is None:
+            unmatched += 1
+            continue
+        log = logs.get(ticket.id)
+        fields = recompute_sla_fields(ticket, rule, log)
+        if log is None:
+            inserts.append({"ticket_id": ticket.id, **fields})
+            continue
+        changes = {key: value for key, value in fields.items() if naive_utc(getattr(log, key)) != value}
+        if changes:
+            updates.append({"id": log.id, **changes})
+
+    if not job.dry_run:
+        if updates:
+            db.execute(update(SLALog), updates)
+        if inserts:
+            db.execute(insert(SLALog), inserts)
+    job.last_ticket_id = tickets[-1].id
+    job.processed_tickets += len(tickets)
+    job.updated_logs += len(updates)
+    job.created_logs += len(inserts)
+    job.unmatched_tickets += unmatched
+    job.heartbeat_at = now
+    db.commit()
+    logger.info(
+        "SLA backfill %d: %d/%d tickets (through ticket %d), %d logs updated, %d created",
+        job.id, job.processed_tickets, job.total_tickets, job.last_ticket_id, job.updated_logs, job.created_logs,
+    )
+    return job.pause_ms / 1000.0
+
+
+def _fail_job(db: Session, job_id: int, error: str) -> None:
+    db.rollback()
+    job = get_backfill_job(db, job_id)
+    if job is not None:
+        job.status = BACKFILL_FAILED
+        job.error = error
+        job.finished_at = datetime.utcnow()
+        db.commit()
+
+
+def _step(job_id: int, db: Optional[Session]) -> Optional[float]:
+    with session_scope(db) as session:
+        return process_backfill_chunk(session, job_id)
+
+
+def _record_failure(job_id: int, db: Optional[Session], error: str) -> None:
+    with session_scope(db) as session:
+        _fail_job(session, job_id, error)
+
+
+async def run_backfill_job(job_id: int, db: Optional[Session] = None) -> None:
+    """
+    Run a pending job until it is done, paused or fails (failures are recorded on the job)
+
+    Args:
+        job_id: Backfill job ID
+        db: Session to use (tests); by default each chunk opens its own
+    """
+    while True:
+        try:
+            pause = await run_blocking(_step, job_id, db)
+        except Exception as exc:
+            logger.error("SLA backfill %d failed: %s", job_id, exc, exc_info=True)
+            await run_blocking(_record_failure, job_id, db, str(exc) or exc.__class__.__name__)
+            return
+        if pause is None:
+            return
+        await asyncio.sleep(pause)
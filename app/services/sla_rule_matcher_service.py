@@ -0,0 +1,250 @@
+"""
+Compiled SLA rule matching
+
+The active SLA rules are compiled into a dict keyed by their exact
+(priority, category, department_id) condition, None meaning "any". A ticket
+is matched by walking the same specificity ladder find_matching_sla_rule
+always used, as dict lookups instead of queries, and the answer per
+(priority, category, department) is memoized, so matching is a single dict
+lookup without touching the database. When several rules share a
+condition, the lowest id wins.
+
+Rules are snapshotted as CompiledSLARule (the columns SLA logs need); load
+the SLARule row by id when the ORM object itself is required.
+
+Any flush, bulk statement or commit touching sla_rules advances a version
+stamp and the next match recompiles with one query. The index is per
+process: writes made by other processes are picked up after
+SLA_RULE_CACHE_TTL_SECONDS.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.enums import TicketCategory, TicketPriority
+from app.database import Base
+from app.models import SLARule
+
+logger = logging.getLogger(__name__)
+
+RuleKey = Tuple[Optional[TicketPriority], Optional[TicketCategory], Optional[int]]
+
+
+@dataclass(frozen=True)
+class CompiledSLARule:
+    """Snapshot of an active SLA rule"""
+    id: int
+    name: str
+    priority: Optional[TicketPriority]
+    category: Optional[TicketCategory]
+    department_id: Optional[int]
+    response_time_minutes: int
+    resolution_time_minutes: int
+    response_warning_minutes: int
+    resolution_warning_minutes: int
+    escalation_enabled: bool
+    escalation_after_minutes: Optional[int]
+
+    @classmethod
+    def from_rule(cls, rule: SLARule) -> "CompiledSLARule":
+        return cls(
+            id=rule.id,
+            name=rule.name,
+            priority=rule.priority,
+            category=rule.category,
+            department_id=rule.department_id,
+            response_time_minutes=rule.response_time_minutes,
+            resolution_time_minutes=rule.resolution_time_minutes,
+            response_warning_minutes=rule.response_warning_minutes,
+            resolution_warning_minutes=rule.resolution_warning_minutes,
+            escalation_enabled=rule.escalation_enabled,
+            escalation_after_minutes=rule.escalation_after_minutes,
+        )
+
+
+def _ladder(priority, category, department_id) -> List[RuleKey]:
+    """Rule conditions to try for a ticket, most specific first"""
+    if department_id:
+        return [
+            (priority, category, department_id),
+            (priority, category, None),
+            (priority, None, department_id),
+            (None, category, department_id),
+            (priority, None, None),
+            (None, category, None),
+            (None, None, department_id),
+            (None, None, None),
+        ]
+    return [
+        (priority, category, None),
+        (priority, None, None),
+        (None, category, None),
+        (None, None, None),
+    ]
+
+
+class _Compiled:
+    __slots__ = ("version", "compiled_at", "rules", "matches")
+
+    def __init__(self, version: int, rules: Dict[RuleKey, CompiledSLARule]):
+        self.version = version
+        self.compiled_at = time.monotonic()
+        self.rules = rules
+        # (priority, category, department_id) of a ticket -> matching rule
+        self.matches: Dict[RuleKey, Optional[CompiledSLARule]] = {}
+
+
+class SLARuleMatcher:
+    """Per-process compiled index of the active SLA rules"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._compiled: Optional[_Compiled] = None
+        self.compilations = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self) -> None:
+        """Advance the version stamp; the next match recompiles"""
+        with self._lock:
+            self._version += 1
+
+    def _current(self, db: Session) -> _Compiled:
+        compiled = self._compiled
+        if (
+            compiled is not None
+            and compiled.version == self._version
+            and time.monotonic() - compiled.compiled_at <= settings.SLA_RULE_CACHE_TTL_SECONDS
+        ):
+            return compiled
+        with self._lock:
+            version = self._version
+        rules: Dict[RuleKey, CompiledSLARule] = {}
+        for rule in db.query(SLARule).filter(SLARule.is_active == True).order_by(SLARule.id):
+            rules.setdefault((rule.priority, rule.category, rule.department_id), CompiledSLARule.from_rule(rule))
+        compiled = _Compiled(version, rules)
+        with self._lock:
+            # A write during compilation leaves the version behind; the next call compiles again
+            self._compiled = compiled
+            self.compilations += 1
+        logger.debug("Compiled %d active SLA rules (version %d)", len(rules), version)
+        return compiled
+
+    def match(
+        self,
+        db: Session,
+        priority: Optional[TicketPriority],
+        category: Optional[TicketCategory],
+        department_id: Optional[int] = None,
+    ) -> Optional[CompiledSLARule]:
+        """
+        Most specific active rule for a ticket's priority, category and department
+
+        Args:
+            db: Database session (only used to recompile)
+            priority: Ticket priority
+            category: Ticket category
+            department_id: Ticket department
+
+        Returns:
+            CompiledSLARule or None
+        """
+        return self._match(self._current(db), priority, category, department_id or None)
+
+    def match_tickets(self, db: Session, tickets: Iterable[Any]) -> Dict[int, Optional[CompiledSLARule]]:
+        """
+        Bulk variant of match for re-evaluating many tickets against one compiled index
+
+        Args:
+            db: Database session (only used to recompile)
+            tickets: Objects or rows with id, priority, category and department_id
+
+        Returns:
+            Dict of ticket id -> CompiledSLARule or None
+        """
+        compiled = self._current(db)
+        return {
+            ticket.id: self._match(compiled, ticket.priority, ticket.category, ticket.department_id or None)
+            for ticket in tickets
+        }
+
+    @staticmethod
+    def _match(compiled: _Compiled, priority, category, department_id) -> Optional[CompiledSLARule]:
+        key = (priority, category, department_id)
+        try:
+            return compiled.matches[key]
+        except KeyError:
+            pass
+        rule = None
+        for condition in _ladder(priority, category, department_id):
+            rule = compiled.rules.get(condition)
+            if rule is not None:
+                break
+        compiled.matches[key] = rule
+        return rule
+
+    def stats(self) -> Dict[str, Any]:
+        compiled = self._compiled
+        return {
+            "version": self._version,
+            "compiled_version": compiled.version if compiled is not None else None,
+            "rules": len(compiled.rules) if compiled is not None else 0,
+            "memoized_matches": len(compiled.matches) if compiled is not None else 0,
+            "compilations": self.compilations,
+            "ttl_seconds": settings.SLA_RULE_CACHE_TTL_SECONDS,
+        }
+
+
+sla_rule_matcher = SLARuleMatcher()
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_after_flush(session: Session, flush_context) -> None:
+    if any(isinstance(obj, SLARule) for obj in (*session.new, *session.dirty, *session.deleted)):
+        # The writing session sees its own rule changes right away
+        sla_rule_matcher.invalidate()
+        session.info["sla_rules_dirty"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_on_bulk_write(orm_execute_state) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, SLARule):
+        sla_rule_matcher.invalidate()
+        orm_execute_state.session.info["sla_rules_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    # Other sessions may have compiled the pre-commit rules meanwhile
+    if session.info.pop("sla_rules_dirty", False):
+        sla_rule_matcher.invalidate()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _invalidate_after_rollback(session: Session, previous_transaction) -> None:
+    # Compiled from rolled-back rows by the writing session; after a savepoint rollback
+    # the outer transaction may still commit rule writes, so the flag stays for after_commit
+    if previous_transaction.nested:
+        dirty = session.info.get("sla_rules_dirty", False)
+    else:
+        dirty = session.info.pop("sla_rules_dirty", False)
+    if dirty:
+        sla_rule_matcher.invalidate()
+
+
+@event.listens_for(Base.metadata, "after_create")
+@event.listens_for(Base.metadata, "after_drop")
+def _invalidate_after_schema_change(target, connection, **kw) -> None:
+    sla_rule_matcher.invalidate()
@@ -0,0 +1,425 @@
+"""
+Deadline-driven SLA alerts
+
+Each open ticket's SLA log has a next instant at which an alert may become
+due: the response/resolution warning (target minus the rule's warning
+minutes), the response/resolution breach (the target) or the escalation
+(creation plus escalation_after_minutes), whichever comes first among the
+ones not yet recorded on the log. The scheduler keeps those instants in a
+min-heap, so the SLA task sleeps until the earliest one and each tick only
+loads the logs that are due.
+
+The heap is built at startup from one query over open tickets (status and
+SLA log ticket indexes). Afterwards session hooks report committed changes
+to SLA logs, tickets (status, response/resolution times) and SLA rules;
+the affected logs' deadlines are reloaded before the next tick and the task
+is woken up.
+
+Only the process holding the "sla" lease runs the task, and the hooks do
+not see writes made by other processes (the other uvicorn workers, the bot,
+scripts). The task therefore polls every SLA_CHANGE_POLL_SECONDS for new
+SLA logs (ids past a watermark), tickets changed since an updated_at
+watermark (idx_ticket_updated_id), SLA rule changes and SLA backfill
+progress (poll_sla_changes), so such writes reach the heap within that
+interval. A transaction that commits more than _POLL_OVERLAP after its
+updated_at was set is only picked up by the full rebuild every
+SLA_RESYNC_SECONDS.
+
+Entries are replaced lazily: a log has one current deadline in a dict and
+heap entries that no longer match it are dropped when they surface.
+"""
+import asyncio
+import heapq
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.enums import TicketStatus
+from app.core.timeutils import naive_utc
+from app.models import SLABackfillJob, SLALog, SLARule, Ticket
+
+logger = logging.getLogger(__name__)
+
+# Tickets the SLA alerts watch
+OPEN_STATUSES = (TicketStatus.PENDING, TicketStatus.IN_PROGRESS)
+
+# Ticket columns the deadlines depend on
+_TICKET_DEADLINE_KEYS = ("status", "created_at", "first_response_at", "resolved_at", "closed_at")
+
+_DEADLINE_COLUMNS = (
+    SLALog.id,
+    SLALog.target_response_time,
+    SLALog.target_resolution_time,
+    SLALog.response_status,
+    SLALog.resolution_status,
+    SLALog.escalated,
+    Ticket.status,
+    Ticket.created_at,
+    Ticket.first_response_at,
+    Ticket.resolved_at,
+    Ticket.closed_at,
+    SLARule.response_warning_minutes,
+    SLARule.resolution_warning_minutes,
+    SLARule.escalation_enabled,
+    SLARule.escalation_after_minutes,
+)
+
+# Ids per IN (...) when reloading changed logs
+_LOAD_BATCH_SIZE = 500
+
+# Tickets are re-read this far behind the updated_at watermark: SQLite stores it with
+# one-second resolution and PostgreSQL's now() is the transaction start, not its commit
+_POLL_OVERLAP = timedelta(seconds=30)
+# More changes than this in one poll rebuild the whole schedule instead
+_POLL_LIMIT = 5000
+
+
+def next_sla_deadline(row) -> Optional[datetime]:
+    """
+    Earliest instant at which an alert check of the log may fire (naive UTC)
+
+    Mirrors the checks in sla_alert_service: a warning is pending until the
+    log records "warning" or "breached", a breach until it records
+    "breached", an escalation until ``escalated`` is set. None when nothing
+    is pending (closed ticket, everything recorded).
+
+    Args:
+        row: A row of _DEADLINE_COLUMNS
+    """
+    if row.status not in OPEN_STATUSES:
+        return None
+    deadlines = []
+    if not row.first_response_at and row.response_status != "breached":
+        target = naive_utc(row.target_response_time)
+        if row.response_status != "warning":
+            deadlines.append(target - timedelta(minutes=row.response_warning_minutes or 0))
+        deadlines.append(target)
+    if not (row.resolved_at or row.closed_at) and row.resolution_status != "breached":
+        target = naive_utc(row.target_resolution_time)
+        if row.resolution_status != "warning":
+            deadlines.append(target - timedelta(minutes=row.resolution_warning_minutes or 0))
+        deadlines.append(target)
+    if row.escalation_enabled and row.escalation_after_minutes and not row.escalated:
+        deadlines.append(naive_utc(row.created_at) + timedelta(minutes=row.escalation_after_minutes))
+    return min(deadlines) if deadlines else None
+
+
+def _deadline_query():
+    return (
+        select(*_DEADLINE_COLUMNS)
+        .join(Ticket, Ticket.id == SLALog.ticket_id)
+        .join(SLARule, SLARule.id == SLALog.sla_rule_id)
+    )
+
+
+def load_open_deadlines(db: Session) -> List[Tuple[int, Optional[datetime]]]:
+    """(log id, next deadline) of every open ticket's SLA log"""
+    rows = db.execute(_deadline_query().where(Ticket.status.in_(OPEN_STATUSES)))
+    return [(row.id, next_sla_deadline(row)) for row in rows]
+
+
+def load_deadlines(
+    db: Session,
+    log_ids: Iterable[int] = (),
+    ticket_ids: Iterable[int] = (),
+    rule_ids: Iterable[int] = (),
+) -> List[Tuple[int, Optional[datetime]]]:
+    """
+    (log id, next deadline) of the given logs and of the logs of the given tickets/rules
+
+    Closed tickets are included (deadline None) so the scheduler forgets them.
+    """
+    result = []
+    for column, ids in ((SLALog.id, log_ids), (SLALog.ticket_id, ticket_ids), (SLALog.sla_rule_id, rule_ids)):
+        ids = sorted(set(ids))
+        for start in range(0, len(ids), _LOAD_BATCH_SIZE):
+            rows = db.execute(_deadline_query().where(column.in_(ids[start:start + _LOAD_BATCH_SIZE])))
+            result.extend((row.id, next_sla_deadline(row)) for row in rows)
+    return result
+
+
+@dataclass(frozen=True)
+class SLAChangeWatermark:
+    """Position of the cross-process change poll"""
+    max_log_id: int
+    ticket_updated_at: Optional[datetime]
+    rules: Tuple[Any, int]  # (max updated_at, count) of sla_rules
+    backfill_heartbeat_at: Optional[datetime]
+
+
+def _backfill_heartbeat(db: Session) -> Optional[datetime]:
+    try:
+        return db.execute(select(func.max(SLABackfillJob.heartbeat_at))).scalar()
+    except SQLAlchemyError:
+        # sla_backfill_jobs missing (migration v30 not applied)
+        db.rollback()
+        return None
+
+
+def sla_change_watermark(db: Session) -> SLAChangeWatermark:
+    """Current watermark; take it before rebuilding the schedule"""
+    return SLAChangeWatermark(
+        max_log_id=db.execute(select(func.max(SLALog.id))).scalar() or 0,
+        ticket_updated_at=db.execute(select(func.max(Ticket.updated_at))).scalar(),
+        rules=tuple(db.execute(select(func.max(SLARule.updated_at), func.count(SLARule.id))).one()),
+        backfill_heartbeat_at=_backfill_heartbeat(db),
+    )
+
+
+def poll_sla_changes(
+    db: Session,
+    watermark: SLAChangeWatermark,
+) -> Tuple[SLAChangeWatermark, Set[int], Set[int], bool]:
+    """
+    Changes committed since ``watermark`` by any process
+
+    Returns:
+        Tuple of (new watermark, new log ids, changed ticket ids, rebuild needed);
+        rule changes, backfill progress and very large change sets ask for a rebuild
+    """
+    log_ids = set(db.execute(
+        select(SLALog.id).where(SLALog.id > watermark.max_log_id).order_by(SLALog.id).limit(_POLL_LIMIT + 1)
+    ).scalars())
+    tickets = select(Ticket.id, Ticket.updated_at).limit(_POLL_LIMIT + 1)
+    if watermark.ticket_updated_at is not None:
+        tickets = tickets.where(Ticket.updated_at >= watermark.ticket_updated_at - _POLL_OVERLAP)
+    rows = db.execute(tickets).all()
+    ticket_ids = {row.id for row in rows}
+    ticket_updated_at = max(
+        (value for value in (watermark.ticket_updated_at, *(row.updated_at for row in rows)) if value is not None),
+        default=None,
+    )
+    rules = tuple(db.execute(select(func.max(SLARule.updated_at), func.count(SLARule.id))).one())
+    backfill_heartbeat_at = _backfill_heartbeat(db)
+    db.rollback()
+
+    rebuild = (
+        len(log_ids) > _POLL_LIMIT
+        or len(ticket_ids) > _POLL_LIMIT
+        or rules != watermark.rules
+        or backfill_heartbeat_at != watermark.backfill_heartbeat_at
+    )
+    new_watermark = SLAChangeWatermark(
+        max_log_id=max(log_ids, default=watermark.max_log_id),
+        ticket_updated_at=ticket_updated_at,
+        rules=rules,
+        backfill_heartbeat_at=backfill_heartbeat_at,
+    )
+    return new_watermark, log_ids, ticket_ids, rebuild
+
+
+class SLADeadlineScheduler:
+    """
+    Min-heap of the next alert deadline per SLA log
+
+    The heap itself is used from the event loop only; mark_* may be called
+    from any thread (session hooks) and wake the loop up. Changes are only
+    recorded while a loop is attached.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int]] = []
+        self._deadlines: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._log_ids: Set[int] = set()
+        self._ticket_ids: Set[int] = set()
+        self._rule_ids: Set[int] = set()
+        self._rebuild_requested = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def attach(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Bind to the loop running the SLA task (wake-ups are delivered there)"""
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+
+    def detach(self) -> None:
+        self._loop = None
+        self._wakeup = None
+
+    # Change notifications (any thread)
+
+    def mark_logs(self, log_ids: Iterable[int]) -> None:
+        self._mark("_log_ids", log_ids)
+
+    def mark_tickets(self, ticket_ids: Iterable[int]) -> None:
+        self._mark("_ticket_ids", ticket_ids)
+
+    def mark_rules(self, rule_ids: Iterable[int]) -> None:
+        self._mark("_rule_ids", rule_ids)
+
+    def request_rebuild(self) -> None:
+        if self._loop is None:
+            return
+        with self._lock:
+            self._rebuild_requested = True
+        self._wake()
+
+    def _mark(self, attribute: str, ids: Iterable[int]) -> None:
+        if self._loop is None:
+            # No SLA task in this process; it rebuilds from the database when it starts
+            return
+        with self._lock:
+            # Looked up under the lock: take_changes swaps the sets
+            target = getattr(self, attribute)
+            before = len(target)
+            target.update(i for i in ids if i is not None)
+            changed = len(target) != before
+        if changed:
+            self._wake()
+
+    def _wake(self) -> None:
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            # Loop closed meanwhile (shutdown)
+            pass
+
+    def take_changes(self) -> Tuple[bool, Set[int], Set[int], Set[int]]:
+        """Pending (rebuild, log ids, ticket ids, rule ids), cleared"""
+        with self._lock:
+            changes = (self._rebuild_requested, self._log_ids, self._ticket_ids, self._rule_ids)
+            self._rebuild_requested = False
+            self._log_ids, self._ticket_ids, self._rule_ids = set(), set(), set()
+        return changes
+
+    # Heap (event loop)
+
+    def replace_all(self, deadlines: Iterable[Tuple[int, Optional[datetime]]]) -> None:
+        self._deadlines = {log_id: deadline for log_id, deadline in deadlines if deadline is not None}
+        self._heap = [(deadline, log_id) for log_id, deadline in self._deadlines.items()]
+        heapq.heapify(self._heap)
+
+    def update(self, deadlines: Iterable[Tuple[int, Optional[datetime]]]) -> None:
+        for log_id, deadline in deadlines:
+            if deadline is None:
+                self._deadlines.pop(log_id, None)
+            elif self._deadlines.get(log_id) != deadline:
+                self._deadlines[log_id] = deadline
+                heapq.heappush(self._heap, (deadline, log_id))
+        # Superseded entries pile up when deadlines keep moving; rebuild past twice the live size
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [(deadline, log_id) for log_id, deadline in self._deadlines.items()]
+            heapq.heapify(self._heap)
+
+    def pop_due(self, now: datetime) -> List[int]:
+        """Remove and return the logs whose deadline is at or before ``now``"""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, log_id = heapq.heappop(self._heap)
+            if self._deadlines.get(log_id) == deadline:
+                del self._deadlines[log_id]
+                due.append(log_id)
+        return due
+
+    def next_deadline(self) -> Optional[datetime]:
+        while self._heap:
+            deadline, log_id = self._heap[0]
+            if self._deadlines.get(log_id) == deadline:
+                return deadline
+            heapq.heappop(self._heap)
+        return None
+
+    async def wait(self, timeout: Optional[float]) -> None:
+        """Sleep up to ``timeout`` seconds, less if a change is reported"""
+        if timeout is not None and timeout <= 0:
+            return
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+
+sla_deadline_scheduler = SLADeadlineScheduler()
+
+
+def _pending(session: Session) -> Dict[str, Set[int]]:
+    return session.info.setdefault("sla_deadlines", {"logs": set(), "tickets": set(), "rules": set(), "all": False})
+
+
+def _changed(obj, keys: Iterable[str]) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[key].history.has_changes() for key in keys)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_after_flush(session: Session, flush_context) -> None:
+    logs, tickets, rules = set(), set(), set()
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, SLALog):
+            logs.add(obj.id)
+        elif isinstance(obj, Ticket) and obj not in session.new and _changed(obj, _TICKET_DEADLINE_KEYS):
+            tickets.add(obj.id)
+        elif isinstance(obj, SLARule) and obj not in session.new:
+            rules.add(obj.id)
+    # Deleted logs/tickets/rules leave stale entries that are skipped when due
+    if logs or tickets or rules:
+        pending = _pending(session)
+        pending["logs"].update(logs)
+        pending["tickets"].update(tickets)
+        pending["rules"].update(rules)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_write(orm_execute_state) -> None:
+    mapper = orm_execute_state.bind_mapper
+    if orm_execute_state.is_insert and mapper is not None and mapper.class_ is SLALog:
+        # Bulk-inserted logs (SLA backfill); their ids are not known here
+        _pending(orm_execute_state.session)["all"] = True
+        return
+    if not orm_execute_state.is_update:
+        return
+    if mapper is None or mapper.class_ not in (Ticket, SLALog, SLARule):
+        return
+    parameters = orm_execute_state.parameters
+    pending = _pending(orm_execute_state.session)
+    if (
+        mapper.class_ is not SLARule
+        and isinstance(parameters, list)
+        and parameters
+        and all("id" in row for row in parameters)
+    ):
+        # executemany UPDATE by primary key (bulk status changes, SLA sweeps)
+        pending["tickets" if mapper.class_ is Ticket else "logs"].update(row["id"] for row in parameters)
+    else:
+        pending["all"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _report_after_commit(session: Session) -> None:
+    if session.in_nested_transaction():
+        # A savepoint was released; the changes are not visible to other sessions yet
+        return
+    pending = session.info.pop("sla_deadlines", None)
+    if not pending:
+        return
+    if pending["all"]:
+        sla_deadline_scheduler.request_rebuild()
+        return
+    if pending["logs"]:
+        sla_deadline_scheduler.mark_logs(pending["logs"])
+    if pending["tickets"]:
+        sla_deadline_scheduler.mark_tickets(pending["tickets"])
+    if pending["rules"]:
+        sla_deadline_scheduler.mark_rules(pending["rules"])
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_after_rollback(session: Session, previous_transaction) -> None:
+    # A savepoint rollback (e.g. a failed auto-assign in create_ticket) leaves the
+    # outer transaction's writes to be committed
+    if not previous_transaction.nested:
+        session.info.pop("sla_deadlines", None)
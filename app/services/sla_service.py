@@ -3,10 +3,12 @@ SLA service for business logic
 """
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from typing import Optional, List, Tuple
+from typing import Dict, Iterable, Optional, List, Tuple, Union
 from app.models import SLARule, SLALog, Ticket, Department
 from app.core.enums import TicketPriority, TicketCategory
 from app.schemas.sla import SLARuleCreate, SLARuleUpdate
+from app.services.count_service import COUNT_EXACT, count_query
+from app.services.sla_rule_matcher_service import CompiledSLARule, sla_rule_matcher
 
 
 def find_matching_sla_rule(
@@ -14,7 +16,7 @@ def find_matching_sla_rule(
     priority: TicketPriority,
     category: TicketCategory,
     department_id: Optional[int] = None
-) -> Optional[SLARule]:
+) -> Optional[CompiledSLARule]:
     """
     Find matching SLA rule for a ticket
     
@@ -27,93 +29,25 @@ def find_matching_sla_rule(
     6. category only
     7. department only
     8. default (all None)
-    """
-    # Try most specific first
-    query = db.query(SLARule).filter(SLARule.is_active == True)
-    
-    # Try: priority + category + department
-    if department_id:
-        rule = query.filter(
-            SLARule.priority == priority,
-            SLARule.category == category,
-            SLARule.department_id == department_id
-        ).first()
-        if rule:
-            return rule
-    
-    # Try: priority + category
-    rule = query.filter(
-        SLARule.priority == priority,
-        SLARule.category == category,
-        SLARule.department_id.is_(None)
-    ).first()
-    if rule:
-        return rule
-    
-    # Try: priority + department
-    if department_id:
-        rule = query.filter(
-            SLARule.priority == priority,
-            SLARule.category.is_(None),
-            SLARule.department_id == department_id
-        ).first()
-        if rule:
-            return rule
-    
-    # Try: category + department
-    if department_id:
-        rule = query.filter(
-            SLARule.priority.is_(None),
-            SLARule.category == category,
-            SLARule.department_id == department_id
-        ).first()
-        if rule:
-            return rule
-    
-    # Try: priority only
-    rule = query.filter(
-        SLARule.priority == priority,
-        SLARule.category.is_(None),
-        SLARule.department_id.is_(None)
-    ).first()
-    if rule:
-        return rule
-    
-    # Try: category only
-    rule = query.filter(
-        SLARule.priority.is_(None),
-        SLARule.category == category,
-        SLARule.department_id.is_(None)
-    ).first()
-    if rule:
-        return rule
-    
-    # Try: department only
-    if department_id:
-        rule = query.filter(
-            SLARule.priority.is_(None),
-            SLARule.category.is_(None),
-            SLARule.department_id == department_id
-        ).first()
-        if rule:
-            return rule
-    
-    # Try: default (all None)
-    rule = query.filter(
-        SLARule.priority.is_(None),
-        SLARule.category.is_(None),
-        SLARule.department_id.is_(None)
-    ).first()
     
-    return rule
+    Matched against the compiled rule index (no query unless the rules
+    changed); returns a snapshot, use db.get(SLARule, rule.id) for the row.
+    """
+    return sla_rule_matcher.match(db, priority, category, department_id)
+
+
+def match_sla_rules_for_tickets(db: Session, tickets: Iterable[Ticket]) -> Dict[int, Optional[CompiledSLARule]]:
+    """Matching SLA rule of each ticket (ticket id -> rule or None), for re-evaluating many tickets"""
+    return sla_rule_matcher.match_tickets(db, tickets)
 
 
 def create_sla_log(
     db: Session,
     ticket: Ticket,
-    sla_rule: SLARule
+    sla_rule: Union[SLARule, CompiledSLARule],
+    commit: bool = True
 ) -> SLALog:
-    """Create SLA log for a ticket"""
+    """Create SLA log for a ticket (commit=False only flushes, for callers owning the transaction)"""
     now = datetime.utcnow()
     
     target_response_time = now + timedelta(minutes=sla_rule.response_time_minutes)
@@ -127,8 +61,11 @@ def create_sla_log(
     )
     
     db.add(sla_log)
-    db.commit()
-    db.refresh(sla_log)
+    if commit:
+        db.commit()
+        db.refresh(sla_log)
+    else:
+        db.flush()
     
     return sla_log
 
@@ -139,7 +76,26 @@ def update_sla_log_status(
     ticket: Ticket
 ) -> SLALog:
     """Update SLA log status based on current ticket state"""
-    now = datetime.utcnow()
+    apply_sla_log_status(sla_log, ticket)
+    
+    db.commit()
+    db.refresh(sla_log)
+    
+    return sla_log
+
+
+def apply_sla_log_status(
+    sla_log: SLALog,
+    ticket: Ticket,
+    now: Optional[datetime] = None
+) -> SLALog:
+    """
+    Recalculate SLA log status from the ticket state without committing
+    
+    Used by update_sla_log_status and by batch callers that flush many logs
+    in one transaction.
+    """
+    now = now or datetime.utcnow()
     
     # Update response status
     if ticket.first_response_at:
@@ -179,9 +135,6 @@ def update_sla_log_status(
             sla_log.escalated = True
             sla_log.escalated_at = now
     
-    db.commit()
-    db.refresh(sla_log)
-    
     return sla_log
 
 
@@ -203,13 +156,14 @@ def list_sla_rules(
     db: Session,
     skip: int = 0,
     limit: int = 50,
-    is_active: Optional[bool] = None
-) -> Tuple[List[SLARule], int]:
-    """List SLA rules with pagination"""
+    is_active: Optional[bool] = None,
+    count_mode: str = COUNT_EXACT
+) -> Tuple[List[SLARule], Optional[int]]:
+    """List SLA rules with pagination (total is None for COUNT_NONE)"""
     query = db.query(SLARule)
     if is_active is not None:
         query = query.filter(SLARule.is_active == is_active)
-    total = query.count()
+    total = count_query(query, count_mode)
     # order_by must be called before offset/limit
     items = query.order_by(SLARule.name).offset(skip).limit(limit).all()
     return items, total
@@ -253,18 +207,16 @@ def list_sla_logs(
     sla_rule_id: Optional[int] = None,
     response_status: Optional[str] = None,
     resolution_status: Optional[str] = None,
-    escalated: Optional[bool] = None
-) -> Tuple[List[SLALog], int]:
+    escalated: Optional[bool] = None,
+    count_mode: str = COUNT_EXACT
+) -> Tuple[List[SLALog], Optional[int]]:
     """
     لیست لاگ‌های SLA با فیلتر و pagination
-    List SLA logs with filters and pagination
+    List SLA logs with filters and pagination (total is None for COUNT_NONE)
     """
     from sqlalchemy.orm import joinedload
     
-    query = db.query(SLALog).options(
-        joinedload(SLALog.ticket),
-        joinedload(SLALog.sla_rule)
-    )
+    query = db.query(SLALog)
     
     # اعمال فیلترها
     if ticket_id:
@@ -279,10 +231,16 @@ def list_sla_logs(
         query = query.filter(SLALog.escalated == escalated)
     
     # شمارش کل
-    total = query.count()
+    total = count_query(query, count_mode)
     
     # مرتب‌سازی و pagination
-    items = query.order_by(SLALog.created_at.desc()).offset(skip).limit(limit).all()
+    items = (
+        query.options(joinedload(SLALog.ticket), joinedload(SLALog.sla_rule))
+        .order_by(SLALog.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
     
     return items, total
 
@@ -0,0 +1,236 @@
+"""
+Set-based bulk actions on tickets (status, assign, unassign, delete)
+"""
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.enums import TicketStatus
+from app.models import Comment, SLALog, Ticket, TicketHistory, User
+
+logger = logging.getLogger(__name__)
+
+BULK_ACTIONS = ("status", "assign", "unassign", "delete")
+
+# Tickets per transaction; keeps lock time and statement size bounded
+BULK_CHUNK_SIZE = 200
+
+# Collections the ORM cascades on delete; loading them per chunk avoids one SELECT per ticket
+_DELETE_LOADERS = (
+    selectinload(Ticket.attachments),
+    selectinload(Ticket.history),
+    selectinload(Ticket.sla_logs),
+    selectinload(Ticket.time_logs),
+    selectinload(Ticket.custom_field_values),
+)
+
+
+class BulkActionResult:
+    """Outcome of a bulk action"""
+
+    def __init__(self):
+        self.success_ids: List[int] = []
+        self.failed_ids: List[int] = []
+        # (ticket_id, previous_status) of tickets whose status changed, for notifications
+        self.status_changes: List[Tuple[int, TicketStatus]] = []
+
+
+def run_bulk_action(
+    db: Session,
+    current_user: User,
+    ticket_ids: List[int],
+    action: str,
+    status: Optional[TicketStatus] = None,
+    assigned_to_id: Optional[int] = None,
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> BulkActionResult:
+    """
+    Apply one action to many tickets with a few statements per chunk
+
+    Each chunk loads its tickets in one query restricted to what the user
+    may access, applies the change with a single UPDATE (or ORM delete),
+    inserts all history rows at once, recalculates the SLA logs of the
+    chunk together and commits once. A failing chunk is rolled back and
+    reported as failed without affecting the others. Notifications are not
+    sent here; see fan_out_status_notifications.
+
+    Args:
+        db: Database session
+        current_user: User performing the action
+        ticket_ids: Target ticket IDs (duplicates are ignored)
+        action: One of BULK_ACTIONS
+        status: New status (action=status)
+        assigned_to_id: Assignee ID (action=assign)
+        chunk_size: Tickets per transaction
+
+    Returns:
+        BulkActionResult: Succeeded/failed IDs and status changes to notify
+    """
+    from app.services.ticket_service import ticket_access_filter
+
+    result = BulkActionResult()
+    ids = list(dict.fromkeys(ticket_ids))
+
+    assignee = None
+    if action == "assign" and assigned_to_id:
+        assignee = db.query(User).filter(User.id == assigned_to_id).first()
+    if (
+        action not in BULK_ACTIONS
+        or (action == "status" and not status)
+        or (action == "assign" and not assignee)
+    ):
+        result.failed_ids = ids
+        return result
+
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        try:
+            query = db.query(Ticket).filter(Ticket.id.in_(chunk), ticket_access_filter(current_user))
+            if action == "delete":
+                query = query.options(*_DELETE_LOADERS)
+            tickets = query.all()
+            found = {ticket.id for ticket in tickets}
+
+            if tickets:
+                if action == "status":
+                    changes = _apply_status(db, tickets, status, current_user.id)
+                elif action == "delete":
+                    changes = []
+                    _delete_tickets(db, tickets)
+                else:
+                    changes = []
+                    _apply_assignment(db, tickets, assignee, current_user.id)
+                db.commit()
+                result.status_changes.extend(changes)
+
+            result.success_ids.extend(i for i in chunk if i in found)
+            result.failed_ids.extend(i for i in chunk if i not in found)
+        except Exception as exc:
+            db.rollback()
+            result.failed_ids.extend(chunk)
+            logger.error("Bulk %s failed for tickets %s..%s: %s", action, chunk[0], chunk[-1], exc)
+
+    return result
+
+
+def _apply_status(
+    db: Session,
+    tickets: List[Ticket],
+    new_status: TicketStatus,
+    changed_by_id: int,
+) -> List[Tuple[int, TicketStatus]]:
+    from app.services.sla_service import apply_sla_log_status
+    from app.services.ticket_rollup_service import apply_fact_changes, load_ticket_facts
+    from app.services.ticket_service import status_transition_values
+
+    by_id = {ticket.id: ticket for ticket in tickets}
+    now = datetime.utcnow()
+    rows = []
+    history = []
+    changes = []
+    for ticket in tickets:
+        previous_status = ticket.status
+        values = status_transition_values(ticket, new_status, now)
+        rows.append({"id": ticket.id, **values})
+        history.append({
+            "ticket_id": ticket.id,
+            "status": new_status,
+            "changed_by_id": changed_by_id,
+            "comment": f"تغییر وضعیت از {previous_status.value} به {new_status.value} (Bulk Action)",
+        })
+        changes.append((ticket.id, previous_status))
+        # Keep the loaded objects current without marking them dirty
+        for key, value in values.items():
+            set_committed_value(ticket, key, value)
+
+    # One executemany UPDATE keyed by primary key; it bypasses the flush hooks
+    # that maintain the report rollups, so move the contributions here
+    connection = db.connection()
+    facts_before = load_ticket_facts(connection, by_id)
+    db.execute(update(Ticket), rows)
+    apply_fact_changes(connection, facts_before, load_ticket_facts(connection, by_id))
+    db.execute(insert(TicketHistory), history)
+
+    sla_logs = (
+        db.query(SLALog)
+        .options(joinedload(SLALog.sla_rule))
+        .filter(SLALog.ticket_id.in_(by_id))
+        .all()
+    )
+    for sla_log in sla_logs:
+        apply_sla_log_status(sla_log, by_id[sla_log.ticket_id], now)
+
+    return changes
+
+
+def _apply_assignment(
+    db: Session,
+    tickets: List[Ticket],
+    assignee: Optional[User],
+    changed_by_id: int,
+) -> None:
+    ids = [ticket.id for ticket in tickets]
+    db.execute(
+        update(Ticket)
+        .where(Ticket.id.in_(ids))
+        .values(assigned_to_id=assignee.id if assignee else None)
+        .execution_options(synchronize_session=False)
+    )
+    comment = f"تخصیص به {assignee.full_name} (Bulk Action)" if assignee else "حذف تخصیص (Bulk Action)"
+    db.execute(insert(TicketHistory), [
+        {
+            "ticket_id": ticket.id,
+            "status": ticket.status,
+            "changed_by_id": changed_by_id,
+            "comment": comment,
+        }
+        for ticket in tickets
+    ])
+
+
+def _delete_tickets(db: Session, tickets: List[Ticket]) -> None:
+    # comments is a plain backref without delete cascade: remove them in SQL and
+    # tell the ORM the collections are empty so it does not lazy-load them
+    db.query(Comment).filter(
+        Comment.ticket_id.in_([ticket.id for ticket in tickets])
+    ).delete(synchronize_session=False)
+    for ticket in tickets:
+        set_committed_value(ticket, "comments", [])
+        db.delete(ticket)
+
+
+async def fan_out_status_notifications(status_changes: List[Tuple[int, TicketStatus]]) -> None:
+    """
+    Send status-change notifications for a finished bulk action
+
+    Runs after the response (FastAPI background task) on its own session;
+    tickets are reloaded with their creators in one query.
+
+    Args:
+        status_changes: (ticket_id, previous_status) pairs from BulkActionResult
+    """
+    if not status_changes:
+        return
+
+    from app.database import SessionLocal
+    from app.services.notification_service import notify_ticket_status_changed
+
+    previous = dict(status_changes)
+    db = SessionLocal()
+    try:
+        tickets = (
+            db.query(Ticket)
+            .options(joinedload(Ticket.user))
+            .filter(Ticket.id.in_(previous))
+            .all()
+        )
+        for ticket in tickets:
+            await notify_ticket_status_changed(ticket, previous[ticket.id], db)
+    except Exception as exc:
+        logger.error("Bulk status notifications failed: %s", exc, exc_info=True)
+    finally:
+        db.close()
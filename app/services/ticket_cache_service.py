@@ -0,0 +1,205 @@
+"""
+Hot-ticket read cache for GET /api/tickets/{id} and /number/{ticket_number}
+
+Holds the serialized TicketResponse of recently read tickets together with
+its ETag, Last-Modified and the fields needed for the access check, so a
+repeated read (or a conditional one answered with 304) needs neither the
+ticket query with its relations nor serialization.
+
+Entries are dropped when a session flushes or commits a change to the
+ticket (ticket_service writes, bulk actions, comments/assignments done
+through the ORM) and the whole cache is cleared when users or branches
+change, since they are embedded in the payload. Invalidations advance a
+version stamp: a reader only stores what it loaded if no invalidation
+happened in between.
+
+The cache is per process, so those hooks do not see writes made by other
+workers. Every hit is therefore revalidated with one primary-key lookup of
+tickets.version (revalidate), a counter every UPDATE of the row bumps,
+before it is served or answered with 304; an entry whose version moved is
+dropped and reloaded. (updated_at cannot serve: SQLite stores it with
+one-second resolution.) The ETag is built from the version as well. A hit
+thus still costs one small round trip, but no relationship loading and no
+serialization. Entries are kept at most TICKET_CACHE_TTL_SECONDS, which
+also bounds how long a change to an embedded user or branch made in another
+worker can show.
+"""
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import Base
+from app.models import Branch, Ticket, User
+from app.schemas.ticket import TicketResponse
+
+_MAX_ENTRIES = 5000
+
+# Objects embedded in TicketResponse whose change affects many tickets
+_SHARED_MODELS = (User, Branch)
+
+
+class CachedTicket:
+    """Serialized ticket plus what is needed to authorize and validate it"""
+
+    __slots__ = (
+        "id", "ticket_number", "user_id", "branch_id", "version", "payload", "etag", "last_modified", "stored_at"
+    )
+
+    def __init__(self, ticket: Ticket, payload: bytes):
+        self.id = ticket.id
+        self.ticket_number = ticket.ticket_number
+        self.user_id = ticket.user_id
+        self.branch_id = ticket.branch_id
+        self.version = ticket.version
+        self.payload = payload
+        # Row version first; the payload hash covers embedded users and branches
+        self.etag = f'"{ticket.id}-{ticket.version}-{hashlib.sha1(payload).hexdigest()[:12]}"'
+        self.last_modified = _http_date(ticket.updated_at or ticket.created_at)
+        self.stored_at = time.monotonic()
+
+
+class TicketReadCache:
+    """Version-stamped cache of serialized tickets keyed by ticket id"""
+
+    def __init__(self, max_entries: int = _MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[int, CachedTicket] = {}
+        self._ids_by_number: Dict[str, int] = {}
+        self._version = 0
+
+    def version(self) -> int:
+        """Version stamp to take before loading a ticket from the database"""
+        with self._lock:
+            return self._version
+
+    def get(self, ticket_id: int) -> Optional[CachedTicket]:
+        with self._lock:
+            entry = self._entries.get(ticket_id)
+            if entry is None:
+                return None
+            if time.monotonic() - entry.stored_at > settings.TICKET_CACHE_TTL_SECONDS:
+                self._entries.pop(ticket_id, None)
+                return None
+            return entry
+
+    def get_by_number(self, ticket_number: str) -> Optional[CachedTicket]:
+        with self._lock:
+            ticket_id = self._ids_by_number.get(ticket_number)
+        return self.get(ticket_id) if ticket_id is not None else None
+
+    def revalidate(self, db: Session, entry: CachedTicket) -> Optional[CachedTicket]:
+        """
+        Check a hit against the ticket's current version (other workers' writes)
+
+        Returns:
+            ``entry`` if the ticket is unchanged, otherwise None (entry dropped)
+        """
+        version = db.query(Ticket.version).filter(Ticket.id == entry.id).scalar()
+        if version is not None and version == entry.version:
+            return entry
+        self.invalidate([entry.id])
+        return None
+
+    def store(self, ticket: Ticket, stamp: int) -> CachedTicket:
+        """Serialize a loaded ticket and cache it unless it changed since ``stamp``"""
+        entry = CachedTicket(ticket, TicketResponse.model_validate(ticket).model_dump_json().encode("utf-8"))
+        with self._lock:
+            if stamp == self._version:
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+                    self._ids_by_number.clear()
+                self._entries[entry.id] = entry
+                self._ids_by_number[entry.ticket_number] = entry.id
+        return entry
+
+    def invalidate(self, ticket_ids) -> None:
+        with self._lock:
+            self._version += 1
+            for ticket_id in ticket_ids:
+                entry = self._entries.pop(ticket_id, None)
+                if entry is not None:
+                    self._ids_by_number.pop(entry.ticket_number, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self._ids_by_number.clear()
+
+
+ticket_read_cache = TicketReadCache()
+
+
+def _http_date(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        # SQLite returns naive UTC timestamps
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _invalidate(session: Session, ticket_ids: set, shared: bool) -> None:
+    if shared:
+        ticket_read_cache.clear()
+    elif ticket_ids:
+        ticket_read_cache.invalidate(ticket_ids)
+    pending = session.info.setdefault("ticket_cache", {"ids": set(), "shared": False})
+    pending["ids"].update(ticket_ids)
+    pending["shared"] = pending["shared"] or shared
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_after_flush(session: Session, flush_context) -> None:
+    ticket_ids = set()
+    shared = False
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Ticket):
+            ticket_ids.add(obj.id)
+        elif isinstance(obj, _SHARED_MODELS):
+            shared = True
+    ticket_ids.discard(None)
+    if ticket_ids or shared:
+        _invalidate(session, ticket_ids, shared)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_on_bulk_write(orm_execute_state) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in (Ticket, *_SHARED_MODELS):
+        # Affected ids are not known up front; bulk writes are rare enough to drop everything
+        _invalidate(orm_execute_state.session, set(), True)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    # Readers in other sessions may have cached the pre-commit rows meanwhile
+    pending = session.info.pop("ticket_cache", None)
+    if pending:
+        if pending["shared"]:
+            ticket_read_cache.clear()
+        else:
+            ticket_read_cache.invalidate(pending["ids"])
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_after_rollback(session: Session, previous_transaction) -> None:
+    # A savepoint rollback leaves the outer transaction's writes to be committed
+    if not previous_transaction.nested:
+        session.info.pop("ticket_cache", None)
+
+
+@event.listens_for(Base.metadata, "after_create")
+@event.listens_for(Base.metadata, "after_drop")
+def _clear_after_schema_change(target, connection, **kw) -> None:
+    ticket_read_cache.clear()
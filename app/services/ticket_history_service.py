@@ -9,8 +9,8 @@ from app.models import TicketHistory
 from app.schemas.ticket_history import TicketHistoryCreate
 
 
-def create_ticket_history(db: Session, data: TicketHistoryCreate) -> TicketHistory:
-    """Create a history entry for a ticket."""
+def create_ticket_history(db: Session, data: TicketHistoryCreate, commit: bool = True) -> TicketHistory:
+    """Create a history entry for a ticket (commit=False only flushes)."""
     history = TicketHistory(
         ticket_id=data.ticket_id,
         status=data.status,
@@ -18,8 +18,11 @@ def create_ticket_history(db: Session, data: TicketHistoryCreate) -> TicketHisto
         comment=data.comment,
     )
     db.add(history)
-    db.commit()
-    db.refresh(history)
+    if commit:
+        db.commit()
+        db.refresh(history)
+    else:
+        db.flush()
     return history
 
 
@@ -0,0 +1,106 @@
+"""
+Ticket number allocation (T-YYYYMMDD-####)
+"""
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Ticket, TicketNumberSequence
+
+logger = logging.getLogger(__name__)
+
+
+class TicketNumberAllocator:
+    """
+    Hand out per-day ticket numbers from an atomically bumped counter row
+
+    Each reservation runs in its own short transaction on a separate
+    connection, so the counter row is locked only for one UPDATE and never
+    for the lifetime of the caller's ticket transaction. With block_size > 1
+    a process reserves several numbers at once and serves them from memory;
+    numbers stay unique across processes but may be out of creation order
+    between workers, and a restart leaves gaps.
+    """
+
+    def __init__(self, block_size: int = 1, max_attempts: int = 5):
+        self.block_size = max(1, block_size)
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # (database url, day) -> (next value to hand out, last reserved value)
+        self._blocks: Dict[Tuple[str, str], Tuple[int, int]] = {}
+
+    def next_number(self, db: Session, now: Optional[datetime] = None) -> str:
+        """
+        Allocate the next ticket number for the day of ``now``
+
+        Args:
+            db: Database session (only its engine is used)
+            now: Allocation time (defaults to local now, like the number itself)
+
+        Returns:
+            str: Ticket number; the suffix grows past 4 digits after 9999 tickets a day
+        """
+        day = (now or datetime.now()).strftime("%Y%m%d")
+        engine = db.get_bind().engine
+        key = (str(engine.url), day)
+
+        with self._lock:
+            next_value, last_value = self._blocks.get(key, (1, 0))
+            if next_value > last_value:
+                last_value = self._reserve(engine, day, self.block_size)
+                next_value = last_value - self.block_size + 1
+            self._blocks[key] = (next_value + 1, last_value)
+
+        return f"T-{day}-{str(next_value).zfill(4)}"
+
+    def reset(self) -> None:
+        """Forget blocks reserved by this process (unused numbers become gaps)"""
+        with self._lock:
+            self._blocks.clear()
+
+    def _reserve(self, engine, day: str, count: int) -> int:
+        """Bump the day's counter by ``count`` and return the new last value"""
+        for _ in range(self.max_attempts):
+            try:
+                with engine.begin() as conn:
+                    return self._bump(conn, day, count)
+            except IntegrityError:
+                # Another worker created the day's row first; bump it instead
+                logger.debug("Ticket number counter for %s created concurrently, retrying", day)
+        raise RuntimeError(f"Could not reserve ticket numbers for {day}")
+
+    def _bump(self, conn: Connection, day: str, count: int) -> int:
+        updated = conn.execute(
+            update(TicketNumberSequence)
+            .where(TicketNumberSequence.day == day)
+            .values(last_value=TicketNumberSequence.last_value + count)
+        ).rowcount
+        if updated:
+            # The UPDATE holds the row (or database) write lock until commit
+            return conn.execute(
+                select(TicketNumberSequence.last_value).where(TicketNumberSequence.day == day)
+            ).scalar_one()
+
+        # First allocation of the day: continue after tickets numbered before the counter existed
+        last_value = _max_existing_suffix(conn, day) + count
+        conn.execute(insert(TicketNumberSequence).values(day=day, last_value=last_value))
+        return last_value
+
+
+def _max_existing_suffix(conn: Connection, day: str) -> int:
+    prefix = f"T-{day}-"
+    numbers = conn.execute(
+        select(Ticket.ticket_number).where(Ticket.ticket_number.like(f"{prefix}%"))
+    ).scalars()
+    suffixes = [int(n[len(prefix):]) for n in numbers if n[len(prefix):].isdigit()]
+    return max(suffixes, default=0)
+
+
+ticket_number_allocator = TicketNumberAllocator(block_size=settings.TICKET_NUMBER_BLOCK_SIZE)
@@ -0,0 +1,218 @@
+"""
+Incrementally maintained daily ticket rollups (ticket_daily_rollups)
+
+Each ticket contributes one "fact" (count 1, resolution time, cost) to the
+rollup row of its creation day and current branch, department, priority,
+status and category. Session hooks read the facts of the tickets a flush
+touches before and after it and apply the difference with upserts in the
+same transaction, so reports never see a ticket change without its rollup
+change. Set-based writers that bypass the unit of work (bulk status
+updates) call load_ticket_facts/apply_fact_changes themselves.
+
+rebuild_ticket_rollups recomputes the table from tickets (migration v26,
+scripts/rebuild_ticket_rollups.py) after imports or manual SQL edits.
+"""
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, event, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.timeutils import naive_utc
+from app.models import Ticket, TicketDailyRollup
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_KEY_COLUMNS = ("day", "branch_id", "department_id", "priority", "status", "category")
+ROLLUP_MEASURES = ("ticket_count", "resolved_count", "resolution_seconds_sum", "cost_sum")
+
+_FACT_COLUMNS = (
+    Ticket.id,
+    Ticket.created_at,
+    Ticket.branch_id,
+    Ticket.department_id,
+    Ticket.priority,
+    Ticket.status,
+    Ticket.category,
+    Ticket.resolved_at,
+    Ticket.cost,
+)
+
+_LOAD_BATCH_SIZE = 500
+_INSERT_BATCH_SIZE = 1000
+
+RollupKey = Tuple[date, int, int, str, str, str]
+Fact = Tuple[RollupKey, Tuple[int, int, float, Decimal]]
+
+
+def _value(member) -> str:
+    return member.value if hasattr(member, "value") else str(member)
+
+
+def ticket_fact(row) -> Fact:
+    """
+    Rollup key and measures of one ticket
+
+    Args:
+        row: Row (or object) with the columns of _FACT_COLUMNS
+
+    Returns:
+        Tuple of (rollup key, (count, resolved count, resolution seconds, cost))
+    """
+    created_at = naive_utc(row.created_at)
+    resolved_at = naive_utc(row.resolved_at)
+    day = created_at.date() if created_at else datetime.utcnow().date()
+    key = (
+        day,
+        row.branch_id or 0,
+        row.department_id or 0,
+        _value(row.priority),
+        _value(row.status),
+        _value(row.category),
+    )
+    resolved = resolved_at is not None and created_at is not None
+    seconds = (resolved_at - created_at).total_seconds() if resolved else 0.0
+    return key, (1, 1 if resolved else 0, seconds, Decimal(row.cost or 0))
+
+
+def load_ticket_facts(connection: Connection, ticket_ids: Iterable[int]) -> Dict[int, Fact]:
+    """
+    Current facts of the given tickets as stored in the database
+
+    Args:
+        connection: Connection inside the writer's transaction
+        ticket_ids: Ticket IDs (missing tickets are skipped)
+
+    Returns:
+        Dict of ticket ID -> fact
+    """
+    ids = sorted(set(ticket_ids))
+    facts: Dict[int, Fact] = {}
+    for start in range(0, len(ids), _LOAD_BATCH_SIZE):
+        rows = connection.execute(
+            select(*_FACT_COLUMNS).where(Ticket.id.in_(ids[start:start + _LOAD_BATCH_SIZE]))
+        )
+        for row in rows:
+            facts[row.id] = ticket_fact(row)
+    return facts
+
+
+def apply_fact_changes(connection: Connection, before: Dict[int, Fact], after: Dict[int, Fact]) -> None:
+    """
+    Move ticket contributions from their old rollup rows to their new ones
+
+    Args:
+        connection: Connection inside the writer's transaction
+        before: Facts before the write (tickets updated or deleted)
+        after: Facts after the write (tickets created or updated)
+    """
+    deltas: Dict[RollupKey, List] = {}
+    for facts, sign in ((before, -1), (after, 1)):
+        for key, measures in facts.values():
+            delta = deltas.setdefault(key, [0, 0, 0.0, Decimal(0)])
+            for i, measure in enumerate(measures):
+                delta[i] += sign * measure
+    rows = [
+        {**dict(zip(ROLLUP_KEY_COLUMNS, key)), **dict(zip(ROLLUP_MEASURES, delta))}
+        for key, delta in deltas.items()
+        if any(delta)
+    ]
+    if rows:
+        _upsert(connection, rows)
+
+
+def _upsert(connection: Connection, rows: List[dict]) -> None:
+    table = TicketDailyRollup.__table__
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        statement = dialect_insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(ROLLUP_KEY_COLUMNS),
+            set_={name: table.c[name] + statement.excluded[name] for name in ROLLUP_MEASURES},
+        )
+        connection.execute(statement, rows)
+        return
+
+    for row in rows:
+        key_filter = [table.c[name] == row[name] for name in ROLLUP_KEY_COLUMNS]
+        result = connection.execute(
+            update(table)
+            .where(*key_filter)
+            .values({name: table.c[name] + row[name] for name in ROLLUP_MEASURES})
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table), row)
+
+
+def rebuild_ticket_rollups(db: Session, batch_size: int = _INSERT_BATCH_SIZE) -> int:
+    """
+    Recompute ticket_daily_rollups from the tickets table
+
+    Tickets are streamed, so memory grows with the number of rollup rows,
+    not tickets. Runs in one transaction; on PostgreSQL run it when ticket
+    writes are paused, or they may be counted twice or not at all.
+
+    Args:
+        db: Database session
+        batch_size: Tickets fetched / rows inserted per round trip
+
+    Returns:
+        int: Number of tickets rolled up
+    """
+    totals: Dict[RollupKey, List] = {}
+    count = 0
+    rows = db.execute(select(*_FACT_COLUMNS).execution_options(yield_per=batch_size))
+    for row in rows:
+        key, measures = ticket_fact(row)
+        total = totals.setdefault(key, [0, 0, 0.0, Decimal(0)])
+        for i, measure in enumerate(measures):
+            total[i] += measure
+        count += 1
+
+    connection = db.connection()
+    connection.execute(delete(TicketDailyRollup))
+    values = [
+        {**dict(zip(ROLLUP_KEY_COLUMNS, key)), **dict(zip(ROLLUP_MEASURES, total))}
+        for key, total in totals.items()
+    ]
+    for start in range(0, len(values), batch_size):
+        connection.execute(insert(TicketDailyRollup), values[start:start + batch_size])
+    db.commit()
+    logger.info("Rebuilt ticket rollups: %d tickets in %d rows", count, len(values))
+    return count
+
+
+@event.listens_for(Session, "before_flush")
+def _capture_facts_before_flush(session: Session, flush_context, instances) -> None:
+    session.info.pop("ticket_rollup_before", None)
+    ids = {obj.id for obj in session.deleted if isinstance(obj, Ticket)}
+    ids.update(
+        obj.id
+        for obj in session.dirty
+        if isinstance(obj, Ticket) and session.is_modified(obj, include_collections=False)
+    )
+    ids.discard(None)
+    if ids:
+        session.info["ticket_rollup_before"] = load_ticket_facts(session.connection(), ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_facts_after_flush(session: Session, flush_context) -> None:
+    before = session.info.pop("ticket_rollup_before", {})
+    deleted = {obj.id for obj in session.deleted if isinstance(obj, Ticket)}
+    ids = {
+        obj.id
+        for obj in (*session.new, *session.dirty)
+        if isinstance(obj, Ticket) and obj.id is not None and obj.id not in deleted
+    }
+    if not ids and not before:
+        return
+    connection = session.connection()
+    apply_fact_changes(connection, before, load_ticket_facts(connection, ids))
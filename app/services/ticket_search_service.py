@@ -0,0 +1,231 @@
+"""
+Full-text ticket search (title, description and public comments)
+
+On SQLite tickets are indexed in the ``ticket_search`` FTS5 table, kept in
+sync by a session ``after_flush`` hook, and results are ranked with bm25.
+Other databases (and SQLite before migration v24) fall back to ILIKE
+matching in the regular list order.
+"""
+import logging
+import re
+from typing import Iterable, List, Optional, Set
+
+from sqlalchemy import Float, Integer, bindparam, event, exists, false, inspect, or_, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Query, Session
+
+from app.core.text import normalize_persian
+from app.models import Comment, Ticket
+from app.models.ticket_search import TICKET_SEARCH_TABLE
+
+logger = logging.getLogger(__name__)
+
+# Longer queries rarely help and make MATCH expensive
+MAX_SEARCH_TERMS = 8
+
+# bm25 column weights: title, description, comments
+_RANK_WEIGHTS = (10.0, 4.0, 1.0)
+
+_TERM_RE = re.compile(r"\w+")
+
+_REINDEX_BATCH_SIZE = 500
+
+
+def search_terms(search_text: Optional[str]) -> List[str]:
+    """
+    Split a user query into normalized search terms
+
+    Args:
+        search_text: Raw query as typed by the user
+
+    Returns:
+        List of terms (at most MAX_SEARCH_TERMS, duplicates removed)
+    """
+    terms: List[str] = []
+    for term in _TERM_RE.findall(normalize_persian(search_text or "")):
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_SEARCH_TERMS]
+
+
+def build_match_expression(terms: Iterable[str]) -> str:
+    """Build an FTS5 MATCH expression: every term must match as a word prefix"""
+    # Terms only contain word characters, so quoting them is enough to disable FTS syntax
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def apply_ticket_search(db: Session, query: Query, search_text: str) -> Query:
+    """
+    Restrict a ticket query to search matches and order it by relevance
+
+    The caller's filters (role scoping, status, branch, ...) are kept, so
+    search never widens what a user may see.
+
+    Args:
+        db: Database session
+        query: Filtered, unordered ticket query
+        search_text: Raw query as typed by the user
+
+    Returns:
+        Query: Ordered query (best match first on SQLite)
+    """
+    from app.services.ticket_service import TICKET_LIST_ORDER
+
+    terms = search_terms(search_text)
+    if not terms:
+        return query.filter(false())
+
+    if not _uses_fts(db):
+        for term in terms:
+            pattern = f"%{term}%"
+            query = query.filter(or_(
+                Ticket.title.ilike(pattern),
+                Ticket.description.ilike(pattern),
+                exists().where(
+                    Comment.ticket_id == Ticket.id,
+                    Comment.is_internal.is_(False),
+                    Comment.comment.ilike(pattern),
+                ),
+            ))
+        return query.order_by(*TICKET_LIST_ORDER)
+
+    weights = ", ".join(str(w) for w in _RANK_WEIGHTS)
+    matches = (
+        text(
+            f"SELECT rowid AS ticket_id, bm25({TICKET_SEARCH_TABLE}, {weights}) AS rank "
+            f"FROM {TICKET_SEARCH_TABLE} WHERE {TICKET_SEARCH_TABLE} MATCH :match"
+        )
+        .bindparams(match=build_match_expression(terms))
+        .columns(ticket_id=Integer, rank=Float)
+        .subquery("ticket_search_matches")
+    )
+    return (
+        query.join(matches, matches.c.ticket_id == Ticket.id)
+        .order_by(matches.c.rank.asc(), Ticket.id.desc())
+    )
+
+
+def reindex_tickets(connection: Connection, ticket_ids: Iterable[int]) -> None:
+    """
+    Rewrite the search rows of the given tickets from the current table data
+
+    Tickets that no longer exist simply lose their row.
+
+    Args:
+        connection: Connection inside the writer's transaction
+        ticket_ids: IDs of tickets whose text changed
+    """
+    ids = sorted(set(ticket_ids))
+    for start in range(0, len(ids), _REINDEX_BATCH_SIZE):
+        _reindex_batch(connection, ids[start:start + _REINDEX_BATCH_SIZE])
+
+
+def rebuild_search_index(db: Session) -> int:
+    """
+    Rebuild the whole search index (after migration or bulk imports)
+
+    Args:
+        db: Database session
+
+    Returns:
+        int: Number of indexed tickets
+    """
+    connection = db.connection()
+    if not _search_table_exists(connection):
+        raise RuntimeError(f"{TICKET_SEARCH_TABLE} table does not exist")
+
+    connection.execute(text(f"DELETE FROM {TICKET_SEARCH_TABLE}"))
+    ids = connection.execute(select(Ticket.id).order_by(Ticket.id)).scalars().all()
+    reindex_tickets(connection, ids)
+    db.commit()
+    logger.info("Rebuilt ticket search index for %d tickets", len(ids))
+    return len(ids)
+
+
+def _reindex_batch(connection: Connection, ids: List[int]) -> None:
+    tickets = connection.execute(
+        select(Ticket.id, Ticket.title, Ticket.description).where(Ticket.id.in_(ids))
+    ).all()
+    comments = {}
+    for ticket_id, comment in connection.execute(
+        select(Comment.ticket_id, Comment.comment)
+        .where(Comment.ticket_id.in_(ids), Comment.is_internal.is_(False))
+        .order_by(Comment.id)
+    ):
+        comments.setdefault(ticket_id, []).append(normalize_persian(comment))
+
+    connection.execute(
+        text(f"DELETE FROM {TICKET_SEARCH_TABLE} WHERE rowid IN :ids").bindparams(
+            bindparam("ids", expanding=True)
+        ),
+        {"ids": ids},
+    )
+    if tickets:
+        connection.execute(
+            text(
+                f"INSERT INTO {TICKET_SEARCH_TABLE} (rowid, title, description, comments) "
+                "VALUES (:id, :title, :description, :comments)"
+            ),
+            [
+                {
+                    "id": ticket_id,
+                    "title": normalize_persian(title),
+                    "description": normalize_persian(description),
+                    "comments": "\n".join(comments.get(ticket_id, [])),
+                }
+                for ticket_id, title, description in tickets
+            ],
+        )
+
+
+def _uses_fts(db: Session) -> bool:
+    if db.get_bind().dialect.name != "sqlite":
+        return False
+    return _search_table_exists(db.connection())
+
+
+def _search_table_exists(connection: Connection) -> bool:
+    return connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": TICKET_SEARCH_TABLE},
+    ).first() is not None
+
+
+def _changed_ticket_ids(session: Session) -> Set[int]:
+    """Tickets whose indexed text was touched by the flush that just ran"""
+    ids: Set[int] = set()
+    for obj in session.new:
+        if isinstance(obj, Ticket):
+            ids.add(obj.id)
+        elif isinstance(obj, Comment):
+            ids.add(obj.ticket_id)
+    for obj in session.dirty:
+        state = inspect(obj)
+        if isinstance(obj, Ticket):
+            if state.attrs.title.history.has_changes() or state.attrs.description.history.has_changes():
+                ids.add(obj.id)
+        elif isinstance(obj, Comment):
+            if state.attrs.comment.history.has_changes() or state.attrs.is_internal.history.has_changes():
+                ids.add(obj.ticket_id)
+    for obj in session.deleted:
+        if isinstance(obj, Ticket):
+            ids.add(obj.id)
+        elif isinstance(obj, Comment):
+            ids.add(obj.ticket_id)
+    ids.discard(None)
+    return ids
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_search_index(session: Session, flush_context) -> None:
+    """Keep ticket_search in the same transaction as the ticket/comment writes"""
+    if session.get_bind().dialect.name != "sqlite":
+        return
+    ids = _changed_ticket_ids(session)
+    if not ids:
+        return
+    connection = session.connection()
+    if not _search_table_exists(connection):
+        # Migration v24 not applied yet; searches use the ILIKE fallback meanwhile
+        return
+    reindex_tickets(connection, ids)
@@ -1,37 +1,51 @@
 """
 Ticket service for business logic
 """
+import base64
+import json
 from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, Query, joinedload
+from sqlalchemy import and_, or_, literal, tuple_, type_coerce, String, true, false
 from typing import Optional, List, Tuple
 from app.models import Ticket, User
 from app.core.enums import TicketStatus, TicketCategory, TicketPriority, UserRole
 from app.schemas.ticket import TicketCreate, TicketUpdate
+from app.services.ticket_search_service import apply_ticket_search
+from app.services.count_service import COUNT_EXACT, count_query
+
+# Relationships serialized by TicketResponse (user/assigned_to and their branch).
+# All are many-to-one, so joining them keeps a page at a single SELECT.
+TICKET_RESPONSE_LOADERS = (
+    joinedload(Ticket.user).joinedload(User.branch),
+    joinedload(Ticket.assigned_to).joinedload(User.branch),
+)
+
+# Sort order of every ticket list: priority (enum name order), newest first, id as tie-breaker.
+# Backed by idx_ticket_priority_created_id; keep both in sync.
+TICKET_LIST_ORDER = (
+    Ticket.priority.asc(),
+    Ticket.created_at.desc(),
+    Ticket.id.desc(),
+)
 
 
 def generate_ticket_number(db: Session) -> str:
     """
     Generate unique ticket number in format: T-YYYYMMDD-####
     
+    Numbers come from the per-day counter in ticket_number_sequences, so
+    concurrent creations never share a number and no scan of today's
+    tickets is needed.
+    
     Args:
         db: Database session
         
     Returns:
         str: Unique ticket number
     """
-    today = datetime.now().strftime("%Y%m%d")
-    prefix = f"T-{today}-"
-    
-    # Count tickets created today
-    count = db.query(Ticket).filter(
-        Ticket.ticket_number.like(f"{prefix}%")
-    ).count()
-    
-    # Generate ticket number with 4-digit zero-padded number
-    ticket_number = f"{prefix}{str(count + 1).zfill(4)}"
+    from app.services.ticket_number_service import ticket_number_allocator
     
-    return ticket_number
+    return ticket_number_allocator.next_number(db)
 
 
 def create_ticket(
@@ -42,6 +56,11 @@ def create_ticket(
     """
     Create a new ticket
     
+    Writes the ticket, its SLA log, auto-assignment, creation history and
+    feed notifications in one transaction. Telegram/email notifications are
+    left to the caller (notify_ticket_created with persist_feed=False) so
+    they only go out after the commit.
+    
     Args:
         db: Database session
         ticket_data: Ticket creation data
@@ -91,7 +110,7 @@ def create_ticket(
         # Determine priority (use provided or auto-detect)
         priority = ticket_data.priority
         if priority is None:
-            priority = _auto_determine_priority(ticket_data.title, ticket_data.description)
+            priority = _auto_determine_priority(ticket_data.title, ticket_data.description, db)
         
         ticket = Ticket(
             ticket_number=ticket_number,
@@ -107,20 +126,25 @@ def create_ticket(
         
         logger.debug(f"Creating ticket: {ticket}")
         db.add(ticket)
-        db.commit()
-        logger.debug("Ticket committed to database")
+        db.flush()
         
-        db.refresh(ticket)
-        logger.debug(f"Ticket refreshed: id={ticket.id}, ticket_number={ticket.ticket_number}")
+        # SLA log, auto-assignment, history and feed rows are written in the
+        # same transaction as the ticket; optional steps run in savepoints so
+        # their failure never leaves (or loses) a half-created ticket.
+        from app.services.sla_service import find_matching_sla_rule, create_sla_log
+        from app.services.automation_service import auto_assign_ticket
+        from app.services.ticket_history_service import create_ticket_history
+        from app.services.notification_feed_service import create_notifications
+        from app.services.notification_service import ticket_created_feed_entries
+        from app.schemas.ticket_history import TicketHistoryCreate
         
         # Create SLA log if matching rule found
         try:
-            from app.services.sla_service import find_matching_sla_rule, create_sla_log
-            sla_rule = find_matching_sla_rule(db, priority, ticket_data.category, department_id)
-            if sla_rule:
-                logger.debug(f"Found matching SLA rule: {sla_rule.name}")
-                create_sla_log(db, ticket, sla_rule)
-                logger.debug("SLA log created successfully")
+            with db.begin_nested():
+                sla_rule = find_matching_sla_rule(db, priority, ticket_data.category, department_id)
+                if sla_rule:
+                    logger.debug(f"Found matching SLA rule: {sla_rule.name}")
+                    create_sla_log(db, ticket, sla_rule, commit=False)
         except Exception as e:
             logger.warning(f"Failed to create SLA log: {e}")
             # Don't fail ticket creation if SLA fails
@@ -128,15 +152,35 @@ def create_ticket(
         # Auto-assign ticket if no manual assignment
         if ticket.assigned_to_id is None:
             try:
-                from app.services.automation_service import auto_assign_ticket
-                assigned_user = auto_assign_ticket(db, ticket)
+                with db.begin_nested():
+                    assigned_user = auto_assign_ticket(db, ticket, commit=False)
                 if assigned_user:
                     logger.debug(f"Auto-assigned ticket {ticket.id} to user {assigned_user.username}")
-                    db.refresh(ticket)
             except Exception as e:
                 logger.warning(f"Failed to auto-assign ticket: {e}")
                 # Don't fail ticket creation if auto-assign fails
         
+        # Log history for ticket creation
+        create_ticket_history(
+            db,
+            TicketHistoryCreate(
+                ticket_id=ticket.id,
+                status=ticket.status,
+                changed_by_id=user_id,
+                comment="Ticket created",
+            ),
+            commit=False,
+        )
+        
+        try:
+            with db.begin_nested():
+                create_notifications(db, ticket_created_feed_entries(ticket, db), commit=False)
+        except Exception as e:
+            logger.warning(f"Failed to create feed notifications: {e}")
+        
+        db.commit()
+        logger.debug(f"Ticket committed to database: id={ticket.id}, ticket_number={ticket.ticket_number}")
+        
         return ticket
     except Exception as e:
         logger.exception(f"Error in create_ticket: {e}")
@@ -144,64 +188,58 @@ def create_ticket(
         raise
 
 
-def get_ticket(db: Session, ticket_id: int) -> Optional[Ticket]:
+def get_ticket(db: Session, ticket_id: int, load_relations: bool = False) -> Optional[Ticket]:
     """
     Get ticket by ID
     
     Args:
         db: Database session
         ticket_id: Ticket ID
+        load_relations: Eager-load everything TicketResponse serializes
         
     Returns:
         Ticket or None
     """
-    return db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    query = db.query(Ticket)
+    if load_relations:
+        query = query.options(*TICKET_RESPONSE_LOADERS)
+    return query.filter(Ticket.id == ticket_id).first()
 
 
-def get_ticket_by_number(db: Session, ticket_number: str) -> Optional[Ticket]:
+def get_ticket_by_number(db: Session, ticket_number: str, load_relations: bool = False) -> Optional[Ticket]:
     """
     Get ticket by ticket number
     
     Args:
         db: Database session
         ticket_number: Ticket number
+        load_relations: Eager-load everything TicketResponse serializes
         
     Returns:
         Ticket or None
     """
-    return db.query(Ticket).filter(Ticket.ticket_number == ticket_number).first()
+    query = db.query(Ticket)
+    if load_relations:
+        query = query.options(*TICKET_RESPONSE_LOADERS)
+    return query.filter(Ticket.ticket_number == ticket_number).first()
 
 
-def _auto_determine_priority(title: str, description: str) -> TicketPriority:
+def _auto_determine_priority(title: str, description: str, db: Optional[Session] = None) -> TicketPriority:
     """
     Auto-determine ticket priority based on title and description
     
     Args:
         title: Ticket title
         description: Ticket description
+        db: Database session for the configured keywords (defaults when omitted)
         
     Returns:
         TicketPriority: Determined priority
     """
-    text = (title + " " + description).lower()
-    
-    # Critical keywords
-    critical_keywords = ["قطع کامل", "کار نمی‌کند", "متوقف شده", "down", "not working", "stopped", "critical"]
-    if any(keyword in text for keyword in critical_keywords):
-        return TicketPriority.CRITICAL
-    
-    # High keywords
-    high_keywords = ["مشکل دارد", "کند است", "has problem", "slow", "error", "خطا"]
-    if any(keyword in text for keyword in high_keywords):
-        return TicketPriority.HIGH
+    from app.services.priority_classifier_service import default_priority_classifier, get_priority_classifier
     
-    # Low keywords
-    low_keywords = ["درخواست", "سوال", "راهنمایی", "request", "question", "help", "پیشنهاد", "suggestion"]
-    if any(keyword in text for keyword in low_keywords):
-        return TicketPriority.LOW
-    
-    # Default to Medium
-    return TicketPriority.MEDIUM
+    classifier = get_priority_classifier(db) if db is not None else default_priority_classifier()
+    return classifier.classify(title, description)
 
 
 def update_ticket(
@@ -266,6 +304,48 @@ def update_ticket(
     return ticket
 
 
+def status_transition_values(ticket: Ticket, new_status: TicketStatus, now: datetime) -> dict:
+    """
+    Column values a ticket gets when moved to ``new_status``
+    
+    Always returns the same keys (unchanged columns keep their current
+    value), so the result of many tickets can feed one executemany UPDATE.
+    
+    Args:
+        ticket: Ticket before the change
+        new_status: New status
+        now: Transition time (UTC)
+        
+    Returns:
+        dict: status, first_response_at, resolved_at, closed_at, actual_resolution_hours
+    """
+    values = {
+        "status": new_status,
+        "first_response_at": ticket.first_response_at,
+        "resolved_at": ticket.resolved_at,
+        "closed_at": ticket.closed_at,
+        "actual_resolution_hours": ticket.actual_resolution_hours,
+    }
+    
+    # Update timestamps for status transitions
+    if new_status == TicketStatus.IN_PROGRESS and values["first_response_at"] is None:
+        values["first_response_at"] = now
+    if new_status == TicketStatus.RESOLVED and values["resolved_at"] is None:
+        values["resolved_at"] = now
+        # Calculate actual resolution hours
+        if ticket.created_at:
+            delta = now - ticket.created_at
+            values["actual_resolution_hours"] = int(delta.total_seconds() / 3600)
+    if new_status == TicketStatus.CLOSED and values["closed_at"] is None:
+        values["closed_at"] = now
+        # Calculate actual resolution hours if not already calculated
+        if values["actual_resolution_hours"] is None and ticket.created_at:
+            delta = now - ticket.created_at
+            values["actual_resolution_hours"] = int(delta.total_seconds() / 3600)
+    
+    return values
+
+
 def update_ticket_status(
     db: Session,
     ticket: Ticket,
@@ -282,24 +362,8 @@ def update_ticket_status(
     Returns:
         Ticket: Updated ticket
     """
-    previous_status = ticket.status
-    ticket.status = new_status
-    
-    # Update timestamps for status transitions
-    if new_status == TicketStatus.IN_PROGRESS and ticket.first_response_at is None:
-        ticket.first_response_at = datetime.utcnow()
-    if new_status == TicketStatus.RESOLVED and ticket.resolved_at is None:
-        ticket.resolved_at = datetime.utcnow()
-        # Calculate actual resolution hours
-        if ticket.created_at:
-            delta = ticket.resolved_at - ticket.created_at
-            ticket.actual_resolution_hours = int(delta.total_seconds() / 3600)
-    if new_status == TicketStatus.CLOSED and ticket.closed_at is None:
-        ticket.closed_at = datetime.utcnow()
-        # Calculate actual resolution hours if not already calculated
-        if ticket.actual_resolution_hours is None and ticket.created_at:
-            delta = ticket.closed_at - ticket.created_at
-            ticket.actual_resolution_hours = int(delta.total_seconds() / 3600)
+    for key, value in status_transition_values(ticket, new_status, datetime.utcnow()).items():
+        setattr(ticket, key, value)
     
     db.commit()
     db.refresh(ticket)
@@ -326,8 +390,10 @@ def get_user_tickets(
     limit: int = 100,
     status: Optional[TicketStatus] = None,
     category: Optional[TicketCategory] = None,
-    priority: Optional[TicketPriority] = None
-) -> Tuple[List[Ticket], int]:
+    priority: Optional[TicketPriority] = None,
+    search: Optional[str] = None,
+    count_mode: str = COUNT_EXACT
+) -> Tuple[List[Ticket], Optional[int]]:
     """
     Get tickets for a specific user with filters
     
@@ -338,10 +404,57 @@ def get_user_tickets(
         limit: Maximum number of records to return
         status: Filter by status (optional)
         category: Filter by category (optional)
+        search: Full-text query; results are ordered by relevance (optional)
+        count_mode: How to compute the total (see count_service)
+        
+    Returns:
+        Tuple of (tickets list, total count or None for COUNT_NONE)
+    """
+    query = _user_tickets_query(db, user_id, status=status, category=category, priority=priority)
+    query = _ordered(db, query, search)
+    
+    total = _count(query, count_mode, search)
+    tickets = query.options(*TICKET_RESPONSE_LOADERS).offset(skip).limit(limit).all()
+    
+    return tickets, total
+
+
+def get_user_tickets_after_cursor(
+    db: Session,
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    status: Optional[TicketStatus] = None,
+    category: Optional[TicketCategory] = None,
+    priority: Optional[TicketPriority] = None
+) -> Tuple[List[Ticket], Optional[str]]:
+    """
+    Get one keyset page of a user's tickets
+    
+    Args:
+        db: Database session
+        user_id: User ID
+        cursor: Opaque cursor from the previous page (None or "" for the first page)
+        limit: Maximum number of records to return
         
     Returns:
-        Tuple of (tickets list, total count)
+        Tuple of (tickets list, cursor of the next page or None)
+        
+    Raises:
+        InvalidTicketCursor: If the cursor is malformed
     """
+    query = _user_tickets_query(db, user_id, status=status, category=category, priority=priority)
+    return _keyset_page(db, query, cursor, limit)
+
+
+def _user_tickets_query(
+    db: Session,
+    user_id: int,
+    status: Optional[TicketStatus] = None,
+    category: Optional[TicketCategory] = None,
+    priority: Optional[TicketPriority] = None
+) -> Query:
+    """Build the filtered (unordered) query behind the user's ticket list"""
     query = db.query(Ticket).filter(Ticket.user_id == user_id)
     
     if status:
@@ -351,13 +464,7 @@ def get_user_tickets(
     if priority:
         query = query.filter(Ticket.priority == priority)
     
-    total = query.count()
-    tickets = query.order_by(
-        Ticket.priority.asc(),
-        Ticket.created_at.desc()
-    ).offset(skip).limit(limit).all()
-    
-    return tickets, total
+    return query
 
 
 def get_all_tickets(
@@ -373,8 +480,10 @@ def get_all_tickets(
     assigned_to_id: Optional[int] = None,
     date_from: Optional[datetime] = None,
     date_to: Optional[datetime] = None,
-    ticket_number: Optional[str] = None
-) -> Tuple[List[Ticket], int]:
+    ticket_number: Optional[str] = None,
+    search: Optional[str] = None,
+    count_mode: str = COUNT_EXACT
+) -> Tuple[List[Ticket], Optional[int]]:
     """
     Get all tickets (for admin) with filters
     
@@ -385,10 +494,108 @@ def get_all_tickets(
         status: Filter by status (optional)
         category: Filter by category (optional)
         user_id: Filter by user ID (optional)
+        search: Full-text query; results are ordered by relevance (optional)
+        count_mode: How to compute the total (see count_service)
         
     Returns:
-        Tuple of (tickets list, total count)
+        Tuple of (tickets list, total count or None for COUNT_NONE)
     """
+    query = _all_tickets_query(
+        db,
+        status=status,
+        category=category,
+        priority=priority,
+        user_id=user_id,
+        branch_id=branch_id,
+        department_id=department_id,
+        assigned_to_id=assigned_to_id,
+        date_from=date_from,
+        date_to=date_to,
+        ticket_number=ticket_number,
+    )
+    query = _ordered(db, query, search)
+    
+    total = _count(query, count_mode, search)
+    tickets = query.options(*TICKET_RESPONSE_LOADERS).offset(skip).limit(limit).all()
+    
+    return tickets, total
+
+
+def _count(query: Query, count_mode: str, search: Optional[str]) -> Optional[int]:
+    # Search matches also change with comments (indexed through raw SQL)
+    return count_query(query, count_mode, depends_on=("comments",) if search else ())
+
+
+def _ordered(db: Session, query: Query, search: Optional[str]) -> Query:
+    """Apply the list order, or relevance order when a search query is given"""
+    if search:
+        return apply_ticket_search(db, query, search)
+    # Order by priority (critical first) then by created_at
+    return query.order_by(*TICKET_LIST_ORDER)
+
+
+def get_all_tickets_after_cursor(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    status: Optional[TicketStatus] = None,
+    category: Optional[TicketCategory] = None,
+    priority: Optional[TicketPriority] = None,
+    user_id: Optional[int] = None,
+    branch_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    assigned_to_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    ticket_number: Optional[str] = None
+) -> Tuple[List[Ticket], Optional[str]]:
+    """
+    Get one keyset page of all tickets (for admin) with filters
+    
+    Unlike get_all_tickets this never counts the matching rows and seeks
+    straight to the cursor position, so page 1000 costs the same as page 1.
+    
+    Args:
+        db: Database session
+        cursor: Opaque cursor from the previous page (None or "" for the first page)
+        limit: Maximum number of records to return
+        
+    Returns:
+        Tuple of (tickets list, cursor of the next page or None)
+        
+    Raises:
+        InvalidTicketCursor: If the cursor is malformed
+    """
+    query = _all_tickets_query(
+        db,
+        status=status,
+        category=category,
+        priority=priority,
+        user_id=user_id,
+        branch_id=branch_id,
+        department_id=department_id,
+        assigned_to_id=assigned_to_id,
+        date_from=date_from,
+        date_to=date_to,
+        ticket_number=ticket_number,
+    )
+    return _keyset_page(db, query, cursor, limit)
+
+
+def _all_tickets_query(
+    db: Session,
+    status: Optional[TicketStatus] = None,
+    category: Optional[TicketCategory] = None,
+    priority: Optional[TicketPriority] = None,
+    user_id: Optional[int] = None,
+    branch_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    assigned_to_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    ticket_number: Optional[str] = None
+) -> Query:
+    """Build the filtered (unordered) query behind the admin ticket list"""
     query = db.query(Ticket)
     
     if status:
@@ -415,14 +622,109 @@ def get_all_tickets(
     if ticket_number:
         query = query.filter(Ticket.ticket_number.ilike(f"%{ticket_number}%"))
     
-    total = query.count()
-    # Order by priority (critical first) then by created_at
-    tickets = query.order_by(
-        Ticket.priority.asc(),  # Critical=1, High=2, Medium=3, Low=4
-        Ticket.created_at.desc()
-    ).offset(skip).limit(limit).all()
+    return query
+
+
+class InvalidTicketCursor(ValueError):
+    """Raised for a malformed ticket list cursor"""
+
+
+def encode_ticket_cursor(priority: TicketPriority, created_at_key: str, ticket_id: int) -> str:
+    """
+    Encode the (priority, created_at, id) sort key of a ticket as an opaque cursor
     
-    return tickets, total
+    Args:
+        priority: Priority of the last ticket on the page
+        created_at_key: created_at of that ticket as compared by the database
+        ticket_id: ID of that ticket
+        
+    Returns:
+        str: URL-safe cursor string
+    """
+    priority_value = priority.value if hasattr(priority, "value") else str(priority)
+    payload = json.dumps([priority_value, created_at_key, ticket_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_ticket_cursor(cursor: str) -> Tuple[TicketPriority, str, int]:
+    """
+    Decode a cursor produced by encode_ticket_cursor
+    
+    Args:
+        cursor: Opaque cursor string
+        
+    Returns:
+        Tuple of (priority, created_at key, id)
+        
+    Raises:
+        InvalidTicketCursor: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        priority, created_at_key, ticket_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(created_at_key, str):
+            raise TypeError("created_at key must be a string")
+        return TicketPriority(priority), created_at_key, int(ticket_id)
+    except Exception as exc:
+        raise InvalidTicketCursor(f"Invalid ticket cursor: {cursor!r}") from exc
+
+
+def _keyset_page(
+    db: Session,
+    query: Query,
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[List[Ticket], Optional[str]]:
+    """
+    Seek past the cursor in TICKET_LIST_ORDER and return one page plus the next cursor
+    
+    The seek is split into two range scans over idx_ticket_priority_created_id:
+    the rest of the cursor's priority, then the following priorities. An OR of
+    both would make the database walk the index from the start on every page.
+    
+    SQLite keeps DATETIME values as text and sorts them as text ("10:00:00" from
+    CURRENT_TIMESTAMP sorts before "10:00:00.000000" written by SQLAlchemy), so
+    there the cursor carries the stored text and is compared as text; parsing it
+    back to a datetime would skip or repeat rows around equal timestamps.
+    """
+    textual = db.get_bind().dialect.name == "sqlite"
+    query = query.options(*TICKET_RESPONSE_LOADERS).add_columns(
+        type_coerce(Ticket.created_at, String) if textual else Ticket.created_at
+    )
+    
+    if not cursor:
+        rows = query.order_by(*TICKET_LIST_ORDER).limit(limit + 1).all()
+    else:
+        priority, created_at_key, ticket_id = decode_ticket_cursor(cursor)
+        try:
+            created_at = literal(created_at_key, String) if textual else datetime.fromisoformat(created_at_key)
+        except ValueError as exc:
+            raise InvalidTicketCursor(f"Invalid ticket cursor: {cursor!r}") from exc
+        rows = (
+            query.filter(
+                Ticket.priority == priority,
+                tuple_(Ticket.created_at, Ticket.id) < tuple_(created_at, ticket_id),
+            )
+            .order_by(*TICKET_LIST_ORDER)
+            .limit(limit + 1)
+            .all()
+        )
+        if len(rows) <= limit:
+            rows += (
+                query.filter(Ticket.priority > priority)
+                .order_by(*TICKET_LIST_ORDER)
+                .limit(limit + 1 - len(rows))
+                .all()
+            )
+    
+    # One extra row tells whether another page exists without counting
+    tickets = [ticket for ticket, _ in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last, created_at_value = rows[limit - 1]
+        created_at_key = created_at_value if textual else created_at_value.isoformat()
+        next_cursor = encode_ticket_cursor(last.priority, created_at_key, last.id)
+    return tickets, next_cursor
 
 
 def delete_ticket(db: Session, ticket: Ticket) -> bool:
@@ -445,6 +747,27 @@ def delete_ticket(db: Session, ticket: Ticket) -> bool:
         return False
 
 
+def ticket_access_filter(user: User, entity=Ticket):
+    """
+    SQL counterpart of can_user_access_ticket, for set-based queries
+    
+    Args:
+        user: User trying to access
+        entity: Mapped class with the ticket's user_id/branch_id
+            (Ticket, or TicketDeletion for tombstones)
+        
+    Returns:
+        Filter expression (true() for admin-level roles)
+    """
+    if user.role in (UserRole.ADMIN, UserRole.CENTRAL_ADMIN, UserRole.REPORT_MANAGER):
+        return true()
+    if user.role == UserRole.BRANCH_ADMIN:
+        if user.branch_id is None:
+            return false()
+        return entity.branch_id == user.branch_id
+    return entity.user_id == user.id
+
+
 def can_user_access_ticket(user: User, ticket: Ticket) -> bool:
     """
     Check if user can access a ticket
@@ -0,0 +1,190 @@
+"""
+Delta sync of tickets for polling clients (web admin, Telegram bot)
+
+A client keeps the opaque watermark of its previous call and asks only for
+what changed after it: tickets past the (updated_at, id) position and
+tombstones from ticket_deletions past the (deleted_at, id) position. The
+first call (no watermark) pages through every visible ticket and starts
+the deletion stream at its current end.
+
+updated_at is set when a row is written, not when its transaction commits,
+so a slow writer could commit a row behind a watermark that was already
+handed out. Changes younger than SYNC_SETTLE_SECONDS are therefore held
+back until the next poll.
+"""
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import String, literal, tuple_, type_coerce
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Ticket, TicketDeletion, User
+
+# Default and maximum number of tickets (and of tombstones) per sync call
+SYNC_PAGE_SIZE = 100
+SYNC_MAX_PAGE_SIZE = 500
+
+
+class TicketSyncPage:
+    """Changes after a watermark"""
+
+    def __init__(
+        self,
+        tickets: List[Ticket],
+        deletions: List[TicketDeletion],
+        watermark: str,
+        has_more: bool,
+    ):
+        self.tickets = tickets
+        self.deletions = deletions
+        self.watermark = watermark
+        # True when the page was cut at the limit; call again right away
+        self.has_more = has_more
+
+
+def encode_sync_watermark(
+    ticket_key: Optional[str],
+    ticket_id: int,
+    deletion_key: Optional[str],
+    deletion_id: int,
+) -> str:
+    """
+    Encode the positions of the ticket and deletion streams as an opaque watermark
+    
+    Args:
+        ticket_key: updated_at of the last synced ticket as compared by the database
+        ticket_id: ID of that ticket
+        deletion_key: deleted_at of the last synced tombstone
+        deletion_id: ID of that tombstone
+        
+    Returns:
+        str: URL-safe watermark string
+    """
+    payload = json.dumps([ticket_key, ticket_id, deletion_key, deletion_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_sync_watermark(watermark: str) -> Tuple[Optional[str], int, Optional[str], int]:
+    """
+    Decode a watermark produced by encode_sync_watermark
+    
+    Raises:
+        ValueError: If the watermark is malformed
+    """
+    try:
+        padded = watermark + "=" * (-len(watermark) % 4)
+        ticket_key, ticket_id, deletion_key, deletion_id = json.loads(
+            base64.urlsafe_b64decode(padded.encode("ascii"))
+        )
+        for key in (ticket_key, deletion_key):
+            if key is not None and not isinstance(key, str):
+                raise TypeError("watermark keys must be strings")
+        return ticket_key, int(ticket_id), deletion_key, int(deletion_id)
+    except Exception as exc:
+        raise ValueError(f"Invalid sync watermark: {watermark!r}") from exc
+
+
+def sync_tickets(
+    db: Session,
+    user: User,
+    watermark: Optional[str] = None,
+    limit: int = SYNC_PAGE_SIZE,
+) -> TicketSyncPage:
+    """
+    Return tickets and tombstones changed after a watermark, within the user's scope
+    
+    Both streams are keyset scans (idx_ticket_updated_id and
+    idx_ticket_deletion_deleted_id), so an idle poll costs two index probes.
+    
+    Args:
+        db: Database session
+        user: Current user (same visibility rules as the ticket list)
+        watermark: Watermark of the previous call (None for the initial sync)
+        limit: Maximum tickets and tombstones returned
+        
+    Returns:
+        TicketSyncPage: Changed tickets, tombstones and the next watermark
+        
+    Raises:
+        ValueError: If the watermark is malformed
+    """
+    from app.services.ticket_service import TICKET_RESPONSE_LOADERS, ticket_access_filter
+
+    limit = max(1, min(limit, SYNC_MAX_PAGE_SIZE))
+    # Same text-vs-datetime handling as the list cursor (see ticket_service._keyset_page)
+    textual = db.get_bind().dialect.name == "sqlite"
+    # Whole seconds, compared with "<": a later write of a returned row can never
+    # share its (updated_at, id) key, even with second-precision CURRENT_TIMESTAMP
+    settled = (datetime.now(timezone.utc) - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)).replace(microsecond=0)
+    cutoff = literal(settled.strftime("%Y-%m-%d %H:%M:%S"), String) if textual else settled
+
+    def key_column(column):
+        return type_coerce(column, String) if textual else column
+
+    def key_value(key: str):
+        return literal(key, String) if textual else datetime.fromisoformat(key)
+
+    def key_text(value) -> str:
+        return value if textual else value.isoformat()
+
+    if watermark:
+        ticket_key, ticket_id, deletion_key, deletion_id = decode_sync_watermark(watermark)
+        try:
+            ticket_position = key_value(ticket_key) if ticket_key is not None else None
+            deletion_position = key_value(deletion_key) if deletion_key is not None else None
+        except ValueError as exc:
+            raise ValueError(f"Invalid sync watermark: {watermark!r}") from exc
+    else:
+        ticket_key, ticket_id, ticket_position = None, 0, None
+        # A fresh client has nothing to delete; start at the end of the log
+        head = (
+            db.query(TicketDeletion.id, key_column(TicketDeletion.deleted_at))
+            .filter(TicketDeletion.deleted_at < cutoff)
+            .order_by(TicketDeletion.deleted_at.desc(), TicketDeletion.id.desc())
+            .first()
+        )
+        deletion_id, deletion_key = (head[0], key_text(head[1])) if head else (0, None)
+        deletion_position = key_value(deletion_key) if deletion_key is not None else None
+
+    ticket_query = (
+        db.query(Ticket, key_column(Ticket.updated_at))
+        .options(*TICKET_RESPONSE_LOADERS)
+        .filter(ticket_access_filter(user), Ticket.updated_at < cutoff)
+    )
+    if ticket_position is not None:
+        ticket_query = ticket_query.filter(
+            tuple_(Ticket.updated_at, Ticket.id) > tuple_(ticket_position, ticket_id)
+        )
+    ticket_rows = ticket_query.order_by(Ticket.updated_at, Ticket.id).limit(limit + 1).all()
+
+    deletion_query = (
+        db.query(TicketDeletion, key_column(TicketDeletion.deleted_at))
+        .filter(ticket_access_filter(user, TicketDeletion), TicketDeletion.deleted_at < cutoff)
+    )
+    if deletion_position is not None:
+        deletion_query = deletion_query.filter(
+            tuple_(TicketDeletion.deleted_at, TicketDeletion.id) > tuple_(deletion_position, deletion_id)
+        )
+    deletion_rows = (
+        deletion_query.order_by(TicketDeletion.deleted_at, TicketDeletion.id).limit(limit + 1).all()
+    )
+
+    has_more = len(ticket_rows) > limit or len(deletion_rows) > limit
+    ticket_rows = ticket_rows[:limit]
+    deletion_rows = deletion_rows[:limit]
+    if ticket_rows:
+        last, updated_at = ticket_rows[-1]
+        ticket_key, ticket_id = key_text(updated_at), last.id
+    if deletion_rows:
+        last, deleted_at = deletion_rows[-1]
+        deletion_key, deletion_id = key_text(deleted_at), last.id
+
+    return TicketSyncPage(
+        tickets=[ticket for ticket, _ in ticket_rows],
+        deletions=[deletion for deletion, _ in deletion_rows],
+        watermark=encode_sync_watermark(ticket_key, ticket_id, deletion_key, deletion_id),
+        has_more=has_more,
+    )
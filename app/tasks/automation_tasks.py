@@ -5,7 +5,9 @@ import asyncio
 import logging
 from datetime import datetime
 from sqlalchemy.orm import Session
+from app.core.concurrency import run_blocking
 from app.database import SessionLocal
+from app.tasks.scheduler_lease_tasks import record_job_run, start_leader_task
 
 logger = logging.getLogger(__name__)
 
@@ -15,25 +17,29 @@ async def run_automation_tasks():
     Run automation tasks periodically
     This should be called by a background scheduler
     """
+    started_at = datetime.utcnow()
+    error = None
     db: Session = SessionLocal()
     try:
         from app.services.automation_service import process_automation_rules
         
         logger.info("Starting automation tasks...")
-        stats = process_automation_rules(db)
+        stats = await run_blocking(process_automation_rules, db)
         logger.info(f"Automation tasks completed: {stats}")
         return stats
     except Exception as e:
+        error = str(e)
         logger.error(f"Error running automation tasks: {e}", exc_info=True)
         return None
     finally:
         db.close()
+        await record_job_run("automation", started_at, error)
 
 
 def start_automation_scheduler():
     """
     Start background scheduler for automation tasks
-    This runs every 30 minutes
+    This runs every 30 minutes, in the process holding the "automation" lease
     """
     async def scheduler_loop():
         while True:
@@ -47,6 +53,6 @@ def start_automation_scheduler():
                 await asyncio.sleep(5 * 60)
     
     # Start scheduler in background
-    asyncio.create_task(scheduler_loop())
+    start_leader_task("automation", scheduler_loop)
     logger.info("Automation scheduler started")
 
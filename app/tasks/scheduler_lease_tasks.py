@@ -0,0 +1,155 @@
+"""
+Running the background schedulers in one process only
+
+start_leader_task wraps a scheduler loop: the loop runs while this process
+holds the job's lease (see app.services.scheduler_lease_service) and is
+cancelled as soon as the lease cannot be renewed; other processes keep
+trying to take the lease over. Without the scheduler_leases table
+(migration v29 not applied) the loop runs unconditionally, as before.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import settings
+from app.core.concurrency import run_blocking
+from app.database import session_scope
+from app.services.scheduler_lease_service import (
+    PROCESS_ID,
+    acquire_lease,
+    last_run_started_at,
+    record_lease_run,
+    release_lease,
+)
+
+logger = logging.getLogger(__name__)
+
+_leader_tasks: Dict[str, asyncio.Task] = {}
+
+
+def _call(func: Callable, *args):
+    with session_scope() as db:
+        return func(db, *args)
+
+
+def _missing_table(exc: Exception) -> bool:
+    message = str(exc).lower()
+    return "scheduler_leases" in message and ("no such table" in message or "does not exist" in message)
+
+
+async def run_as_leader(
+    name: str,
+    job: Callable[[], Awaitable[None]],
+    call: Callable = _call,
+) -> None:
+    """
+    Run ``job`` (a scheduler loop) whenever this process holds the lease on ``name``
+
+    Args:
+        name: Job name (scheduler_leases.name)
+        job: Coroutine function running the scheduler loop
+        call: Runs a lease function with a session (tests pass their own)
+    """
+    loop = asyncio.get_running_loop()
+    heartbeat = settings.SCHEDULER_HEARTBEAT_SECONDS
+    while True:
+        try:
+            acquired = await run_blocking(call, acquire_lease, name)
+        except SQLAlchemyError as e:
+            if _missing_table(e):
+                logger.warning(
+                    "scheduler_leases table does not exist; running %s in every process. "
+                    "Run migration: python scripts/migrate_v29_create_scheduler_leases.py", name
+                )
+                await job()
+                return
+            logger.error(f"Error acquiring scheduler lease {name}: {e}", exc_info=True)
+            acquired = False
+        if not acquired:
+            await asyncio.sleep(heartbeat)
+            continue
+
+        logger.info("Scheduler %s runs in this process (%s)", name, PROCESS_ID)
+        valid_until = loop.time() + settings.SCHEDULER_LEASE_SECONDS
+        task = asyncio.create_task(job())
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=heartbeat)
+                if done:
+                    break
+                try:
+                    renewed = await run_blocking(call, acquire_lease, name)
+                except SQLAlchemyError as e:
+                    # Still ours until it expires; stop before another process may take it
+                    logger.error(f"Error renewing scheduler lease {name}: {e}", exc_info=True)
+                    renewed = loop.time() + heartbeat < valid_until
+                else:
+                    if renewed:
+                        valid_until = loop.time() + settings.SCHEDULER_LEASE_SECONDS
+                if not renewed:
+                    logger.warning("Scheduler %s lost its lease; stopping it in this process", name)
+                    break
+        finally:
+            if not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+        if task.done() and not task.cancelled():
+            exc = task.exception()
+            try:
+                await run_blocking(call, release_lease, name)
+            except SQLAlchemyError as e:
+                logger.error(f"Error releasing scheduler lease {name}: {e}", exc_info=True)
+            if exc is None:
+                return
+            logger.error(f"Scheduler {name} stopped: {exc}", exc_info=exc)
+        await asyncio.sleep(heartbeat)
+
+
+def start_leader_task(name: str, job: Callable[[], Awaitable[None]]) -> asyncio.Task:
+    """Start ``job`` under the lease on ``name`` (must run inside the event loop)"""
+    task = asyncio.create_task(run_as_leader(name, job))
+    _leader_tasks[name] = task
+    return task
+
+
+async def stop_leader_tasks() -> None:
+    """Stop the schedulers and release their leases, so other processes take over at once (shutdown)"""
+    tasks = list(_leader_tasks.items())
+    _leader_tasks.clear()
+    for _, task in tasks:
+        task.cancel()
+    for name, task in tasks:
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Scheduler {name} failed: {e}", exc_info=True)
+        try:
+            await run_blocking(_call, release_lease, name)
+        except SQLAlchemyError as e:
+            logger.debug("Could not release scheduler lease %s: %s", name, e)
+
+
+async def record_job_run(name: str, started_at: datetime, error: Optional[str] = None) -> None:
+    """Record a finished run of a job on its lease; failures are only logged"""
+    try:
+        await run_blocking(_call, record_lease_run, name, started_at, error)
+    except SQLAlchemyError as e:
+        logger.debug("Could not record run of scheduler %s: %s", name, e)
+
+
+async def last_job_run(name: str) -> Optional[datetime]:
+    """Start of the last recorded run of a job, None if unknown"""
+    try:
+        return await run_blocking(_call, last_run_started_at, name)
+    except SQLAlchemyError as e:
+        logger.debug("Could not read last run of scheduler %s: %s", name, e)
+        return None
@@ -1,22 +1,49 @@
 """
 Background tasks for SLA monitoring and alerts
+
+The scheduler sleeps until the next SLA deadline (see
+app.services.sla_scheduler_service) or until a change to SLA logs,
+tickets or rules wakes it up, and then checks only the logs that are due.
+Changes committed by other processes are polled for every
+SLA_CHANGE_POLL_SECONDS, so they are applied at most that late.
 """
 import asyncio
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
 from sqlalchemy.orm import Session
-from app.database import SessionLocal
-from app.services.sla_alert_service import check_sla_warnings_and_breaches
+from app.config import settings
+from app.core.concurrency import run_blocking
+from app.database import SessionLocal, session_scope
+from app.services.sla_alert_service import check_due_sla_logs, check_sla_warnings_and_breaches
+from app.services.sla_scheduler_service import (
+    SLAChangeWatermark,
+    SLADeadlineScheduler,
+    load_deadlines,
+    load_open_deadlines,
+    poll_sla_changes,
+    sla_change_watermark,
+    sla_deadline_scheduler,
+)
+from app.tasks.scheduler_lease_tasks import record_job_run, start_leader_task
 
 logger = logging.getLogger(__name__)
 
+# A log still due after its checks ran (an alert could not be recorded) is retried this much later
+SLA_RETRY_SECONDS = 60
+
+
+def _load(db: Optional[Session], func: Callable, *args):
+    with session_scope(db) as session:
+        return func(session, *args)
+
 
 async def run_sla_checks():
     """
-    اجرای بررسی‌های SLA به صورت دوره‌ای
-    این تابع باید توسط یک background scheduler فراخوانی شود
+    اجرای بررسی‌های SLA روی تمام تیکت‌های باز (اسکن کامل)
     """
-    db: Session = SessionLocal()
+    # Objects stay loaded after the per-log commits, so notifications do not refresh them on the loop
+    db: Session = SessionLocal(expire_on_commit=False)
     try:
         logger.info("Starting SLA checks...")
         stats = await check_sla_warnings_and_breaches(db)
@@ -29,27 +56,146 @@ async def run_sla_checks():
         db.close()
 
 
+async def run_due_sla_checks(
+    log_ids: List[int],
+    now: Optional[datetime] = None,
+    db: Optional[Session] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    اجرای بررسی‌های SLA فقط برای لاگ‌هایی که مهلتشان رسیده است
+    """
+    try:
+        with session_scope(db, expire_on_commit=False) as session:
+            stats = await check_due_sla_logs(session, log_ids, now)
+        logger.info(f"SLA checks completed for {len(log_ids)} due logs: {stats}")
+        return stats
+    except Exception as e:
+        logger.error(f"Error running due SLA checks: {e}", exc_info=True)
+        return None
+
+
+async def refresh_sla_deadlines(scheduler: SLADeadlineScheduler, db: Optional[Session] = None) -> None:
+    """
+    Apply the changes reported since the last call (or rebuild the heap if requested)
+
+    Args:
+        scheduler: Deadline scheduler
+        db: Session to use (tests); by default a new one is opened
+    """
+    rebuild, log_ids, ticket_ids, rule_ids = scheduler.take_changes()
+    if rebuild:
+        scheduler.replace_all(await run_blocking(_load, db, load_open_deadlines))
+        logger.info("SLA deadline schedule rebuilt: %d open SLA logs", len(scheduler))
+    elif log_ids or ticket_ids or rule_ids:
+        scheduler.update(await run_blocking(_load, db, load_deadlines, log_ids, ticket_ids, rule_ids))
+
+
+async def poll_sla_deadline_changes(
+    scheduler: SLADeadlineScheduler,
+    watermark: SLAChangeWatermark,
+    db: Optional[Session] = None,
+) -> SLAChangeWatermark:
+    """
+    Report changes committed by other processes since ``watermark`` to the scheduler
+
+    Args:
+        scheduler: Deadline scheduler
+        watermark: Position of the previous poll
+        db: Session to use (tests); by default a new one is opened
+
+    Returns:
+        Watermark for the next poll
+    """
+    watermark, log_ids, ticket_ids, rebuild = await run_blocking(_load, db, poll_sla_changes, watermark)
+    if rebuild:
+        scheduler.request_rebuild()
+    else:
+        scheduler.mark_logs(log_ids)
+        scheduler.mark_tickets(ticket_ids)
+    return watermark
+
+
+async def run_sla_tick(
+    scheduler: SLADeadlineScheduler,
+    now: Optional[datetime] = None,
+    db: Optional[Session] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Check the logs due at ``now`` and schedule their next deadlines
+
+    Args:
+        scheduler: Deadline scheduler
+        now: Current UTC time
+        db: Session to use (tests); by default new ones are opened
+
+    Returns:
+        Stats of the checks, or None when nothing was due
+    """
+    now = now or datetime.utcnow()
+    due = scheduler.pop_due(now)
+    if not due:
+        return None
+    stats = await run_due_sla_checks(due, now, db)
+    retry_at = now + timedelta(seconds=SLA_RETRY_SECONDS)
+    deadlines = await run_blocking(_load, db, load_deadlines, due)
+    scheduler.update(
+        (log_id, retry_at if deadline is not None and deadline <= now else deadline)
+        for log_id, deadline in deadlines
+    )
+    return stats
+
+
 def start_sla_scheduler():
     """
     شروع background scheduler برای بررسی‌های SLA
-    این scheduler هر 15 دقیقه یکبار اجرا می‌شود
+    این scheduler تا نزدیک‌ترین مهلت SLA می‌خوابد و با هر تغییر بیدار می‌شود
+    It runs in the process holding the "sla" lease and rebuilds its schedule when it takes over;
+    writes made by other processes are picked up by polling every SLA_CHANGE_POLL_SECONDS
     """
     async def scheduler_loop():
-        while True:
-            try:
-                await run_sla_checks()
-                # Wait 15 minutes before next run
-                await asyncio.sleep(15 * 60)
-            except Exception as e:
-                logger.error(f"Error in SLA scheduler: {e}", exc_info=True)
-                # Wait 5 minutes before retry on error
-                await asyncio.sleep(5 * 60)
-    
+        loop = asyncio.get_running_loop()
+        scheduler = sla_deadline_scheduler
+        scheduler.attach(loop)
+        resync_at = loop.time()
+        poll_at = resync_at
+        watermark = None
+        try:
+            while True:
+                started_at = datetime.utcnow()
+                try:
+                    if loop.time() >= resync_at:
+                        # Watermark first, so changes committed during the rebuild are polled again
+                        watermark = await run_blocking(_load, None, sla_change_watermark)
+                        scheduler.request_rebuild()
+                        resync_at = loop.time() + settings.SLA_RESYNC_SECONDS
+                        poll_at = loop.time() + settings.SLA_CHANGE_POLL_SECONDS
+                    elif loop.time() >= poll_at:
+                        watermark = await poll_sla_deadline_changes(scheduler, watermark)
+                        poll_at = loop.time() + settings.SLA_CHANGE_POLL_SECONDS
+                    await refresh_sla_deadlines(scheduler)
+                    stats = await run_sla_tick(scheduler)
+                    if stats is not None:
+                        await record_job_run("sla", started_at)
+
+                    # Sleep until the next deadline, a reported change, the next poll or the periodic rebuild
+                    timeout = min(resync_at, poll_at) - loop.time()
+                    next_deadline = scheduler.next_deadline()
+                    if next_deadline is not None:
+                        timeout = min(timeout, (next_deadline - datetime.utcnow()).total_seconds())
+                    await scheduler.wait(timeout)
+                except Exception as e:
+                    logger.error(f"Error in SLA scheduler: {e}", exc_info=True)
+                    await record_job_run("sla", started_at, str(e))
+                    # Rebuild from the database after a minute
+                    resync_at = loop.time()
+                    await asyncio.sleep(SLA_RETRY_SECONDS)
+        finally:
+            scheduler.detach()
+
     # Start scheduler in background
     try:
         # Create task in the current event loop (should be running in FastAPI startup)
-        asyncio.create_task(scheduler_loop())
-        logger.info("SLA scheduler started (runs every 15 minutes)")
+        start_leader_task("sla", scheduler_loop)
+        logger.info("SLA scheduler started (wakes at the next SLA deadline)")
     except Exception as e:
         logger.error(f"Failed to start SLA scheduler: {e}", exc_info=True)
-
@@ -2,17 +2,14 @@
 import asyncio
 import logging
 from datetime import datetime, timedelta
+from typing import Optional
 
 from app.config import settings
+from app.core.concurrency import run_blocking
 from app.database import SessionLocal
 from app.services.notification_service import notify_admin_group
-from app.services.report_service import (
-    tickets_overview,
-    tickets_by_status,
-    tickets_by_priority,
-    sla_compliance_report,
-    average_response_time_hours,
-)
+from app.services.report_service import dashboard_kpis
+from app.tasks.scheduler_lease_tasks import last_job_run, record_job_run, start_leader_task
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
@@ -27,11 +24,12 @@ async def send_daily_admin_report() -> None:
 
     db: Session = SessionLocal()
     try:
-        overview = tickets_overview(db)
-        status_counts = tickets_by_status(db)
-        priority_counts = tickets_by_priority(db)
-        sla_summary = sla_compliance_report(db)
-        avg_response = average_response_time_hours(db)
+        kpis = await run_blocking(dashboard_kpis, db)
+        overview = kpis["overview"]
+        status_counts = kpis["by_status"]
+        priority_counts = kpis["by_priority"]
+        sla_summary = kpis["sla"]
+        avg_response = kpis["response_time_hours"]
 
         today_label = datetime.now().strftime("%Y-%m-%d")
         lines = [
@@ -87,17 +85,41 @@ def status_label(status_key: str) -> str:
     return mapping.get(status_key.lower(), status_key)
 
 
+def next_report_at(now: datetime, hour: int, last_run: Optional[datetime] = None) -> datetime:
+    """
+    When to send the next daily report
+
+    Args:
+        now: Current UTC time
+        hour: Report hour (UTC)
+        last_run: Start of the last report sent by any process (lease record), on takeover
+
+    Returns:
+        ``now`` if today's report time has passed without a report since (the previous
+        holder died or failed over), otherwise the next report time
+    """
+    target = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if target > now:
+        return target
+    if last_run is not None and last_run < target:
+        return now
+    return target + timedelta(days=1)
+
+
 async def _scheduler_loop() -> None:
     hour = max(0, min(23, settings.TELEGRAM_ADMIN_DAILY_REPORT_HOUR))
+    # Runs on each takeover of the lease: send a report the previous holder missed, once
+    last_run = await last_job_run("daily_report")
     while True:
         now = datetime.utcnow()
-        target = now.replace(hour=hour, minute=0, second=0, microsecond=0)
-        if target <= now:
-            target += timedelta(days=1)
+        target = next_report_at(now, hour, last_run)
+        last_run = None
         wait_seconds = (target - now).total_seconds()
         logger.debug("Next admin report scheduled in %.1f seconds", wait_seconds)
         await asyncio.sleep(wait_seconds)
+        started_at = datetime.utcnow()
         await send_daily_admin_report()
+        await record_job_run("daily_report", started_at)
 
 
 def start_daily_report_scheduler() -> None:
@@ -106,12 +128,12 @@ def start_daily_report_scheduler() -> None:
         return
 
     try:
-        asyncio.create_task(_scheduler_loop())
+        # Sent by the process holding the "daily_report" lease
+        start_leader_task("daily_report", _scheduler_loop)
         logger.info(
             "Telegram daily report scheduler started (hour=%s)",
             settings.TELEGRAM_ADMIN_DAILY_REPORT_HOUR,
         )
     except Exception as exc:
         logger.error("Failed to start daily Telegram report scheduler: %s", exc, exc_info=True)
-"\"\"\"\n+Background task that sends summaries to the Telegram admin group.\n+"\"\"\"\n+import asyncio\n+import logging\n+from datetime import datetime, timedelta\n+from typing import Optional\n+\n+from app.config import settings\n+from app.database import SessionLocal\n+from app.services.notification_service import notify_admin_group\n+from app.services.report_service import (\n+    tickets_overview,\n+    tickets_by_status,\n+    tickets_by_priority,\n+    sla_compliance_report,\n+    average_response_time_hours,\n+)\n+from sqlalchemy.orm import Session\n+\n+logger = logging.getLogger(__name__)\n+\n+\n+async def send_daily_admin_report() -> None:\n+    \"\"\"Gather KPIs and send a daily summary to the admin Telegram group.\"\"\"\n+\n+    if not settings.TELEGRAM_ADMIN_GROUP_ID:\n+        logger.debug(\"Admin group ID is not configured; skipping daily report\")\n+        return\n+\n+    db: Session = SessionLocal()\n+    try:\n+        overview = tickets_overview(db)\n+        status_counts = tickets_by_status(db)\n+        priority_counts = tickets_by_priority(db)\n+        sla_summary = sla_compliance_report(db)\n+        avg_response = average_response_time_hours(db)\n+\n+        today_label = datetime.now().strftime(\"%Y-%m-%d\")\n+        lines = [\n+            \"📊 گزارش روزانه مدیران سیستم\", \n+            f\"🗓 تاریخ: {today_label}\",\n+            \"\",\n+            f\"✅ مجموع تیکت‌ها: {overview.get('total', 0)}\",\n+        ]\n+\n+        if status_counts:\n+            status_line = \" | \".join(\n+                f\"{status_label(status)}: {count}\" for status, count in status_counts.items()\n+            )\n+            lines.append(status_line)\n+\n+        if priority_counts:\n+            top_priorities = sorted(\n+                priority_counts.items(), key=lambda item: -item[1]\n+            )[:3]\n+            priority_line = \" | \".join(f\"{priority}: {count}\" for priority, count in top_priorities)\n+            lines.append(f\"🎯 اولویت‌های پرتکرار: {priority_line}\")\n+\n+        if sla_summary:\n+            lines.append(\n+                \"\"\"\n+🕒 SLA:\n+• پاسخ به‌موقع: {response_on_time}/{total}\n+• حل به‌موقع: {resolution_on_time}/{total}\n+\"\"\".strip().format(\n+                    response_on_time=sla_summary.get(\"response_on_time\", 0),\n+                    resolution_on_time=sla_summary.get(\"resolution_on_time\", 0),\n+                    total=sla_summary.get(\"total_tickets_with_sla\", 0),\n+                )\n+            )\n+\n+        if avg_response is not None:\n+            lines.append(f\"⏱ میانگین زمان پاسخ: {avg_response:.2f} ساعت\")\n+\n+        message = \"\\n\".join(lines)\n+        await notify_admin_group(message)\n+        logger.info(\"Daily admin report dispatched\")\n+    except Exception as exc:\n+        logger.error(\"Failed to send daily admin report: %s\", exc, exc_info=True)\n+    finally:\n+        db.close()\n+\n+\n+def status_label(status_key: str) -> str:\n+    mapping = {\n+        \"pending\": \"در انتظار\",\n+        \"in_progress\": \"در حال انجام\",\n+        \"resolved\": \"حل شده\",\n+        \"closed\": \"بسته شده\",\n+    }\n+    return mapping.get(status_key.lower(), status_key)\n+\n+\n+async def _scheduler_loop() -> None:\n+    hour = max(0, min(23, settings.TELEGRAM_ADMIN_DAILY_REPORT_HOUR))\n+    while True:\n+        now = datetime.utcnow()\n+        target = now.replace(hour=hour, minute=0, second=0, microsecond=0)\n+        if target <= now:\n+            target += timedelta(days=1)\n+        wait_seconds = (target - now).total_seconds()\n+        logger.debug(\"Next admin report scheduled in %.1f seconds\", wait_seconds)\n+        await asyncio.sleep(wait_seconds)\n+        await send_daily_admin_report()\n+\n+\n+def start_daily_report_scheduler() -> None:\n+    if not settings.TELEGRAM_ADMIN_DAILY_REPORT_ENABLED or not settings.TELEGRAM_ADMIN_GROUP_ID:\n+        logger.info(\"Daily Telegram report disabled (missing config)\")\n+        return\n+\n+    try:\n+        asyncio.create_task(_scheduler_loop())\n+        logger.info(\"Telegram daily report scheduler started (hour=%s)\", settings.TELEGRAM_ADMIN_DAILY_REPORT_HOUR)\n+    except Exception as exc:\n+        logger.error(\"Failed to start daily Telegram report scheduler: %s\", exc, exc_info=True)\n*** End Patch*** End Patch
 
@@ -3,9 +3,12 @@ Background tasks for Telegram session management
 """
 import asyncio
 import logging
+from datetime import datetime
+from app.core.concurrency import run_blocking
 from app.database import SessionLocal
 from app.services.telegram_session_service import cleanup_expired_telegram_sessions
 from app.config import settings
+from app.tasks.scheduler_lease_tasks import record_job_run, start_leader_task
 
 logger = logging.getLogger(__name__)
 
@@ -16,16 +19,19 @@ async def run_session_cleanup():
     """
     Run Telegram session cleanup periodically
     """
+    started_at = datetime.utcnow()
+    error = None
     db = SessionLocal()
     try:
         logger.info("Starting Telegram session cleanup...")
-        count = cleanup_expired_telegram_sessions(db)
+        count = await run_blocking(cleanup_expired_telegram_sessions, db)
         if count > 0:
             logger.info(f"Cleaned up {count} expired Telegram sessions.")
         else:
             logger.debug("No expired Telegram sessions to clean up.")
     except Exception as e:
         # Log error but don't crash the scheduler
+        error = str(e)
         error_msg = str(e).lower()
         if "no such table" in error_msg or "does not exist" in error_msg:
             logger.warning(
@@ -36,6 +42,7 @@ async def run_session_cleanup():
             logger.error(f"Error running Telegram session cleanup: {e}", exc_info=True)
     finally:
         db.close()
+        await record_job_run("telegram_session_cleanup", started_at, error)
 
 
 async def _scheduler_loop():
@@ -59,7 +66,8 @@ def start_telegram_session_cleanup_scheduler():
     Start background scheduler for Telegram session cleanup
     """
     try:
-        asyncio.create_task(_scheduler_loop())
+        # Runs in the process holding the "telegram_session_cleanup" lease
+        start_leader_task("telegram_session_cleanup", _scheduler_loop)
         logger.info(f"Telegram session cleanup scheduler started (runs every {CLEANUP_INTERVAL_MINUTES} minutes)")
     except Exception as exc:
         logger.error("Failed to start Telegram session cleanup scheduler: %s", exc, exc_info=True)
@@ -739,7 +739,7 @@ class APIClient:
             date_from: Filter from date (YYYY-MM-DD)
             date_to: Filter to date (YYYY-MM-DD)
             ticket_number: Filter by ticket number
-            search_text: Search in title and description
+            search_text: Full-text search in title, description and comments
             
         Returns:
             Tickets data or None if failed
@@ -761,6 +761,9 @@ class APIClient:
                 params["date_to"] = date_to
             if ticket_number:
                 params["ticket_number"] = ticket_number
+            if search_text:
+                # Ranked server-side search; results are already scoped and paginated
+                params["q"] = search_text
             
             response = await self.client.get(
                 f"{self.base_url}/api/tickets",
@@ -768,23 +771,45 @@ class APIClient:
                 params=params
             )
             if response.status_code == 200:
-                data = response.json()
-                # Filter by search_text if provided (client-side filtering for now)
-                if search_text and data.get("items"):
-                    search_lower = search_text.lower()
-                    filtered_items = [
-                        item for item in data["items"]
-                        if search_lower in item.get("title", "").lower() or
-                        search_lower in item.get("description", "").lower()
-                    ]
-                    data["items"] = filtered_items
-                    data["total"] = len(filtered_items)
-                return data
+                return response.json()
             return None
         except Exception as e:
             logger.error(f"Failed to search tickets: {e}")
             return None
 
+    async def sync_tickets(
+        self,
+        token: str,
+        since: Optional[str] = None,
+        limit: int = 100
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get tickets changed and deleted since a watermark
+        
+        Args:
+            token: Access token
+            since: Watermark from the previous call (None for the initial sync)
+            limit: Maximum changes per call
+            
+        Returns:
+            Dict with items, deleted, watermark and has_more, or None if failed
+        """
+        try:
+            params = {"limit": limit}
+            if since:
+                params["since"] = since
+            response = await self.client.get(
+                f"{self.base_url}/api/tickets/sync",
+                headers={"Authorization": f"Bearer {token}"},
+                params=params
+            )
+            if response.status_code == 200:
+                return response.json()
+            return None
+        except Exception as e:
+            logger.error(f"Failed to sync tickets: {e}")
+            return None
+
     async def bulk_action_tickets(
         self,
         token: str,
@@ -0,0 +1,98 @@
+"""
+Recompute the SLA logs of existing tickets against the current SLA rules
+
+Needed after changing SLA rules or importing tickets. Runs in chunks with a
+pause between them; Ctrl+C pauses the job and --resume continues it after
+the last chunk written.
+
+    python scripts/backfill_sla_logs.py [--open-only] [--dry-run] [--chunk-size 500] [--pause-ms 200]
+    python scripts/backfill_sla_logs.py --resume JOB_ID
+    python scripts/backfill_sla_logs.py --status JOB_ID
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app.services.sla_backfill_service import (
+    create_backfill_job,
+    get_backfill_job,
+    pause_backfill_job,
+    resume_backfill_job,
+    run_backfill_job,
+    update_backfill_throttle,
+)
+
+
+def _print_job(job):
+    print(
+        f"SLA backfill {job.id}: {job.status}, {job.processed_tickets}/{job.total_tickets} tickets "
+        f"(through ticket {job.last_ticket_id}), {job.updated_logs} logs updated, "
+        f"{job.created_logs} created, {job.unmatched_tickets} unmatched"
+        + (" [dry run]" if job.dry_run else "")
+    )
+    if job.error:
+        print(f"Error: {job.error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute SLA logs of existing tickets")
+    parser.add_argument("--open-only", action="store_true", help="only pending and in-progress tickets")
+    parser.add_argument("--dry-run", action="store_true", help="count the changes without writing them")
+    parser.add_argument("--chunk-size", type=int, default=None, help="tickets per chunk")
+    parser.add_argument("--pause-ms", type=int, default=None, help="pause between chunks (milliseconds)")
+    parser.add_argument("--resume", type=int, metavar="JOB_ID", help="continue a paused or failed job")
+    parser.add_argument("--status", type=int, metavar="JOB_ID", help="show the progress of a job")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        if args.status or args.resume:
+            job = get_backfill_job(db, args.status or args.resume)
+            if job is None:
+                print(f"SLA backfill job {args.status or args.resume} not found")
+                sys.exit(1)
+            if args.status:
+                _print_job(job)
+                return
+            job = resume_backfill_job(db, job)
+            if args.chunk_size or args.pause_ms is not None:
+                job = update_backfill_throttle(db, job, args.chunk_size, args.pause_ms)
+        else:
+            job = create_backfill_job(
+                db,
+                only_open=args.open_only,
+                dry_run=args.dry_run,
+                chunk_size=args.chunk_size,
+                pause_ms=args.pause_ms,
+            )
+
+        started = time.perf_counter()
+        try:
+            asyncio.run(run_backfill_job(job.id, db))
+        except KeyboardInterrupt:
+            db.rollback()
+            pause_backfill_job(db, get_backfill_job(db, job.id))
+            print(f"Paused; continue with --resume {job.id}")
+        _print_job(get_backfill_job(db, job.id))
+        print(f"Took {time.perf_counter() - started:.1f}s")
+    except ValueError as exc:
+        print(exc)
+        sys.exit(1)
+    except Exception as exc:
+        db.rollback()
+        print(f"Backfill failed: {exc}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Migration v22: add composite index backing keyset pagination of ticket lists
+"""
+import sys
+from pathlib import Path
+from sqlalchemy import create_engine, text
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def upgrade():
+    """Create idx_ticket_priority_created_id on tickets(priority, created_at DESC, id DESC)"""
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        try:
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS idx_ticket_priority_created_id "
+                "ON tickets(priority, created_at DESC, id DESC)"
+            ))
+            conn.commit()
+            logger.info("Migration v22 completed: idx_ticket_priority_created_id created")
+        except Exception as exc:
+            conn.rollback()
+            logger.error("Migration v22 failed: %s", exc, exc_info=True)
+            raise
+
+
+def downgrade():
+    """Drop idx_ticket_priority_created_id"""
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("DROP INDEX IF EXISTS idx_ticket_priority_created_id"))
+            conn.commit()
+            logger.info("Migration v22 downgrade completed: idx_ticket_priority_created_id dropped")
+        except Exception as exc:
+            conn.rollback()
+            logger.error("Migration v22 downgrade failed: %s", exc, exc_info=True)
+            raise
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    upgrade()
@@ -0,0 +1,63 @@
+"""
+Migration v23: create ticket_number_sequences table for the ticket number allocator
+"""
+import sys
+from pathlib import Path
+from sqlalchemy import create_engine, text
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def upgrade():
+    """Create ticket_number_sequences table"""
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        try:
+            if settings.DATABASE_URL.startswith("sqlite"):
+                conn.execute(text("""
+                    CREATE TABLE IF NOT EXISTS ticket_number_sequences (
+                        day VARCHAR(8) PRIMARY KEY,
+                        last_value INTEGER NOT NULL DEFAULT 0,
+                        updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+                    );
+                """))
+            else:
+                # PostgreSQL
+                conn.execute(text("""
+                    CREATE TABLE IF NOT EXISTS ticket_number_sequences (
+                        day VARCHAR(8) PRIMARY KEY,
+                        last_value INTEGER NOT NULL DEFAULT 0,
+                        updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+                    );
+                """))
+            # Existing days are seeded lazily from tickets on their first allocation
+            conn.commit()
+            logger.info("Migration v23 completed: ticket_number_sequences table created")
+        except Exception as exc:
+            conn.rollback()
+            logger.error("Migration v23 failed: %s", exc, exc_info=True)
+            raise
+
+
+def downgrade():
+    """Drop ticket_number_sequences table"""
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("DROP TABLE IF EXISTS ticket_number_sequences"))
+            conn.commit()
+            logger.info("Migration v23 downgrade completed: ticket_number_sequences dropped")
+        except Exception as exc:
+            conn.rollback()
+            logger.error("Migration v23 downgrade failed: %s", exc, exc_info=True)
+            raise
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    upgrade()
@@ -0,0 +1,67 @@
+"""
+Migration v24: create ticket_search FTS5 table and index existing tickets
+"""
+import sys
+from pathlib import Path
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def upgrade():
+    """Create ticket_search table and backfill it"""
+    if not settings.DATABASE_URL.startswith("sqlite"):
+        # PostgreSQL uses the ILIKE fallback of ticket_search_service; nothing to create
+        logger.info("Migration v24 skipped: full-text index is SQLite only")
+        return
+
+    from app.models.ticket_search import CREATE_TICKET_SEARCH_SQL
+    from app.services.ticket_search_service import rebuild_search_index
+
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        try:
+            conn.execute(text(CREATE_TICKET_SEARCH_SQL))
+            conn.commit()
+        except Exception as exc:
+            conn.rollback()
+            logger.error("Migration v24 failed: %s", exc, exc_info=True)
+            raise
+
+    db = sessionmaker(bind=engine)()
+    try:
+        indexed = rebuild_search_index(db)
+        logger.info("Migration v24 completed: ticket_search created, %d tickets indexed", indexed)
+    except Exception as exc:
+        db.rollback()
+        logger.error("Migration v24 backfill failed: %s", exc, exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+def downgrade():
+    """Drop ticket_search table"""
+    from app.models.ticket_search import DROP_TICKET_SEARCH_SQL
+
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        try:
+            conn.execute(text(DROP_TICKET_SEARCH_SQL))
+            conn.commit()
+            logger.info("Migration v24 downgrade completed: ticket_search dropped")
+        except Exception as exc:
+            conn.rollback()
+            logger.error("Migration v24 downgrade failed: %s", exc, exc_info=True)
+            raise
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    upgrade()
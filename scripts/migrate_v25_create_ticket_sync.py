@@ -0,0 +1,74 @@
+"""
+Migration v25: ticket delta sync (ticket_deletions log and (updated_at, id) index)
+"""
+import sys
+from pathlib import Path
+from sqlalchemy import create_engine, text
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def upgrade():
+    """Create ticket_deletions table and the sync indexes"""
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        try:
+            if settings.DATABASE_URL.startswith("sqlite"):
+                conn.execute(text("""
+                    CREATE TABLE IF NOT EXISTS ticket_deletions (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        ticket_id INTEGER NOT NULL,
+                        ticket_number VARCHAR NOT NULL,
+                        user_id INTEGER,
+                        branch_id INTEGER,
+                        deleted_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+                    );
+                """))
+            else:
+                # PostgreSQL
+                conn.execute(text("""
+                    CREATE TABLE IF NOT EXISTS ticket_deletions (
+                        id SERIAL PRIMARY KEY,
+                        ticket_id INTEGER NOT NULL,
+                        ticket_number VARCHAR NOT NULL,
+                        user_id INTEGER,
+                        branch_id INTEGER,
+                        deleted_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+                    );
+                """))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_ticket_deletions_id ON ticket_deletions (id)"))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS idx_ticket_deletion_deleted_id ON ticket_deletions (deleted_at, id)"
+            ))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS idx_ticket_updated_id ON tickets (updated_at, id)"))
+            conn.commit()
+            logger.info("Migration v25 completed: ticket_deletions and idx_ticket_updated_id created")
+        except Exception as exc:
+            conn.rollback()
+            logger.error("Migration v25 failed: %s", exc, exc_info=True)
+            raise
+
+
+def downgrade():
+    """Drop ticket_deletions table and idx_ticket_updated_id"""
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("DROP INDEX IF EXISTS idx_ticket_updated_id"))
+            conn.execute(text("DROP TABLE IF EXISTS ticket_deletions"))
+            conn.commit()
+            logger.info("Migration v25 downgrade completed: ticket sync objects dropped")
+        except Exception as exc:
+            conn.rollback()
+            logger.error("Migration v25 downgrade failed: %s", exc, exc_info=True)
+            raise
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    upgrade()
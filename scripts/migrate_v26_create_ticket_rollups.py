@@ -0,0 +1,96 @@
+"""
+Migration v26: create ticket_daily_rollups table and fill it from tickets
+"""
+import sys
+from pathlib import Path
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def upgrade():
+    """Create ticket_daily_rollups table and backfill it"""
+    from app.services.ticket_rollup_service import rebuild_ticket_rollups
+
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        try:
+            if settings.DATABASE_URL.startswith("sqlite"):
+                conn.execute(text("""
+                    CREATE TABLE IF NOT EXISTS ticket_daily_rollups (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        day DATE NOT NULL,
+                        branch_id INTEGER NOT NULL DEFAULT 0,
+                        department_id INTEGER NOT NULL DEFAULT 0,
+                        priority VARCHAR(20) NOT NULL,
+                        status VARCHAR(20) NOT NULL,
+                        category VARCHAR(20) NOT NULL,
+                        ticket_count INTEGER NOT NULL DEFAULT 0,
+                        resolved_count INTEGER NOT NULL DEFAULT 0,
+                        resolution_seconds_sum FLOAT NOT NULL DEFAULT 0,
+                        cost_sum NUMERIC(14, 2) NOT NULL DEFAULT 0
+                    );
+                """))
+            else:
+                # PostgreSQL
+                conn.execute(text("""
+                    CREATE TABLE IF NOT EXISTS ticket_daily_rollups (
+                        id SERIAL PRIMARY KEY,
+                        day DATE NOT NULL,
+                        branch_id INTEGER NOT NULL DEFAULT 0,
+                        department_id INTEGER NOT NULL DEFAULT 0,
+                        priority VARCHAR(20) NOT NULL,
+                        status VARCHAR(20) NOT NULL,
+                        category VARCHAR(20) NOT NULL,
+                        ticket_count INTEGER NOT NULL DEFAULT 0,
+                        resolved_count INTEGER NOT NULL DEFAULT 0,
+                        resolution_seconds_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+                        cost_sum NUMERIC(14, 2) NOT NULL DEFAULT 0
+                    );
+                """))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_ticket_daily_rollups_id ON ticket_daily_rollups (id)"))
+            conn.execute(text("""
+                CREATE UNIQUE INDEX IF NOT EXISTS uq_ticket_rollup_key
+                ON ticket_daily_rollups (day, branch_id, department_id, priority, status, category)
+            """))
+            conn.commit()
+        except Exception as exc:
+            conn.rollback()
+            logger.error("Migration v26 failed: %s", exc, exc_info=True)
+            raise
+
+    db = sessionmaker(bind=engine)()
+    try:
+        count = rebuild_ticket_rollups(db)
+        logger.info("Migration v26 completed: ticket_daily_rollups created, %d tickets rolled up", count)
+    except Exception as exc:
+        db.rollback()
+        logger.error("Migration v26 backfill failed: %s", exc, exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+def downgrade():
+    """Drop ticket_daily_rollups table"""
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("DROP TABLE IF EXISTS ticket_daily_rollups"))
+            conn.commit()
+            logger.info("Migration v26 downgrade completed: ticket_daily_rollups dropped")
+        except Exception as exc:
+            conn.rollback()
+            logger.error("Migration v26 downgrade failed: %s", exc, exc_info=True)
+            raise
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    upgrade()
@@ -0,0 +1,88 @@
+"""
+Migration v27: create report_jobs table (queued PDF/XLSX report builds)
+"""
+import sys
+from pathlib import Path
+from sqlalchemy import create_engine, text
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def upgrade():
+    """Create report_jobs table"""
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        try:
+            if settings.DATABASE_URL.startswith("sqlite"):
+                conn.execute(text("""
+                    CREATE TABLE IF NOT EXISTS report_jobs (
+                        id VARCHAR(32) PRIMARY KEY,
+                        kind VARCHAR(10) NOT NULL,
+                        params TEXT NOT NULL,
+                        cache_key VARCHAR(64) NOT NULL,
+                        status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                        file_path VARCHAR(512),
+                        file_size INTEGER,
+                        error TEXT,
+                        requested_by_id INTEGER REFERENCES users(id) ON DELETE SET NULL,
+                        created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        started_at DATETIME,
+                        finished_at DATETIME,
+                        expires_at DATETIME
+                    );
+                """))
+            else:
+                # PostgreSQL
+                conn.execute(text("""
+                    CREATE TABLE IF NOT EXISTS report_jobs (
+                        id VARCHAR(32) PRIMARY KEY,
+                        kind VARCHAR(10) NOT NULL,
+                        params TEXT NOT NULL,
+                        cache_key VARCHAR(64) NOT NULL,
+                        status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                        file_path VARCHAR(512),
+                        file_size INTEGER,
+                        error TEXT,
+                        requested_by_id INTEGER REFERENCES users(id) ON DELETE SET NULL,
+                        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                        started_at TIMESTAMPTZ,
+                        finished_at TIMESTAMPTZ,
+                        expires_at TIMESTAMPTZ
+                    );
+                """))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS idx_report_job_key_created ON report_jobs (cache_key, created_at)"
+            ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS idx_report_job_expires ON report_jobs (expires_at)"
+            ))
+            conn.commit()
+            logger.info("Migration v27 completed: report_jobs created")
+        except Exception as exc:
+            conn.rollback()
+            logger.error("Migration v27 failed: %s", exc, exc_info=True)
+            raise
+
+
+def downgrade():
+    """Drop report_jobs table"""
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("DROP TABLE IF EXISTS report_jobs"))
+            conn.commit()
+            logger.info("Migration v27 downgrade completed: report_jobs dropped")
+        except Exception as exc:
+            conn.rollback()
+            logger.error("Migration v27 downgrade failed: %s", exc, exc_info=True)
+            raise
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    upgrade()
@@ -0,0 +1,59 @@
+"""
+Migration v28: add indexes backing filtered reports (branch/department/date)
+"""
+import sys
+from pathlib import Path
+from sqlalchemy import create_engine, text
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+INDEXES = (
+    ("idx_ticket_rollup_branch_day", "ticket_daily_rollups(branch_id, day)"),
+    ("idx_ticket_rollup_department_day", "ticket_daily_rollups(department_id, day)"),
+    ("idx_ticket_branch_created", "tickets(branch_id, created_at)"),
+    ("idx_ticket_department_created", "tickets(department_id, created_at)"),
+    (
+        "idx_sla_log_report",
+        "sla_logs(ticket_id, sla_rule_id, response_status, resolution_status, escalated)",
+    ),
+)
+
+
+def upgrade():
+    """Create the report filter indexes"""
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        try:
+            for name, target in INDEXES:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {target}"))
+            conn.commit()
+            logger.info("Migration v28 completed: %d report filter indexes created", len(INDEXES))
+        except Exception as exc:
+            conn.rollback()
+            logger.error("Migration v28 failed: %s", exc, exc_info=True)
+            raise
+
+
+def downgrade():
+    """Drop the report filter indexes"""
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        try:
+            for name, _ in INDEXES:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            conn.commit()
+            logger.info("Migration v28 downgrade completed: report filter indexes dropped")
+        except Exception as exc:
+            conn.rollback()
+            logger.error("Migration v28 downgrade failed: %s", exc, exc_info=True)
+            raise
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    upgrade()
@@ -0,0 +1,79 @@
+"""
+Migration v29: create scheduler_leases table (one process runs each background job)
+"""
+import sys
+from pathlib import Path
+from sqlalchemy import create_engine, text
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def upgrade():
+    """Create scheduler_leases table"""
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        try:
+            if settings.DATABASE_URL.startswith("sqlite"):
+                conn.execute(text("""
+                    CREATE TABLE IF NOT EXISTS scheduler_leases (
+                        name VARCHAR(64) PRIMARY KEY,
+                        holder VARCHAR(255),
+                        acquired_at DATETIME,
+                        heartbeat_at DATETIME,
+                        expires_at DATETIME,
+                        last_run_holder VARCHAR(255),
+                        last_run_started_at DATETIME,
+                        last_run_finished_at DATETIME,
+                        last_run_status VARCHAR(20),
+                        last_run_error TEXT
+                    );
+                """))
+            else:
+                # PostgreSQL
+                conn.execute(text("""
+                    CREATE TABLE IF NOT EXISTS scheduler_leases (
+                        name VARCHAR(64) PRIMARY KEY,
+                        holder VARCHAR(255),
+                        acquired_at TIMESTAMPTZ,
+                        heartbeat_at TIMESTAMPTZ,
+                        expires_at TIMESTAMPTZ,
+                        last_run_holder VARCHAR(255),
+                        last_run_started_at TIMESTAMPTZ,
+                        last_run_finished_at TIMESTAMPTZ,
+                        last_run_status VARCHAR(20),
+                        last_run_error TEXT
+                    );
+                """))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_scheduler_leases_expires_at ON scheduler_leases (expires_at)"
+            ))
+            conn.commit()
+            logger.info("Migration v29 completed: scheduler_leases created")
+        except Exception as exc:
+            conn.rollback()
+            logger.error("Migration v29 failed: %s", exc, exc_info=True)
+            raise
+
+
+def downgrade():
+    """Drop scheduler_leases table"""
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("DROP TABLE IF EXISTS scheduler_leases"))
+            conn.commit()
+            logger.info("Migration v29 downgrade completed: scheduler_leases dropped")
+        except Exception as exc:
+            conn.rollback()
+            logger.error("Migration v29 downgrade failed: %s", exc, exc_info=True)
+            raise
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    upgrade()
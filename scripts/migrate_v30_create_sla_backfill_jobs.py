@@ -0,0 +1,97 @@
+"""
+Migration v30: create sla_backfill_jobs table (resumable SLA recompute)
+"""
+import sys
+from pathlib import Path
+from sqlalchemy import create_engine, text
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def upgrade():
+    """Create sla_backfill_jobs table"""
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        try:
+            if settings.DATABASE_URL.startswith("sqlite"):
+                conn.execute(text("""
+                    CREATE TABLE IF NOT EXISTS sla_backfill_jobs (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                        only_open BOOLEAN NOT NULL DEFAULT 0,
+                        dry_run BOOLEAN NOT NULL DEFAULT 0,
+                        chunk_size INTEGER NOT NULL,
+                        pause_ms INTEGER NOT NULL,
+                        last_ticket_id INTEGER NOT NULL DEFAULT 0,
+                        max_ticket_id INTEGER NOT NULL DEFAULT 0,
+                        total_tickets INTEGER NOT NULL DEFAULT 0,
+                        processed_tickets INTEGER NOT NULL DEFAULT 0,
+                        updated_logs INTEGER NOT NULL DEFAULT 0,
+                        created_logs INTEGER NOT NULL DEFAULT 0,
+                        unmatched_tickets INTEGER NOT NULL DEFAULT 0,
+                        error TEXT,
+                        requested_by_id INTEGER REFERENCES users(id) ON DELETE SET NULL,
+                        created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        started_at DATETIME,
+                        heartbeat_at DATETIME,
+                        finished_at DATETIME
+                    );
+                """))
+            else:
+                # PostgreSQL
+                conn.execute(text("""
+                    CREATE TABLE IF NOT EXISTS sla_backfill_jobs (
+                        id SERIAL PRIMARY KEY,
+                        status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                        only_open BOOLEAN NOT NULL DEFAULT FALSE,
+                        dry_run BOOLEAN NOT NULL DEFAULT FALSE,
+                        chunk_size INTEGER NOT NULL,
+                        pause_ms INTEGER NOT NULL,
+                        last_ticket_id INTEGER NOT NULL DEFAULT 0,
+                        max_ticket_id INTEGER NOT NULL DEFAULT 0,
+                        total_tickets INTEGER NOT NULL DEFAULT 0,
+                        processed_tickets INTEGER NOT NULL DEFAULT 0,
+                        updated_logs INTEGER NOT NULL DEFAULT 0,
+                        created_logs INTEGER NOT NULL DEFAULT 0,
+                        unmatched_tickets INTEGER NOT NULL DEFAULT 0,
+                        error TEXT,
+                        requested_by_id INTEGER REFERENCES users(id) ON DELETE SET NULL,
+                        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                        started_at TIMESTAMPTZ,
+                        heartbeat_at TIMESTAMPTZ,
+                        finished_at TIMESTAMPTZ
+                    );
+                """))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_sla_backfill_jobs_id ON sla_backfill_jobs (id)"
+            ))
+            conn.commit()
+            logger.info("Migration v30 completed: sla_backfill_jobs created")
+        except Exception as exc:
+            conn.rollback()
+            logger.error("Migration v30 failed: %s", exc, exc_info=True)
+            raise
+
+
+def downgrade():
+    """Drop sla_backfill_jobs table"""
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("DROP TABLE IF EXISTS sla_backfill_jobs"))
+            conn.commit()
+            logger.info("Migration v30 downgrade completed: sla_backfill_jobs dropped")
+        except Exception as exc:
+            conn.rollback()
+            logger.error("Migration v30 downgrade failed: %s", exc, exc_info=True)
+            raise
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    upgrade()
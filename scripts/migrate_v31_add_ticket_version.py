@@ -0,0 +1,62 @@
+"""
+Migration v31: add tickets.version (row version checked by the ticket read cache)
+"""
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import create_engine, text
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def upgrade():
+    """Add tickets.version"""
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        try:
+            if settings.DATABASE_URL.startswith("sqlite"):
+                result = conn.execute(text(
+                    "SELECT COUNT(*) FROM pragma_table_info('tickets') WHERE name = 'version'"
+                ))
+            else:
+                result = conn.execute(text(
+                    "SELECT COUNT(*) FROM information_schema.columns "
+                    "WHERE table_name = 'tickets' AND column_name = 'version'"
+                ))
+            if result.scalar() > 0:
+                logger.info("Migration v31 skipped: tickets.version already exists")
+                return
+            conn.execute(text("ALTER TABLE tickets ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+            conn.commit()
+            logger.info("Migration v31 completed: tickets.version added")
+        except Exception as exc:
+            conn.rollback()
+            logger.error("Migration v31 failed: %s", exc, exc_info=True)
+            raise
+
+
+def downgrade():
+    """Drop tickets.version"""
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        try:
+            if settings.DATABASE_URL.startswith("sqlite"):
+                logger.warning("SQLite does not support DROP COLUMN. Manual migration required.")
+            else:
+                conn.execute(text("ALTER TABLE tickets DROP COLUMN IF EXISTS version"))
+            conn.commit()
+            logger.info("Migration v31 downgrade completed: tickets.version dropped")
+        except Exception as exc:
+            conn.rollback()
+            logger.error("Migration v31 downgrade failed: %s", exc, exc_info=True)
+            raise
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    upgrade()
@@ -0,0 +1,42 @@
+"""
+Rebuild the report rollup table (ticket_daily_rollups) from tickets
+
+Needed after importing tickets or editing them with plain SQL; normal
+writes through the application keep the rollups current.
+
+    python scripts/rebuild_ticket_rollups.py [--batch-size 1000]
+"""
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app.services.ticket_rollup_service import rebuild_ticket_rollups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild ticket_daily_rollups from the tickets table")
+    parser.add_argument("--batch-size", type=int, default=1000, help="tickets fetched / rows inserted per round trip")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        count = rebuild_ticket_rollups(db, batch_size=args.batch_size)
+        print(f"Rolled up {count} tickets in {time.perf_counter() - started:.1f}s")
+    except Exception as exc:
+        db.rollback()
+        print(f"Rebuild failed: {exc}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
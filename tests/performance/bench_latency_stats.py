@@ -0,0 +1,133 @@
+"""
+Benchmark of the NumPy latency statistics on a synthetic ticket table.
+
+Fills a throw-away SQLite database with N tickets (1,000,000 by default)
+spread over branches, departments and priorities, then times loading the
+durations into arrays and computing percentiles/histograms, against a
+pure-Python pass producing the same summaries (datetime arithmetic per
+row, statistics.quantiles and bisect per group).
+
+اجرا:
+    python -m tests.performance.bench_latency_stats --tickets 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.enums import TicketCategory, TicketPriority, TicketStatus
+from app.database import Base
+from app.models import Branch, Department, Ticket, User
+from app.services.latency_stats_service import HISTOGRAM_EDGES_HOURS, latency_statistics, load_latency_arrays
+
+BATCH = 50000
+
+
+def populate(engine, tickets: int, branches: int, departments: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    Base.metadata.create_all(engine, tables=[User.__table__, Branch.__table__, Department.__table__, Ticket.__table__])
+    priorities = [p.name for p in TicketPriority]
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"username": "bench", "full_name": "bench", "password_hash": "x"}])
+        conn.execute(insert(Branch), [{"name": f"شعبه {i}", "code": f"B{i:03d}"} for i in range(1, branches + 1)])
+        conn.execute(insert(Department), [{"name": f"دپارتمان {i}", "code": f"D{i:02d}"} for i in range(1, departments + 1)])
+        for offset in range(0, tickets, BATCH):
+            rows = []
+            for i in range(offset, min(offset + BATCH, tickets)):
+                created = start + timedelta(seconds=rng.randrange(365 * 86400))
+                # Log-normal like real queues: most tickets fast, a long tail
+                response = created + timedelta(hours=rng.lognormvariate(0, 1.2)) if rng.random() < 0.9 else None
+                resolved = created + timedelta(hours=rng.lognormvariate(2, 1.0)) if rng.random() < 0.7 else None
+                rows.append({
+                    "ticket_number": f"BENCH-{i}",
+                    "title": "t",
+                    "description": "d",
+                    "category": TicketCategory.SOFTWARE.name,
+                    "status": (TicketStatus.RESOLVED if resolved else TicketStatus.PENDING).name,
+                    "priority": rng.choice(priorities),
+                    "user_id": 1,
+                    "branch_id": rng.randint(1, branches) if rng.random() < 0.95 else None,
+                    "department_id": rng.randint(1, departments),
+                    "created_at": created,
+                    "updated_at": created,
+                    "first_response_at": response,
+                    "resolved_at": resolved,
+                })
+            conn.execute(insert(Ticket.__table__), rows)
+
+
+def pure_python(db: Session) -> dict:
+    """The same summaries with per-row datetime arithmetic, statistics.quantiles and bisect"""
+    edges = HISTOGRAM_EDGES_HOURS[1:]
+    groups: dict = {}
+    rows = db.connection().execute(
+        select(
+            Ticket.branch_id, Ticket.department_id, Ticket.priority,
+            Ticket.created_at, Ticket.first_response_at, Ticket.resolved_at,
+        ).execution_options(stream_results=True)
+    )
+    for branch_id, department_id, priority, created_at, first_response_at, resolved_at in rows:
+        for metric, end in (("response", first_response_at), ("resolution", resolved_at)):
+            if end is None:
+                continue
+            hours = (end - created_at).total_seconds() / 3600.0
+            for key in (("overall",), ("branch", branch_id or 0), ("department", department_id or 0), ("priority", priority)):
+                groups.setdefault((metric, key), []).append(hours)
+    summaries = {}
+    for key, values in groups.items():
+        histogram = [0] * len(HISTOGRAM_EDGES_HOURS)
+        for value in values:
+            histogram[bisect.bisect_right(edges, value)] += 1
+        quantiles = statistics.quantiles(values, n=20, method="inclusive") if len(values) > 1 else values * 19
+        summaries[key] = (len(values), statistics.fmean(values), quantiles[9], quantiles[17], quantiles[18], histogram)
+    return summaries
+
+
+def timed(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<36} {time.perf_counter() - start:8.2f} s")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=1000000)
+    parser.add_argument("--branches", type=int, default=120)
+    parser.add_argument("--departments", type=int, default=12)
+    parser.add_argument("--skip-python", action="store_true", help="skip the pure-Python comparison")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "bench_latency.db")
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        timed(f"populate {args.tickets:,} tickets", lambda: populate(engine, args.tickets, args.branches, args.departments))
+        with Session(engine) as db:
+            arrays = timed("load arrays (SQL durations)", lambda: load_latency_arrays(db))
+            print(f"{'':<36} {arrays.nbytes / 1e6:8.1f} MB for {len(arrays):,} tickets")
+            stats = timed("full latency_statistics", lambda: latency_statistics(db))
+            overall = stats["resolution"]["overall"]
+            print(f"resolution p50/p90/p95 = {overall['p50']}/{overall['p90']}/{overall['p95']} h, "
+                  f"{len(stats['resolution']['by_branch'])} branches")
+            if not args.skip_python:
+                timed("pure Python (same summaries)", lambda: pure_python(db))
+    finally:
+        engine.dispose()
+        os.remove(path)
+        os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main()
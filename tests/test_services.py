@@ -119,3 +119,1691 @@ def test_get_user(db, test_user):
     assert user.username == "testuser"
     assert user.id == test_user.id
 
+
+
+def test_get_all_tickets_after_cursor_walks_every_ticket_once(db, test_user):
+    """Test keyset pagination returns the offset order without gaps or repeats"""
+    from app.services.ticket_service import get_all_tickets_after_cursor
+
+    priorities = [TicketPriority.HIGH, TicketPriority.LOW, TicketPriority.CRITICAL]
+    for i in range(7):
+        create_ticket(
+            db,
+            TicketCreate(
+                title=f"تیکت {i}",
+                description="توضیحات تست صفحه‌بندی",
+                category=TicketCategory.SOFTWARE,
+                priority=priorities[i % len(priorities)]
+            ),
+            test_user.id
+        )
+
+    expected, total = get_all_tickets(db, skip=0, limit=100)
+    assert total == 7
+
+    seen = []
+    cursor = ""
+    while True:
+        page, cursor = get_all_tickets_after_cursor(db, cursor=cursor, limit=3)
+        seen.extend(page)
+        if cursor is None:
+            break
+
+    assert [t.id for t in seen] == [t.id for t in expected]
+
+
+def test_get_all_tickets_after_cursor_rejects_garbage(db):
+    """Test malformed cursors raise InvalidTicketCursor"""
+    from app.services.ticket_service import InvalidTicketCursor, get_all_tickets_after_cursor
+
+    with pytest.raises(InvalidTicketCursor):
+        get_all_tickets_after_cursor(db, cursor="not-a-cursor", limit=10)
+
+
+def test_ticket_list_serialization_uses_constant_statements(db, test_branch):
+    """Test a page of N tickets costs the same number of SQL statements for any N"""
+    from sqlalchemy import event
+    from app.models import Ticket, User
+    from app.schemas.ticket import TicketResponse
+    from app.services.count_service import COUNT_NONE
+    from app.services.ticket_service import get_all_tickets_after_cursor
+
+    # Distinct creators/assignees per ticket so lazy loads cannot hide in the identity map
+    for i in range(12):
+        creator = User(username=f"creator{i}", full_name=f"کاربر {i}", password_hash="x", branch_id=test_branch.id)
+        assignee = User(username=f"agent{i}", full_name=f"کارشناس {i}", password_hash="x", role=UserRole.IT_SPECIALIST)
+        db.add_all([creator, assignee])
+        db.flush()
+        db.add(Ticket(
+            ticket_number=f"T-20250101-{i:04d}",
+            title=f"تیکت {i}",
+            description="توضیحات تست بارگذاری",
+            category=TicketCategory.SOFTWARE,
+            priority=TicketPriority.MEDIUM,
+            user_id=creator.id,
+            branch_id=test_branch.id,
+            assigned_to_id=assignee.id if i % 2 else None,
+        ))
+    db.commit()
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def statements_for_page(size):
+        db.expunge_all()
+        statements.clear()
+        event.listen(db.get_bind(), "before_cursor_execute", count_statement)
+        try:
+            tickets, _ = get_all_tickets(db, skip=0, limit=size, count_mode=COUNT_NONE)
+            [TicketResponse.model_validate(t) for t in tickets]
+            page, _ = get_all_tickets_after_cursor(db, cursor="", limit=size)
+            [TicketResponse.model_validate(t) for t in page]
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", count_statement)
+        return len(statements)
+
+    assert statements_for_page(2) == statements_for_page(12)
+
+
+def test_search_tickets_normalizes_persian_and_ranks_title_first(db, test_user):
+    """Test full-text search matches Arabic/Persian letter variants and ZWNJ spellings"""
+    from app.models import Comment
+    from app.services.ticket_search_service import search_terms
+
+    in_title = create_ticket(db, TicketCreate(
+        title="خرابی كيبورد",
+        description="صفحه کلید کار نمی‌کند",
+        category=TicketCategory.EQUIPMENT,
+        priority=TicketPriority.LOW
+    ), test_user.id)
+    in_comment = create_ticket(db, TicketCreate(
+        title="مشکل سیستم",
+        description="رایانه روشن نمی‌شود",
+        category=TicketCategory.EQUIPMENT,
+        priority=TicketPriority.HIGH
+    ), test_user.id)
+    create_ticket(db, TicketCreate(
+        title="درخواست چاپگر",
+        description="نیاز به چاپگر جدید داریم",
+        category=TicketCategory.EQUIPMENT,
+        priority=TicketPriority.CRITICAL
+    ), test_user.id)
+
+    db.add(Comment(ticket_id=in_comment.id, user_id=test_user.id, comment="کیبورد هم عوض شود"))
+    db.add(Comment(ticket_id=in_comment.id, user_id=test_user.id, comment="چاپگر", is_internal=True))
+    db.commit()
+
+    assert search_terms("كيبورد  نمي‌کند") == ["کیبورد", "نمیکند"]
+
+    tickets, total = get_all_tickets(db, search="کیبورد")
+    assert total == 2
+    assert [t.id for t in tickets] == [in_title.id, in_comment.id]
+
+    tickets, total = get_all_tickets(db, search="نمیکند كيبورد")
+    assert [t.id for t in tickets] == [in_title.id]
+
+    # Internal notes are not searchable
+    tickets, _ = get_all_tickets(db, search="چاپگر")
+    assert len(tickets) == 1
+
+    in_title.title = "خرابی موس"
+    db.commit()
+    tickets, _ = get_all_tickets(db, search="موس")
+    assert [t.id for t in tickets] == [in_title.id]
+
+
+def test_search_tickets_respects_user_scope(db, test_user):
+    """Test search through get_user_tickets never returns other users' tickets"""
+    from app.services.ticket_service import get_user_tickets
+
+    other = create_user(db, UserCreate(
+        username="otheruser",
+        full_name="کاربر دیگر",
+        password="password123",
+        role=UserRole.USER,
+        language=Language.FA
+    ))
+    mine = create_ticket(db, TicketCreate(
+        title="مشکل پرینتر",
+        description="پرینتر طبقه دوم کاغذ گیر می‌کند",
+        category=TicketCategory.EQUIPMENT,
+        priority=TicketPriority.MEDIUM
+    ), test_user.id)
+    create_ticket(db, TicketCreate(
+        title="مشکل پرینتر",
+        description="پرینتر اتاق جلسه خاموش است",
+        category=TicketCategory.EQUIPMENT,
+        priority=TicketPriority.MEDIUM
+    ), other.id)
+
+    tickets, total = get_user_tickets(db, test_user.id, search="پرینتر")
+    assert total == 1
+    assert [t.id for t in tickets] == [mine.id]
+
+
+def test_bulk_status_action_updates_tickets_history_and_sla(db, test_user, test_admin):
+    """Test a chunked bulk close updates every ticket, its history and SLA log"""
+    from app.models import SLALog, SLARule, Ticket, TicketHistory
+    from app.services.ticket_bulk_service import run_bulk_action
+
+    db.add(SLARule(name="پیش‌فرض", response_time_minutes=60, resolution_time_minutes=240))
+    db.commit()
+    tickets = [
+        create_ticket(db, TicketCreate(
+            title=f"تیکت گروهی {i}",
+            description="تست عملیات گروهی",
+            category=TicketCategory.SOFTWARE,
+            priority=TicketPriority.MEDIUM
+        ), test_user.id)
+        for i in range(5)
+    ]
+    ids = [t.id for t in tickets]
+
+    result = run_bulk_action(db, test_admin, ids + [9999], "status", status=TicketStatus.RESOLVED, chunk_size=2)
+
+    assert result.success_ids == ids
+    assert result.failed_ids == [9999]
+    assert [change[0] for change in result.status_changes] == ids
+    db.expire_all()
+    for ticket in db.query(Ticket).filter(Ticket.id.in_(ids)):
+        assert ticket.status == TicketStatus.RESOLVED
+        assert ticket.resolved_at is not None
+    assert db.query(TicketHistory).filter(
+        TicketHistory.ticket_id.in_(ids), TicketHistory.status == TicketStatus.RESOLVED
+    ).count() == 5
+    logs = db.query(SLALog).filter(SLALog.ticket_id.in_(ids)).all()
+    assert len(logs) == 5
+    assert all(log.resolution_status == "on_time" for log in logs)
+
+
+def test_bulk_action_respects_scope_and_deletes_with_comments(db, test_user, test_branch):
+    """Test branch admins only touch their branch and delete removes comments too"""
+    from app.models import Comment, Ticket, User
+    from app.services.ticket_bulk_service import run_bulk_action
+
+    branch_admin = User(
+        username="branchadmin",
+        full_name="مدیر شعبه",
+        password_hash="x",
+        role=UserRole.BRANCH_ADMIN,
+        branch_id=test_branch.id
+    )
+    db.add(branch_admin)
+    db.commit()
+    own = create_ticket(db, TicketCreate(
+        title="تیکت شعبه",
+        description="تیکت داخل شعبه",
+        category=TicketCategory.OTHER,
+        priority=TicketPriority.LOW,
+        branch_id=test_branch.id
+    ), test_user.id)
+    foreign = create_ticket(db, TicketCreate(
+        title="تیکت دیگر",
+        description="تیکت بدون شعبه",
+        category=TicketCategory.OTHER,
+        priority=TicketPriority.LOW
+    ), test_user.id)
+    db.add(Comment(ticket_id=own.id, user_id=test_user.id, comment="نظر تست"))
+    db.commit()
+    own_id, foreign_id = own.id, foreign.id
+
+    result = run_bulk_action(db, branch_admin, [own_id, foreign_id], "delete")
+
+    assert result.success_ids == [own_id]
+    assert result.failed_ids == [foreign_id]
+    assert db.query(Ticket).filter(Ticket.id == own_id).count() == 0
+    assert db.query(Comment).count() == 0
+    assert db.query(Ticket).filter(Ticket.id == foreign_id).count() == 1
+
+
+def test_create_ticket_writes_pipeline_in_one_commit(db, test_user, test_admin):
+    """Test ticket, SLA log, history and feed rows are written by a single commit"""
+    from sqlalchemy import event
+    from app.models import Notification, SLALog, SLARule, TicketHistory
+
+    test_admin.telegram_chat_id = "1001"
+    db.add(SLARule(name="پیش‌فرض", response_time_minutes=60, resolution_time_minutes=240))
+    db.commit()
+
+    commits = []
+
+    def count_commit(session, transaction):
+        # Savepoints (begin_nested) end as child transactions; only count real commits
+        if transaction.parent is None:
+            commits.append(transaction)
+
+    event.listen(db, "after_transaction_end", count_commit)
+    try:
+        ticket = create_ticket(db, TicketCreate(
+            title="تیکت یک تراکنشی",
+            description="بررسی ثبت در یک تراکنش",
+            category=TicketCategory.SOFTWARE,
+            priority=TicketPriority.HIGH
+        ), test_user.id)
+    finally:
+        event.remove(db, "after_transaction_end", count_commit)
+
+    assert len(commits) == 1
+    assert db.query(SLALog).filter(SLALog.ticket_id == ticket.id).count() == 1
+    assert db.query(TicketHistory).filter(TicketHistory.ticket_id == ticket.id).count() == 1
+    assert db.query(Notification).filter(Notification.user_id == test_admin.id).count() == 1
+
+
+def test_create_ticket_leaves_nothing_behind_on_failure(db, test_user, monkeypatch):
+    """Test a failing mandatory step rolls back the whole ticket, optional steps do not"""
+    from app.models import SLALog, SLARule, Ticket
+    from app.services import automation_service, ticket_history_service
+
+    db.add(SLARule(name="پیش‌فرض", response_time_minutes=60, resolution_time_minutes=240))
+    db.commit()
+    ticket_data = TicketCreate(
+        title="تیکت ناقص",
+        description="بررسی بازگشت تراکنش",
+        category=TicketCategory.SOFTWARE,
+        priority=TicketPriority.LOW
+    )
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(automation_service, "auto_assign_ticket", fail)
+    ticket = create_ticket(db, ticket_data, test_user.id)
+    assert db.query(SLALog).filter(SLALog.ticket_id == ticket.id).count() == 1
+
+    monkeypatch.setattr(ticket_history_service, "create_ticket_history", fail)
+    with pytest.raises(RuntimeError):
+        create_ticket(db, ticket_data, test_user.id)
+    assert db.query(Ticket).count() == 1
+    assert db.query(SLALog).count() == 1
+
+
+def test_ticket_totals_are_cached_until_a_write(db, test_user):
+    """Test exact totals are reused per filter set and dropped when tickets change"""
+    from sqlalchemy import event
+    from app.services.count_service import COUNT_ESTIMATED, COUNT_NONE
+
+    def new_ticket(title):
+        return create_ticket(db, TicketCreate(
+            title=title,
+            description="تست شمارش کش‌شده",
+            category=TicketCategory.SOFTWARE,
+            priority=TicketPriority.MEDIUM
+        ), test_user.id)
+
+    new_ticket("تیکت اول")
+    counts = []
+
+    def record_count(conn, cursor, statement, parameters, context, executemany):
+        if "count(*)" in statement.lower():
+            counts.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", record_count)
+    try:
+        assert get_all_tickets(db)[1] == 1
+        assert get_all_tickets(db)[1] == 1
+        assert len(counts) == 1
+        assert get_all_tickets(db, status=TicketStatus.CLOSED)[1] == 0
+        assert len(counts) == 2
+
+        new_ticket("تیکت دوم")
+        assert get_all_tickets(db)[1] == 2
+        counts.clear()
+        new_ticket("تیکت سوم")
+        # Estimates may lag behind writes; exact totals may not
+        assert get_all_tickets(db, count_mode=COUNT_ESTIMATED)[1] == 2
+        assert get_all_tickets(db)[1] == 3
+        assert get_all_tickets(db, count_mode=COUNT_NONE)[1] is None
+        assert len(counts) == 1
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", record_count)
+
+
+def test_ticket_read_cache_is_invalidated_by_writes(db, test_user):
+    """Test cached ticket reads are dropped on write and stale loads are not stored"""
+    from sqlalchemy import text, update
+    from app.models import Ticket
+    from app.services.ticket_cache_service import ticket_read_cache
+
+    ticket = create_ticket(db, TicketCreate(
+        title="تیکت کش",
+        description="تست کش خواندن",
+        category=TicketCategory.SOFTWARE,
+        priority=TicketPriority.MEDIUM
+    ), test_user.id)
+    ticket_read_cache.clear()
+
+    stamp = ticket_read_cache.version()
+    entry = ticket_read_cache.store(get_ticket(db, ticket.id, load_relations=True), stamp)
+    assert ticket_read_cache.get(ticket.id) is entry
+    assert ticket_read_cache.get_by_number(ticket.ticket_number) is entry
+    assert b'"status":"pending"' in entry.payload
+    assert entry.last_modified.endswith("GMT")
+
+    update_ticket_status(db, ticket, TicketStatus.IN_PROGRESS)
+    assert ticket_read_cache.get(ticket.id) is None
+
+    # A load that raced with a write must not be cached
+    ticket_read_cache.store(get_ticket(db, ticket.id, load_relations=True), stamp)
+    assert ticket_read_cache.get(ticket.id) is None
+
+    stamp = ticket_read_cache.version()
+    fresh = ticket_read_cache.store(get_ticket(db, ticket.id, load_relations=True), stamp)
+    assert ticket_read_cache.get(ticket.id) is fresh
+    assert fresh.etag != entry.etag
+
+    test_user.full_name = "نام جدید"
+    db.commit()
+    assert ticket_read_cache.get(ticket.id) is None
+
+    # A write by another worker is not seen by the hooks; revalidation catches it
+    stamp = ticket_read_cache.version()
+    entry = ticket_read_cache.store(get_ticket(db, ticket.id, load_relations=True), stamp)
+    assert ticket_read_cache.revalidate(db, entry) is entry
+    with db.get_bind().begin() as conn:
+        conn.execute(text("UPDATE tickets SET version = version + 1 WHERE id = :id"), {"id": ticket.id})
+    assert ticket_read_cache.get(ticket.id) is entry
+    assert ticket_read_cache.revalidate(db, entry) is None
+    assert ticket_read_cache.get(ticket.id) is None
+
+    # Every write bumps the version, however close together
+    version = db.query(Ticket.version).filter(Ticket.id == ticket.id).scalar()
+    update_ticket_status(db, ticket, TicketStatus.RESOLVED)
+    db.execute(update(Ticket).where(Ticket.id == ticket.id).values(title="عنوان جدید"))
+    db.commit()
+    assert db.query(Ticket.version).filter(Ticket.id == ticket.id).scalar() == version + 2
+
+
+def test_ticket_sync_returns_changes_and_tombstones_after_watermark(db, test_user, test_admin):
+    """Test delta sync pages by watermark, reports deletions and respects scope"""
+    from sqlalchemy import update
+    from app.models import Ticket, TicketDeletion
+    from app.services.ticket_service import delete_ticket, update_ticket
+    from app.services.ticket_sync_service import sync_tickets
+    from app.schemas.ticket import TicketUpdate
+
+    def new_ticket(title, user_id):
+        return create_ticket(db, TicketCreate(
+            title=title,
+            description="تست همگام‌سازی",
+            category=TicketCategory.SOFTWARE,
+            priority=TicketPriority.MEDIUM
+        ), user_id)
+
+    def settle(model, column, minutes):
+        # Changes younger than SYNC_SETTLE_SECONDS are held back
+        db.execute(update(model).values({column: datetime.utcnow() - timedelta(minutes=minutes)}))
+        db.commit()
+
+    first = new_ticket("اول", test_user.id)
+    second = new_ticket("دوم", test_user.id)
+    third = new_ticket("سوم", test_admin.id)
+    settle(Ticket, "updated_at", 60)
+
+    page = sync_tickets(db, test_admin, limit=2)
+    assert [t.id for t in page.tickets] == [first.id, second.id]
+    assert page.has_more
+    page = sync_tickets(db, test_admin, watermark=page.watermark, limit=2)
+    assert [t.id for t in page.tickets] == [third.id]
+    assert not page.has_more and page.deletions == []
+    watermark = page.watermark
+    assert sync_tickets(db, test_admin, watermark=watermark).tickets == []
+
+    update_ticket(db, first, TicketUpdate(title="اول ویرایش‌شده"))
+    assert sync_tickets(db, test_admin, watermark=watermark).tickets == []
+    db.execute(update(Ticket).where(Ticket.id == first.id).values(updated_at=datetime.utcnow() - timedelta(minutes=30)))
+    second_id = second.id
+    assert delete_ticket(db, second)
+    settle(TicketDeletion, "deleted_at", 30)
+
+    page = sync_tickets(db, test_admin, watermark=watermark)
+    assert [t.title for t in page.tickets] == ["اول ویرایش‌شده"]
+    assert [d.ticket_id for d in page.deletions] == [second_id]
+    assert sync_tickets(db, test_admin, watermark=page.watermark).deletions == []
+
+    own = sync_tickets(db, test_user)
+    assert [t.id for t in own.tickets] == [first.id]
+    with pytest.raises(ValueError):
+        sync_tickets(db, test_user, watermark="not-a-watermark")
+
+
+def test_priority_classifier_uses_configured_weighted_keywords(db, test_user):
+    """Test the compiled classifier matches like the old keyword lists and honours settings"""
+    from app.services.priority_classifier_service import (
+        default_priority_classifier,
+        reset_priority_classifier,
+        set_priority_keyword_config,
+    )
+
+    classifier = default_priority_classifier()
+    assert classifier.classify("Server DOWN", "") == TicketPriority.CRITICAL
+    # Normalized once: Arabic letters and a missing ZWNJ still match "کار نمی‌کند"
+    assert classifier.classify("چاپگر", "كار نميكند") == TicketPriority.CRITICAL
+    assert classifier.classify("Errors everywhere", "and a question") == TicketPriority.HIGH
+    assert classifier.classify("سلام", "") == TicketPriority.MEDIUM
+    assert classifier.classify_many([("help me", ""), ("stopped", "")]) == [
+        TicketPriority.LOW, TicketPriority.CRITICAL
+    ]
+
+    try:
+        set_priority_keyword_config(db, {
+            "critical": {"outage": 1.0, "slow": 0.5, "slowdown": 0.5},
+            "low": ["printer"],
+            "threshold": 1.0,
+        })
+        # Overlapping keywords are all counted: "slowdown" contains "slow"
+        def auto_priority(title, description):
+            ticket_data = TicketCreate(title=title, description=description, category=TicketCategory.SOFTWARE)
+            ticket_data.priority = None
+            return create_ticket(db, ticket_data, test_user.id).priority
+
+        assert auto_priority("Network slowdown", "the printer too") == TicketPriority.CRITICAL
+        assert auto_priority("slow printer", "in the main office") == TicketPriority.LOW
+
+        with pytest.raises(ValueError):
+            set_priority_keyword_config(db, {"urgent": ["x"]})
+    finally:
+        reset_priority_classifier()
+
+
+def test_report_rollups_follow_ticket_writes(db, test_user, test_admin, test_branch):
+    """Test report breakdowns come from rollups kept in step with every write path"""
+    from sqlalchemy import select
+    from app.models import TicketDailyRollup
+    from app.services.report_service import (
+        average_response_time_hours,
+        tickets_by_branch,
+        tickets_by_date,
+        tickets_by_priority,
+        tickets_overview,
+    )
+    from app.services.ticket_bulk_service import run_bulk_action
+    from app.services.ticket_rollup_service import rebuild_ticket_rollups
+    from app.services.ticket_service import delete_ticket
+
+    tickets = [
+        create_ticket(db, TicketCreate(
+            title=f"تیکت گزارش {i}",
+            description="تست جدول تجمیعی",
+            category=TicketCategory.SOFTWARE,
+            priority=TicketPriority.HIGH if i % 2 else TicketPriority.LOW,
+            branch_id=test_branch.id if i < 2 else None,
+        ), test_user.id)
+        for i in range(4)
+    ]
+    update_ticket_status(db, tickets[0], TicketStatus.RESOLVED)
+    run_bulk_action(db, test_admin, [tickets[1].id, tickets[2].id], "status", status=TicketStatus.IN_PROGRESS)
+    assert delete_ticket(db, tickets[3])
+
+    assert tickets_overview(db) == {"total": 3, "resolved": 1, "in_progress": 2}
+    assert tickets_by_priority(db) == {"critical": 0, "high": 1, "medium": 0, "low": 2}
+    assert {row["branch_code"]: row["count"] for row in tickets_by_branch(db)} == {test_branch.code: 2, "NONE": 1}
+    assert [row["count"] for row in tickets_by_date(db)] == [3]
+    assert average_response_time_hours(db) is not None
+
+    def snapshot():
+        rows = db.execute(select(TicketDailyRollup).order_by(TicketDailyRollup.id)).scalars()
+        return sorted(
+            (r.day, r.branch_id, r.department_id, r.priority, r.status, r.category, r.ticket_count, r.resolved_count)
+            for r in rows if r.ticket_count
+        )
+
+    incremental = snapshot()
+    assert rebuild_ticket_rollups(db) == 3
+    assert snapshot() == incremental
+
+
+def test_sla_reports_aggregate_in_one_query_per_report(db, test_user, test_branch):
+    """Test SLA compliance reports group statuses in SQL with one statement each"""
+    from sqlalchemy import event
+    from app.models import SLALog, SLARule
+    from app.services.report_service import (
+        sla_by_branch,
+        sla_by_priority,
+        sla_by_rule,
+        sla_compliance_report,
+    )
+
+    db.add(SLARule(name="پیش‌فرض", response_time_minutes=60, resolution_time_minutes=240))
+    db.commit()
+    tickets = [
+        create_ticket(db, TicketCreate(
+            title=f"تیکت SLA {i}",
+            description="تست گزارش SLA",
+            category=TicketCategory.SOFTWARE,
+            priority=TicketPriority.HIGH if i < 2 else TicketPriority.LOW,
+            branch_id=test_branch.id if i == 0 else None,
+        ), test_user.id)
+        for i in range(3)
+    ]
+    logs = {log.ticket_id: log for log in db.query(SLALog)}
+    logs[tickets[0].id].response_status = "on_time"
+    logs[tickets[1].id].response_status = "breached"
+    logs[tickets[1].id].escalated = True
+    logs[tickets[2].id].resolution_status = "on_time"
+    db.commit()
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    try:
+        summary = sla_compliance_report(db)
+        by_priority = sla_by_priority(db)
+        by_branch = sla_by_branch(db)
+        by_rule = sla_by_rule(db)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", record)
+
+    assert len(statements) == 4
+    assert summary["total_tickets_with_sla"] == 3
+    assert summary["escalated_count"] == 1
+    assert summary["response_compliance_rate"] == 50.0
+    assert summary["resolution_compliance_rate"] == 100.0
+    assert [(row["priority"], row["total_tickets"]) for row in by_priority] == [("high", 2), ("low", 1)]
+    assert by_priority[0]["response_breached"] == 1
+    assert {row["branch_code"]: row["total_tickets"] for row in by_branch} == {test_branch.code: 1, "NONE": 2}
+    assert [(row["sla_rule_name"], row["total_tickets"]) for row in by_rule] == [("پیش‌فرض", 3)]
+
+
+def test_ticket_export_streams_rows_in_chunks(db, test_user, test_admin, test_branch):
+    """Test row-level ticket export yields CSV/NDJSON blocks per chunk and a valid XLSX"""
+    import csv
+    import io
+    import json
+    import openpyxl
+    from app.services.ticket_export_service import EXPORT_FIELDS, stream_ticket_export
+
+    for i in range(5):
+        create_ticket(db, TicketCreate(
+            title=f"تیکت خروجی {i}, \"نقل‌قول\"",
+            description="تست خروجی ردیفی تیکت‌ها",
+            category=TicketCategory.SOFTWARE,
+            priority=TicketPriority.HIGH if i % 2 else TicketPriority.LOW,
+            branch_id=test_branch.id,
+        ), test_user.id)
+
+    blocks = list(stream_ticket_export("csv", test_admin, db=db, chunk_size=2))
+    # Header first, then one block per chunk of 2 rows
+    assert len(blocks) == 4
+    rows = list(csv.reader(io.StringIO(b"".join(blocks).decode("utf-8-sig"))))
+    assert rows[0] == EXPORT_FIELDS
+    assert [row[EXPORT_FIELDS.index("title")] for row in rows[1:]] == [
+        f"تیکت خروجی {i}, \"نقل‌قول\"" for i in range(5)
+    ]
+    assert {row[EXPORT_FIELDS.index("branch_code")] for row in rows[1:]} == {test_branch.code}
+
+    lines = b"".join(stream_ticket_export("ndjson", test_user, db=db, priority=TicketPriority.HIGH)).splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [record["priority"] for record in records] == ["high", "high"]
+    assert records[0]["created_by"] == test_user.username
+
+    workbook = openpyxl.load_workbook(io.BytesIO(b"".join(stream_ticket_export("xlsx", test_admin, db=db))))
+    sheet_rows = list(workbook["tickets"].values)
+    assert list(sheet_rows[0]) == EXPORT_FIELDS
+    assert len(sheet_rows) == 6
+
+
+def test_report_jobs_reuse_artifacts_within_ttl(db, test_user, monkeypatch, tmp_path):
+    """Test report jobs render once per parameter set and are purged after expiry"""
+    import asyncio
+    import openpyxl
+    from datetime import date
+    from app.config import settings
+    from app.models import ReportJob
+    from app.services.report_job_service import (
+        JOB_DONE,
+        JOB_FAILED,
+        purge_expired_report_jobs,
+        report_job_artifact,
+        run_report_job,
+        submit_report_job,
+        wait_for_report_job,
+    )
+    from tests.conftest import TestingSessionLocal
+
+    monkeypatch.setattr(settings, "REPORT_JOB_WORKERS", 0)
+    monkeypatch.setattr(settings, "REPORT_STORAGE_DIR", tmp_path)
+    create_ticket(db, TicketCreate(
+        title="تیکت گزارش",
+        description="تست صف ساخت گزارش",
+        category=TicketCategory.SOFTWARE,
+        priority=TicketPriority.HIGH,
+    ), test_user.id)
+
+    params = {"date_from": date(2020, 1, 1), "branch_id": None}
+    job, created = submit_report_job(db, "xlsx", params, requested_by_id=test_user.id)
+    assert created
+    # Identical request while pending shares the job; other parameters do not
+    assert submit_report_job(db, "xlsx", {"date_from": date(2020, 1, 1)}) == (job, False)
+    other, created = submit_report_job(db, "xlsx", {"date_from": date(2021, 1, 1)})
+    assert created and other.id != job.id
+
+    asyncio.run(run_report_job(job.id, db=db))
+    db.refresh(job)
+    assert job.status == JOB_DONE
+    path = report_job_artifact(job)
+    assert path is not None and path.parent == tmp_path
+    workbook = openpyxl.load_workbook(path)
+    assert dict(list(workbook["overview"].values)[1:])["total"] == 1
+
+    assert submit_report_job(db, "xlsx", params) == (job, False)
+
+    job.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    assert purge_expired_report_jobs(db) == 1
+    assert not path.exists()
+    assert db.query(ReportJob).filter(ReportJob.id == job.id).first() is None
+
+    # A job left running past its expiry reads as interrupted, also through a fresh session
+    monkeypatch.setattr("app.database.SessionLocal", TestingSessionLocal)
+    other.status = "running"
+    other.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    interrupted = asyncio.run(wait_for_report_job(other.id, timeout=0))
+    assert (interrupted.status, interrupted.error) == (JOB_FAILED, "interrupted")
+
+
+def test_report_jobs_are_scoped_to_branch_admins_branch(db, test_admin, test_branch, monkeypatch):
+    """Branch admins queue report jobs for their own branch and cannot see other branches' jobs"""
+    import asyncio
+    import httpx
+    from fastapi import Depends, FastAPI
+    from app.api import reports
+    from app.api.deps import get_current_user
+    from app.database import get_db
+    from app.models import Branch, ReportJob, User
+    from app.services.report_job_service import report_job_params, submit_report_job
+    from tests.conftest import TestingSessionLocal
+
+    other_branch = Branch(name="شعبه دیگر", name_en="Other", code="OTHER", is_active=True)
+    branch_admin = User(
+        username="branchadmin", full_name="مدیر شعبه", password_hash="x", role=UserRole.BRANCH_ADMIN,
+        language=Language.FA, is_active=True, branch_id=test_branch.id,
+    )
+    db.add_all([other_branch, branch_admin])
+    db.commit()
+    foreign, _ = submit_report_job(db, "xlsx", {"branch_id": other_branch.id}, requested_by_id=test_admin.id)
+    user_ids = {"admin": test_admin.id, "branch": branch_admin.id}
+    current = {"role": "branch"}
+    queued = []
+
+    def request_db():
+        session = TestingSessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    def current_user(session=Depends(get_db)):
+        return session.get(User, user_ids[current["role"]])
+
+    async def run_report_job(job_id):
+        queued.append(job_id)
+
+    monkeypatch.setattr(reports, "run_report_job", run_report_job)
+    app = FastAPI()
+    app.include_router(reports.router, prefix="/api/reports")
+    app.dependency_overrides[get_db] = request_db
+    app.dependency_overrides[get_current_user] = current_user
+
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            created = await client.post("/api/reports/jobs", json={"kind": "xlsx"})
+            forbidden = await client.post("/api/reports/jobs", json={"kind": "xlsx", "branch_id": other_branch.id})
+            own = await client.get(f"/api/reports/jobs/{created.json()['id']}")
+            hidden = await client.get(f"/api/reports/jobs/{foreign.id}")
+            hidden_download = await client.get(f"/api/reports/jobs/{foreign.id}/download")
+            current["role"] = "admin"
+            visible = await client.get(f"/api/reports/jobs/{foreign.id}")
+        return created, forbidden, own, hidden, hidden_download, visible
+
+    created, forbidden, own, hidden, hidden_download, visible = asyncio.run(scenario())
+    assert created.status_code == 202 and queued == [created.json()["id"]]
+    db.expire_all()
+    job = db.get(ReportJob, created.json()["id"])
+    assert report_job_params(job) == {"branch_id": test_branch.id}
+    assert forbidden.status_code == 403
+    assert own.status_code == 200
+    assert hidden.status_code == 404 and hidden_download.status_code == 404
+    assert visible.status_code == 200
+
+
+def test_report_cache_coalesces_and_invalidates_on_ticket_writes(db, test_user):
+    """Test report cache hits, per-filter keys, write invalidation and request coalescing"""
+    import threading
+    import time
+    from datetime import date
+    from app.services.report_cache_service import ReportCache, report_cache
+    from app.services.report_service import tickets_by_status
+
+    calls = []
+
+    def by_status():
+        calls.append(1)
+        return tickets_by_status(db)
+
+    assert report_cache.get_or_compute("by-status", {}, by_status) == {}
+    assert report_cache.get_or_compute("by-status", {"branch_id": None}, by_status) == {}
+    assert len(calls) == 1
+    report_cache.get_or_compute("by-status", {"date_from": date(2024, 1, 1)}, by_status)
+    assert len(calls) == 2
+
+    create_ticket(db, TicketCreate(
+        title="تیکت کش گزارش",
+        description="تست ابطال کش گزارش",
+        category=TicketCategory.SOFTWARE,
+    ), test_user.id)
+    assert report_cache.get_or_compute("by-status", {}, by_status) == {"pending": 1}
+    assert len(calls) == 3
+
+    cache = ReportCache()
+    release = threading.Event()
+    computed = []
+
+    def slow():
+        computed.append(1)
+        release.wait(5)
+        return {"total": 1}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("overview", {}, slow)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    while cache.stats()["coalesced"] < 4:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(computed) == 1
+    assert results == [{"total": 1}] * 5
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["entries"]) == (1, 4, 1)
+
+
+def test_dashboard_kpis_match_single_reports(db, test_user, test_branch):
+    """Test the dashboard payload equals the single reports in a handful of statements"""
+    from sqlalchemy import event
+    from app.services.report_service import (
+        average_response_time_hours,
+        dashboard_kpis,
+        sla_compliance_report,
+        tickets_by_branch,
+        tickets_by_date,
+        tickets_by_department,
+        tickets_by_priority,
+        tickets_by_status,
+        tickets_overview,
+    )
+
+    tickets = [
+        create_ticket(db, TicketCreate(
+            title=f"تیکت داشبورد {i}",
+            description="تست شاخص‌های داشبورد",
+            category=TicketCategory.SOFTWARE,
+            priority=TicketPriority.HIGH if i % 2 else TicketPriority.LOW,
+            branch_id=test_branch.id if i < 2 else None,
+        ), test_user.id)
+        for i in range(4)
+    ]
+    update_ticket_status(db, tickets[0], TicketStatus.RESOLVED)
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    try:
+        kpis = dashboard_kpis(db)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", record)
+
+    assert len(statements) <= 5
+    assert kpis["overview"] == tickets_overview(db)
+    assert kpis["by_status"] == tickets_by_status(db) == {"pending": 3, "resolved": 1}
+    assert kpis["by_date"] == tickets_by_date(db)
+    assert kpis["by_branch"] == tickets_by_branch(db)
+    assert kpis["by_priority"] == tickets_by_priority(db)
+    assert kpis["by_department"] == tickets_by_department(db)
+    assert kpis["sla"] == sla_compliance_report(db)
+    assert kpis["response_time_hours"] == average_response_time_hours(db)
+
+
+def test_latency_statistics_percentiles_and_histograms(db, test_user, test_branch):
+    """Test latency percentiles/histograms per dimension from SQL-computed durations"""
+    pytest.importorskip("numpy")
+    from app.services.latency_stats_service import latency_statistics
+    from app.services.report_service import ReportFilter
+
+    created = datetime(2024, 3, 1, 8, 0, 0)
+    for i, hours in enumerate((1, 2, 10, 30)):
+        ticket = create_ticket(db, TicketCreate(
+            title=f"تیکت زمان حل {i}",
+            description="تست توزیع زمان پاسخ و حل",
+            category=TicketCategory.SOFTWARE,
+            priority=TicketPriority.HIGH if i < 3 else TicketPriority.LOW,
+            branch_id=test_branch.id if i < 3 else None,
+        ), test_user.id)
+        ticket.created_at = created
+        ticket.first_response_at = created + timedelta(minutes=30) if i == 0 else None
+        ticket.resolved_at = created + timedelta(hours=hours) if i < 3 else None
+    db.commit()
+
+    stats = latency_statistics(db, chunk_size=2)
+    assert stats["ticket_count"] == 4
+
+    resolution = stats["resolution"]
+    assert resolution["overall"]["count"] == 3
+    assert (resolution["overall"]["p50"], resolution["overall"]["p90"], resolution["overall"]["p95"]) == (2.0, 8.4, 9.2)
+    assert resolution["overall"]["mean"] == round(13 / 3, 4)
+    # Buckets [0,1) [1,2) [2,4) [4,8) [8,24) ...
+    assert resolution["overall"]["histogram"][:5] == [0, 1, 1, 0, 1]
+    assert [(row["priority"], row["count"]) for row in resolution["by_priority"]] == [("high", 3)]
+    assert [(row["branch_code"], row["count"]) for row in resolution["by_branch"]] == [(test_branch.code, 3)]
+
+    response = stats["response"]
+    assert response["overall"]["count"] == 1
+    assert response["overall"]["p50"] == 0.5
+    assert [row["department_code"] for row in response["by_department"]] == ["NONE"]
+
+    assert latency_statistics(db, ReportFilter(date_from=created.date() + timedelta(days=1)))["ticket_count"] == 0
+
+
+def test_report_filters_are_applied_in_sql(db, test_user, test_branch):
+    """Test a ReportFilter narrows every report in its WHERE clause, rollup and SLA alike"""
+    from datetime import date
+    from sqlalchemy import event
+    from app.models import SLARule
+    from app.services.report_service import (
+        ReportFilter,
+        dashboard_kpis,
+        sla_by_rule,
+        sla_compliance_report,
+        tickets_by_branch,
+        tickets_by_status,
+    )
+
+    db.add(SLARule(name="پیش‌فرض", response_time_minutes=60, resolution_time_minutes=240))
+    db.commit()
+    for i in range(4):
+        create_ticket(db, TicketCreate(
+            title=f"تیکت فیلتر {i}",
+            description="تست فیلتر گزارش",
+            category=TicketCategory.SOFTWARE,
+            priority=TicketPriority.HIGH if i < 3 else TicketPriority.LOW,
+            branch_id=test_branch.id if i < 2 else None,
+        ), test_user.id)
+
+    branch_only = ReportFilter(branch_id=test_branch.id)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    try:
+        assert tickets_by_status(db, branch_only) == {"pending": 2}
+        assert sla_compliance_report(db, branch_only)["total_tickets_with_sla"] == 2
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", record)
+    assert all("WHERE" in statement and "branch_id" in statement.split("WHERE", 1)[1] for statement in statements)
+
+    assert tickets_by_status(db) == {"pending": 4}
+    assert [row["count"] for row in tickets_by_branch(db, branch_only)] == [2]
+    high_no_branch = ReportFilter(priority="high", date_to=datetime.utcnow().date() - timedelta(days=1))
+    assert tickets_by_status(db, high_no_branch) == {}
+    assert [row["total_tickets"] for row in sla_by_rule(db, ReportFilter(priority="LOW"))] == [1]
+
+    kpis = dashboard_kpis(db, ReportFilter(priority=TicketPriority.HIGH))
+    assert kpis["overview"] == {"total": 3, "pending": 3}
+    assert kpis["by_priority"]["low"] == 0
+    assert kpis["sla"]["total_tickets_with_sla"] == 3
+    assert ReportFilter(date_from="2024-01-01", category="software").as_dict() == {
+        "date_from": date(2024, 1, 1),
+        "category": TicketCategory.SOFTWARE,
+    }
+
+
+def test_routes_keep_database_work_off_the_event_loop(db, test_user, test_admin, test_branch):
+    """Test slow queries behind the report and ticket routes never stall the event loop"""
+    import asyncio
+    import time
+    import httpx
+    from fastapi import Depends, FastAPI
+    from sqlalchemy import event, text
+    from app.api import reports, tickets
+    from app.api.deps import get_current_user
+    from app.core.concurrency import EventLoopMonitor, configure_worker_threads
+    from app.database import get_db
+    from app.models import User
+    from app.services.report_cache_service import report_cache
+    from tests.conftest import TestingSessionLocal, engine
+
+    ticket = create_ticket(db, TicketCreate(
+        title="تیکت حلقه رویداد",
+        description="تست مسدود نشدن حلقه",
+        category=TicketCategory.SOFTWARE,
+        priority=TicketPriority.HIGH,
+        branch_id=test_branch.id,
+    ), test_user.id)
+    admin_id, branch_id, ticket_id = test_admin.id, test_branch.id, ticket.id
+    report_cache.clear()
+
+    def request_db():
+        session = TestingSessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    def admin_user(session=Depends(get_db)):
+        return session.get(User, admin_id)
+
+    app = FastAPI()
+    app.include_router(reports.router, prefix="/api/reports")
+    app.include_router(tickets.router, prefix="/api/tickets")
+
+    @app.get("/blocking")
+    async def blocking(session=Depends(get_db)):
+        session.execute(text("SELECT 1"))
+        return {}
+
+    app.dependency_overrides[get_db] = request_db
+    app.dependency_overrides[get_current_user] = admin_user
+
+    query_seconds = 0.05
+
+    def slow_query(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(query_seconds)
+
+    async def max_lag(paths):
+        # As at application startup (also loads anyio's backend before measuring)
+        configure_worker_threads()
+        monitor = EventLoopMonitor(interval=0.005, warning_seconds=query_seconds)
+        monitor.start()
+        try:
+            async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+                responses = await asyncio.gather(*(
+                    client.request(method, path, **kwargs) for method, path, kwargs in paths
+                ))
+        finally:
+            await monitor.stop()
+        return monitor.max_lag, responses
+
+    event.listen(engine, "before_cursor_execute", slow_query)
+    try:
+        lag, responses = asyncio.run(max_lag([
+            ("GET", "/api/reports/dashboard", {}),
+            ("GET", "/api/reports/by-status", {"params": {"branch_id": branch_id}}),
+            ("GET", "/api/reports/export", {"params": {"kind": "by-priority"}}),
+            ("GET", f"/api/tickets/{ticket_id}", {}),
+            ("PATCH", f"/api/tickets/{ticket_id}/status", {"json": {"status": "in_progress"}}),
+        ]))
+        assert [response.status_code for response in responses] == [200] * 5
+        assert responses[4].json()["status"] == "in_progress"
+        assert lag < query_seconds * 0.8
+
+        # The probe itself notices a handler that queries on the loop
+        blocked_lag, _ = asyncio.run(max_lag([("GET", "/blocking", {})]))
+        assert blocked_lag >= query_seconds * 0.8
+    finally:
+        event.remove(engine, "before_cursor_execute", slow_query)
+
+
+def test_hot_endpoints_run_on_an_async_session(db, test_user, test_branch):
+    """Ticket list/detail, notification feed and auth/me work on an AsyncSession without worker threads"""
+    import asyncio
+    import threading
+    import httpx
+    from fastapi import FastAPI
+    from sqlalchemy import event
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+    from app.api import auth, notifications, tickets
+    from app.core.security import create_access_token
+    from app.database import async_database_url, get_session
+    from app.services.notification_feed_service import create_notifications
+    from app.services.ticket_cache_service import ticket_read_cache
+    from tests.conftest import SQLALCHEMY_DATABASE_URL
+
+    test_user.branch_id = test_branch.id
+    db.commit()
+    ticket = create_ticket(db, TicketCreate(
+        title="تیکت async",
+        description="خواندن با AsyncSession",
+        category=TicketCategory.SOFTWARE,
+        priority=TicketPriority.HIGH,
+    ), test_user.id)
+    create_notifications(db, [{"user_id": test_user.id, "title": "اعلان", "body": "متن اعلان"}])
+    ticket_id, ticket_number = ticket.id, ticket.ticket_number
+    token = create_access_token(data={"sub": test_user.username, "user_id": test_user.id})
+    ticket_read_cache.clear()
+
+    assert async_database_url("sqlite:///./x.db") == "sqlite+aiosqlite:///./x.db"
+    assert async_database_url("postgresql://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+
+    async def scenario():
+        async_engine = create_async_engine(async_database_url(SQLALCHEMY_DATABASE_URL))
+        session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+        sessions, query_threads = [], set()
+
+        async def async_db():
+            async with session_factory() as session:
+                sessions.append(session)
+                yield session
+
+        def record_thread(*args):
+            query_threads.add(threading.current_thread())
+
+        app = FastAPI()
+        app.include_router(auth.router, prefix="/api/auth")
+        app.include_router(tickets.router, prefix="/api/tickets")
+        app.include_router(notifications.router, prefix="/api/notifications")
+        app.dependency_overrides[get_session] = async_db
+        event.listen(async_engine.sync_engine, "before_cursor_execute", record_thread)
+        try:
+            async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+                headers = {"Authorization": f"Bearer {token}"}
+                responses = await asyncio.gather(
+                    client.get("/api/auth/me", headers=headers),
+                    client.get("/api/tickets", headers=headers),
+                    client.get(f"/api/tickets/{ticket_id}", headers=headers),
+                    client.get("/api/notifications", headers=headers),
+                )
+        finally:
+            await async_engine.dispose()
+        return responses, sessions, query_threads
+
+    (me, listing, detail, feed), sessions, query_threads = asyncio.run(scenario())
+
+    assert [r.status_code for r in (me, listing, detail, feed)] == [200] * 4
+    assert me.json()["branch"]["code"] == test_branch.code
+    assert [item["ticket_number"] for item in listing.json()["items"]] == [ticket_number]
+    assert detail.json()["user"]["username"] == test_user.username
+    assert [item["title"] for item in feed.json()] == ["اعلان"]
+    assert sessions and all(isinstance(session, AsyncSession) for session in sessions)
+    # Queries are awaited on the loop through the async driver, not run on worker threads
+    assert query_threads == {threading.main_thread()}
+
+
+def test_sla_scheduler_wakes_at_deadlines_and_follows_changes(db, test_user, monkeypatch):
+    """The SLA task checks only due logs and reschedules them as logs, tickets and rules change"""
+    import asyncio
+    from app.models import SLALog, SLARule
+    from app.services import sla_alert_service
+    from app.services.sla_scheduler_service import sla_deadline_scheduler
+    from app.tasks.sla_tasks import refresh_sla_deadlines, run_sla_tick
+
+    rule = SLARule(
+        name="پیش‌فرض", response_time_minutes=60, resolution_time_minutes=240,
+        response_warning_minutes=30, resolution_warning_minutes=60,
+        escalation_enabled=True, escalation_after_minutes=300,
+    )
+    db.add(rule)
+    db.commit()
+    ticket = create_ticket(db, TicketCreate(
+        title="تیکت SLA", description="بررسی مهلت‌های SLA", category=TicketCategory.SOFTWARE, priority=TicketPriority.HIGH,
+    ), test_user.id)
+    log = db.query(SLALog).filter(SLALog.ticket_id == ticket.id).one()
+    target_response = log.target_response_time
+
+    sent = []
+
+    async def record(db, alerts):
+        sent.extend((alert.kind, alert.ticket_id) for alert in alerts)
+        return {"sent": len(alerts), "failed": 0}
+    monkeypatch.setattr(sla_alert_service, "dispatch_sla_alerts", record)
+
+    async def scenario():
+        scheduler = sla_deadline_scheduler
+        scheduler.attach(asyncio.get_running_loop())
+        try:
+            scheduler.request_rebuild()
+            await refresh_sla_deadlines(scheduler, db)
+            assert len(scheduler) == 1
+
+            # New tickets are picked up from the session hooks (SLA log written in a savepoint)
+            other = create_ticket(db, TicketCreate(
+                title="تیکت دوم", description="بررسی مهلت‌های SLA", category=TicketCategory.SOFTWARE,
+                priority=TicketPriority.LOW,
+            ), test_user.id)
+            other_log = db.query(SLALog).filter(SLALog.ticket_id == other.id).one()
+            await refresh_sla_deadlines(scheduler, db)
+            assert len(scheduler) == 2
+            assert scheduler.next_deadline() == min(
+                target_response, other_log.target_response_time
+            ) - timedelta(minutes=30)
+
+            # Nothing due yet: no log is loaded
+            assert await run_sla_tick(scheduler, target_response - timedelta(minutes=31), db) is None
+
+            # Only this ticket's warning is due if the other one got a response meanwhile
+            other.first_response_at = datetime.utcnow()
+            db.commit()
+            await refresh_sla_deadlines(scheduler, db)
+            stats = await run_sla_tick(scheduler, target_response - timedelta(minutes=10), db)
+            assert stats["checked"] == 1 and stats["warnings_sent"] == 1
+            assert sent == [("response_warning", ticket.id)]
+            await refresh_sla_deadlines(scheduler, db)
+            assert scheduler.next_deadline() == target_response
+
+            # Rule changes move the pending deadlines
+            rule.escalation_after_minutes = 1
+            db.commit()
+            await refresh_sla_deadlines(scheduler, db)
+            assert scheduler.next_deadline() < target_response - timedelta(minutes=50)
+
+            # Resolved tickets drop out
+            update_ticket_status(db, ticket, TicketStatus.RESOLVED)
+            await refresh_sla_deadlines(scheduler, db)
+            assert scheduler.next_deadline() == other.created_at + timedelta(minutes=1)
+            update_ticket_status(db, other, TicketStatus.RESOLVED)
+            await refresh_sla_deadlines(scheduler, db)
+            assert len(scheduler) == 0 and scheduler.next_deadline() is None
+        finally:
+            scheduler.detach()
+
+    asyncio.run(scenario())
+    assert len(sent) == 1
+
+
+def test_sla_rule_matching_uses_compiled_index(db):
+    """Rules are matched without queries and recompiled after rule writes"""
+    from sqlalchemy import event
+    from app.models import Department, SLARule, Ticket
+    from app.schemas.sla import SLARuleCreate, SLARuleUpdate
+    from app.services.sla_service import (
+        create_sla_rule, delete_sla_rule, find_matching_sla_rule, match_sla_rules_for_tickets, update_sla_rule,
+    )
+
+    department = Department(name="پشتیبانی", code="SUP")
+    db.add(department)
+    db.commit()
+    default = create_sla_rule(db, SLARuleCreate(name="پیش‌فرض", response_time_minutes=60, resolution_time_minutes=480))
+    high = create_sla_rule(db, SLARuleCreate(
+        name="فوری", priority=TicketPriority.HIGH, response_time_minutes=15, resolution_time_minutes=120,
+    ))
+    by_department = create_sla_rule(db, SLARuleCreate(
+        name="پشتیبانی", department_id=department.id, response_time_minutes=30, resolution_time_minutes=240,
+    ))
+    exact = create_sla_rule(db, SLARuleCreate(
+        name="نرم‌افزار فوری پشتیبانی", priority=TicketPriority.HIGH, category=TicketCategory.SOFTWARE,
+        department_id=department.id, response_time_minutes=5, resolution_time_minutes=60,
+    ))
+    rule_ids = {rule.name: rule.id for rule in (default, high, by_department, exact)}
+    department_id = department.id
+    find_matching_sla_rule(db, TicketPriority.LOW, TicketCategory.OTHER)
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    try:
+        matched = {
+            key: find_matching_sla_rule(db, *key).id
+            for key in [
+                (TicketPriority.HIGH, TicketCategory.SOFTWARE, department_id),
+                (TicketPriority.HIGH, TicketCategory.EQUIPMENT, department_id),
+                (TicketPriority.LOW, TicketCategory.SOFTWARE, department_id),
+                (TicketPriority.LOW, TicketCategory.SOFTWARE, None),
+            ]
+        }
+        bulk = match_sla_rules_for_tickets(db, [
+            Ticket(id=1, priority=TicketPriority.HIGH, category=TicketCategory.SOFTWARE, department_id=department_id),
+            Ticket(id=2, priority=TicketPriority.HIGH, category=TicketCategory.OTHER, department_id=None),
+        ])
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", record)
+
+    assert statements == []
+    assert list(matched.values()) == [
+        rule_ids["نرم‌افزار فوری پشتیبانی"], rule_ids["فوری"], rule_ids["پشتیبانی"], rule_ids["پیش‌فرض"],
+    ]
+    assert {ticket_id: rule.id for ticket_id, rule in bulk.items()} == {1: rule_ids["نرم‌افزار فوری پشتیبانی"], 2: rule_ids["فوری"]}
+
+    # Updates, deactivation and deletes are seen by the next match
+    update_sla_rule(db, db.get(SLARule, rule_ids["فوری"]), SLARuleUpdate(response_time_minutes=10))
+    assert find_matching_sla_rule(db, TicketPriority.HIGH, TicketCategory.OTHER).response_time_minutes == 10
+    update_sla_rule(db, db.get(SLARule, rule_ids["فوری"]), SLARuleUpdate(is_active=False))
+    assert find_matching_sla_rule(db, TicketPriority.HIGH, TicketCategory.OTHER).id == rule_ids["پیش‌فرض"]
+    delete_sla_rule(db, db.get(SLARule, rule_ids["نرم‌افزار فوری پشتیبانی"]))
+    assert find_matching_sla_rule(
+        db, TicketPriority.HIGH, TicketCategory.SOFTWARE, department_id
+    ).id == rule_ids["پشتیبانی"]
+    db.query(SLARule).delete()
+    db.commit()
+    assert find_matching_sla_rule(db, TicketPriority.LOW, TicketCategory.OTHER) is None
+
+
+def test_sla_sweep_batches_transitions_and_groups_notifications(db, test_user, test_admin, monkeypatch):
+    """A sweep writes its transitions in one bulk update and sends one message per recipient"""
+    import asyncio
+    from sqlalchemy import event
+    from app.config import settings
+    from app.models import SLALog, SLARule, User
+    from app.services import sla_alert_service
+    from app.services.email_service import email_service
+    from app.services.sla_alert_service import check_due_sla_logs
+
+    db.add(SLARule(name="پیش‌فرض", response_time_minutes=60, resolution_time_minutes=480))
+    specialist = User(
+        username="specialist", full_name="کارشناس", password_hash="x", role=UserRole.IT_SPECIALIST,
+        language=Language.EN, is_active=True, telegram_chat_id="200", email="specialist@example.com",
+    )
+    db.add(specialist)
+    test_admin.telegram_chat_id = "100"
+    test_admin.email = "admin@example.com"
+    db.commit()
+    tickets = [
+        create_ticket(db, TicketCreate(
+            title=f"تیکت {index}", description="بررسی هشدارهای SLA", category=TicketCategory.SOFTWARE,
+            priority=TicketPriority.MEDIUM,
+        ), test_user.id)
+        for index in range(4)
+    ]
+    for ticket in tickets[:3]:
+        ticket.assigned_to_id = specialist.id
+    db.commit()
+    numbers = [ticket.ticket_number for ticket in tickets]
+    logs = db.query(SLALog).order_by(SLALog.id).all()
+    log_ids = [log.id for log in logs]
+    now = max(log.target_response_time for log in logs) + timedelta(minutes=5)
+
+    messages = []
+    emails = []
+
+    async def telegram(chat_id, message):
+        messages.append((chat_id, message))
+
+    async def digest(to_email, alerts, language):
+        emails.append((to_email, language, sorted(alert["ticket_number"] for alert in alerts)))
+        return True
+
+    monkeypatch.setattr(sla_alert_service, "send_telegram_notification_to_user", telegram)
+    monkeypatch.setattr(settings, "TELEGRAM_ADMIN_GROUP_ID", None)
+    monkeypatch.setattr(email_service, "enabled", True)
+    monkeypatch.setattr(email_service, "send_sla_digest_email", digest)
+
+    updates = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE sla_logs"):
+            updates.append(executemany)
+
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    try:
+        stats = asyncio.run(check_due_sla_logs(db, log_ids, now))
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", record)
+
+    assert stats["checked"] == 4 and stats["breaches_sent"] == 4 and stats["errors"] == 0
+    assert updates == [True]
+    assert set(stats["timings_ms"]) == {"load", "evaluate", "persist", "notify"}
+    assert {log.response_status for log in db.query(SLALog)} == {"breached"}
+
+    assert sorted(chat_id for chat_id, _ in messages) == ["100", "200"]
+    by_chat = dict(messages)
+    assert all(number in by_chat["200"] for number in numbers[:3]) and numbers[3] not in by_chat["200"]
+    assert all(number in by_chat["100"] for number in numbers)
+    assert sorted(emails) == [
+        ("admin@example.com", Language.FA, sorted(numbers)),
+        ("specialist@example.com", Language.EN, sorted(numbers[:3])),
+    ]
+    assert stats["messages_sent"] == 4 and stats["message_errors"] == 0
+
+    # Already breached: nothing is written or sent again
+    messages.clear()
+    stats = asyncio.run(check_due_sla_logs(db, log_ids, now + timedelta(minutes=1)))
+    assert stats["breaches_sent"] == 0 and messages == []
+
+
+def test_scheduler_leases_elect_one_process_and_fail_over(db, monkeypatch):
+    """Each job runs in the process holding its lease; a dead holder's lease is taken over"""
+    import asyncio
+    from sqlalchemy.orm import Session
+    from app.config import settings
+    from app.models import SchedulerLease
+    from app.services.scheduler_lease_service import (
+        SCHEDULER_JOBS, acquire_lease, lease_is_active, list_leases, record_lease_run, release_lease,
+    )
+    from app.tasks.scheduler_lease_tasks import run_as_leader
+
+    now = datetime.utcnow()
+    assert acquire_lease(db, "sla", "a", now)
+    assert not acquire_lease(db, "sla", "b", now + timedelta(seconds=30))
+    assert acquire_lease(db, "sla", "a", now + timedelta(seconds=30))
+    assert not acquire_lease(db, "sla", "b", now + timedelta(seconds=80))
+    assert acquire_lease(db, "sla", "b", now + timedelta(seconds=91))
+    record_lease_run(db, "sla", now + timedelta(seconds=91), "timeout", holder="b")
+    lease = db.get(SchedulerLease, "sla")
+    db.refresh(lease)
+    assert lease.holder == "b" and lease.acquired_at == now + timedelta(seconds=91)
+    assert lease.last_run_status == "error" and lease.last_run_error == "timeout"
+    assert not release_lease(db, "sla", "a") and release_lease(db, "sla", "b")
+    assert [lease.name for lease in list_leases(db)] == list(SCHEDULER_JOBS)
+    assert not any(lease_is_active(lease) for lease in list_leases(db))
+
+    # Two processes running the same scheduler: only one runs it until it dies
+    monkeypatch.setattr(settings, "SCHEDULER_HEARTBEAT_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "SCHEDULER_LEASE_SECONDS", 0.3)
+    runs = []
+
+    def process(holder):
+        def call(func, *args):
+            session = Session(bind=db.get_bind())
+            try:
+                return func(session, *args, holder=holder)
+            finally:
+                session.close()
+
+        async def job():
+            while True:
+                runs.append(holder)
+                await asyncio.sleep(0.01)
+
+        return run_as_leader("automation", job, call=call)
+
+    async def scenario():
+        first = asyncio.create_task(process("first"))
+        await asyncio.sleep(0.1)
+        second = asyncio.create_task(process("second"))
+        await asyncio.sleep(0.3)
+        assert set(runs) == {"first"}
+        # The first process dies without releasing its lease
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        runs.clear()
+        await asyncio.sleep(0.15)
+        assert runs == []
+        await asyncio.sleep(0.5)
+        second.cancel()
+        await asyncio.gather(second, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert runs and set(runs) == {"second"}
+
+
+def test_daily_report_missed_by_a_failed_over_holder_is_sent_on_takeover(db):
+    """A process taking the daily_report lease after the report hour sends the missed report once"""
+    from app.services.scheduler_lease_service import acquire_lease, last_run_started_at, record_lease_run
+    from app.tasks.telegram_report_tasks import next_report_at
+
+    now = datetime(2024, 5, 2, 10, 30)
+    assert acquire_lease(db, "daily_report", "a", now)
+    assert last_run_started_at(db, "daily_report") is None
+    record_lease_run(db, "daily_report", datetime(2024, 5, 1, 8, 0), holder="a")
+    last_run = last_run_started_at(db, "daily_report")
+    assert last_run == datetime(2024, 5, 1, 8, 0)
+
+    # Yesterday's report was the last one: today's 08:00 was missed
+    assert next_report_at(now, 8, last_run) == now
+    # Today's report was sent before the failover, or it is not due yet
+    assert next_report_at(now, 8, datetime(2024, 5, 2, 8, 0)) == datetime(2024, 5, 3, 8, 0)
+    assert next_report_at(now, 11, last_run) == datetime(2024, 5, 2, 11, 0)
+    # No recorded run (fresh install) or not on takeover: wait for the next report time
+    assert next_report_at(now, 8) == datetime(2024, 5, 3, 8, 0)
+
+
+def test_sla_backfill_recomputes_logs_in_resumable_chunks(db, test_user, test_admin):
+    """A backfill applies changed rules to existing logs chunk by chunk and can be paused and resumed"""
+    import asyncio
+    from app.models import SLALog, SLARule
+    from app.services.sla_backfill_service import (
+        BACKFILL_DONE,
+        BACKFILL_PAUSED,
+        create_backfill_job,
+        get_backfill_job,
+        pause_backfill_job,
+        process_backfill_chunk,
+        resume_backfill_job,
+        run_backfill_job,
+    )
+
+    rule = SLARule(name="پیش‌فرض", response_time_minutes=60, resolution_time_minutes=480)
+    db.add(rule)
+    db.commit()
+    tickets = [
+        create_ticket(db, TicketCreate(
+            title=f"تیکت {index}", description="بازمحاسبه SLA", category=TicketCategory.SOFTWARE,
+            priority=TicketPriority.MEDIUM,
+        ), test_user.id)
+        for index in range(5)
+    ]
+    # An imported ticket without a log, and one resolved in time
+    db.query(SLALog).filter(SLALog.ticket_id == tickets[4].id).delete()
+    tickets[0].first_response_at = tickets[0].created_at + timedelta(minutes=90)
+    rule.response_time_minutes = 120
+    db.commit()
+
+    job = create_backfill_job(db, chunk_size=2, pause_ms=0, requested_by_id=test_admin.id)
+    assert job.total_tickets == 5 and job.max_ticket_id == tickets[-1].id
+
+    assert process_backfill_chunk(db, job.id) == 0
+    job = get_backfill_job(db, job.id)
+    assert job.processed_tickets == 2 and job.last_ticket_id == tickets[1].id
+    pause_backfill_job(db, job)
+    asyncio.run(run_backfill_job(job.id, db))
+    job = get_backfill_job(db, job.id)
+    assert job.status == BACKFILL_PAUSED and job.processed_tickets == 2
+
+    with pytest.raises(ValueError):
+        pause_backfill_job(db, job)
+    resume_backfill_job(db, job)
+    with pytest.raises(ValueError):
+        resume_backfill_job(db, job)
+    asyncio.run(run_backfill_job(job.id, db))
+
+    job = get_backfill_job(db, job.id)
+    assert job.status == BACKFILL_DONE and job.finished_at is not None
+    assert job.processed_tickets == 5 and job.created_logs == 1 and job.updated_logs == 4
+    db.expire_all()
+    logs = {log.ticket_id: log for log in db.query(SLALog)}
+    assert set(logs) == {ticket.id for ticket in tickets}
+    for ticket in tickets:
+        target = logs[ticket.id].target_response_time.replace(tzinfo=None)
+        assert target == ticket.created_at.replace(tzinfo=None) + timedelta(minutes=120)
+    assert logs[tickets[0].id].response_status == "on_time"
+
+    # Nothing left to change
+    rerun = create_backfill_job(db, chunk_size=10, pause_ms=0)
+    asyncio.run(run_backfill_job(rerun.id, db))
+    rerun = get_backfill_job(db, rerun.id)
+    assert rerun.status == BACKFILL_DONE and rerun.updated_logs == 0 and rerun.created_logs == 0
+
+
+def test_sla_backfill_leaves_open_deadlines_to_the_sla_checks():
+    """Overdue open tickets keep their status and escalation so the SLA checks still alert on them"""
+    from types import SimpleNamespace
+    from app.services.sla_backfill_service import recompute_sla_fields
+    from app.services.sla_rule_matcher_service import CompiledSLARule
+
+    rule = CompiledSLARule(
+        id=1, name="فوری", priority=None, category=None, department_id=None,
+        response_time_minutes=30, resolution_time_minutes=120,
+        response_warning_minutes=10, resolution_warning_minutes=30,
+        escalation_enabled=True, escalation_after_minutes=60,
+    )
+    created_at = datetime.utcnow() - timedelta(days=1)
+    open_ticket = SimpleNamespace(created_at=created_at, first_response_at=None, resolved_at=None, closed_at=None)
+
+    fields = recompute_sla_fields(open_ticket, rule)
+    assert fields["response_status"] is None and fields["resolution_status"] is None
+    assert not fields["escalated"] and fields["escalated_at"] is None
+
+    current = SimpleNamespace(response_status="warning", resolution_status=None, escalated=False, escalated_at=None)
+    fields = recompute_sla_fields(open_ticket, rule, current)
+    assert fields["response_status"] == "warning" and fields["resolution_status"] is None
+    assert not fields["escalated"]
+
+    # Met deadlines are settled: responded late, resolved after the escalation was due
+    closed_ticket = SimpleNamespace(
+        created_at=created_at, first_response_at=created_at + timedelta(minutes=45),
+        resolved_at=created_at + timedelta(minutes=90), closed_at=None,
+    )
+    fields = recompute_sla_fields(closed_ticket, rule, current)
+    assert fields["response_status"] == "breached" and fields["resolution_status"] == "on_time"
+    assert fields["escalated"] and fields["escalated_at"] == created_at + timedelta(minutes=60)
+
+
+def test_count_invalidation_survives_a_failed_savepoint(db):
+    """A savepoint rolled back inside a transaction keeps the commit's count invalidation"""
+    from app.models import Branch
+    from app.services.count_service import count_cache
+
+    db.add(Branch(name="شعبه شمارش", name_en="Counted", code="CNT", is_active=True))
+    db.flush()
+    with pytest.raises(RuntimeError):
+        with db.begin_nested():
+            raise RuntimeError("auto-assign failed")
+    generations = count_cache.generations(("branches",))
+    db.commit()
+    assert count_cache.generations(("branches",)) > generations
+
+    db.add(Branch(name="شعبه برگشتی", name_en="Rolled", code="RBK", is_active=True))
+    db.flush()
+    db.rollback()
+    generations = count_cache.generations(("branches",))
+    db.commit()
+    assert count_cache.generations(("branches",)) == generations
+
+
+def test_ticket_cache_invalidation_survives_a_failed_savepoint(db, test_user):
+    """A savepoint rolled back inside a transaction keeps the commit's ticket cache invalidation"""
+    from app.services.ticket_cache_service import ticket_read_cache
+
+    ticket = create_ticket(db, TicketCreate(
+        title="تیکت savepoint",
+        description="تست کش پس از savepoint",
+        category=TicketCategory.SOFTWARE,
+        priority=TicketPriority.MEDIUM
+    ), test_user.id)
+    ticket.title = "عنوان تغییرکرده"
+    db.flush()
+    with pytest.raises(RuntimeError):
+        with db.begin_nested():
+            raise RuntimeError("feed failed")
+    # Another session reads and caches the pre-commit row meanwhile
+    stamp = ticket_read_cache.version()
+    ticket_read_cache.store(get_ticket(db, ticket.id, load_relations=True), stamp)
+    db.commit()
+    assert ticket_read_cache.get(ticket.id) is None
+
+
+def test_ticket_write_hooks_are_registered_with_the_models():
+    """Importing the models alone registers the rollup and search index hooks (scripts, bot)"""
+    import subprocess
+    import sys
+
+    code = (
+        "import sys\n"
+        "import app.models\n"
+        "assert 'app.services.ticket_rollup_service' in sys.modules\n"
+        "assert 'app.services.ticket_search_service' in sys.modules\n"
+        "from sqlalchemy import event\n"
+        "from sqlalchemy.orm import Session\n"
+        "from app.services import ticket_rollup_service as r, ticket_search_service as s\n"
+        "assert event.contains(Session, 'before_flush', r._capture_facts_before_flush)\n"
+        "assert event.contains(Session, 'after_flush', r._apply_facts_after_flush)\n"
+        "assert event.contains(Session, 'after_flush', s._sync_search_index)\n"
+    )
+    subprocess.run([sys.executable, "-W", "ignore", "-c", code], check=True)
+
+
+def test_sla_deadline_marks_survive_a_failed_savepoint_in_create_ticket(db, test_user, monkeypatch):
+    """A failing auto-assign savepoint does not drop the new SLA log from the deadline heap"""
+    import asyncio
+    from app.models import SLALog, SLARule
+    from app.services import automation_service
+    from app.services.sla_scheduler_service import sla_deadline_scheduler
+
+    def failing_auto_assign(db, ticket, commit=True):
+        raise RuntimeError("auto-assign failed")
+
+    monkeypatch.setattr(automation_service, "auto_assign_ticket", failing_auto_assign)
+    db.add(SLARule(name="پیش‌فرض", response_time_minutes=60, resolution_time_minutes=240))
+    db.commit()
+    loop = asyncio.new_event_loop()
+    sla_deadline_scheduler.attach(loop)
+    try:
+        sla_deadline_scheduler.take_changes()
+        ticket = create_ticket(db, TicketCreate(
+            title="تیکت savepoint", description="ثبت مهلت پس از خطای انتساب", category=TicketCategory.SOFTWARE,
+            priority=TicketPriority.HIGH,
+        ), test_user.id)
+        log = db.query(SLALog).filter(SLALog.ticket_id == ticket.id).one()
+        _, log_ids, _, _ = sla_deadline_scheduler.take_changes()
+        assert log.id in log_ids
+    finally:
+        sla_deadline_scheduler.detach()
+        loop.close()
+
+
+def test_sla_rule_invalidation_survives_a_failed_savepoint(db):
+    """A rule write committed after a failed savepoint still invalidates the compiled index"""
+    from app.models import SLARule
+    from app.services.sla_rule_matcher_service import sla_rule_matcher
+
+    db.add(SLARule(name="پیش‌فرض", response_time_minutes=60, resolution_time_minutes=240))
+    db.flush()
+    with pytest.raises(RuntimeError):
+        with db.begin_nested():
+            raise RuntimeError("unrelated failure")
+    assert db.info.get("sla_rules_dirty")
+    version = sla_rule_matcher.version
+    db.commit()
+    assert sla_rule_matcher.version > version
+    assert "sla_rules_dirty" not in db.info
+
+
+def test_sla_scheduler_polls_changes_made_by_other_processes(db, test_user):
+    """Writes the hooks did not report (another process) reach the scheduler through the poll"""
+    import asyncio
+    from app.models import SLALog, SLARule
+    from app.services.sla_scheduler_service import sla_change_watermark, sla_deadline_scheduler
+    from app.tasks.sla_tasks import poll_sla_deadline_changes
+
+    rule = SLARule(name="پیش‌فرض", response_time_minutes=60, resolution_time_minutes=240)
+    db.add(rule)
+    db.commit()
+    watermark = sla_change_watermark(db)
+    # Detached scheduler: the hooks drop the marks, as in a process without the "sla" lease
+    ticket = create_ticket(db, TicketCreate(
+        title="تیکت فرایند دیگر", description="ثبت در فرایند دیگر", category=TicketCategory.SOFTWARE,
+        priority=TicketPriority.HIGH,
+    ), test_user.id)
+    log = db.query(SLALog).filter(SLALog.ticket_id == ticket.id).one()
+
+    loop = asyncio.new_event_loop()
+    sla_deadline_scheduler.attach(loop)
+    try:
+        sla_deadline_scheduler.take_changes()
+        watermark = loop.run_until_complete(poll_sla_deadline_changes(sla_deadline_scheduler, watermark, db))
+        rebuild, log_ids, ticket_ids, _ = sla_deadline_scheduler.take_changes()
+        assert not rebuild
+        assert log.id in log_ids
+        assert ticket.id in ticket_ids
+        assert watermark.max_log_id == log.id
+
+        # Nothing new: only the overlap window is re-read
+        loop.run_until_complete(poll_sla_deadline_changes(sla_deadline_scheduler, watermark, db))
+        _, log_ids, _, _ = sla_deadline_scheduler.take_changes()
+        assert not log_ids
+
+        db.execute(SLARule.__table__.update().values(response_time_minutes=30))
+        db.add(SLARule(name="فوری", response_time_minutes=15, resolution_time_minutes=60))
+        db.commit()
+        loop.run_until_complete(poll_sla_deadline_changes(sla_deadline_scheduler, watermark, db))
+        rebuild, _, _, _ = sla_deadline_scheduler.take_changes()
+        assert rebuild
+    finally:
+        sla_deadline_scheduler.detach()
+        loop.close()
@@ -0,0 +1,101 @@
+"""
+Tests for the ticket number allocator
+"""
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Ticket, TicketNumberSequence
+from app.schemas.ticket import TicketCreate
+from app.services.ticket_number_service import TicketNumberAllocator
+from app.services.ticket_service import create_ticket
+from app.core.enums import TicketCategory, TicketPriority
+from tests.conftest import SQLALCHEMY_DATABASE_URL
+
+
+@pytest.fixture
+def threaded_sessions(db):
+    """Session factory on the test database that tolerates many writer threads"""
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args={"check_same_thread": False, "timeout": 60},
+        pool_size=32,
+        max_overflow=0,
+    )
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def test_allocator_continues_after_existing_tickets(db, test_user):
+    """Test the first allocation of a day continues after already numbered tickets"""
+    today = datetime.now().strftime("%Y%m%d")
+    db.add(Ticket(
+        ticket_number=f"T-{today}-0007",
+        title="تیکت قدیمی",
+        description="تیکتی که قبل از شمارنده ساخته شده",
+        category=TicketCategory.OTHER,
+        priority=TicketPriority.LOW,
+        user_id=test_user.id
+    ))
+    db.commit()
+
+    allocator = TicketNumberAllocator()
+    assert allocator.next_number(db) == f"T-{today}-0008"
+    assert allocator.next_number(db) == f"T-{today}-0009"
+
+
+def test_allocator_grows_past_four_digits(db):
+    """Test numbers keep increasing after 9999 tickets in one day"""
+    db.add(TicketNumberSequence(day="20250101", last_value=9999))
+    db.commit()
+
+    allocator = TicketNumberAllocator()
+    now = datetime(2025, 1, 1, 12, 0)
+    assert allocator.next_number(db, now) == "T-20250101-10000"
+    assert allocator.next_number(db, now) == "T-20250101-10001"
+
+
+def test_block_allocators_never_overlap(db):
+    """Test two processes pre-allocating blocks hand out disjoint numbers"""
+    first = TicketNumberAllocator(block_size=5)
+    second = TicketNumberAllocator(block_size=5)
+    now = datetime(2025, 1, 2, 9, 0)
+
+    numbers = [first.next_number(db, now) for _ in range(3)]
+    numbers += [second.next_number(db, now) for _ in range(7)]
+    numbers += [first.next_number(db, now) for _ in range(4)]
+
+    assert len(set(numbers)) == len(numbers)
+    assert db.query(TicketNumberSequence).filter_by(day="20250102").one().last_value == 20
+
+
+def test_parallel_create_ticket_gets_unique_numbers(db, test_user, threaded_sessions):
+    """Test hundreds of concurrent create_ticket calls never collide on a number"""
+    user_id = test_user.id
+    calls = 300
+
+    def create(i):
+        session = threaded_sessions()
+        try:
+            ticket = create_ticket(
+                session,
+                TicketCreate(
+                    title=f"تیکت همزمان {i}",
+                    description="تست ایجاد همزمان تیکت‌ها",
+                    category=TicketCategory.SOFTWARE,
+                    priority=TicketPriority.MEDIUM
+                ),
+                user_id
+            )
+            return ticket.ticket_number
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        numbers = list(pool.map(create, range(calls)))
+
+    assert len(set(numbers)) == calls
+    assert db.query(Ticket).count() == calls
+    suffixes = sorted(int(n.rsplit("-", 1)[1]) for n in numbers)
+    assert suffixes == list(range(1, calls + 1))